@@ -22,6 +22,11 @@ import urllib.request
 from dataclasses import asdict, dataclass
 from pathlib import Path
 
+# Job completion waiting lives next to the orchestrator (event stream,
+# long-poll, then adaptive polling).
+sys.path.insert(0, str(Path(__file__).resolve().parents[3] / "skill-agent-setup" / "claude-code"))
+from job_waiter import wait_for_job  # noqa: E402
+
 
 @dataclass
 class TrialResult:
@@ -74,7 +79,7 @@ def reset_sim(sim_api: str) -> None:
 
 def submit_and_wait(agent_url: str, code: str, holder: str,
                     timeout: float = 600.0) -> dict:
-    """Submit code to /code/submit, poll /code/jobs/<id> until done.
+    """Submit code to /code/submit, wait on /code/jobs/<id> until done.
 
     Returns the final job dict (with status, stdout, etc).
     """
@@ -84,20 +89,13 @@ def submit_and_wait(agent_url: str, code: str, holder: str,
     if not job_id:
         raise RuntimeError(f"no job_id in submit response: {sub}")
 
-    deadline = time.time() + timeout
-    while time.time() < deadline:
-        job = _get(agent_url + f"/code/jobs/{job_id}")
-        if job.get("_error"):
-            time.sleep(1.0)
-            continue
-        st = job.get("status")
-        # agent_server emits "completed" (with exit_code) for finished jobs,
-        # not the "succeeded" the API guide hints at — verify before adding more
-        # statuses here.
-        if st in ("completed", "failed", "timed_out", "cancelled", "error"):
-            return job
-        time.sleep(1.5)
-    return {"status": "wait_timeout", "job_id": job_id}
+    # agent_server emits "completed" (with exit_code) for finished jobs, not
+    # the "succeeded" the API guide hints at — job_waiter.TERMINAL_STATUSES
+    # lists what counts as done.
+    job = wait_for_job(agent_url, job_id, timeout=timeout)
+    if job.get("status") == "timeout":
+        return {"status": "wait_timeout", "job_id": job_id}
+    return job
 
 
 def run_one(skill_path: Path, label: str, version: str, idx: int,
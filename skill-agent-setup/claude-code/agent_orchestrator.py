@@ -22,7 +22,10 @@ import re
 import sys
 import traceback
 import time
+import urllib.parse
 import uuid
+from collections import deque
+from contextlib import asynccontextmanager
 from pathlib import Path
 from dataclasses import dataclass, field
 from typing import Optional
@@ -32,6 +35,18 @@ try:
 except ImportError:
     raise ImportError("pip install websockets")
 
+import metrics
+from async_http import AsyncHttpClient
+from job_waiter import wait_for_job_async
+from eval_pool import EvalJob, EvalWorkerPool
+from recording_cache import RecordingCache
+from eval_evidence import build_digest, format_digest, pre_evaluate, select_key_frames
+from eval_results import EnvelopeParser, EvalResultStore, code_key
+
+# The bundler is a script dir, not a package; import it in-process.
+sys.path.insert(0, str(Path(__file__).resolve().parent / "tidybot-bundle" / "scripts"))
+import tidybot_bundle  # noqa: E402
+
 from claude_agent_sdk import (
     ClaudeSDKClient,
     ClaudeAgentOptions,
@@ -64,6 +79,15 @@ for i in range(2, 5):
 
 AGENT_SERVER = "http://localhost:8080"  # default, overridden by graph targets
 
+# Every agent-server / sim / recording request goes through this client: one
+# keep-alive pool per origin, per-attempt timeouts, retries with backoff.
+# Never call blocking urllib from a coroutine — it stalls the event loop.
+_http = AsyncHttpClient(max_per_origin=8, timeout=10.0, retries=2)
+
+
+def _http_client() -> AsyncHttpClient:
+    return _main_global("_http", _http)
+
 # Multi-target support (populated in _load_entries from graph.json "targets" field)
 targets: list[dict] = []
 primary_target: dict = {"name": "default", "agent_server": AGENT_SERVER, "sim_api": "http://localhost:5500", "primary": True}
@@ -82,6 +106,10 @@ _parser.add_argument("--graph", required=True, type=Path,
                      help="Path to a graph folder (containing graph.json) or a JSON file")
 _parser.add_argument("--autonomous", action="store_true",
                      help="Autonomous mode: skip review gate, auto-promote skills to done")
+_parser.add_argument("--placement", choices=["fanout", "least-loaded"], default=None,
+                     help="Where dev agents run: 'fanout' develops every skill on every target; "
+                          "'least-loaded' puts each skill on one target picked from live load. "
+                          "Overrides $PLACEMENT (default fanout).")
 _args = _parser.parse_args()
 
 # Harness backend — claude-sdk (default) or openclaw.
@@ -109,11 +137,17 @@ if _args.autonomous:
     autonomous_mode = True
     dev_mode = True  # autonomous implies dev mode (no planning gate either)
 
+# Dev-agent placement across targets. run_multi_target_test always fans out
+# to every target for the final validation regardless of this setting.
+PLACEMENT = (_args.placement or os.environ.get("PLACEMENT", "fanout")).lower()
+
 # ---------------------------------------------------------------------------
 # Agent type system prompts
 # ---------------------------------------------------------------------------
 
 SKILLS_DIR = GRAPH_DIR / "skills"
+# Shared with generated run_trials.py and dev agents' bundler calls.
+BUNDLE_CACHE_DIR = Path(os.environ.get(tidybot_bundle.CACHE_DIR_ENV) or GRAPH_DIR / ".bundle_cache")
 
 
 
@@ -129,13 +163,20 @@ def _is_task_root(skill: str) -> bool:
     A skill is the task root if:
     - The graph has task_env metadata, AND
     - No other skill in the tree depends on this skill
+
+    The second check is a lookup in the registry's reverse-dependency index
+    rather than a scan over every entry.
     """
     if not graph_meta.get("task_env"):
         return False
-    for entry in _entries_list():
-        if skill in entry.get("dependencies", []):
-            return False
-    return True
+    return not _registry().dependents.get(skill)
+
+
+# Ground-truth trials (trial_engine.py): spread over all targets, stopped
+# by SPRT once pass/fail against TRIAL_SUCCESS_THRESHOLD is decided.
+# Baked into generated run_trials.py; the same env vars override at run time.
+TRIAL_SUCCESS_THRESHOLD = float(os.environ.get("TRIAL_SUCCESS_THRESHOLD", "0.5"))
+TRIAL_MAX = int(os.environ.get("TRIAL_MAX", "10"))
 
 
 def _auto_generate_task_root_test(skill: str):
@@ -151,32 +192,55 @@ def _auto_generate_task_root_test(skill: str):
     # Also ensure scripts/ dir exists
     (SKILLS_DIR / skill / "scripts").mkdir(parents=True, exist_ok=True)
 
-    agent_server_url = primary_target["agent_server"]
-    sim_api_url = primary_target.get("sim_api", "http://localhost:5500")
+    trial_targets = [
+        {"name": t.get("name", ""), "agent_server": t["agent_server"],
+         "sim_api": t.get("sim_api", "http://localhost:5500")}
+        for t in (_targets_list() or [primary_target])
+    ]
 
     test_code = f'''\
 #!/usr/bin/env python3
 """Auto-generated test for task root skill: {skill}
 Task: {task_env}
 
-Runs the skill's main.py via the agent server, then checks success
-via the sim's /task/success endpoint.
+Bundles the skill once, then runs trials on every target in parallel via
+the orchestrator's trial_engine: each trial resets that target's sim, runs
+the bundle via its agent server and checks the sim's /task/success. Trials
+stop as soon as an SPRT decides pass/fail against SUCCESS_THRESHOLD.
+Per-trial results stream to tests/results/summary.json.
 """
 import json
+import os
+import sys
 import time
 import urllib.request
 import urllib.error
 
-AGENT_SERVER = "{agent_server_url}"
-SIM_API = "{sim_api_url}"
-NUM_TRIALS = 1
+TARGETS = {json.dumps(trial_targets, indent=4)}
+SUCCESS_THRESHOLD = float(os.environ.get("TRIAL_SUCCESS_THRESHOLD", "{TRIAL_SUCCESS_THRESHOLD}"))
+MAX_TRIALS = int(os.environ.get("TRIAL_MAX", "{TRIAL_MAX}"))
+
+# trial_engine (parallel trials + SPRT) and job_waiter (push-based job
+# completion) live next to the orchestrator, the bundler under it.
+sys.path.insert(0, "{Path(__file__).resolve().parent}")
+sys.path.insert(0, "{Path(__file__).resolve().parent / 'tidybot-bundle' / 'scripts'}")
+from trial_engine import SPRT, TrialEngine
+from tidybot_bundle import bundle as _bundle
+BUNDLE_CACHE_DIR = os.environ.get("TIDYBOT_BUNDLE_CACHE_DIR") or "{BUNDLE_CACHE_DIR}"
+try:
+    from job_waiter import wait_for_job as _wait_for_job
+except ImportError:
+    _wait_for_job = None
 
+SKILL_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SUMMARY_FILE = os.path.join(SKILL_DIR, "tests", "results", "summary.json")
 
-def submit_code(code: str) -> str:
+
+def submit_code(agent_server: str, code: str) -> str:
     """Submit code to agent server, return job_id."""
-    data = json.dumps({{"code": code}}).encode()
+    data = json.dumps({{"code": code, "holder": "test:{skill}", "reset_env": True}}).encode()
     req = urllib.request.Request(
-        f"{{AGENT_SERVER}}/code/submit",
+        f"{{agent_server}}/code/submit",
         data=data,
         headers={{"Content-Type": "application/json"}},
     )
@@ -184,9 +248,11 @@ def submit_code(code: str) -> str:
     return resp["job_id"]
 
 
-def wait_for_job(job_id: str, timeout: int = 300) -> dict:
-    """Poll until job completes."""
-    url = f"{{AGENT_SERVER}}/code/jobs/{{job_id}}"
+def wait_for_job(agent_server: str, job_id: str, timeout: int = 300) -> dict:
+    """Wait until job completes."""
+    if _wait_for_job is not None:
+        return _wait_for_job(agent_server, job_id, timeout=timeout)
+    url = f"{{agent_server}}/code/jobs/{{job_id}}"
     start = time.time()
     while time.time() - start < timeout:
         try:
@@ -199,90 +265,78 @@ def wait_for_job(job_id: str, timeout: int = 300) -> dict:
     return {{"status": "timeout"}}
 
 
-def check_success() -> bool:
+def reset_sim(sim_api: str):
+    req = urllib.request.Request(f"{{sim_api}}/reset", data=b"{{}}",
+                                 headers={{"Content-Type": "application/json"}})
+    try:
+        urllib.request.urlopen(req, timeout=10).read()
+    except Exception as e:
+        print(f"Could not reset sim at {{sim_api}}: {{e}}")
+
+
+def check_success(sim_api: str) -> bool:
     """Check task success via sim endpoint."""
     try:
-        resp = json.loads(urllib.request.urlopen(f"{{SIM_API}}/task/success").read())
+        resp = json.loads(urllib.request.urlopen(f"{{sim_api}}/task/success").read())
         return resp.get("success", False)
     except Exception as e:
         print(f"Could not check sim success: {{e}}")
         return False
 
 
-def run_trial(trial_num: int) -> bool:
-    """Run one trial of the skill and check success."""
-    import os
-    import subprocess
-    skill_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    skills_dir = os.path.dirname(skill_dir)
-    skill_name = os.path.basename(skill_dir)
-    bundler = os.path.join(os.path.dirname(skills_dir), "..", "tidybot-bundle", "scripts", "tidybot-bundle.py")
+def bundle() -> str:
+    """Bundle the skill with its dependencies (once for all trials)."""
+    code = _bundle(os.path.basename(SKILL_DIR), os.path.dirname(SKILL_DIR),
+                   cache_dir=BUNDLE_CACHE_DIR)
+    if code.startswith("# ERROR"):
+        raise RuntimeError(f"bundler error: {{code.splitlines()[0][:200]}}")
+    return code
 
-    if not os.path.exists(bundler):
-        print(f"Trial {{trial_num}}: FAIL - bundler not found at {{bundler}}")
-        return False
 
-    print(f"Trial {{trial_num}}: bundling skill with dependencies...")
-    result = subprocess.run(
-        ["python3", bundler, skill_name, "--skills-dir", skills_dir],
-        capture_output=True, text=True,
-    )
-    if result.returncode != 0:
-        print(f"Trial {{trial_num}}: FAIL - bundler error: {{result.stderr[:200]}}")
-        return False
-    code = result.stdout
-
-    print(f"Trial {{trial_num}}: submitting skill code...")
-    job_id = submit_code(code)
-    job = wait_for_job(job_id)
+def make_trial(code: str):
+    def run_trial(target: dict, trial_num: int) -> dict:
+        """Run one trial on ``target`` and check success."""
+        name = target["name"]
+        reset_sim(target["sim_api"])
+        print(f"Trial {{trial_num}} [{{name}}]: submitting skill code...")
+        job = wait_for_job(target["agent_server"], submit_code(target["agent_server"], code))
 
-    result = job.get("result", {{}})
-    status = job.get("status", "unknown")
-    stdout = result.get("stdout", "")
-    stderr = result.get("stderr", "")
+        result = job.get("result") or {{}}
+        status = job.get("status", "unknown")
+        execution_id = job.get("execution_id", "")
+        if status != "completed":
+            error = result.get("error") or result.get("stderr", "")[:200] or status
+            print(f"Trial {{trial_num}} [{{name}}]: FAIL - execution error: {{error}}")
+            return {{"passed": False, "execution_id": execution_id, "error": str(error)[:200]}}
 
-    if status == "failed":
-        error = result.get("error", stderr[:200])
-        print(f"Trial {{trial_num}}: FAIL - execution error: {{error}}")
-        return False
-
-    # Check task success via sim
-    success = check_success()
-    label = "PASS" if success else "FAIL"
-    print(f"Trial {{trial_num}}: {{label}} (sim _check_success={{success}})")
-    return success
+        success = check_success(target["sim_api"])
+        print(f"Trial {{trial_num}} [{{name}}]: {{'PASS' if success else 'FAIL'}} (sim _check_success={{success}})")
+        return {{"passed": success, "execution_id": execution_id}}
+    return run_trial
 
 
 def main():
-    passed = 0
-    failed = 0
-    failures = []
-
-    for i in range(1, NUM_TRIALS + 1):
-        try:
-            if run_trial(i):
-                passed += 1
-            else:
-                failed += 1
-                failures.append(f"trial_{{i}}")
-        except Exception as e:
-            failed += 1
-            failures.append(f"trial_{{i}}: {{e}}")
-            print(f"Trial {{i}}: ERROR - {{e}}")
-
-    total = passed + failed
-    rate = (passed / total * 100) if total > 0 else 0
+    meta = {{"skill": "{skill}", "task_env": "{task_env}"}}
+    try:
+        code = bundle()
+    except Exception as e:
+        print(f"FAIL - {{e}}")
+        result = {{**meta, "decision": "fail", "reason": "bundle", "success_rate": 0,
+                   "total_trials": 0, "passed": 0, "failed": 0, "failure_modes": [str(e)]}}
+        os.makedirs(os.path.dirname(SUMMARY_FILE), exist_ok=True)
+        with open(SUMMARY_FILE, "w") as f:
+            json.dump(result, f, indent=2)
+        print(json.dumps(result))
+        return
 
-    result = {{
-        "skill": "{skill}",
-        "task_env": "{task_env}",
-        "success_rate": rate,
-        "total_trials": total,
-        "passed": passed,
-        "failed": failed,
-        "failure_modes": failures,
-    }}
+    engine = TrialEngine(TARGETS, make_trial(code),
+                         SPRT(threshold=SUCCESS_THRESHOLD, max_trials=MAX_TRIALS),
+                         summary_path=SUMMARY_FILE, meta=meta)
+    summary = engine.run()
+    result = {{k: summary[k] for k in ("skill", "task_env", "decision", "reason", "success_rate",
+                                       "total_trials", "passed", "failed", "failure_modes")}}
     print(json.dumps(result))
+    # engine.run() already waited for trials submitted before the verdict.
 
 
 if __name__ == "__main__":
@@ -950,6 +1004,220 @@ skill_entries: list[dict] = []
 graph_meta: dict = {}  # top-level metadata (task_env, task_source, etc.)
 
 
+def find_dependency_cycle(deps: dict[str, tuple | list]) -> list[str] | None:
+    """Return one dependency cycle as ``[a, b, ..., a]``, or None if acyclic.
+
+    ``deps`` maps skill -> its dependencies; names missing from the map are
+    treated as leaves. Iterative DFS, so deep chains don't hit the recursion
+    limit.
+    """
+    WHITE, GREY, BLACK = 0, 1, 2
+    color = dict.fromkeys(deps, WHITE)
+    for root in deps:
+        if color[root] != WHITE:
+            continue
+        path = [root]
+        stack = [iter(deps[root])]
+        color[root] = GREY
+        while stack:
+            nxt = next(stack[-1], None)
+            if nxt is None:
+                color[path.pop()] = BLACK
+                stack.pop()
+                continue
+            c = color.get(nxt)
+            if c == GREY:
+                return path[path.index(nxt):] + [nxt]
+            if c == WHITE:
+                color[nxt] = GREY
+                path.append(nxt)
+                stack.append(iter(deps[nxt]))
+    return None
+
+
+class SkillRegistry:
+    """Indexes over the live skill_entries list.
+
+    Keeps these maps so the hot paths (entry lookup, task-root detection,
+    readiness checks) don't scan every entry:
+
+      by_name     skill name -> entry dict (same object as in skill_entries)
+      deps        skill name -> tuple of its declared dependencies
+      dependents  skill name -> set of skills that list it as a dependency
+      unmet       skill name -> number of its dependencies not "done"
+                  (a missing dependency counts as unmet)
+      ready       skills with no unmet dependencies whose own status is
+                  planned / failed, i.e. what auto-spawn should start
+
+    ``dependents`` is keyed by dependency NAME, not entry, so a skill that
+    references a missing dependency is still indexed (and becomes visible
+    again if that dependency is re-added).
+
+    ``unmet`` is maintained through the reverse edges: when a skill becomes
+    done (status_changed), only its direct dependents are touched. Status
+    changes must go through _update_entry for this to stay exact; anything
+    that edits entries wholesale goes through rebuild().
+
+    The registry binds to a list object rather than owning one. skill_entries
+    must stay a plain list (the openclaw shim and the tests read and rebind
+    it directly), so ``bind()`` rebuilds whenever the list identity or length
+    changed behind our back. All mutations that go through _add_entry /
+    _remove_entry / _update_entry / _load_entries update the indexes
+    incrementally instead.
+    """
+
+    READY_STATUSES = ("planned", "failed")
+
+    def __init__(self):
+        self._entries: list[dict] | None = None
+        self._size = -1
+        self.by_name: dict[str, dict] = {}
+        self.deps: dict[str, tuple[str, ...]] = {}
+        self.dependents: dict[str, set[str]] = {}
+        self.unmet: dict[str, int] = {}
+        self.ready: set[str] = set()
+        self._done: set[str] = set()
+        self._rank: dict[str, int] = {}   # entry order, for stable ready_names()
+        self._next_rank = 0
+        self.topology = 0   # bumped whenever skills or dependency edges change
+        self._critical_paths: tuple[int, dict[str, int]] | None = None
+
+    def bind(self, entries: list[dict]) -> "SkillRegistry":
+        if entries is not self._entries or len(entries) != self._size:
+            self.rebuild(entries)
+        return self
+
+    def rebuild(self, entries: list[dict]) -> None:
+        self.topology += 1
+        self._entries = entries
+        self._size = len(entries)
+        self.by_name = {}
+        self.deps = {}
+        self.dependents = {}
+        self.unmet = {}
+        self.ready = set()
+        self._rank = {}
+        for e in entries:
+            name = e["name"]
+            if name in self.by_name:
+                continue  # first entry wins, matching the old linear scan
+            self.by_name[name] = e
+            self._rank[name] = self._next_rank
+            self._next_rank += 1
+            self._index_deps(name, e.get("dependencies") or [])
+        self._done = {n for n, e in self.by_name.items() if e.get("status", "planned") == "done"}
+        for name in self.by_name:
+            self._count_unmet(name)
+
+    def _index_deps(self, name: str, deps) -> None:
+        self.deps[name] = tuple(deps)
+        for d in self.deps[name]:
+            self.dependents.setdefault(d, set()).add(name)
+
+    def _unindex_deps(self, name: str) -> None:
+        for d in self.deps.pop(name, ()):
+            users = self.dependents.get(d)
+            if users is not None:
+                users.discard(name)
+                if not users:
+                    del self.dependents[d]
+
+    def _count_unmet(self, name: str) -> None:
+        self.unmet[name] = sum(1 for d in self.deps.get(name, ()) if d not in self._done)
+        self._refresh_ready(name)
+
+    def _refresh_ready(self, name: str) -> None:
+        e = self.by_name.get(name)
+        if (e is not None and self.unmet.get(name, 0) == 0
+                and e.get("status", "planned") in self.READY_STATUSES):
+            self.ready.add(name)
+        else:
+            self.ready.discard(name)
+
+    def _set_done(self, name: str, done: bool) -> None:
+        """Flip ``name``'s done-ness and adjust its direct dependents' counters."""
+        if done == (name in self._done):
+            return
+        if done:
+            self._done.add(name)
+        else:
+            self._done.discard(name)
+        delta = -1 if done else 1
+        for user in self.dependents.get(name, ()):
+            if user in self.unmet:
+                self.unmet[user] += delta * self.deps[user].count(name)
+                self._refresh_ready(user)
+
+    def ready_names(self) -> list[str]:
+        """Ready skills in graph order."""
+        return sorted(self.ready, key=lambda n: self._rank.get(n, 0))
+
+    def status_changed(self, name: str) -> None:
+        """Re-read ``name``'s status after _update_entry changed it."""
+        e = self.by_name.get(name)
+        if e is None:
+            return
+        self._set_done(name, e.get("status", "planned") == "done")
+        self._refresh_ready(name)
+
+    def cycle_with(self, name: str, deps) -> list[str] | None:
+        """The cycle that giving ``name`` these dependencies would create, if any."""
+        if name in deps:
+            return [name, name]
+        graph = dict(self.deps)
+        graph[name] = tuple(deps)
+        return find_dependency_cycle(graph)
+
+    def get(self, name: str) -> dict | None:
+        return self.by_name.get(name)
+
+    def status_of(self, name: str) -> str | None:
+        e = self.by_name.get(name)
+        return e.get("status", "planned") if e else None
+
+    def added(self, entry: dict) -> None:
+        """Index an entry that was just appended to the bound list."""
+        self._size = len(self._entries) if self._entries is not None else self._size
+        name = entry["name"]
+        if name not in self.by_name:
+            self.topology += 1
+            self.by_name[name] = entry
+            self._rank[name] = self._next_rank
+            self._next_rank += 1
+            self._index_deps(name, entry.get("dependencies") or [])
+            self._count_unmet(name)
+            self._set_done(name, entry.get("status", "planned") == "done")
+
+    def removed(self, name: str) -> None:
+        """Drop a skill whose entries were just removed from the bound list."""
+        self._size = len(self._entries) if self._entries is not None else self._size
+        if self.by_name.pop(name, None) is not None:
+            self.topology += 1
+            self._set_done(name, False)  # dependents now wait on a missing skill
+            self._unindex_deps(name)
+            self.unmet.pop(name, None)
+            self.ready.discard(name)
+            self._rank.pop(name, None)
+
+    def dependencies_changed(self, name: str) -> None:
+        entry = self.by_name.get(name)
+        if entry is None:
+            return
+        self.topology += 1
+        self._unindex_deps(name)
+        self._index_deps(name, entry.get("dependencies") or [])
+        self._count_unmet(name)
+
+
+_skill_registry = SkillRegistry()
+
+
+def _registry() -> SkillRegistry:
+    """Registry bound to the live skill_entries (prefers __main__'s)."""
+    reg = _main_global("_skill_registry", _skill_registry)
+    return reg.bind(_entries_list())
+
+
 def _load_entries():
     """Load entries from graph file into memory. Resets stale non-done statuses.
 
@@ -970,6 +1238,18 @@ def _load_entries():
         new_entries = data
         new_meta = {}
 
+    # A cyclic graph (hand-edited graph.json) still loads, but every skill on
+    # a cycle would wait on another forever and auto-spawn would silently
+    # never start them — say so in the log and on the dashboard card.
+    deps = {e["name"]: e.get("dependencies") or [] for e in new_entries}
+    by_name = {e["name"]: e for e in new_entries}
+    while cycle := find_dependency_cycle(deps):
+        text = f"dependency cycle: {' -> '.join(cycle)}"
+        print(f"[ORCH] warn: {LOCAL_REPOS.name}: {text}")
+        for name in cycle:
+            by_name[name]["agent_status_text"] = text
+            deps[name] = []  # treat as a leaf so the next search finds other cycles
+
     # In-place mutation (don't rebind globals)
     skill_entries.clear()
     skill_entries.extend(new_entries)
@@ -1001,6 +1281,9 @@ def _load_entries():
         if status not in ("done", "confirmed_done", "planned"):
             entry["status"] = "failed"
             reset_count += 1
+    _registry().rebuild(_entries_list())
+    # Every entry may have changed — re-diff all of them on the next broadcast
+    _main_global("_delta_state", _delta_state).primed = False
     if reset_count:
         print(f"[ORCH] Reset {reset_count} stale skill(s) to 'failed'")
         _save_entries()
@@ -1049,15 +1332,163 @@ def _agents_dict():
     return _main_global("agents", agents)
 
 
-def _save_entries():
-    """Persist entries back to local_repos.json."""
-    LOCAL_REPOS.parent.mkdir(parents=True, exist_ok=True)
+GRAPH_FLUSH_DEBOUNCE_S = float(os.environ.get("GRAPH_FLUSH_DEBOUNCE_S", "0.5"))
+
+
+class GraphPersister:
+    """Write-behind state for graph.json.
+
+    _save_entries() only marks the graph dirty; a background task started by
+    main() coalesces every save inside a GRAPH_FLUSH_DEBOUNCE_S window into a
+    single write. Without a running flush task (module import, tests, CLI
+    helpers) saves fall through to an immediate synchronous write.
+    """
+
+    def __init__(self):
+        self.dirty = False
+        self.wakeup: asyncio.Event | None = None
+        self.task: asyncio.Task | None = None
+        self.inflight: asyncio.Task | None = None   # write running in a worker thread
+        self.writes = 0
+
+    @property
+    def running(self) -> bool:
+        return self.task is not None and not self.task.done()
+
+
+_graph_persist = GraphPersister()
+
+
+def _atomic_write_text(path: Path, text: str) -> None:
+    """Write ``text`` to ``path`` via a temp file + os.replace.
+
+    A crash mid-write leaves the previous file intact instead of a
+    truncated one. The temp file lives in the same directory so the
+    rename stays on one filesystem.
+    """
+    import tempfile
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=str(path.parent), prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def _graph_snapshot() -> str:
+    """Serialize the current graph (meta + entries) exactly as stored on disk."""
     entries = _entries_list()
     if graph_meta:
         data = {**graph_meta, "entries": entries}
     else:
         data = entries
-    LOCAL_REPOS.write_text(json.dumps(data, indent=2))
+    return json.dumps(data, indent=2)
+
+
+def _save_entries():
+    """Persist entries back to graph.json.
+
+    Marks the graph dirty and wakes the write-behind flush task. Falls back
+    to a synchronous atomic write when no flush task is running.
+    """
+    p = _main_global("_graph_persist", _graph_persist)
+    p.dirty = True
+    if p.running and p.wakeup is not None:
+        p.wakeup.set()
+    else:
+        _flush_entries()
+
+
+def _flush_entries():
+    """Synchronously write graph.json if there are unsaved changes."""
+    p = _main_global("_graph_persist", _graph_persist)
+    if not p.dirty:
+        return
+    p.dirty = False
+    try:
+        _atomic_write_text(LOCAL_REPOS, _graph_snapshot())
+        p.writes += 1
+    except Exception:
+        p.dirty = True
+        raise
+
+
+async def _graph_flush_loop():
+    """Background task: flush graph.json at most once per debounce window.
+
+    The snapshot is serialized on the event loop (entries are mutated there,
+    so this is the only consistent view); only the file write itself is
+    handed to a worker thread.
+    """
+    p = _graph_persist
+    while True:
+        await p.wakeup.wait()
+        await asyncio.sleep(GRAPH_FLUSH_DEBOUNCE_S)
+        p.wakeup.clear()
+        if not p.dirty:
+            continue
+        p.dirty = False
+        snapshot = _graph_snapshot()
+        # Shielded so cancelling the loop leaves the write for
+        # _stop_graph_persister to await instead of orphaning the thread.
+        p.inflight = asyncio.ensure_future(asyncio.to_thread(_atomic_write_text, LOCAL_REPOS, snapshot))
+        try:
+            await asyncio.shield(p.inflight)
+            p.writes += 1
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"[ORCH] graph.json flush failed (will retry): {e}")
+            p.dirty = True
+            p.wakeup.set()
+
+
+def _start_graph_persister():
+    """Start the write-behind flush task (call from inside the event loop)."""
+    p = _graph_persist
+    if p.running:
+        return
+    p.wakeup = asyncio.Event()
+    if p.dirty:
+        p.wakeup.set()
+    p.task = asyncio.create_task(_graph_flush_loop())
+
+
+async def _stop_graph_persister():
+    """Cancel the flush task and write any pending changes synchronously.
+
+    A write already handed to a worker thread can't be cancelled; it is
+    awaited first so its os.replace can't land after (and overwrite) the
+    final flush with an older snapshot.
+    """
+    p = _graph_persist
+    if p.task is not None:
+        p.task.cancel()
+        try:
+            await p.task
+        except (asyncio.CancelledError, Exception):
+            pass
+        p.task = None
+    if p.inflight is not None:
+        try:
+            if not p.inflight.done():
+                await p.inflight
+                p.writes += 1
+            elif p.inflight.cancelled() or p.inflight.exception() is not None:
+                p.dirty = True
+        except Exception as e:
+            print(f"[ORCH] graph.json flush failed (retrying now): {e}")
+            p.dirty = True
+        p.inflight = None
+    _flush_entries()
 
 
 def _find_entry(name: str) -> dict | None:
@@ -1065,11 +1496,9 @@ def _find_entry(name: str) -> dict | None:
 
     Uses _entries_list() which prefers __main__'s skill_entries — see
     that function's docstring for the module-duplication background.
+    O(1) via the registry's name index.
     """
-    for e in _entries_list():
-        if e["name"] == name:
-            return e
-    return None
+    return _registry().get(name)
 
 
 def _add_entry(name: str, description: str = "", dependencies: list[str] | None = None) -> dict:
@@ -1077,6 +1506,10 @@ def _add_entry(name: str, description: str = "", dependencies: list[str] | None
     existing = _find_entry(name)
     if existing:
         return existing
+    reg = _registry()
+    cycle = reg.cycle_with(name, dependencies or [])
+    if cycle:
+        raise ValueError(f"adding '{name}' would create a dependency cycle: {' -> '.join(cycle)}")
     entry = {
         "id": f"sc-{len(skill_entries)+1:03d}",
         "name": name,
@@ -1101,21 +1534,25 @@ def _add_entry(name: str, description: str = "", dependencies: list[str] | None
         "progress_history": [],
     }
     _entries_list().append(entry)
+    reg.added(entry)
+    _mark_entry_dirty(name)
     _save_entries()
     return entry
 
 
 def _remove_entry(name: str) -> bool:
     """Remove a skill entry by name. Returns True if found."""
+    reg = _registry()
+    if reg.get(name) is None:
+        return False
     entries = _entries_list()
-    before = len(entries)
     # Mutate the list in place (don't reassign) so __main__ and module
     # references stay pointing at the same list object.
     entries[:] = [e for e in entries if e["name"] != name]
-    if len(entries) < before:
-        _save_entries()
-        return True
-    return False
+    reg.removed(name)
+    _mark_entry_dirty(name)
+    _save_entries()
+    return True
 
 
 def _update_entry(name: str, updates: dict) -> dict | None:
@@ -1123,10 +1560,20 @@ def _update_entry(name: str, updates: dict) -> dict | None:
     entry = _find_entry(name)
     if not entry:
         return None
+    reg = _registry()
+    if "dependencies" in updates:
+        cycle = reg.cycle_with(name, updates["dependencies"] or [])
+        if cycle:
+            raise ValueError(f"'{name}' dependencies would create a cycle: {' -> '.join(cycle)}")
     for k, v in updates.items():
         if k != "name":  # don't allow renaming via update
             entry[k] = v
+    if "dependencies" in updates:
+        reg.dependencies_changed(name)
+    if "status" in updates:
+        reg.status_changed(name)
     entry["updated_at"] = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+    _mark_entry_dirty(name)
     _save_entries()
     return entry
 
@@ -1172,7 +1619,16 @@ def _get_eval_lock(skill: str) -> asyncio.Lock:
     return lock
 
 
-def _update_trial_images(skill: str, execution_id: str, agent_server_url: str = ""):
+@asynccontextmanager
+async def _eval_lock(skill: str):
+    """Hold the skill's eval mutex, recording how long we queued for it."""
+    t0 = time.monotonic()
+    async with _get_eval_lock(skill):
+        EVAL_LOCK_WAIT_SECONDS.observe(time.monotonic() - t0)
+        yield
+
+
+async def _update_trial_images(skill: str, execution_id: str, agent_server_url: str = ""):
     """Update entry's trial_images with frames from the latest execution recording.
 
     When agent_server_url is provided (from /job-done), uses it to build image URLs
@@ -1195,9 +1651,8 @@ def _update_trial_images(skill: str, execution_id: str, agent_server_url: str =
         frames = sorted(f.name for f in exec_dir.iterdir() if f.suffix == ".jpg")
     if not frames:
         try:
-            import urllib.request
             url = f"{agent_server_url}/code/recordings/{execution_id}"
-            data = json.loads(urllib.request.urlopen(url, timeout=10).read())
+            data = await _http_client().get_json(url, timeout=10)
             frames = [f for f in data.get("frames", []) if f.endswith(".jpg")]
         except Exception as e:
             print(f"[ORCH] {skill}: could not fetch remote frames for {execution_id}: {e}")
@@ -1227,7 +1682,8 @@ def _update_trial_images(skill: str, execution_id: str, agent_server_url: str =
     print(f"[ORCH] {label}: updated trial_images ({len(image_urls)} frames from {execution_id})")
 
 
-async def _run_submission_eval(skill: str, execution_id: str, job_agent_server: str = ""):
+async def _run_submission_eval(skill: str, execution_id: str, job_agent_server: str = "",
+                               code_hash: str = ""):
     """Run evaluator for a specific submission, store result in _submission_evals.
 
     Path B (submit_and_wait → /job-done). Serialized with Path A
@@ -1236,12 +1692,13 @@ async def _run_submission_eval(skill: str, execution_id: str, job_agent_server:
     deterministic session.
     """
     # Update dashboard images from this execution
-    _update_trial_images(skill, execution_id, agent_server_url=job_agent_server)
-    await broadcast_full_sync()
+    await _update_trial_images(skill, execution_id, agent_server_url=job_agent_server)
+    await broadcast_changes()
 
-    async with _get_eval_lock(skill):
+    async with _eval_lock(skill):
         try:
-            result = await run_evaluator(skill, execution_id=execution_id)
+            result = await run_evaluator(skill, execution_id=execution_id,
+                                         agent_server=job_agent_server, code_hash=code_hash)
         except Exception as e:
             result = {"passed": False, "feedback": f"Evaluator error: {e}"}
         # Record latest feedback for /summary + dashboard.
@@ -1285,7 +1742,7 @@ async def _maybe_resume_paused_dev(skill: str, eval_result: dict) -> None:
     if attempts >= MAX_EVAL_RETRIES:
         print(f"[ORCH] {skill}: eval retries exhausted ({attempts}/{MAX_EVAL_RETRIES}); leaving paused for human review")
         _update_entry(skill, {"status": "review"})
-        await broadcast_full_sync()
+        await broadcast_changes()
         return
 
     _eval_attempt_count[skill] = attempts + 1
@@ -1313,30 +1770,231 @@ async def _maybe_resume_paused_dev(skill: str, eval_result: dict) -> None:
     await spawn_agent(skill, resume_prompt, agent_type="dev")
 
 
+# ---------------------------------------------------------------------------
+# Metrics (GET /metrics, Prometheus text format)
+# ---------------------------------------------------------------------------
+# Defined through metrics.counter()/gauge()/histogram(), which return the
+# existing object on re-import, so the shim's module copy records into the
+# same series as __main__.
+EVENT_LOOP_LAG_SECONDS = metrics.histogram(
+    "orch_event_loop_lag_seconds", "How late the loop watchdog woke up (time the loop was blocked)",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0))
+EVENT_LOOP_LAG_LAST = metrics.gauge(
+    "orch_event_loop_lag_last_seconds", "Most recent event-loop lag sample")
+WS_BROADCAST_SECONDS = metrics.histogram(
+    "orch_ws_broadcast_seconds", "Time to serialize and enqueue one broadcast", ["type"])
+WS_BROADCAST_BYTES = metrics.histogram(
+    "orch_ws_broadcast_bytes", "Serialized broadcast payload size", ["type"],
+    buckets=metrics.SIZE_BUCKETS)
+WS_SEND_SECONDS = metrics.histogram(
+    "orch_ws_send_seconds", "Per-client websocket send latency")
+WS_DROPPED = metrics.counter(
+    "orch_ws_dropped_messages_total", "Messages dropped from full client outboxes")
+WS_CLIENTS = metrics.gauge("orch_ws_clients", "Connected dashboard websockets")
+WS_QUEUE_DEPTH = metrics.gauge(
+    "orch_ws_queue_depth", "Queued outbound websocket messages (sum / max over clients)", ["agg"])
+FULL_SYNC_SECONDS = metrics.histogram(
+    "orch_build_full_sync_seconds", "Time to build a full_sync snapshot")
+AGENT_SPAWNS = metrics.counter("orch_agent_spawns_total", "Agents spawned", ["agent_type"])
+AGENT_RUN_SECONDS = metrics.histogram(
+    "orch_agent_run_seconds", "Agent task wall time from spawn to exit", ["agent_type", "outcome"])
+AGENTS_LIVE = metrics.gauge("orch_agents", "Agents currently tracked", ["status", "target"])
+EVALS = metrics.counter("orch_evals_total", "Evaluator runs", ["result"])
+EVAL_SECONDS = metrics.histogram("orch_eval_seconds", "Evaluator run duration", ["result"])
+EVAL_LOCK_WAIT_SECONDS = metrics.histogram(
+    "orch_eval_lock_wait_seconds", "Time spent waiting for a skill's eval mutex")
+HTTP_REQUEST_SECONDS = metrics.histogram(
+    "orch_http_request_seconds", "Control API handler latency", ["method", "route", "status"])
+
+# Fixed route labels — raw paths carry skill/graph names and would make the
+# series unbounded. Anything handle_http doesn't route is "other".
+_HTTP_ROUTE_PREFIXES = ("/entries/", "/sessions/", "/eval-result/")
+_HTTP_ROUTES = frozenset({
+    "/xbot-start", "/spawn", "/stop", "/kill", "/inject", "/status", "/ws-clients",
+    "/metrics", "/entries", "/job-done",
+})
+
+
+def _http_route_label(path: str) -> str:
+    for prefix in _HTTP_ROUTE_PREFIXES:
+        if path.startswith(prefix):
+            return prefix + "*"
+    if path in _HTTP_ROUTES:
+        return path
+    return "other"
+
+
+def _collect_live_metrics():
+    """Refresh gauges derived from live state; runs on every scrape."""
+    AGENTS_LIVE.clear()
+    for a in list(_main_global("agents", agents).values()):
+        AGENTS_LIVE.labels(a.status, a.target_name or "default").inc()
+    boxes = list(_main_global("ws_outboxes", ws_outboxes).values())
+    WS_CLIENTS.set(len(_main_global("ws_clients", ws_clients)))
+    depths = [len(b.queue) for b in boxes]
+    WS_QUEUE_DEPTH.labels("sum").set(sum(depths))
+    WS_QUEUE_DEPTH.labels("max").set(max(depths, default=0))
+
+
+metrics.register_collector(_collect_live_metrics)
+_lag_task: asyncio.Task | None = None
+
+
+def _start_lag_monitor():
+    global _lag_task
+    if _lag_task is None or _lag_task.done():
+        _lag_task = asyncio.get_running_loop().create_task(
+            metrics.watch_event_loop_lag(EVENT_LOOP_LAG_SECONDS, EVENT_LOOP_LAG_LAST))
+
+
 # ---------------------------------------------------------------------------
 # WebSocket: browser <-> orchestrator
 # ---------------------------------------------------------------------------
 
-async def ws_broadcast(msg: dict):
-    data = json.dumps(msg)
-    gone = set()
+# Each dashboard connection gets its own bounded outbox and writer task, so a
+# stalled browser tab only backs up its own queue. Producers (agent message
+# pumps, eval pipeline) enqueue and return without touching the network.
+#
+# Policy for slow consumers: when the outbox is full the OLDEST message is
+# dropped (the dashboard recovers via seq gap -> resync). A client that
+# keeps dropping without draining, or whose send blocks past
+# WS_SEND_TIMEOUT_S, is disconnected.
+WS_QUEUE_MAX = int(os.environ.get("WS_QUEUE_MAX", "512"))
+WS_SEND_TIMEOUT_S = float(os.environ.get("WS_SEND_TIMEOUT_S", "10"))
+WS_MAX_DROPS = int(os.environ.get("WS_MAX_DROPS", "2048"))  # consecutive, without a send
+
+
+class WsOutbox:
+    """Bounded outbound queue + writer task for one websocket."""
+
+    def __init__(self, ws):
+        self.ws = ws
+        self.queue: deque[str] = deque()
+        self.ready = asyncio.Event()
+        self.task: asyncio.Task | None = None
+        self.sent = 0
+        self.dropped = 0
+        self.drops_since_send = 0
+        self.closed = False
+
+    def put(self, data: str) -> bool:
+        """Enqueue a serialized message. Returns False if the client was cut off."""
+        if self.closed:
+            return False
+        if len(self.queue) >= WS_QUEUE_MAX:
+            self.queue.popleft()
+            self.dropped += 1
+            WS_DROPPED.inc()
+            self.drops_since_send += 1
+            if self.drops_since_send > WS_MAX_DROPS:
+                print(f"[WS] client {_ws_peer(self.ws)} too slow "
+                      f"({self.drops_since_send} drops without a send) — disconnecting")
+                self.close()
+                return False
+        self.queue.append(data)
+        self.ready.set()
+        return True
+
+    async def run(self):
+        try:
+            while True:
+                while not self.queue:
+                    self.ready.clear()
+                    await self.ready.wait()
+                data = self.queue.popleft()
+                t0 = time.monotonic()
+                await asyncio.wait_for(self.ws.send(data), timeout=WS_SEND_TIMEOUT_S)
+                WS_SEND_SECONDS.observe(time.monotonic() - t0)
+                self.sent += 1
+                self.drops_since_send = 0
+        except asyncio.CancelledError:
+            pass
+        except (websockets.ConnectionClosed, asyncio.TimeoutError, OSError) as e:
+            if isinstance(e, asyncio.TimeoutError):
+                print(f"[WS] client {_ws_peer(self.ws)} send timed out — disconnecting")
+            self.close()
+
+    def close(self):
+        """Stop the writer and forget the client. Idempotent."""
+        if self.closed:
+            return
+        self.closed = True
+        self.queue.clear()
+        _main_global("ws_clients", ws_clients).discard(self.ws)
+        outboxes = _main_global("ws_outboxes", ws_outboxes)
+        if outboxes.get(self.ws) is self:
+            del outboxes[self.ws]
+        if self.task and self.task is not asyncio.current_task():
+            self.task.cancel()
+        close = getattr(self.ws, "close", None)
+        if close is not None:
+            try:
+                res = close()
+                if asyncio.iscoroutine(res):
+                    asyncio.ensure_future(res)
+            except Exception:
+                pass
+
+    def stats(self) -> dict:
+        return {
+            "peer": _ws_peer(self.ws),
+            "queue_depth": len(self.queue),
+            "sent": self.sent,
+            "dropped": self.dropped,
+        }
+
+
+ws_outboxes: dict = {}  # websocket -> WsOutbox
+
+
+def _ws_peer(ws) -> str:
+    addr = getattr(ws, "remote_address", None)
+    if isinstance(addr, tuple) and len(addr) >= 2:
+        return f"{addr[0]}:{addr[1]}"
+    return str(addr or id(ws))
+
+
+def _ws_outbox(ws) -> WsOutbox:
+    """Return the outbox for ``ws``, creating it (and its writer) on first use."""
+    outboxes = _main_global("ws_outboxes", ws_outboxes)
+    box = outboxes.get(ws)
+    if box is None:
+        box = WsOutbox(ws)
+        box.task = asyncio.get_running_loop().create_task(box.run())
+        outboxes[ws] = box
+    return box
+
+
+def _ws_fanout(data: str) -> int:
+    """Enqueue one serialized message on every client's outbox. Never blocks."""
     # Use __main__'s ws_clients — the HTTP server's WS handler runs in __main__
     # and registers connections there. Shim-path callers (e.g. spawn_agent
     # via _auto_spawn_ready_skills) running in agent_orchestrator MODULE see
     # an empty module-level ws_clients otherwise, and broadcasts silently
     # reach 0 clients (dashboard loses iter N+1's events).
     clients = _main_global("ws_clients", ws_clients)
-    # Fix #5 cherry-picked from unified-multi-task v18: snapshot ws_clients
-    # to a list before iterating. Without this, a WS client connecting or
-    # disconnecting mid-iteration triggers `RuntimeError: Set changed size
-    # during iteration`, which propagates up and kills the calling task
-    # (eval pipeline / spawn task / etc.) silently.
+    # Snapshot ws_clients before iterating: a client closed by the drop
+    # policy is removed from the set mid-loop.
+    queued = 0
     for c in list(clients):
-        try:
-            await asyncio.wait_for(c.send(data), timeout=5.0)
-        except (websockets.ConnectionClosed, asyncio.TimeoutError):
-            gone.add(c)
-    clients.difference_update(gone)
+        if _ws_outbox(c).put(data):
+            queued += 1
+    return queued
+
+
+async def ws_broadcast(msg: dict):
+    """Serialize ``msg`` once and queue it for every connected browser."""
+    t0 = time.monotonic()
+    data = json.dumps(msg)
+    _ws_fanout(data)
+    kind = str(msg.get("type", ""))
+    WS_BROADCAST_SECONDS.labels(kind).observe(time.monotonic() - t0)
+    WS_BROADCAST_BYTES.labels(kind).observe(len(data))
+
+
+def ws_client_stats() -> list[dict]:
+    """Per-client outbox depth and counters (GET /ws-clients)."""
+    return [box.stats() for box in list(_main_global("ws_outboxes", ws_outboxes).values())]
 
 
 async def ws_broadcast_status(skill: str, agent_id: str, status: str, text: str,
@@ -1412,6 +2070,311 @@ def _normalize_log_entry(m, default_role: str) -> dict:
     return {"role": role, "text": text}
 
 
+class SessionLogIndex:
+    """Byte-offset index over agent_sessions.jsonl, updated by tailing.
+
+    Each record is indexed as (offset, length, skill, agent_type, target, ts)
+    without keeping its (large) log in memory. refresh() parses only the
+    bytes appended since the last call, so session counts and "last session
+    per skill" cost O(new bytes) rather than O(file size).
+
+    The index is persisted to a sidecar (``.agent_sessions.jsonl.idx``) so a
+    restarted orchestrator resumes from the saved offset. The sidecar is
+    JSONL too: each refresh appends one line with only the records it
+    added ({"from", "offset", "inode", "head", "records"}), so saving
+    costs O(new records). The sidecar is discarded if the log was
+    rotated/rewritten — detected via inode, size shrinking below the
+    saved offset, or the first line changing.
+    """
+
+    HEAD_BYTES = 256  # fingerprint of the start of the file
+
+    def __init__(self, path: Path | None = None):
+        self.path = path
+        self.reset()
+
+    def reset(self):
+        self.offset = 0
+        self.inode = None
+        self.head = ""
+        self.records: list[tuple] = []   # (offset, length, skill, agent_type, target, ts)
+        self.counts: dict[tuple[str, str, str], int] = {}   # (skill, agent_type, target) -> n
+        self.last_by_skill: dict[str, int] = {}             # skill -> index into records
+        self._last_logs: dict[str, tuple[int, list]] = {}   # skill -> (offset, normalized log)
+        self._rewrite_sidecar = True   # next save starts a new sidecar instead of appending
+
+    @property
+    def sidecar(self) -> Path:
+        return self.path.parent / f".{self.path.name}.idx"
+
+    def bind(self, path: Path) -> "SessionLogIndex":
+        if path != self.path:
+            self.path = path
+            self.reset()
+            self._load_sidecar()
+        return self
+
+    def _head(self, f) -> str:
+        f.seek(0)
+        return f.read(self.HEAD_BYTES).decode("utf-8", "replace")
+
+    def _load_sidecar(self):
+        try:
+            lines = self.sidecar.read_text().splitlines()
+        except FileNotFoundError:
+            return
+        except OSError as e:
+            print(f"[ORCH] warn: ignoring unreadable session index {self.sidecar.name}: {e}")
+            return
+        replayed = 0
+        try:
+            for line in lines:
+                try:
+                    data = json.loads(line)
+                except json.JSONDecodeError:
+                    break   # torn last append: resume from the batch before it
+                if data.get("from", 0) != self.offset:
+                    break   # not a continuation of what we have
+                for rec in data["records"]:
+                    self._add(*rec)
+                self.offset = data["offset"]
+                self.inode = data["inode"]
+                self.head = data["head"]
+                replayed += 1
+        except Exception as e:
+            print(f"[ORCH] warn: ignoring bad session index {self.sidecar.name}: {e}")
+            self.reset()
+            return
+        # Start over on the next save if anything after the resumed batches was dropped.
+        self._rewrite_sidecar = replayed == 0 or replayed != len(lines)
+
+    def _save_sidecar(self, start: int, new_records: list[tuple]):
+        line = json.dumps({"from": start, "offset": self.offset, "inode": self.inode,
+                           "head": self.head, "records": new_records}) + "\n"
+        try:
+            if self._rewrite_sidecar:
+                _atomic_write_text(self.sidecar, json.dumps({
+                    "from": 0, "offset": self.offset, "inode": self.inode,
+                    "head": self.head, "records": self.records}) + "\n")
+                self._rewrite_sidecar = False
+            else:
+                with open(self.sidecar, "a", encoding="utf-8") as f:
+                    f.write(line)
+        except OSError as e:
+            print(f"[ORCH] warn: failed to save session index: {e}")
+            self._rewrite_sidecar = True
+
+    def _add(self, offset, length, skill, agent_type, target, ts):
+        self.records.append((offset, length, skill, agent_type, target, ts))
+        key = (skill, agent_type, target)
+        self.counts[key] = self.counts.get(key, 0) + 1
+        self.last_by_skill[skill] = len(self.records) - 1
+
+    def refresh(self) -> int:
+        """Index records appended since the last call. Returns how many."""
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            if self.records or self.offset:
+                self.reset()
+            return 0
+        with open(self.path, "rb") as f:
+            head = self._head(f) if self.offset else ""
+            if self.offset and (st.st_ino != self.inode or st.st_size < self.offset
+                                or not head.startswith(self.head)):
+                self.reset()
+            if st.st_size == self.offset:
+                return 0
+            start, first_new = self.offset, len(self.records)
+            f.seek(self.offset)
+            chunk = f.read(st.st_size - self.offset)
+            if not self.head:
+                self.head = self._head(f)
+        # Only consume complete lines — a writer may be mid-append.
+        end = chunk.rfind(b"\n") + 1
+        added = 0
+        pos = 0
+        while pos < end:
+            nl = chunk.index(b"\n", pos)
+            line = chunk[pos:nl]
+            if line.strip():
+                try:
+                    rec = json.loads(line)
+                    self._add(self.offset + pos, nl - pos, rec["skill"],
+                              rec.get("agent_type", "agent"),
+                              rec.get("target") or "default",
+                              rec.get("timestamp", ""))
+                    added += 1
+                except (json.JSONDecodeError, KeyError, TypeError):
+                    pass
+            pos = nl + 1
+        self.offset += end
+        self.inode = st.st_ino
+        if end:
+            self._save_sidecar(start, self.records[first_new:])
+        return added
+
+    def read_record(self, idx: int) -> dict | None:
+        offset, length = self.records[idx][:2]
+        try:
+            with open(self.path, "rb") as f:
+                f.seek(offset)
+                return json.loads(f.read(length))
+        except (OSError, json.JSONDecodeError):
+            return None
+
+    def dev_counts(self) -> tuple[int, dict[str, int]]:
+        """Dev session count, total and per target env."""
+        total = 0
+        per_target: dict[str, int] = {}
+        for (_skill, agent_type, target), n in self.counts.items():
+            if agent_type != "dev":
+                continue
+            total += n
+            per_target[target] = per_target.get(target, 0) + n
+        return total, per_target
+
+    def last_logs(self) -> dict[str, list]:
+        """Normalized log of the LAST session per skill.
+
+        Only records that changed since the previous call are re-read.
+        """
+        out = {}
+        for skill, idx in self.last_by_skill.items():
+            offset = self.records[idx][0]
+            cached = self._last_logs.get(skill)
+            if cached is None or cached[0] != offset:
+                rec = self.read_record(idx) or {}
+                role = rec.get("agent_type", "agent")
+                cached = (offset, [_normalize_log_entry(m, role) for m in rec.get("log", [])])
+                self._last_logs[skill] = cached
+            out[skill] = cached[1]
+        return out
+
+
+_session_index = SessionLogIndex()
+
+
+def _session_log_index() -> SessionLogIndex:
+    """Session index bound to SESSION_LOG and caught up with its tail."""
+    idx = _main_global("_session_index", _session_index).bind(SESSION_LOG)
+    idx.refresh()
+    return idx
+
+
+_session_indexes: dict = {}  # other graphs' logs (GET /sessions/<graph>) -> (SessionLogIndex, Lock)
+
+
+async def _session_index_for(log_path: Path) -> SessionLogIndex:
+    """Caught-up index for any graph's agent_sessions.jsonl.
+
+    Another graph's index is built and refreshed in a worker thread — the
+    first request parses that graph's whole log. The lock keeps concurrent
+    requests for the same graph from refreshing it at once.
+    """
+    if log_path == SESSION_LOG:
+        return _session_log_index()
+    indexes = _main_global("_session_indexes", _session_indexes)
+    if log_path not in indexes:
+        indexes[log_path] = (SessionLogIndex(), asyncio.Lock())
+    idx, lock = indexes[log_path]
+    async with lock:
+        await asyncio.to_thread(lambda: idx.bind(log_path).refresh())
+    return idx
+
+
+def _parse_ts(value: str) -> float | None:
+    """Epoch seconds from an ISO-8601 timestamp or a bare number; None if neither."""
+    import datetime
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        pass
+    try:
+        dt = datetime.datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=datetime.timezone.utc)
+    return dt.timestamp()
+
+
+def _select_sessions(idx: SessionLogIndex, query: dict[str, str]) -> tuple[int, list[tuple[int, int]]]:
+    """Apply /sessions query filters + paging to the index.
+
+    Filters: skill, agent_type, target (exact match), since (ISO-8601 or
+    epoch seconds, inclusive). Paging: offset, limit over the filtered
+    records; order=desc returns newest first. Returns (total matches,
+    [(byte offset, length), ...] of the requested page). Raises ValueError
+    on malformed parameters.
+    """
+    skill = query.get("skill")
+    agent_type = query.get("agent_type")
+    target = query.get("target")
+    since = None
+    if "since" in query:
+        since = _parse_ts(query["since"])
+        if since is None:
+            raise ValueError(f"bad since: {query['since']!r}")
+    offset = int(query.get("offset", 0))
+    limit = int(query["limit"]) if "limit" in query else None
+    if offset < 0 or (limit is not None and limit < 0):
+        raise ValueError("offset/limit must be >= 0")
+    order = query.get("order", "asc")
+    if order not in ("asc", "desc"):
+        raise ValueError(f"bad order: {order!r}")
+
+    matches = []
+    for off, length, r_skill, r_type, r_target, ts in idx.records:
+        if skill is not None and r_skill != skill:
+            continue
+        if agent_type is not None and r_type != agent_type:
+            continue
+        if target is not None and r_target != target:
+            continue
+        if since is not None:
+            r_ts = _parse_ts(ts)
+            if r_ts is None or r_ts < since:
+                continue
+        matches.append((off, length))
+    if order == "desc":
+        matches.reverse()
+    end = None if limit is None else offset + limit
+    return len(matches), matches[offset:end]
+
+
+SESSIONS_CHUNK_BYTES = 64 * 1024
+
+
+def _read_session_ranges(path: Path, ranges: list[tuple[int, int]]) -> bytes:
+    """Read the given records (each + trailing newline) as one JSONL blob."""
+    out = []
+    with open(path, "rb") as f:
+        for off, length in ranges:
+            f.seek(off)
+            out.append(f.read(length))
+            out.append(b"\n")
+    return b"".join(out)
+
+
+async def _stream_session_records(path: Path, ranges: list[tuple[int, int]]):
+    """Yield selected JSONL records in ~SESSIONS_CHUNK_BYTES pieces.
+
+    File reads run in a worker thread so a large history doesn't stall the
+    event loop; only one chunk is held in memory at a time.
+    """
+    batch: list[tuple[int, int]] = []
+    size = 0
+    for rng in ranges:
+        batch.append(rng)
+        size += rng[1] + 1
+        if size >= SESSIONS_CHUNK_BYTES:
+            yield await asyncio.to_thread(_read_session_ranges, path, batch)
+            batch, size = [], 0
+    if batch:
+        yield await asyncio.to_thread(_read_session_ranges, path, batch)
+
+
 def _load_session_logs() -> dict[str, list]:
     """Return cached logs of the LAST completed session per skill.
 
@@ -1424,120 +2387,100 @@ def _load_session_logs() -> dict[str, list]:
     # keeps the same dict object so module-import-bootstrap binding stays valid.
     if _session_log_cache:
         return _session_log_cache
-    last_rec_by_skill: dict[str, dict] = {}
-    if SESSION_LOG.exists():
-        for line in SESSION_LOG.read_text().splitlines():
-            if not line.strip():
-                continue
-            try:
-                rec = json.loads(line)
-                last_rec_by_skill[rec["skill"]] = rec  # overwrite → keeps last
-            except (json.JSONDecodeError, KeyError):
-                continue
-    for skill, rec in last_rec_by_skill.items():
-        role = rec.get("agent_type", "agent")
-        _session_log_cache[skill] = [
-            _normalize_log_entry(msg, role) for msg in rec.get("log", [])
-        ]
+    _session_log_cache.update(_session_log_index().last_logs())
     return _session_log_cache
 
 
 def _invalidate_session_log_cache():
-    """Invalidate the session log cache so next read reloads from disk.
+    """Invalidate the session log cache so next read catches up with the file.
 
     Mutates in-place (clear) instead of rebinding to None — the openclaw
     shim has its own reference to this dict via module-import bootstrap;
-    rebinding would leave the shim's reference stale.
+    rebinding would leave the shim's reference stale. The next read only
+    tails newly appended bytes (see SessionLogIndex).
     """
     _session_log_cache.clear()
+    _main_global("_delta_state", _delta_state).meta_dirty = True
 
 
-def build_full_sync() -> dict:
-    """Build a full_sync payload from in-memory entries with live agent state overlay."""
-    import copy
-    repos = copy.deepcopy(_entries_list())
+def _normalize_log(entries, default_role):
+    return [_normalize_log_entry(m, default_role) for m in entries]
 
-    session_logs = _load_session_logs()
 
-    # Overlay live agent state onto matching entries
-    # Collect ALL agents per skill (for multi-target parallel dev)
-    agents_by_skill: dict[str, list[AgentState]] = {}
+def _agents_by_skill() -> dict[str, list[AgentState]]:
+    """Collect ALL agents per skill (for multi-target parallel dev)."""
+    by_skill: dict[str, list[AgentState]] = {}
     for a in agents.values():
-        agents_by_skill.setdefault(a.skill, []).append(a)
-    def _normalize_log(entries, default_role):
-        return [_normalize_log_entry(m, default_role) for m in entries]
-
-    for repo in repos:
-        name = repo["name"]
-        skill_agents = agents_by_skill.get(name, [])
-        if skill_agents:
-            # Pick best agent for top-level status (prefer running)
-            best = next((a for a in skill_agents if a.status in ("starting", "running")), skill_agents[0])
-            repo["status"] = _map_status(best.status, best.agent_type)
-            repo["agent_id"] = best.agent_id
-            repo["agent_status_text"] = f"{best.status}"
-            repo["agent_type"] = best.agent_type
-            # Show ONLY the currently-running agent's messages in the hex popup.
-            # Past sessions (dev + evaluator history) are browsable at sessions.html.
-            repo["agent_log"] = _normalize_log(list(best.log[-200:]), best.agent_type)
-            # Per-target agent status + logs (for dashboard multi-target display)
-            repo["target_agents"] = {}
-            for a in skill_agents:
-                tname = a.target_name or "default"
-                ta_entry = {
-                    "agent_id": a.agent_id,
-                    "status": a.status,
-                    "agent_type": a.agent_type,
-                    "agent_log": _normalize_log(list(a.log[-200:]), a.agent_type),
-                }
-                # Include per-target agent_server URL so frontend can build recording URLs
-                target_dict = next((t for t in targets if t["name"] == tname), None)
-                if target_dict:
-                    ta_entry["agent_server"] = target_dict["agent_server"]
-                repo["target_agents"][tname] = ta_entry
-        else:
-            # No live agent — show only the last completed session's log as
-            # a placeholder. Full history lives at sessions.html.
-            repo["agent_log"] = session_logs.get(name, [])
+        by_skill.setdefault(a.skill, []).append(a)
+    return by_skill
 
-    # Build agents list
-    agents_list = []
-    for a in agents.values():
-        agents_list.append({
-            "agent_id": a.agent_id,
-            "skill": a.skill,
-            "agent_type": a.agent_type,
-            "status": a.status,
-            "target": a.target_name,
-        })
 
-    # Session-demo aggregates for dashboard's live session-demo hex (index.html)
-    # Reads persisted session log (dev + evaluator runs across time) + currently
-    # live agents. `graph` lets the frontend key hexes per-graph; the counts
-    # let it render env bars with session totals.
-    session_count = 0
-    per_env_session_count: dict[str, int] = {}
-    if SESSION_LOG.exists():
-        try:
-            for line in SESSION_LOG.read_text().splitlines():
-                if not line.strip():
-                    continue
-                try:
-                    rec = json.loads(line)
-                except Exception:
-                    continue
-                if rec.get("agent_type") != "dev":
-                    continue  # only count dev sessions, not evaluator noise
-                session_count += 1
-                env = rec.get("target") or "default"
-                per_env_session_count[env] = per_env_session_count.get(env, 0) + 1
-        except Exception as e:
-            print(f"[ORCH] warn: failed to aggregate session counts: {e}")
+def _entry_view(entry: dict, skill_agents: list[AgentState],
+                targets_by_name: dict[str, dict], session_logs: dict) -> dict:
+    """Dashboard view of one entry: stored fields + live agent state overlay.
 
+    Returns a shallow copy — nested values are shared with the entry, so the
+    caller must serialize the view before yielding to the event loop.
+    """
+    repo = dict(entry)
+    name = repo["name"]
+    if skill_agents:
+        # Pick best agent for top-level status (prefer running)
+        best = next((a for a in skill_agents if a.status in ("starting", "running")), skill_agents[0])
+        repo["status"] = _map_status(best.status, best.agent_type)
+        repo["agent_id"] = best.agent_id
+        repo["agent_status_text"] = f"{best.status}"
+        repo["agent_type"] = best.agent_type
+        # Show ONLY the currently-running agent's messages in the hex popup.
+        # Past sessions (dev + evaluator history) are browsable at sessions.html.
+        repo["agent_log"] = _normalize_log(list(best.log[-200:]), best.agent_type)
+        # Per-target agent status + logs (for dashboard multi-target display)
+        repo["target_agents"] = {}
+        for a in skill_agents:
+            tname = a.target_name or "default"
+            ta_entry = {
+                "agent_id": a.agent_id,
+                "status": a.status,
+                "agent_type": a.agent_type,
+                "agent_log": _normalize_log(list(a.log[-200:]), a.agent_type),
+            }
+            # Include per-target agent_server URL so frontend can build recording URLs
+            target_dict = targets_by_name.get(tname)
+            if target_dict:
+                ta_entry["agent_server"] = target_dict["agent_server"]
+            repo["target_agents"][tname] = ta_entry
+    else:
+        # No live agent — show only the last completed session's log as
+        # a placeholder. Full history lives at sessions.html.
+        repo["agent_log"] = session_logs.get(name, [])
+    return repo
+
+
+def _agent_view(a: AgentState) -> dict:
+    return {
+        "agent_id": a.agent_id,
+        "skill": a.skill,
+        "agent_type": a.agent_type,
+        "status": a.status,
+        "target": a.target_name,
+    }
+
+
+def _session_counts() -> tuple[int, dict[str, int]]:
+    """Count persisted dev sessions, total and per target env."""
+    try:
+        return _session_log_index().dev_counts()
+    except Exception as e:
+        print(f"[ORCH] warn: failed to aggregate session counts: {e}")
+        return 0, {}
+
+
+def _live_sessions(stamp: bool = True) -> list[dict]:
+    """Agents with a session, for sessions.html (``timestamp`` only if ``stamp``)."""
     live_sessions = []
     for a in agents.values():
         if a.session_id:
-            live_sessions.append({
+            view = {
                 "agent_id": a.agent_id,
                 "session_id": a.session_id,
                 "skill": a.skill,
@@ -1551,39 +2494,227 @@ def build_full_sync() -> dict:
                 "num_turns": len(a.log),  # approximate — one entry per reply
                 "cost_usd": 0,             # unknown until ResultMessage arrives
                 "in_progress": a.status in ("starting", "running", "paused", "writing"),
-                "timestamp": time.time(),
-            })
+            }
+            if stamp:
+                view["timestamp"] = time.time()
+            live_sessions.append(view)
+    return live_sessions
 
-    return {
+
+def build_full_sync() -> dict:
+    """Build a full_sync payload from in-memory entries with live agent state overlay.
+
+    ``seq`` is the sequence number of the last patch broadcast; clients apply
+    only patches with a higher seq on top of this snapshot.
+    """
+    t0 = time.monotonic()
+    session_logs = _load_session_logs()
+    agents_by_skill = _agents_by_skill()
+    targets_by_name = {t["name"]: t for t in targets}
+    repos = [
+        _entry_view(e, agents_by_skill.get(e["name"], []), targets_by_name, session_logs)
+        for e in _entries_list()
+    ]
+
+    # Build agents list
+    agents_list = [_agent_view(a) for a in agents.values()]
+
+    # Session-demo aggregates for dashboard's live session-demo hex (index.html)
+    # Reads persisted session log (dev + evaluator runs across time) + currently
+    # live agents. `graph` lets the frontend key hexes per-graph; the counts
+    # let it render env bars with session totals.
+    session_count, per_env_session_count = _session_counts()
+
+    payload = {
         "entries": repos,
         "agents": agents_list,
         "targets": targets,
         "graph": GRAPH_DIR.name,
         "session_count": session_count,
         "per_env_session_count": per_env_session_count,
-        "live_sessions": live_sessions,
+        "live_sessions": _live_sessions(),
+        "scheduler": scheduler_status(),
+        "seq": _main_global("_delta_state", _delta_state).seq,
     }
+    FULL_SYNC_SECONDS.observe(time.monotonic() - t0)
+    return payload
 
 
 async def broadcast_full_sync():
-    """Broadcast full_sync to all connected browsers (call after entry changes)."""
+    """Broadcast full_sync to all connected browsers.
+
+    Only needed when every client must be rebased (e.g. after reloading the
+    graph). Routine state changes go through broadcast_changes().
+    """
     await ws_broadcast({"type": "full_sync", "payload": build_full_sync()})
 
 
+# ---------------------------------------------------------------------------
+# Delta broadcasts: entry_patch / agent_patch / sync_patch
+# ---------------------------------------------------------------------------
+# Instead of re-sending the whole world after every change, broadcast_changes()
+# diffs the dashboard view of what changed against what was last broadcast
+# and sends only the changed fields:
+#
+#   {"type": "entry_patch", "seq": N, "name": skill, "fields": {...}}
+#   {"type": "entry_patch", "seq": N, "name": skill, "removed": true}
+#   {"type": "agent_patch", "seq": N, "agent_id": id, "fields": {...}}
+#   {"type": "agent_patch", "seq": N, "agent_id": id, "removed": true}
+#   {"type": "sync_patch",  "seq": N, "fields": {"session_count": ..., ...}}
+#
+# sync_patch carries session_count / per_env_session_count, scheduler and
+# live_sessions (the whole list, when any live session changed).
+#
+# seq increases by exactly one per message. full_sync carries the seq it is
+# current as of; a client that sees a jump sends {"type": "resync"} and gets
+# a fresh full_sync (see ws_handler).
+#
+# Only dirty entries are re-viewed: those touched via _add_entry /
+# _remove_entry / _update_entry, plus skills that have (or just lost) a live
+# agent, since their overlay changes without going through an entry update.
+
+
+class DeltaState:
+    def __init__(self):
+        self.seq = 0
+        self.primed = False                               # baseline taken?
+        self.dirty_skills: set[str] = set()
+        self.meta_dirty = True
+        self.sent_entries: dict[str, dict[str, str]] = {}  # name -> field -> json
+        self.sent_agents: dict[str, dict[str, str]] = {}   # agent_id -> field -> json
+        self.sent_meta: dict[str, str] = {}
+        self.sent_scheduler: dict[str, str] = {}
+        self.sent_live: dict[str, str] = {}                # live_sessions, minus timestamps
+        self.agent_skills: set[str] = set()                # skills with agents last time
+        self.entries_ref: list | None = None               # list the baseline was taken from
+        self.lock = asyncio.Lock()
+
+
+_delta_state = DeltaState()
+
+
+def _mark_entry_dirty(name: str) -> None:
+    _main_global("_delta_state", _delta_state).dirty_skills.add(name)
+
+
+def _diff_fields(view: dict, sent: dict[str, str]) -> dict:
+    """Return fields of ``view`` whose JSON encoding differs from ``sent``.
+
+    Updates ``sent`` in place. Fields present in ``sent`` but missing from
+    ``view`` are reported as None.
+    """
+    changed = {}
+    for k, v in view.items():
+        enc = json.dumps(v, sort_keys=True)
+        if sent.get(k) != enc:
+            sent[k] = enc
+            changed[k] = v
+    for k in [k for k in sent if k not in view]:
+        del sent[k]
+        changed[k] = None
+    return changed
+
+
+def _collect_patches() -> list[dict]:
+    """Diff current state against the last broadcast. Pure CPU, no awaits."""
+    st = _main_global("_delta_state", _delta_state)
+    reg = _registry()
+    if reg._entries is not st.entries_ref:
+        # skill_entries was swapped wholesale — re-diff everything
+        st.entries_ref = reg._entries
+        st.primed = False
+    if not st.primed:
+        st.dirty_skills.update(reg.by_name)
+        st.dirty_skills.update(st.sent_entries)
+        st.meta_dirty = True
+        st.primed = True
+
+    agents_by_skill = _agents_by_skill()
+    targets_by_name = {t["name"]: t for t in targets}
+    session_logs = _load_session_logs()
+    messages: list[dict] = []
+
+    live_skills = set(agents_by_skill)
+    to_view = st.dirty_skills | live_skills | st.agent_skills
+    st.dirty_skills = set()
+    st.agent_skills = live_skills
+    for name in sorted(to_view):
+        entry = reg.get(name)
+        if entry is None:
+            if st.sent_entries.pop(name, None) is not None:
+                messages.append({"type": "entry_patch", "name": name, "removed": True})
+            continue
+        view = _entry_view(entry, agents_by_skill.get(name, []), targets_by_name, session_logs)
+        changed = _diff_fields(view, st.sent_entries.setdefault(name, {}))
+        if changed:
+            messages.append({"type": "entry_patch", "name": name, "fields": changed})
+
+    live_ids = set()
+    for a in agents.values():
+        live_ids.add(a.agent_id)
+        view = _agent_view(a)
+        view["session_id"] = a.session_id
+        changed = _diff_fields(view, st.sent_agents.setdefault(a.agent_id, {}))
+        if changed:
+            messages.append({"type": "agent_patch", "agent_id": a.agent_id, "fields": changed})
+    for aid in [aid for aid in st.sent_agents if aid not in live_ids]:
+        del st.sent_agents[aid]
+        messages.append({"type": "agent_patch", "agent_id": aid, "removed": True})
+
+    meta_changed = {}
+    if st.meta_dirty:
+        st.meta_dirty = False
+        session_count, per_env = _session_counts()
+        meta_changed = _diff_fields(
+            {"session_count": session_count, "per_env_session_count": per_env},
+            st.sent_meta,
+        )
+    # Slot usage follows agent status, so it's re-diffed on every pass (cheap).
+    meta_changed.update(_diff_fields({"scheduler": scheduler_status()}, st.sent_scheduler))
+    # Same for live sessions (agent logs grow without an entry update);
+    # diffed without the timestamp, which changes on every build.
+    if _diff_fields({"live_sessions": _live_sessions(stamp=False)}, st.sent_live):
+        meta_changed["live_sessions"] = _live_sessions()
+    if meta_changed:
+        messages.append({"type": "sync_patch", "fields": meta_changed})
+
+    for m in messages:
+        st.seq += 1
+        m["seq"] = st.seq
+    return messages
+
+
+async def broadcast_changes():
+    """Broadcast entry/agent/sync patches for everything that changed.
+
+    Call after entry or agent state changes. Serialized by a lock so patch
+    batches reach clients in seq order.
+    """
+    st = _main_global("_delta_state", _delta_state)
+    async with st.lock:
+        for msg in _collect_patches():
+            await ws_broadcast(msg)
+
+
 async def ws_handler(websocket):
+    # Queue current state first, then register for broadcasts — no await in
+    # between, so full_sync is always the first message this client sees.
+    outbox = _ws_outbox(websocket)
+    outbox.put(json.dumps({"type": "full_sync", "payload": build_full_sync()}))
     ws_clients.add(websocket)
     print(f"[WS] client connected ({len(ws_clients)} total)")
 
-    # Send current state on connect
-    await websocket.send(json.dumps({"type": "full_sync", "payload": build_full_sync()}))
-
     try:
         async for raw in websocket:
             try:
                 msg = json.loads(raw)
                 t = msg.get("type")
 
-                if t == "inject":
+                if t == "resync":
+                    # Client saw a seq gap in entry/agent patches — rebase it
+                    outbox.put(json.dumps({"type": "full_sync", "payload": build_full_sync()}))
+
+                elif t == "inject":
                     agent_id = msg.get("agent_id", "")
                     text = msg.get("text", "")
                     print(f"[WS] inject -> {agent_id}: {text}")
@@ -1637,21 +2768,30 @@ async def ws_handler(websocket):
                     desc = msg.get("description", "")
                     deps = msg.get("dependencies", [])
                     print(f"[WS] add_entry -> {name}")
-                    _add_entry(name, desc, deps)
-                    asyncio.create_task(broadcast_full_sync())
+                    try:
+                        _add_entry(name, desc, deps)
+                    except ValueError as e:
+                        # dependency cycle — same rejection as POST /entries
+                        outbox.put(json.dumps({"type": "error", "error": str(e)}))
+                        continue
+                    asyncio.create_task(broadcast_changes())
 
                 elif t == "remove_entry":
                     name = msg.get("name", "")
                     print(f"[WS] remove_entry -> {name}")
                     _remove_entry(name)
-                    asyncio.create_task(broadcast_full_sync())
+                    asyncio.create_task(broadcast_changes())
 
                 elif t == "update_entry":
                     name = msg.get("name", "")
                     updates = msg.get("updates", {})
                     print(f"[WS] update_entry -> {name}: {list(updates.keys())}")
-                    _update_entry(name, updates)
-                    asyncio.create_task(broadcast_full_sync())
+                    try:
+                        _update_entry(name, updates)
+                    except ValueError as e:
+                        outbox.put(json.dumps({"type": "error", "error": str(e)}))
+                        continue
+                    asyncio.create_task(broadcast_changes())
 
                 else:
                     print(f"[WS] unknown: {t}")
@@ -1661,7 +2801,7 @@ async def ws_handler(websocket):
     except websockets.ConnectionClosed:
         pass
     finally:
-        ws_clients.discard(websocket)
+        outbox.close()
         print(f"[WS] client disconnected ({len(ws_clients)} total)")
 
 
@@ -1729,18 +2869,30 @@ async def spawn_agent(skill: str, prompt: str, agent_type: str = "dev",
         _runner = _run_agent_sdk
         _tag = "SDK"
 
+    AGENT_SPAWNS.labels(agent_type).inc()
+
     async def _wrapped():
+        t0 = time.monotonic()
+        outcome = "exited"
         try:
             await asyncio.wait_for(_runner(state, prompt), timeout=DEV_AGENT_TIMEOUT)
         except asyncio.TimeoutError:
+            outcome = "timeout"
             print(f"[{_tag}] {skill}: TIMEOUT after {DEV_AGENT_TIMEOUT}s")
             state.status = "failed"
             _update_entry(skill, {"status": "failed"})
-            await broadcast_full_sync()
+            await broadcast_changes()
             await ws_broadcast_agent_msg(skill, f"Dev agent timed out after {DEV_AGENT_TIMEOUT // 60} minutes.", state.agent_type)
         except Exception as e:
+            outcome = "error"
             print(f"[{_tag}] {skill}: UNHANDLED EXCEPTION: {e}")
             import traceback; traceback.print_exc()
+        except asyncio.CancelledError:
+            outcome = "cancelled"
+            raise
+        finally:
+            AGENT_RUN_SECONDS.labels(agent_type, outcome).observe(time.monotonic() - t0)
+            _schedule_spawn_pump()  # this agent's slot is free
     state.task = asyncio.create_task(_wrapped())
     print(f"[ORCH] {skill}: task created, id={agent_id}")
 
@@ -1756,6 +2908,50 @@ async def spawn_skill_pipeline(skill: str, user_prompt: str):
     await spawn_agent(skill, user_prompt, agent_type="dev")
 
 
+# Test subprocess output is read line by line into ring buffers — a chatty
+# skill can't grow orchestrator memory or fill the pipe while we wait.
+TEST_OUTPUT_MAX_LINES = 500
+TEST_LINE_MAX_CHARS = 1000
+TEST_DECIDED_GRACE_S = 5.0    # exit allowance once the test reported its verdict
+TEST_TIMEOUT_S = 600
+TEST_POLL_S = 5.0             # progress / verdict check interval
+_TRIAL_LINE_RE = re.compile(r"^Trial \d+\b.*?: (?:PASS|FAIL|ERROR)\b")
+
+
+async def _read_lines(stream, buf: deque, on_line=None) -> None:
+    """Append ``stream``'s lines to ``buf`` (truncated), calling ``on_line``."""
+    while True:
+        try:
+            raw = await stream.readline()
+        except ValueError:  # line longer than the reader limit — dropped
+            buf.append("[line too long — truncated]")
+            continue
+        if not raw:
+            return
+        line = raw.decode(errors="replace").rstrip("\n")
+        if len(line) > TEST_LINE_MAX_CHARS:
+            line = line[:TEST_LINE_MAX_CHARS] + " …"
+        buf.append(line)
+        if on_line is not None:
+            try:
+                await on_line(line)
+            except Exception as e:
+                print(f"[TEST] line handler failed: {e}")
+
+
+def _test_result_line(line: str) -> dict | None:
+    """The test's JSON result line ({"success_rate": ...}), else None."""
+    if not line.startswith("{"):
+        return None
+    try:
+        obj = json.loads(line)
+    except ValueError:
+        return None
+    if isinstance(obj, dict) and ("success_rate" in obj or "decision" in obj):
+        return obj
+    return None
+
+
 async def run_mechanical_test(skill: str) -> dict:
     """Run the skill's test as a subprocess and parse results.
     Returns {"passed": bool, "success_rate": float, "total_trials": int, "stdout": str, "stderr": str}.
@@ -1764,11 +2960,16 @@ async def run_mechanical_test(skill: str) -> dict:
     if not test_file.exists():
         await ws_broadcast_agent_msg(skill, "No test file found", "test")
         _update_entry(skill, {"status": "failed"})
-        await broadcast_full_sync()
+        await broadcast_changes()
         return {"passed": False, "success_rate": 0, "total_trials": 0, "stdout": "", "stderr": "No test file"}
 
     await ws_broadcast_agent_msg(skill, "Running test subprocess...", "test")
 
+    # summary.json is (re)written by the test as trials finish — drop the
+    # previous run's so neither progress nor the verdict come from it.
+    summary_file = SKILLS_DIR / skill / "tests" / "results" / "summary.json"
+    summary_file.unlink(missing_ok=True)
+
     try:
         # Run test as a subprocess (tests use requests to call agent server)
         env = {**os.environ, "PYTHONUNBUFFERED": "1"}
@@ -1785,44 +2986,101 @@ async def run_mechanical_test(skill: str) -> dict:
             env=env,
         )
 
+        out_buf: deque[str] = deque(maxlen=TEST_OUTPUT_MAX_LINES)
+        err_buf: deque[str] = deque(maxlen=TEST_OUTPUT_MAX_LINES)
+        live = {"result": None}     # last JSON result line seen on stdout
+
+        async def _on_stdout(line: str):
+            if _TRIAL_LINE_RE.match(line):
+                await ws_broadcast_agent_msg(skill, line, "test")
+            elif (res := _test_result_line(line)) is not None:
+                live["result"] = res
+
+        readers = asyncio.gather(_read_lines(proc.stdout, out_buf, _on_stdout),
+                                 _read_lines(proc.stderr, err_buf))
+
+        async def _drain():
+            # A grandchild still holding the pipes must not block us.
+            try:
+                await asyncio.wait_for(readers, timeout=5.0)
+            except asyncio.TimeoutError:
+                pass
         start_time = time.time()
+        decided_at = None
+        killed_early = ""
 
-        # Poll proc.wait() for progress updates; communicate() once after exit
+        # Wait for exit; every TEST_POLL_S report progress from summary.json. Once
+        # the test has reported its verdict (summary.json or the result
+        # line), let it finish trials already submitted to the robot
+        # ("inflight"), then give it TEST_DECIDED_GRACE_S to exit and kill it.
         while True:
             try:
-                await asyncio.wait_for(proc.wait(), timeout=5.0)
+                await asyncio.wait_for(proc.wait(), timeout=TEST_POLL_S)
                 break  # process finished
             except asyncio.TimeoutError:
                 elapsed = int(time.time() - start_time)
-                if elapsed > 600:
+                progress = ""
+                verdict = (live["result"] or {}).get("decision")
+                inflight = []
+                try:
+                    summary_live = json.loads(summary_file.read_text())
+                    progress = f" — {summary_live.get('passed', 0)}/{summary_live.get('total_trials', 0)} trials passed"
+                    verdict = verdict or summary_live.get("decision")
+                    inflight = summary_live.get("inflight") or []
+                except (OSError, ValueError):
+                    pass
+                if elapsed > TEST_TIMEOUT_S and verdict:
+                    print(f"[TEST] {skill}: timed out draining; trials left running: "
+                          f"{[t.get('trial') for t in inflight]}")
+                    killed_early = verdict
+                    proc.kill()
+                    await proc.wait()
+                    break
+                if elapsed > TEST_TIMEOUT_S:
                     proc.kill()
                     await proc.wait()
-                    await ws_broadcast_agent_msg(skill, "Test timed out (10 min limit)", "test")
+                    await _drain()
+                    await ws_broadcast_agent_msg(skill, f"Test timed out ({TEST_TIMEOUT_S // 60} min limit)", "test")
                     _update_entry(skill, {"status": "failed"})
-                    await broadcast_full_sync()
-                    return {"passed": False, "success_rate": 0, "total_trials": 0, "stdout": "", "stderr": "Timed out"}
-
-                await ws_broadcast_status(skill, "", "running", f"Testing... {elapsed}s")
+                    await broadcast_changes()
+                    return {"passed": False, "success_rate": 0, "total_trials": 0,
+                            "stdout": "\n".join(out_buf), "stderr": "Timed out"}
+
+                if verdict and inflight:
+                    progress += f" — {verdict}, waiting for {len(inflight)} in-flight trial(s)"
+                elif verdict and decided_at is None:
+                    decided_at = time.monotonic()
+                elif verdict and time.monotonic() - decided_at >= TEST_DECIDED_GRACE_S:
+                    killed_early = verdict
+                    proc.kill()
+                    await proc.wait()
+                    break
+                await ws_broadcast_status(skill, "", "running", f"Testing... {elapsed}s{progress}")
 
-        stdout_bytes, stderr_bytes = await proc.communicate()
+        await _drain()
         exit_code = proc.returncode
-        stdout = stdout_bytes.decode(errors="replace")
-        stderr = stderr_bytes.decode(errors="replace")
+        stdout = "\n".join(out_buf)
+        stderr = "\n".join(err_buf)
 
         print(f"[TEST] {skill}: exit_code={exit_code}")
         if stderr.strip():
             print(f"[TEST] {skill}: stderr={stderr[-500:]}")
 
-        await ws_broadcast_agent_msg(skill, f"Test completed (exit {exit_code})", "test")
+        if killed_early:
+            await ws_broadcast_agent_msg(
+                skill, f"Test already decided ({killed_early}) — stopped the test process", "test")
+        else:
+            await ws_broadcast_agent_msg(skill, f"Test completed (exit {exit_code})", "test")
 
-        # Parse JSON results — check summary.json first, then last line of stdout
+        # Parse JSON results — check summary.json first, then the result line on stdout
         sr = None
         total_trials = 0
-        summary_file = SKILLS_DIR / skill / "tests" / "results" / "summary.json"
+        decision = None
 
         if summary_file.exists():
             try:
                 summary = json.loads(summary_file.read_text())
+                decision = summary.get("decision")
                 sr = summary.get("success_rate",
                                  summary.get("passed", 0) / max(summary.get("total_trials", 1), 1) * 100)
                 total_trials = summary.get("total_trials", 0)
@@ -1831,18 +3089,23 @@ async def run_mechanical_test(skill: str) -> dict:
                 print(f"[TEST] {skill}: could not parse summary.json: {e}")
 
         if sr is None:
-            # Fallback: parse last line of stdout as JSON
-            try:
-                results = json.loads(stdout.strip().split('\n')[-1])
+            # Fallback: the JSON result line the test printed on stdout
+            results = live["result"]
+            if results is not None:
+                decision = results.get("decision")
                 sr = results.get("success_rate",
                                  results.get("passed", 0) / max(results.get("total_trials", 1), 1) * 100)
                 total_trials = results.get("total_trials", 0)
-            except (json.JSONDecodeError, IndexError, ValueError):
+            else:
                 sr = 100.0 if exit_code == 0 else 0.0
                 total_trials = 1
 
-        # Update entry and broadcast
-        passed = sr is not None and sr > 0
+        # Update entry and broadcast. Tests on the trial engine decide
+        # pass/fail themselves (SPRT); older tests pass on any success.
+        if decision in ("pass", "fail"):
+            passed = decision == "pass"
+        else:
+            passed = sr is not None and sr > 0
         if passed and autonomous_mode:
             status_label = "done"
         elif passed:
@@ -1862,7 +3125,7 @@ async def run_mechanical_test(skill: str) -> dict:
         else:
             msg = f"Tests complete (success_rate={sr:.0f}%). Failed."
         await ws_broadcast_agent_msg(skill, msg, "test")
-        await broadcast_full_sync()
+        await broadcast_changes()
         print(f"[TEST] {skill}: {status_label} (sr={sr}%, trials={total_trials})")
 
         # Autonomous: auto-promote and spawn downstream
@@ -1875,7 +3138,7 @@ async def run_mechanical_test(skill: str) -> dict:
         await ws_broadcast_agent_msg(skill, f"Test error: {e}", "test")
         traceback.print_exc()
         _update_entry(skill, {"status": "failed"})
-        await broadcast_full_sync()
+        await broadcast_changes()
         return {"passed": False, "success_rate": 0, "total_trials": 0, "stdout": "", "stderr": str(e)}
 
 
@@ -1884,28 +3147,17 @@ async def run_multi_target_test(skill: str) -> dict:
 
     Returns {"target_results": {name: {passed, execution_id}}, "aggregate_pass": bool, "success_rate": float}.
     """
-    import urllib.request, urllib.error
-
-    # 1. Bundle the skill
-    bundler = str(Path(__file__).parent / ".." / "tidybot-bundle" / "scripts" / "tidybot-bundle.py")
-    bundler = str(Path(bundler).resolve())
-    skills_dir = str(SKILLS_DIR)
+    http = _http_client()
 
-    bundle_out = SKILLS_DIR / skill / "scripts" / "_bundled.py"
-    proc = await asyncio.create_subprocess_exec(
-        sys.executable, bundler, skill, "--skills-dir", skills_dir, "-o", str(bundle_out),
-        stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE,
-    )
-    stdout, stderr = await proc.communicate()
-    if proc.returncode != 0:
-        err = stderr.decode(errors="replace")[-300:]
-        await ws_broadcast_agent_msg(skill, f"Bundle failed: {err}", "test")
+    # 1. Bundle the skill (in-process; cached until a file in its closure changes)
+    try:
+        code = await asyncio.to_thread(tidybot_bundle.bundle, skill, SKILLS_DIR, None, BUNDLE_CACHE_DIR)
+    except Exception as e:
+        code = f"# ERROR: {type(e).__name__}: {e}"
+    if code.startswith("# ERROR"):
+        await ws_broadcast_agent_msg(skill, f"Bundle failed: {code[:300]}", "test")
         return {"target_results": {}, "aggregate_pass": False, "success_rate": 0}
-
-    if not bundle_out.exists():
-        # Fallback: use main.py directly
-        bundle_out = SKILLS_DIR / skill / "scripts" / "main.py"
-    code = bundle_out.read_text()
+    (SKILLS_DIR / skill / "scripts" / "_bundled.py").write_text(code)
 
     # 2. Submit to all targets in parallel
     async def _test_one_target(target: dict) -> tuple[str, dict]:
@@ -1917,30 +3169,27 @@ async def run_multi_target_test(skill: str) -> dict:
         try:
             # Reset sim
             if sim_api:
+                t0 = time.monotonic()
                 try:
-                    req = urllib.request.Request(f"{sim_api}/reset", data=b'{}',
-                        headers={"Content-Type": "application/json"}, method="POST")
-                    urllib.request.urlopen(req, timeout=10)
+                    await http.post(f"{sim_api}/reset", json={}, timeout=10, idempotent=True)
+                    _target_load_obj().record_reset(name, time.monotonic() - t0)
                 except Exception:
                     pass
 
-            # Submit code
-            data = json.dumps({"code": code, "holder": f"test:{skill}", "reset_env": True}).encode()
-            req = urllib.request.Request(f"{server}/code/submit", data=data,
-                headers={"Content-Type": "application/json"})
-            resp = json.loads(urllib.request.urlopen(req, timeout=10).read())
+            # Submit code (not retried — a resend could run the code twice)
+            t0 = time.monotonic()
+            resp = await http.post_json(
+                f"{server}/code/submit",
+                {"code": code, "holder": f"test:{skill}", "reset_env": True},
+                timeout=10,
+            )
             job_id = resp["job_id"]
 
-            # Poll until done (up to 5 min)
-            for _ in range(150):
-                await asyncio.sleep(2)
-                try:
-                    job = json.loads(urllib.request.urlopen(f"{server}/code/jobs/{job_id}", timeout=5).read())
-                    if job.get("status") in ("completed", "failed"):
-                        break
-                except Exception:
-                    continue
-            else:
+            # Wait for completion (up to 5 min): job event stream if the
+            # agent server has one, else long-poll / adaptive polling.
+            job = await wait_for_job_async(http, server, job_id, timeout=300)
+            _target_load_obj().record_job(name, time.monotonic() - t0)
+            if job.get("status") == "timeout":
                 return name, {"passed": False, "error": "timeout", "execution_id": ""}
 
             execution_id = job.get("execution_id", "")
@@ -1949,7 +3198,7 @@ async def run_multi_target_test(skill: str) -> dict:
             passed = False
             if sim_api:
                 try:
-                    result = json.loads(urllib.request.urlopen(f"{sim_api}/task/success", timeout=5).read())
+                    result = await http.get_json(f"{sim_api}/task/success", timeout=5)
                     passed = result.get("success", False)
                 except Exception:
                     pass
@@ -1980,7 +3229,7 @@ async def run_multi_target_test(skill: str) -> dict:
     summary_parts = [f"{n}: {'PASS' if r.get('passed') else 'FAIL'}" for n, r in target_results.items()]
     msg = f"Multi-target test: {passed_count}/{total} passed — " + ", ".join(summary_parts)
     await ws_broadcast_agent_msg(skill, msg, "test")
-    await broadcast_full_sync()
+    await broadcast_changes()
 
     return {"target_results": target_results, "aggregate_pass": aggregate_pass, "success_rate": success_rate}
 
@@ -2005,7 +3254,7 @@ async def _root_skill_test_loop_inner(skill: str):
     while attempt < MAX_ROOT_TEST_ATTEMPTS:
         attempt += 1
         _update_entry(skill, {"test_attempts": attempt, "status": "testing"})
-        await broadcast_full_sync()
+        await broadcast_changes()
 
         await ws_broadcast_agent_msg(skill, f"Ground-truth test attempt {attempt}/{MAX_ROOT_TEST_ATTEMPTS}", "test")
         result = await run_mechanical_test(skill)
@@ -2025,13 +3274,13 @@ async def _root_skill_test_loop_inner(skill: str):
                 else:
                     await ws_broadcast_agent_msg(skill, f"All {len(targets)} targets PASSED (attempt {attempt}). Waiting for review.", "test")
                     _update_entry(skill, {"status": "review"})
-                    await broadcast_full_sync()
+                    await broadcast_changes()
                     return
             else:
                 # Single target — go straight to review
                 await ws_broadcast_agent_msg(skill, f"Ground-truth test PASSED (attempt {attempt}). Waiting for review.", "test")
                 _update_entry(skill, {"status": "review"})
-                await broadcast_full_sync()
+                await broadcast_changes()
                 return
 
         if attempt >= MAX_ROOT_TEST_ATTEMPTS:
@@ -2068,7 +3317,7 @@ async def _root_skill_test_loop_inner(skill: str):
     # Exhausted all attempts — go to review anyway so user can inspect
     await ws_broadcast_agent_msg(skill, f"Ground-truth test failed after {attempt} attempts. Sending to review.", "test")
     _update_entry(skill, {"status": "review"})
-    await broadcast_full_sync()
+    await broadcast_changes()
 
 
 def _get_system_prompt(agent_type: str, skill_name: str = "",
@@ -2088,7 +3337,7 @@ def _get_system_prompt(agent_type: str, skill_name: str = "",
     # For dev agents: tell them about dependencies and how to bundle
     dep_context = ""
     if agent_type == "dev" and skill_name:
-        entry = next((e for e in _entries_list() if e["name"] == skill_name), None)
+        entry = _find_entry(skill_name)
         if entry and entry.get("dependencies"):
             dep_lines = []
             for dep_name in entry["dependencies"]:
@@ -2101,9 +3350,11 @@ def _get_system_prompt(agent_type: str, skill_name: str = "",
                 + "\n".join(dep_lines)
                 + "\n\nList them in `scripts/deps.txt` (one per line). "
                 + "When submitting code for execution, use the bundler to produce a single script:\n"
-                + f"```bash\npython {bundler_path} {skill_name} --skills-dir {SKILLS_DIR} -o bundled.py\n```\n"
-                + "The bundler resolves deps.txt, topologically sorts, deduplicates imports, "
-                + "and inlines everything into one file ready for `/code/execute`.\n"
+                + f"```bash\npython {bundler_path} {skill_name} --skills-dir {SKILLS_DIR} "
+                + f"--cache-dir {BUNDLE_CACHE_DIR} -o bundled.py\n```\n"
+                + "The bundler resolves deps.txt, topologically sorts, merges imports, drops "
+                + "duplicate and unused dependency code, and inlines everything into one file "
+                + "ready for `/code/execute`.\n"
             )
 
     # Choose prompt based on whether we're targeting hardware or sim
@@ -2147,6 +3398,7 @@ def _save_session_mapping(state: AgentState, message):
         "skill": state.skill,
         "agent_type": state.agent_type,
         "agent_id": state.agent_id,
+        "target": state.target_name or "default",
         "cost_usd": message.total_cost_usd,
         "num_turns": message.num_turns,
         "log": list(state.log),
@@ -2175,6 +3427,7 @@ def _save_state_log(state: AgentState, reason: str = "interrupted"):
         "skill": state.skill,
         "agent_type": state.agent_type,
         "agent_id": state.agent_id,
+        "target": state.target_name or "default",
         "cost_usd": 0,
         "num_turns": len(state.log),
         "log": list(state.log),
@@ -2304,6 +3557,12 @@ specific fabrications.
 
 **IMPORTANT: Read logs first, images selectively. Do NOT read every image.**
 
+If the task message has an **Evidence digest**, start there. It was computed
+mechanically from the files below and lists the stdout markers, errors, gripper
+timeline, base displacement, phase durations and the frames on disk, tagged by
+key moment. Open files only to confirm a point or to look past the digest.
+Quotes in your feedback must still come from the files or from the digest.
+
 **Step 1 — Logs first:**
 - Read **stdout.log** in the exec dir — this is the dev's actual printed output
   (markers like `DETECT_OK`, `APPROACH_OK <dist>`, `FAIL`, error messages).
@@ -2397,117 +3656,225 @@ fail (better to retry than to merge broken code).
 """
 
 
-async def _fetch_remote_recording(execution_id: str, skill: str) -> Path | None:
-    """Download a recording from the remote agent server to a local cache.
+# Remote recordings are materialized under logs/code_executions/<id> (where
+# the evaluator and _update_trial_images look for them); frames and the LRU
+# index live in logs/recording_cache. See recording_cache.py. Only frames
+# around the run's key moments (gripper, base, EE height, detection flips)
+# are downloaded — see eval_evidence.select_key_frames.
+RECORDING_CACHE_BYTES = int(os.environ.get("RECORDING_CACHE_BYTES", str(2 * 1024 ** 3)))
+_recording_cache = RecordingCache(
+    exec_root=PROJECT_DIR / "logs" / "code_executions",
+    store_root=PROJECT_DIR / "logs" / "recording_cache",
+    budget_bytes=RECORDING_CACHE_BYTES,
+    http_client=lambda: _http_client(),
+    frame_selector=select_key_frames,
+)
+
+
+def _recording_cache_obj() -> RecordingCache:
+    return _main_global("_recording_cache", _recording_cache)
 
-    Fetches metadata, stdout/stderr (from job), state timeline, and camera frames.
+
+def _skill_agent_server(skill: str, agent_server: str = "") -> str:
+    """Agent server that ran ``skill``'s code: the caller's, else its placement."""
+    if agent_server:
+        return agent_server
+    entry = _find_entry(skill)
+    placed = (entry or {}).get("placement")
+    for t in _targets_list():
+        if placed and t.get("name") == placed and t.get("agent_server"):
+            return t["agent_server"]
+    return AGENT_SERVER
+
+
+async def _fetch_remote_recording(execution_id: str, skill: str,
+                                  agent_server: str = "") -> Path | None:
+    """Download a recording from the remote agent server to the local cache.
+
+    Fetches metadata, stdout/stderr (from job), state timeline, and camera frames
+    from ``agent_server`` (default: the skill's placed target, else AGENT_SERVER).
     Returns the local cache directory path, or None on failure.
     """
-    import urllib.request, urllib.error
+    server = _skill_agent_server(skill, agent_server)
+    return await _recording_cache_obj().fetch(server, execution_id, label=skill)
+
+
+# ---------------------------------------------------------------------------
+# Evaluator worker pool
+# ---------------------------------------------------------------------------
+# Evaluations go through a small pool of workers that each hold an
+# evaluator session started ahead of time (see eval_pool.py). _eval_lock
+# still serializes evals of ONE skill; different skills run side by side up
+# to EVAL_POOL_SIZE, and at most EVAL_QUEUE_MAX more wait for a worker.
+# Sessions idle longer than EVAL_SESSION_IDLE_TTL seconds are reconnected;
+# a warm-up (connect) slower than EVAL_SESSION_WARM_TIMEOUT is abandoned.
+EVAL_POOL_SIZE = int(os.environ.get("EVAL_POOL_SIZE", "2"))
+EVAL_QUEUE_MAX = int(os.environ.get("EVAL_QUEUE_MAX", "16"))
+EVAL_SESSION_IDLE_TTL = float(os.environ.get("EVAL_SESSION_IDLE_TTL", "600"))
+EVAL_SESSION_WARM_TIMEOUT = float(os.environ.get("EVAL_SESSION_WARM_TIMEOUT", "60"))
+EVAL_TIMEOUT_S = 900  # 15 minutes max for evaluator
+
+# A warm SDK session is connected before we know which skill it will judge,
+# so its system prompt can't carry the skill specifics: they travel in the
+# task message instead (see _evaluator_task_prompt).
+_EVAL_GENERIC_FIELDS = {
+    "{{skill_name}}": "named in the task message",
+    "{{skill_description}}": "(given in the task message)",
+    "{{exec_dir}}": "<exec_dir>",
+    "{{skill_code_path}}": "<skill_code_path>",
+    "{{skill_dir}}": "<skill_dir>",
+}
+
+
+def _render_evaluator_prompt(fields: dict[str, str]) -> str:
+    prompt = SYSTEM_PROMPT_EVALUATOR
+    for placeholder, value in fields.items():
+        prompt = prompt.replace(placeholder, value)
+    return prompt
+
+
+def _evaluator_task_prompt(skill: str, skill_desc: str, skill_dir: Path,
+                           skill_code_path: Path, exec_dir: Path, digest: str = "") -> str:
+    digest_block = (
+        f"Evidence digest (computed mechanically from the recording files):\n{digest}\n\n"
+        if digest else ""
+    )
+    return (
+        f"Evaluate the execution recording for skill '{skill}'.\n"
+        f"Recording dir: {exec_dir}\n"
+        f"Skill code: {skill_code_path}\n\n"
+        f"Task details (values for the placeholders in your instructions):\n"
+        f"  skill: {skill}\n"
+        f"  description: {skill_desc}\n"
+        f"  <skill_dir> = {skill_dir}\n"
+        f"  <skill_code_path> = {skill_code_path}\n"
+        f"  <exec_dir> = {exec_dir}\n\n"
+        f"{digest_block}"
+        f"Read the images and metadata, then output your EVAL_RESULT JSON."
+    )
+
+
+class _SdkEvalSession:
+    """ClaudeSDKClient connected ahead of time with the generic evaluator prompt.
+
+    One conversation per client (a second eval must not see the first
+    one's context), so the pool replaces it after every job.
+    """
 
-    cache_dir = PROJECT_DIR / "logs" / "code_executions" / execution_id
-    metadata_path = cache_dir / "metadata.json"
+    reusable = False
 
-    # Already cached?
-    if metadata_path.exists():
-        return cache_dir
+    def __init__(self):
+        self.client = None
 
-    print(f"[EVAL] {skill}: fetching recording {execution_id} from {AGENT_SERVER}")
+    async def warm(self):
+        options = ClaudeAgentOptions(
+            cwd=str(WORKSPACE_DIR),  # claude-code/, same reason as dev agent
+            permission_mode="bypassPermissions",
+            system_prompt=_render_evaluator_prompt(_EVAL_GENERIC_FIELDS),
+            model="claude-sonnet-4-6",
+        )
+        self.client = ClaudeSDKClient(options=options)
+        await self.client.connect()
+
+    async def run(self, job: EvalJob) -> dict:
+        """Stream the eval; stop reading once ``job.on_text`` reports a verdict.
+
+        Stopping early leaves the conversation mid-turn — fine, the pool
+        disconnects this single-use client right after.
+        """
+        await self.client.query(job.prompt)
+        res = {"ok": True, "session_id": "", "cost_usd": 0, "num_turns": 0}
+        async for message in self.client.receive_response():
+            if isinstance(message, SystemMessage) and getattr(message, "subtype", "") == "init":
+                res["session_id"] = (getattr(message, "data", None) or {}).get("session_id", "")
+            elif isinstance(message, AssistantMessage):
+                res["num_turns"] += 1
+                for block in message.content:
+                    if isinstance(block, TextBlock) and block.text.strip() and job.on_text:
+                        if await job.on_text(block.text.strip()):
+                            res["early"] = True
+                            return res
+            elif isinstance(message, ResultMessage):
+                res.update(session_id=message.session_id or res["session_id"],
+                           cost_usd=message.total_cost_usd, num_turns=message.num_turns)
+        return res
+
+    async def close(self):
+        if self.client is not None:
+            await self.client.disconnect()
+            self.client = None
+
+
+class _OpenclawEvalSession:
+    """openclaw evals are one-shot CLI runs — nothing to pre-start; the
+    pool still bounds how many run at once."""
+
+    reusable = True
+
+    async def warm(self):
+        pass
 
-    try:
-        # 1. Fetch recording metadata (has timeline, frames list, cameras, duration)
-        rec_url = f"{AGENT_SERVER}/code/recordings/{execution_id}"
-        rec_data = json.loads(await asyncio.to_thread(
-            lambda: urllib.request.urlopen(rec_url, timeout=15).read()
-        ))
-    except Exception as e:
-        print(f"[EVAL] {skill}: failed to fetch recording {execution_id}: {e}")
-        return None
+    async def run(self, job: EvalJob) -> dict:
+        return await _openclaw_backend._run_eval_openclaw(
+            skill=job.skill,
+            system_prompt=job.system_prompt,
+            user_prompt=job.prompt,
+            on_text=job.on_text,
+            timeout_s=int(job.timeout),
+        )
 
-    cache_dir.mkdir(parents=True, exist_ok=True)
+    async def close(self):
+        pass
 
-    # 2. Fetch job info for stdout/stderr
-    stdout, stderr = "", ""
-    try:
-        # Find the job that produced this execution
-        jobs_url = f"{AGENT_SERVER}/code/jobs"
-        jobs_data = json.loads(await asyncio.to_thread(
-            lambda: urllib.request.urlopen(jobs_url, timeout=10).read()
-        ))
-        job_list = jobs_data.get("jobs", jobs_data) if isinstance(jobs_data, dict) else jobs_data
-        for job in job_list:
-            if job.get("execution_id") == execution_id:
-                result = job.get("result", {})
-                if isinstance(result, dict):
-                    stdout = result.get("stdout", "")
-                    stderr = result.get("stderr", "")
-                break
-    except Exception as e:
-        print(f"[EVAL] {skill}: could not fetch job stdout for {execution_id}: {e}")
-
-    # 3. Write metadata.json (what the evaluator agent expects)
-    metadata = {
-        "execution_id": execution_id,
-        "started_at": rec_data.get("started_at"),
-        "stopped_at": rec_data.get("stopped_at"),
-        "duration": rec_data.get("duration"),
-        "cameras": rec_data.get("cameras", []),
-        "frame_count": rec_data.get("frame_count", 0),
-        "stdout": stdout,
-        "stderr": stderr,
-    }
-    metadata_path.write_text(json.dumps(metadata, indent=2))
-
-    # 4. Write state_log.jsonl from timeline
-    timeline = rec_data.get("timeline", [])
-    if timeline:
-        with open(cache_dir / "state_log.jsonl", "w") as f:
-            for entry in timeline:
-                state = entry.get("state")
-                if state:
-                    f.write(json.dumps({
-                        "timestamp": entry.get("timestamp"),
-                        "frame": entry.get("frame"),
-                        **state,
-                    }) + "\n")
-
-    # 5. Download frames — sample evenly, max 30 frames to keep it fast
-    all_frames = rec_data.get("frames", [])
-    if all_frames:
-        if len(all_frames) > 30:
-            step = len(all_frames) / 30
-            sampled = [all_frames[int(i * step)] for i in range(30)]
-        else:
-            sampled = all_frames
 
-        async def _download_frame(fname: str):
-            url = f"{AGENT_SERVER}/code/recordings/{execution_id}/frames/{fname}"
-            try:
-                data = await asyncio.to_thread(
-                    lambda u=url: urllib.request.urlopen(u, timeout=10).read()
-                )
-                (cache_dir / fname).write_bytes(data)
-            except Exception:
-                pass  # non-fatal, evaluator can work with fewer frames
+def _new_eval_session():
+    if HARNESS == "openclaw" and _openclaw_backend is not None:
+        return _OpenclawEvalSession()
+    return _SdkEvalSession()
+
+
+_eval_pool = EvalWorkerPool(_new_eval_session, size=EVAL_POOL_SIZE, queue_max=EVAL_QUEUE_MAX,
+                            idle_ttl=EVAL_SESSION_IDLE_TTL,
+                            warm_timeout=EVAL_SESSION_WARM_TIMEOUT)
+
+
+def _eval_pool_obj() -> EvalWorkerPool:
+    return _main_global("_eval_pool", _eval_pool)
+
 
-        # Download frames concurrently (bounded)
-        sem = asyncio.Semaphore(5)
-        async def _bounded_download(fname: str):
-            async with sem:
-                await _download_frame(fname)
+metrics.register_collector(lambda: _eval_pool_obj().export_metrics())
 
-        await asyncio.gather(*[_bounded_download(f) for f in sampled])
 
-    frame_count = len([f for f in cache_dir.iterdir() if f.suffix == ".jpg"])
-    print(f"[EVAL] {skill}: cached recording {execution_id} ({frame_count} frames, {len(timeline)} state samples)")
-    return cache_dir
+# Verdicts by execution_id and code hash, persisted next to agent_sessions.jsonl.
+_eval_results = EvalResultStore(SESSION_LOG.parent / "eval_results.jsonl")
 
 
-async def run_evaluator(skill: str, execution_id: str | None = None) -> dict:
-    """Run a short-lived evaluator agent (ClaudeSDKClient) that reviews execution recordings.
+def _eval_results_obj() -> EvalResultStore:
+    return _main_global("_eval_results", _eval_results)
 
-    Returns {"passed": bool, "feedback": str}.
+
+async def run_evaluator(skill: str, execution_id: str | None = None,
+                        agent_server: str = "", code_hash: str = "") -> dict:
+    """Run an evaluator (on a pooled worker) that reviews execution recordings.
+
+    ``agent_server`` is where the execution ran (default: the skill's placed
+    target, else AGENT_SERVER). ``code_hash`` (sha256 of the submitted
+    script, from /job-done) lets a resubmission of identical code reuse the
+    verdict. Returns {"passed": bool, "feedback": str}.
     """
+    t0 = time.monotonic()
+    outcome = "error"
+    try:
+        result = await _run_evaluator(skill, execution_id, agent_server, code_hash)
+        outcome = "passed" if result.get("passed") else "failed"
+        return result
+    finally:
+        EVALS.labels(outcome).inc()
+        EVAL_SECONDS.labels(outcome).observe(time.monotonic() - t0)
+
+
+async def _run_evaluator(skill: str, execution_id: str | None, agent_server: str = "",
+                         code_hash: str = "") -> dict:
     # Find execution recording — try local first, then fetch from remote agent server
     exec_dir = PROJECT_DIR / "logs" / "code_executions"
 
@@ -2519,27 +3886,25 @@ async def run_evaluator(skill: str, execution_id: str | None = None) -> dict:
             target = exec_dir / execution_id
             if target.exists() and target.is_dir():
                 latest = target
-        if latest is None:
+        else:
             all_dirs = [d for d in exec_dir.iterdir() if d.is_dir()]
             if all_dirs:
                 latest = max(all_dirs, key=lambda d: d.stat().st_mtime)
 
     # Fall back to fetching from agent server (works for both local and remote)
     if latest is None:
+        server = _skill_agent_server(skill, agent_server)
         try:
             if execution_id:
                 # Fetch specific execution
-                latest = await _fetch_remote_recording(execution_id, skill)
+                latest = await _fetch_remote_recording(execution_id, skill, server)
             else:
-                # Find the most recent execution from the remote server
-                import urllib.request
-                rec_url = f"{AGENT_SERVER}/code/recordings"
-                rec_data = json.loads(await asyncio.to_thread(
-                    lambda: urllib.request.urlopen(rec_url, timeout=10).read()
-                ))
+                # Find the most recent execution on the server the skill ran on
+                rec_url = f"{server}/code/recordings"
+                rec_data = await _http_client().get_json(rec_url, timeout=10)
                 recordings = rec_data.get("recordings", rec_data) if isinstance(rec_data, dict) else rec_data
                 if recordings:
-                    latest = await _fetch_remote_recording(recordings[0], skill)
+                    latest = await _fetch_remote_recording(recordings[0], skill, server)
         except Exception as e:
             print(f"[EVAL] {skill}: failed to fetch remote recordings: {e}")
 
@@ -2556,135 +3921,127 @@ async def run_evaluator(skill: str, execution_id: str | None = None) -> dict:
     # webhook), which never fires for openclaw dev autoloop — the dashboard
     # would show stale frames from whichever earlier iter last triggered B.
     try:
-        _update_trial_images(skill, latest.name)
-        await broadcast_full_sync()
+        await _update_trial_images(skill, latest.name)
+        await broadcast_changes()
     except Exception as e:
         print(f"[EVAL] {skill}: trial_images refresh failed (non-fatal): {e}")
 
-    # Build evaluator prompt
+    # Decisive failures (uncaught traceback, FAILURE on stdout, non-zero
+    # exit, empty recording) are judged from the logs — no LLM call.
+    try:
+        verdict = await asyncio.to_thread(pre_evaluate, latest)
+    except Exception as e:
+        print(f"[EVAL] {skill}: pre-evaluator failed (non-fatal): {e}")
+        verdict = None
+    if verdict is not None:
+        print(f"[EVAL] {skill}: rule {verdict['rule']!r} failed execution {latest.name} — LLM evaluator skipped")
+        await ws_broadcast_agent_msg(skill, verdict["feedback"], "evaluator")
+        return {**verdict, "full_text": verdict["feedback"]}
+
+    # Same recording, or byte-identical submitted code, already judged for
+    # this skill and description -> reuse that verdict (see eval_results.py).
+    # Path A picks the newest recording, so it only gets the execution key.
     entry = _find_entry(skill)
     skill_desc = entry.get("description", skill) if entry else skill
-    skill_code_path = SKILLS_DIR / skill / "scripts" / "main.py"
+    code = code_key(skill, code_hash, skill_desc) if execution_id and code_hash else ""
+    result = await _eval_results_obj().run_once(
+        latest.name, code, skill, lambda: _evaluate_recording(skill, latest, skill_desc),
+        description=skill_desc)
+    if result.get("cached") == "execution":
+        await ws_broadcast_agent_msg(
+            skill, f"Execution {latest.name} was already evaluated — reusing its verdict.", "evaluator")
+    elif result.get("cached") == "code":
+        await ws_broadcast_agent_msg(
+            skill, f"Identical code was already evaluated (execution {result['cached_from']}) "
+                   f"— reusing its verdict.", "evaluator")
+    return result
 
-    skill_dir = SKILLS_DIR / skill
-    system_prompt = SYSTEM_PROMPT_EVALUATOR.replace(
-        "{{skill_name}}", skill
-    ).replace(
-        "{{skill_description}}", skill_desc
-    ).replace(
-        "{{exec_dir}}", str(latest)
-    ).replace(
-        "{{skill_code_path}}", str(skill_code_path)
-    ).replace(
-        "{{skill_dir}}", str(skill_dir)
-    )
 
-    prompt = (
-        f"Evaluate the execution recording for skill '{skill}'.\n"
-        f"Recording dir: {latest}\n"
-        f"Skill code: {skill_code_path}\n\n"
-        f"Read the images and metadata, then output your EVAL_RESULT JSON."
-    )
+async def _evaluate_recording(skill: str, latest: Path, skill_desc: str) -> dict:
+    """One evaluator run over the recording at ``latest``."""
+    # Build evaluator prompt
+    skill_code_path = SKILLS_DIR / skill / "scripts" / "main.py"
 
-    # Run a short-lived SDK agent
-    options = ClaudeAgentOptions(
-        cwd=str(WORKSPACE_DIR),  # claude-code/, same reason as dev agent
-        permission_mode="bypassPermissions",
-        system_prompt=system_prompt,
-        model="claude-sonnet-4-6",
-    )
+    skill_dir = SKILLS_DIR / skill
+    system_prompt = _render_evaluator_prompt({
+        "{{skill_name}}": skill,
+        "{{skill_description}}": skill_desc,
+        "{{exec_dir}}": str(latest),
+        "{{skill_code_path}}": str(skill_code_path),
+        "{{skill_dir}}": str(skill_dir),
+    })
+    try:
+        digest = format_digest(await asyncio.to_thread(build_digest, latest))
+    except Exception as e:
+        print(f"[EVAL] {skill}: evidence digest failed (non-fatal): {e}")
+        digest = ""
+    prompt = _evaluator_task_prompt(skill, skill_desc, skill_dir, skill_code_path, latest, digest)
 
     collected_text: list[str] = []
-    EVAL_TIMEOUT = 900  # 15 minutes max for evaluator
+    envelope = EnvelopeParser()
 
-    try:
-        if HARNESS == "openclaw" and _openclaw_backend is not None:
-            # OpenClaw eval path: spawn `openclaw agent --local --agent tidybot-evaluator`
-            # subprocess. Reads collected text from session JSONL.
-            async def _on_text(t: str):
-                collected_text.append(t)
-                await ws_broadcast_agent_msg(skill, t, "evaluator")
-
-            res = await _openclaw_backend._run_eval_openclaw(
-                skill=skill,
-                system_prompt=system_prompt,
-                user_prompt=prompt,
-                on_text=_on_text,
-                timeout_s=EVAL_TIMEOUT,
-            )
-            if not res.get("ok"):
-                err = res.get("error", "unknown")
-                print(f"[EVAL/OC] {skill}: failed — {err}")
-                await ws_broadcast_agent_msg(skill, f"Evaluator failed: {err}", "evaluator")
-                return {"passed": False, "feedback": f"Evaluator (openclaw) failed: {err}"}
+    async def _on_text(t: str) -> bool:
+        """Collect + broadcast; True once a complete EVAL_RESULT has streamed
+        in, which tells the session to stop the evaluator."""
+        collected_text.append(t)
+        await ws_broadcast_agent_msg(skill, t, "evaluator")
+        return envelope.feed(t) is not None
 
-            cost = f"${res['cost_usd']:.4f}" if res.get('cost_usd') else "free"
-            await ws_broadcast_agent_msg(
-                skill, f"Eval done — {res.get('num_turns', 0)} turns, {cost}", "evaluator"
-            )
+    try:
+        res = await _eval_pool_obj().submit(EvalJob(
+            skill=skill,
+            system_prompt=system_prompt,
+            prompt=prompt,
+            on_text=_on_text,
+            timeout=EVAL_TIMEOUT_S,
+        ))
+        if res.get("timeout"):
+            raise asyncio.TimeoutError()
+        if not res.get("ok"):
+            err = res.get("error", "unknown")
+            print(f"[EVAL] {skill}: failed — {err}")
+            await ws_broadcast_agent_msg(skill, f"Evaluator failed: {err}", "evaluator")
+            return {"passed": False, "feedback": f"Evaluator failed: {err}"}
+
+        cost = f"${res['cost_usd']:.4f}" if res.get("cost_usd") else "free"
+        early = " (stopped at EVAL_RESULT)" if res.get("early") else ""
+        await ws_broadcast_agent_msg(
+            skill, f"Eval done — {res.get('num_turns', 0)} turns, {cost}{early}", "evaluator"
+        )
 
-            sess_id = res.get("session_id")
-            if sess_id:
-                import datetime
-                eval_entry = {
-                    "session_id": sess_id,
-                    "skill": skill,
-                    "agent_type": "evaluator",
-                    "agent_id": f"eval-{skill}",
-                    "cost_usd": res.get("cost_usd", 0),
-                    "num_turns": res.get("num_turns", 0),
-                    "log": collected_text[-10:],
-                    "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
-                }
-                with open(SESSION_LOG, "a") as f:
-                    f.write(json.dumps(eval_entry) + "\n")
-                _invalidate_session_log_cache()
-        else:
-            # Default: ClaudeSDKClient path
-            async def _run_eval_client():
-                nonlocal collected_text
-                client = ClaudeSDKClient(options=options)
-                async with client:
-                    await client.query(prompt)
-                    async for message in client.receive_response():
-                        if isinstance(message, AssistantMessage):
-                            for block in message.content:
-                                if isinstance(block, TextBlock) and block.text.strip():
-                                    text = block.text.strip()
-                                    collected_text.append(text)
-                                    await ws_broadcast_agent_msg(skill, text, "evaluator")
-                        elif isinstance(message, ResultMessage):
-                            cost = f"${message.total_cost_usd:.4f}" if message.total_cost_usd else "?"
-                            await ws_broadcast_agent_msg(skill, f"Eval done — {message.num_turns} turns, {cost}", "evaluator")
-                            if message.session_id:
-                                import datetime
-                                eval_entry = {
-                                    "session_id": message.session_id,
-                                    "skill": skill,
-                                    "agent_type": "evaluator",
-                                    "agent_id": f"eval-{skill}",
-                                    "cost_usd": message.total_cost_usd,
-                                    "num_turns": message.num_turns,
-                                    "log": collected_text[-10:],
-                                    "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
-                                }
-                                with open(SESSION_LOG, "a") as f:
-                                    f.write(json.dumps(eval_entry) + "\n")
-                                _invalidate_session_log_cache()
-
-            await asyncio.wait_for(_run_eval_client(), timeout=EVAL_TIMEOUT)
+        sess_id = res.get("session_id")
+        if sess_id:
+            import datetime
+            eval_entry = {
+                "session_id": sess_id,
+                "skill": skill,
+                "agent_type": "evaluator",
+                "agent_id": f"eval-{skill}",
+                "cost_usd": res.get("cost_usd", 0),
+                "num_turns": res.get("num_turns", 0),
+                "log": collected_text[-10:],
+                "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            }
+            with open(SESSION_LOG, "a") as f:
+                f.write(json.dumps(eval_entry) + "\n")
+            _invalidate_session_log_cache()
 
         # Parse EVAL_RESULT from collected text — try multiple formats
         # (Fix #15B: regex tolerant — Qwen3.6 sometimes wraps in code fences,
         # uses single quotes, or splits across lines).
         full_text = "\n".join(collected_text)
 
+        # Envelope seen while streaming (also what stopped the evaluator).
+        if envelope.result is not None:
+            result = envelope.result
+            return {"passed": result.get("passed", True), "feedback": result.get("feedback", ""), "full_text": full_text, "parsed": True}
+
         # Pattern 1: standard envelope
         match = re.search(r'EVAL_RESULT:\s*(\{[\s\S]*?\})', full_text)
         if match:
             try:
                 result = json.loads(match.group(1))
-                return {"passed": result.get("passed", True), "feedback": result.get("feedback", ""), "full_text": full_text}
+                return {"passed": result.get("passed", True), "feedback": result.get("feedback", ""), "full_text": full_text, "parsed": True}
             except json.JSONDecodeError:
                 pass
 
@@ -2693,7 +4050,7 @@ async def run_evaluator(skill: str, execution_id: str | None = None) -> dict:
         if match:
             try:
                 result = json.loads(match.group(1))
-                return {"passed": result.get("passed", True), "feedback": result.get("feedback", ""), "full_text": full_text}
+                return {"passed": result.get("passed", True), "feedback": result.get("feedback", ""), "full_text": full_text, "parsed": True}
             except json.JSONDecodeError:
                 pass
 
@@ -2702,7 +4059,7 @@ async def run_evaluator(skill: str, execution_id: str | None = None) -> dict:
         if match:
             try:
                 result = json.loads(match.group(1))
-                return {"passed": result.get("passed", True), "feedback": result.get("feedback", ""), "full_text": full_text}
+                return {"passed": result.get("passed", True), "feedback": result.get("feedback", ""), "full_text": full_text, "parsed": True}
             except json.JSONDecodeError:
                 pass
 
@@ -2711,7 +4068,7 @@ async def run_evaluator(skill: str, execution_id: str | None = None) -> dict:
         if match:
             try:
                 result = json.loads(match.group())
-                return {"passed": result.get("passed", True), "feedback": result.get("feedback", full_text[-200:]), "full_text": full_text}
+                return {"passed": result.get("passed", True), "feedback": result.get("feedback", full_text[-200:]), "full_text": full_text, "parsed": True}
             except json.JSONDecodeError:
                 pass
 
@@ -2724,8 +4081,8 @@ async def run_evaluator(skill: str, execution_id: str | None = None) -> dict:
         return {"passed": False, "feedback": full_text[-200:] if full_text else "Evaluator output unparseable (no EVAL_RESULT envelope)", "full_text": full_text}
 
     except asyncio.TimeoutError:
-        print(f"[EVAL] {skill}: evaluator timed out after {EVAL_TIMEOUT}s")
-        await ws_broadcast_agent_msg(skill, f"Evaluator timed out after {EVAL_TIMEOUT // 60} minutes.", "evaluator")
+        print(f"[EVAL] {skill}: evaluator timed out after {EVAL_TIMEOUT_S}s")
+        await ws_broadcast_agent_msg(skill, f"Evaluator timed out after {EVAL_TIMEOUT_S // 60} minutes.", "evaluator")
         return {"passed": False, "feedback": "Evaluator timed out — CLI process may have died."}
     except Exception as e:
         print(f"[EVAL] {skill}: evaluator error: {e}")
@@ -2740,6 +4097,9 @@ async def _handle_agent_done(state: AgentState):
         await ws_broadcast_status(state.skill, state.agent_id, "done", "Finished")
         return
 
+    # The dev agent stopped working; let queued spawns use its slot.
+    _schedule_spawn_pump()
+
     # Skip if this dev agent was re-spawned inside the test loop (loop manages flow)
     if state.skill in _skills_in_test_loop:
         return
@@ -2747,16 +4107,16 @@ async def _handle_agent_done(state: AgentState):
     # Run evaluator on the latest execution
     await ws_broadcast_agent_msg(state.skill, "Dev complete — running evaluator...", "evaluator")
     _update_entry(state.skill, {"status": "evaluating"})
-    await broadcast_full_sync()
+    await broadcast_changes()
 
     # Path A: wrap in _get_eval_lock(skill) so this serializes with Path B
     # (_run_submission_eval). Without the lock, both paths can fire openclaw
     # evaluator subprocesses concurrently and corrupt each other's session
     # (openclaw --local mode = single deterministic session per agent).
     # Fix #14 cherry-picked from unified-multi-task v18.
-    async with _get_eval_lock(state.skill):
+    async with _eval_lock(state.skill):
         try:
-            eval_result = await run_evaluator(state.skill)
+            eval_result = await run_evaluator(state.skill, agent_server=state._agent_server_url)
         except Exception as e:
             eval_result = {"passed": False, "feedback": f"Evaluator error: {e}"}
         # Fix #14b: record latest feedback here too — without this, dev sessions
@@ -2787,11 +4147,11 @@ async def _handle_agent_done(state: AgentState):
             await ws_broadcast_agent_msg(state.skill, f"Evaluator failed {attempts} times — sending to review.", "evaluator")
             _eval_attempt_count.pop(state.skill, None)
             _update_entry(state.skill, {"status": "review"})
-            await broadcast_full_sync()
+            await broadcast_changes()
             return
 
         _update_entry(state.skill, {"status": "writing"})
-        await broadcast_full_sync()
+        await broadcast_changes()
 
         # Inject feedback into the dev agent to continue working
         if state.client and state.status in ("done", "paused"):
@@ -2820,14 +4180,14 @@ async def _handle_agent_done(state: AgentState):
                 "evaluator",
             )
             _update_entry(state.skill, {"status": "failed"})
-            await broadcast_full_sync()
+            await broadcast_changes()
             asyncio.create_task(_auto_spawn_ready_skills())
         else:
             # Manual mode — sit at "review" for human inspection
             await ws_broadcast_agent_msg(state.skill, "Dev agent unavailable for retry — sending to review.", "evaluator")
             _eval_attempt_count.pop(state.skill, None)
             _update_entry(state.skill, {"status": "review"})
-            await broadcast_full_sync()
+            await broadcast_changes()
         return
 
     # Evaluator passed — clear retry counter
@@ -2848,7 +4208,7 @@ async def _handle_agent_done(state: AgentState):
     else:
         await ws_broadcast_status(state.skill, state.agent_id, "done", "Evaluator passed — waiting for review")
         _update_entry(state.skill, {"status": "review"})
-        await broadcast_full_sync()
+        await broadcast_changes()
 
 
 async def _eval_retry_response(state: AgentState):
@@ -2868,81 +4228,352 @@ async def _confirm_skill_done(skill: str):
         if a.skill == skill:
             a.exit_event.set()
     print(f"[ORCH] Skill '{skill}' confirmed done — checking downstream skills")
-    await broadcast_full_sync()
+    await broadcast_changes()
     await _auto_spawn_ready_skills()
 
 
+# ---------------------------------------------------------------------------
+# Spawn scheduler: concurrency slots + critical-path priority queue
+# ---------------------------------------------------------------------------
+# _auto_spawn_ready_skills used to start one dev agent per target for every
+# ready skill at once, which on a wide graph launches dozens of SDK/openclaw
+# processes against the same agent servers and sims. Ready (skill, target)
+# pairs now go through a queue; a pair starts only while fewer than
+# MAX_CONCURRENT_AGENTS agents are active overall and fewer than
+# MAX_AGENTS_PER_TARGET on its target (0 = unlimited). Queued work starts as
+# agents finish. Order: longest chain of downstream dependents first (the
+# critical path), then FIFO.
+MAX_CONCURRENT_AGENTS = int(os.environ.get("MAX_CONCURRENT_AGENTS", "8"))
+MAX_AGENTS_PER_TARGET = int(os.environ.get("MAX_AGENTS_PER_TARGET", "4"))
+_ACTIVE_AGENT_STATUSES = ("starting", "running")
+
+
+@dataclass
+class QueuedSpawn:
+    skill: str
+    target: str
+    seq: int
+    enqueued_at: float
+    priority: int = 0
+
+
+class SpawnQueue:
+    """Pending (skill, target) dev spawns waiting for a free slot."""
+
+    def __init__(self):
+        self.items: dict[tuple[str, str], QueuedSpawn] = {}
+        self._seq = 0
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def add(self, skill: str, target: str) -> bool:
+        if (skill, target) in self.items:
+            return False
+        self._seq += 1
+        self.items[(skill, target)] = QueuedSpawn(skill, target, self._seq, time.time())
+        return True
+
+    def discard(self, skill: str, target: str) -> None:
+        self.items.pop((skill, target), None)
+
+    def ordered(self, reg: "SkillRegistry") -> list[QueuedSpawn]:
+        """Queue in start order, with priorities refreshed from the live graph."""
+        depth = _critical_path_lengths(reg)
+        for item in self.items.values():
+            item.priority = depth.get(item.skill, 0)
+        return sorted(self.items.values(), key=lambda i: (-i.priority, i.seq))
+
+    def snapshot(self) -> list[dict]:
+        if not self.items:
+            return []
+        return [
+            {"skill": i.skill, "target": i.target, "priority": i.priority,
+             "position": n, "enqueued_at": i.enqueued_at}
+            for n, i in enumerate(self.ordered(_registry()))
+        ]
+
+
+_spawn_queue = SpawnQueue()
+
+
+def _spawn_queue_obj() -> SpawnQueue:
+    return _main_global("_spawn_queue", _spawn_queue)
+
+
+def _critical_path_lengths(reg: "SkillRegistry") -> dict[str, int]:
+    """Skill -> length of its longest chain of downstream dependents (leaf = 0).
+
+    Cached on the registry until its topology (skills or edges) changes;
+    status changes don't affect it.
+    """
+    cached = reg._critical_paths
+    if cached is not None and cached[0] == reg.topology:
+        return cached[1]
+    depth: dict[str, int] = {}
+    on_stack: set[str] = set()
+
+    def visit(name: str) -> int:
+        if name in depth:
+            return depth[name]
+        if name in on_stack:
+            return 0  # dependency cycle — don't recurse forever
+        on_stack.add(name)
+        best = 0
+        for user in reg.dependents.get(name, ()):
+            best = max(best, 1 + visit(user))
+        on_stack.discard(name)
+        depth[name] = best
+        return best
+
+    for name in reg.by_name:
+        visit(name)
+    reg._critical_paths = (reg.topology, depth)
+    return depth
+
+
+def _slot_usage() -> tuple[int, dict[str, int]]:
+    """(active agents overall, active agents per target name)."""
+    total = 0
+    per_target: dict[str, int] = {}
+    for a in _agents_dict().values():
+        if a.status in _ACTIVE_AGENT_STATUSES:
+            total += 1
+            per_target[a.target_name] = per_target.get(a.target_name, 0) + 1
+    return total, per_target
+
+
+def scheduler_status() -> dict:
+    """Slot usage and queued spawns (GET /status?include=queue, full_sync)."""
+    total, per_target = _slot_usage()
+    return {
+        "placement": PLACEMENT,
+        "max_concurrent": MAX_CONCURRENT_AGENTS,
+        "max_per_target": MAX_AGENTS_PER_TARGET,
+        "target_load": _target_load_obj().snapshot(),
+        "active": total,
+        "active_per_target": per_target,
+        "queue": _spawn_queue_obj().snapshot(),
+    }
+
+
+def _dev_prompt(name: str, entry: dict) -> str:
+    """Dev prompt for ``name``, with LESSONS.md and the last eval feedback attached."""
+    desc = entry.get("description", name)
+    prompt = f"Implement the '{name}' skill: {desc}"
+    lessons_file = SKILLS_DIR / name / "LESSONS.md"
+    if lessons_file.exists():
+        lessons = lessons_file.read_text().strip()
+        prompt += f"\n\n## Previous Debugging Lessons (READ CAREFULLY)\n{lessons}"
+        print(f"[ORCH] {name}: attached LESSONS.md ({len(lessons)} chars)")
+
+    # Inject latest evaluator feedback if this is a re-spawn after
+    # a failed eval (autonomous-mode openclaw retry). spawn_agent
+    # also resumes the previous session_id, so dev sees the prior
+    # turns + this new feedback as the next user message.
+    fb = _last_feedback.get(name, "").strip()
+    if fb:
+        prompt += (
+            f"\n\n## Previous Eval Feedback (FIX THESE before resubmitting)\n"
+            f"{fb}"
+        )
+        print(f"[ORCH] {name}: attached eval feedback ({len(fb)} chars) for retry")
+    return prompt
+
+
+async def _drain_spawn_queue() -> list[str]:
+    """Start queued spawns while slots are free. Caller holds _spawn_lock."""
+    queue = _spawn_queue_obj()
+    if not queue:
+        return []
+    reg = _registry()
+    targets_by_name = {t["name"]: t for t in _targets_list()}
+    total, per_target = _slot_usage()
+    active_pairs = {(a.skill, a.target_name) for a in _agents_dict().values()
+                    if a.status in _ACTIVE_AGENT_STATUSES}
+
+    spawned = []
+    for item in queue.ordered(reg):
+        if MAX_CONCURRENT_AGENTS and total >= MAX_CONCURRENT_AGENTS:
+            break
+        entry = reg.get(item.skill)
+        target = targets_by_name.get(item.target)
+        # Drop work that went stale while queued (skill removed or moved on,
+        # target gone, or someone else already started it).
+        if (entry is None or target is None
+                or entry.get("status", "planned") not in ("planned", "failed", "writing")
+                or reg.unmet.get(item.skill, 0)
+                or (item.skill, item.target) in active_pairs):
+            queue.discard(item.skill, item.target)
+            continue
+        if MAX_AGENTS_PER_TARGET and per_target.get(item.target, 0) >= MAX_AGENTS_PER_TARGET:
+            continue  # this target is full; lower-priority work elsewhere may fit
+
+        queue.discard(item.skill, item.target)
+        print(f"[ORCH] Auto-spawning dev for '{item.skill}' on target '{item.target}' "
+              f"({target['agent_server']}, priority {item.priority})")
+        if await spawn_agent(item.skill, _dev_prompt(item.skill, entry), agent_type="dev", target=target):
+            total += 1
+            per_target[item.target] = per_target.get(item.target, 0) + 1
+        active_pairs.add((item.skill, item.target))
+        if entry.get("status") != "writing":
+            _update_entry(item.skill, {"status": "writing"})
+        if item.skill not in spawned:
+            spawned.append(item.skill)
+    return spawned
+
+
+async def _announce_auto_spawn(spawned: list[str]):
+    if spawned:
+        await ws_broadcast({
+            "type": "auto_spawn",
+            "skills": spawned,
+            "message": f"Auto-started {len(spawned)} skill(s) on {len(targets)} target(s): {', '.join(spawned)}",
+        })
+    await broadcast_changes()
+
+
+async def _pump_spawn_queue() -> list[str]:
+    """Start whatever queued spawns now fit (called when an agent frees its slot)."""
+    async with _spawn_lock:
+        spawned = await _drain_spawn_queue()
+    if spawned:
+        await _announce_auto_spawn(spawned)
+    return spawned
+
+
+def _schedule_spawn_pump():
+    """Fire-and-forget _pump_spawn_queue() if anything is waiting."""
+    if len(_spawn_queue_obj()):
+        asyncio.get_running_loop().create_task(_pump_spawn_queue())
+
+
+# ---------------------------------------------------------------------------
+# Target placement (--placement least-loaded)
+# ---------------------------------------------------------------------------
+# Instead of developing each skill on every target, pick ONE target per skill
+# by load score:
+#
+#   active + queued dev agents on the target
+#   + (job latency EWMA + sim reset EWMA) / PLACEMENT_SECONDS_PER_AGENT
+#
+# i.e. PLACEMENT_SECONDS_PER_AGENT seconds of extra observed latency weigh as
+# much as one more agent. Latency samples come from run_multi_target_test
+# (reset + submit->done per target) and from /job-done (submit_and_wait
+# reports its submit->done wall time). A skill keeps its target across
+# respawns (entry["placement"]) so the dev session can resume there.
+PLACEMENT_SECONDS_PER_AGENT = float(os.environ.get("PLACEMENT_SECONDS_PER_AGENT", "60"))
+PLACEMENT_EWMA_ALPHA = 0.3
+
+
+class TargetLoad:
+    """Exponentially weighted job latency and sim reset time per target."""
+
+    def __init__(self, alpha: float = PLACEMENT_EWMA_ALPHA):
+        self.alpha = alpha
+        self.job_s: dict[str, float] = {}
+        self.reset_s: dict[str, float] = {}
+
+    def _ewma(self, table: dict[str, float], target: str, sample: float) -> None:
+        prev = table.get(target)
+        table[target] = sample if prev is None else prev + self.alpha * (sample - prev)
+
+    def record_job(self, target: str, seconds: float) -> None:
+        self._ewma(self.job_s, target, max(0.0, seconds))
+
+    def record_reset(self, target: str, seconds: float) -> None:
+        self._ewma(self.reset_s, target, max(0.0, seconds))
+
+    def latency(self, target: str) -> float:
+        return self.job_s.get(target, 0.0) + self.reset_s.get(target, 0.0)
+
+    def snapshot(self) -> dict:
+        return {t: {"job_s": round(self.job_s.get(t, 0.0), 3),
+                    "reset_s": round(self.reset_s.get(t, 0.0), 3)}
+                for t in sorted(set(self.job_s) | set(self.reset_s))}
+
+
+_target_load = TargetLoad()
+
+
+def _target_load_obj() -> TargetLoad:
+    return _main_global("_target_load", _target_load)
+
+
+def _target_name_for_server(agent_server: str) -> str | None:
+    url = (agent_server or "").rstrip("/")
+    for t in _targets_list():
+        if t.get("agent_server", "").rstrip("/") == url:
+            return t["name"]
+    return None
+
+
+def _target_scores() -> dict[str, float]:
+    """Target name -> placement score (lower is less loaded)."""
+    _, active = _slot_usage()
+    queued: dict[str, int] = {}
+    for skill, target in _spawn_queue_obj().items:
+        queued[target] = queued.get(target, 0) + 1
+    load = _target_load_obj()
+    return {
+        t["name"]: active.get(t["name"], 0) + queued.get(t["name"], 0)
+        + load.latency(t["name"]) / PLACEMENT_SECONDS_PER_AGENT
+        for t in _targets_list()
+    }
+
+
+def _place_skill(name: str, entry: dict, targets_live: list[dict]) -> list[dict]:
+    """Targets to develop ``name`` on under the current PLACEMENT mode."""
+    if PLACEMENT != "least-loaded" or len(targets_live) <= 1:
+        return targets_live
+    by_name = {t["name"]: t for t in targets_live}
+    sticky = by_name.get(entry.get("placement") or "")
+    if sticky is not None:
+        return [sticky]
+    scores = _target_scores()
+    # min() keeps the first of equal scores, i.e. graph.json target order.
+    best = min(targets_live, key=lambda t: scores.get(t["name"], 0.0))
+    _update_entry(name, {"placement": best["name"]})
+    print(f"[ORCH] {name}: placed on '{best['name']}' "
+          f"(scores: {', '.join(f'{k}={v:.2f}' for k, v in scores.items())})")
+    return [best]
+
+
 async def _auto_spawn_ready_skills() -> list[str]:
     """Find skills whose dependencies are all 'done' and spawn dev pipelines.
 
-    When multiple targets are configured, spawns one dev agent per target for
-    each ready skill (parallel multi-target development).
+    When multiple targets are configured, queues one dev agent per target for
+    each ready skill (parallel multi-target development); the spawn scheduler
+    starts as many as the concurrency slots allow, critical path first.
     Returns list of skill names that were spawned."""
     async with _spawn_lock:
-        entries = _entries_list()
+        reg = _registry()
         targets_live = _targets_list()
-        agents_live = _agents_dict()
-        done_skills = {e["name"] for e in entries if e.get("status") == "done"}
+        queue = _spawn_queue_obj()
         # Skills already being worked on — track per (skill, target_name) pair
-        active_pairs = {(a.skill, a.target_name) for a in agents_live.values()
-                        if a.status in ("starting", "running")}
-
-        spawned = []
-        for entry in entries:
-            name = entry["name"]
-            status = entry.get("status", "planned")
-            deps = entry.get("dependencies", [])
-
-            # Only auto-spawn skills that are "planned" or "failed" (retriable)
-            if status not in ("planned", "failed"):
-                continue
-            # Check all dependencies are done
-            if deps and not all(d in done_skills for d in deps):
-                continue
-
-            # Build dev prompt with lessons if available
-            desc = entry.get("description", name)
-            prompt = f"Implement the '{name}' skill: {desc}"
-            lessons_file = SKILLS_DIR / name / "LESSONS.md"
-            if lessons_file.exists():
-                lessons = lessons_file.read_text().strip()
-                prompt += f"\n\n## Previous Debugging Lessons (READ CAREFULLY)\n{lessons}"
-                print(f"[ORCH] {name}: attached LESSONS.md ({len(lessons)} chars)")
-
-            # Inject latest evaluator feedback if this is a re-spawn after
-            # a failed eval (autonomous-mode openclaw retry). spawn_agent
-            # also resumes the previous session_id, so dev sees the prior
-            # turns + this new feedback as the next user message.
-            fb = _last_feedback.get(name, "").strip()
-            if fb:
-                prompt += (
-                    f"\n\n## Previous Eval Feedback (FIX THESE before resubmitting)\n"
-                    f"{fb}"
-                )
-                print(f"[ORCH] {name}: attached eval feedback ({len(fb)} chars) for retry")
-
-            # Spawn one agent per target (parallel multi-target development)
-            spawned_any = False
-            for t in targets_live:
-                if (name, t["name"]) in active_pairs:
-                    continue  # already has an agent on this target
-
-                print(f"[ORCH] Auto-spawning dev for '{name}' on target '{t['name']}' ({t['agent_server']})")
-                await spawn_agent(name, prompt, agent_type="dev", target=t)
-                spawned_any = True
-
-            if spawned_any:
-                _update_entry(name, {"status": "writing"})
-                spawned.append(name)
-
-        if spawned:
-            await ws_broadcast({
-                "type": "auto_spawn",
-                "skills": spawned,
-                "message": f"Auto-started {len(spawned)} skill(s) on {len(targets)} target(s): {', '.join(spawned)}",
-            })
-
-        return spawned
+        active_pairs = {(a.skill, a.target_name) for a in _agents_dict().values()
+                        if a.status in _ACTIVE_AGENT_STATUSES}
+        placed = {s for s, _ in active_pairs} | {s for s, _ in queue.items}
+
+        # reg.ready = "planned"/"failed" (retriable) skills whose dependencies
+        # are all done, kept current via unmet-dependency counters — no scan
+        # over every entry and dependency list.
+        for name in reg.ready_names():
+            entry = reg.get(name)
+            if PLACEMENT == "least-loaded" and name in placed:
+                continue  # already running / waiting on its target
+            placed.add(name)
+            for t in _place_skill(name, entry, targets_live):
+                if (name, t["name"]) not in active_pairs:
+                    queue.add(name, t["name"])
+
+        spawned = await _drain_spawn_queue()
+        if len(queue):
+            print(f"[ORCH] {len(queue)} spawn(s) queued waiting for a free slot")
+
+    if spawned or len(queue):
+        await _announce_auto_spawn(spawned)
+    return spawned
 
 
 SDK_IDLE_TIMEOUT_S = 900  # max wait between messages from a Claude SDK client (15 min, aligned with EVAL_TIMEOUT)
@@ -3177,7 +4808,7 @@ async def kill_agent(agent_id: str):
     await ws_broadcast_status(state.skill, state.agent_id, "stopped", "Stopped")
     await ws_broadcast_agent_msg(state.skill, "Agent killed", state.agent_type)
     agents.pop(agent_id, None)
-    await broadcast_full_sync()
+    await broadcast_changes()
 
 
 # ---------------------------------------------------------------------------
@@ -3188,30 +4819,204 @@ async def kill_agent(agent_id: str):
 # HTTP API (optional — for spawning agents from scripts/curl)
 # ---------------------------------------------------------------------------
 
+# A small HTTP/1.1 server on top of asyncio streams: requests are framed by
+# Content-Length (or chunked transfer-encoding), connections are kept alive
+# between requests, and responses either carry a Content-Length or are
+# streamed chunked. Each connection is served by its own task
+# (asyncio.start_server), so slow clients don't serialize each other.
+
+HTTP_KEEPALIVE_S = float(os.environ.get("HTTP_KEEPALIVE_S", "30"))  # idle timeout
+HTTP_MAX_BODY = int(os.environ.get("HTTP_MAX_BODY", str(64 * 1024 * 1024)))
+
+
+@dataclass
+class HttpRequest:
+    method: str
+    path: str
+    query: dict
+    headers: dict             # lower-cased names
+    body: str = ""
+    version: str = "HTTP/1.1"
+
+    @property
+    def keep_alive(self) -> bool:
+        conn = self.headers.get("connection", "").lower()
+        if self.version == "HTTP/1.0":
+            return conn == "keep-alive"
+        return conn != "close"
+
+
+@dataclass
+class HttpResponse:
+    status: str = "200 OK"
+    body: str = ""
+    content_type: str = "application/json"
+    headers: dict = field(default_factory=dict)
+    stream: Optional[object] = None   # async iterator of bytes -> chunked
+
+
+class HttpError(Exception):
+    def __init__(self, status: str, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+async def _read_http_request(reader, writer, timeout: float | None) -> HttpRequest | None:
+    """Read one request off the connection. Returns None on clean EOF/idle timeout."""
+    try:
+        head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), timeout)
+    except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+        return None
+    except asyncio.LimitOverrunError:
+        raise HttpError("431 Request Header Fields Too Large", "request headers too large")
+    lines = head.decode("latin-1").split("\r\n")
+    try:
+        method, target, version = lines[0].split(" ", 2)
+    except ValueError:
+        raise HttpError("400 Bad Request", f"bad request line: {lines[0][:100]!r}")
+    headers = {}
+    for line in lines[1:]:
+        if not line:
+            break
+        k, _, v = line.partition(":")
+        headers[k.strip().lower()] = v.strip()
+    path, _, query_string = target.partition("?")
+    query = dict(urllib.parse.parse_qsl(query_string))
+
+    if headers.get("expect", "").lower() == "100-continue":
+        writer.write(b"HTTP/1.1 100 Continue\r\n\r\n")
+        await writer.drain()
+
+    if "chunked" in headers.get("transfer-encoding", "").lower():
+        parts, total = [], 0
+        while True:
+            size_line = await reader.readuntil(b"\r\n")
+            size = int(size_line.split(b";")[0].strip() or b"0", 16)
+            if size == 0:
+                # Trailers (if any) end with a blank line
+                while (await reader.readuntil(b"\r\n")) != b"\r\n":
+                    pass
+                break
+            total += size
+            if total > HTTP_MAX_BODY:
+                raise HttpError("413 Payload Too Large", "request body too large")
+            parts.append(await reader.readexactly(size))
+            await reader.readexactly(2)
+        raw = b"".join(parts)
+    else:
+        try:
+            length = int(headers.get("content-length", "0"))
+        except ValueError:
+            raise HttpError("400 Bad Request", "bad Content-Length")
+        if length > HTTP_MAX_BODY:
+            raise HttpError("413 Payload Too Large", "request body too large")
+        raw = await reader.readexactly(length) if length > 0 else b""
+    return HttpRequest(method, path, query, headers, raw.decode("utf-8"), version)
+
+
+def _response_head(status: str, content_type: str, extra: dict, keep_alive: bool,
+                   version: str = "HTTP/1.1") -> bytes:
+    head = [
+        f"{version} {status}",
+        f"Content-Type: {content_type}",
+        "Access-Control-Allow-Origin: *",
+        f"Connection: {'keep-alive' if keep_alive else 'close'}",
+    ]
+    head += [f"{k}: {v}" for k, v in extra.items()]
+    return ("\r\n".join(head) + "\r\n\r\n").encode("utf-8")
+
+
+async def _write_response(writer, req: HttpRequest | None, resp: HttpResponse,
+                          keep_alive: bool) -> None:
+    """Write a Content-Length response in ONE write, or stream it chunked."""
+    if resp.stream is None:
+        # Use UTF-8 byte length (not char length) so multi-byte content
+        # (e.g. Chinese text in session logs) doesn't get truncated.
+        body_bytes = resp.body.encode("utf-8")
+        extra = dict(resp.headers, **{"Content-Length": str(len(body_bytes))})
+        writer.write(_response_head(resp.status, resp.content_type, extra, keep_alive) + body_bytes)
+        await writer.drain()
+        return
+
+    import zlib
+    accept = (req.headers.get("accept-encoding", "") if req else "")
+    gz = zlib.compressobj(6, zlib.DEFLATED, 31) if "gzip" in accept else None  # wbits 31 = gzip
+    extra = dict(resp.headers)
+    extra["Vary"] = "Accept-Encoding"
+    if gz:
+        extra["Content-Encoding"] = "gzip"
+    # HTTP/1.0 clients don't understand chunked — stream raw and close.
+    chunked = req is None or req.version != "HTTP/1.0"
+    if chunked:
+        extra["Transfer-Encoding"] = "chunked"
+    writer.write(_response_head(resp.status, resp.content_type, extra,
+                                keep_alive and chunked))
+
+    def _chunk(b: bytes):
+        if b:
+            writer.write(f"{len(b):x}\r\n".encode() + b + b"\r\n" if chunked else b)
+
+    async for piece in resp.stream:
+        _chunk(gz.compress(piece) if gz else piece)
+        await writer.drain()
+    if gz:
+        _chunk(gz.flush())
+    if chunked:
+        writer.write(b"0\r\n\r\n")
+    await writer.drain()
+
+
 async def handle_http(reader, writer):
-    """Minimal HTTP endpoint for spawning/controlling agents from scripts.
+    """HTTP/1.1 control API for spawning/controlling agents from scripts.
 
     POST /spawn       {"skill": "...", "prompt": "..."}
     POST /stop        {"agent_id": "..."}
     POST /inject      {"agent_id": "...", "text": "..."}
     POST /xbot-start  Trigger auto-spawn of all skills with satisfied dependencies
     GET  /status      -> all agents
+    GET  /metrics     -> Prometheus text exposition
+
+    Serves requests on the connection until the client closes it, asks for
+    ``Connection: close``, or stays idle for HTTP_KEEPALIVE_S.
     """
-    data = await reader.read(8192)
-    request = data.decode()
-    lines = request.split("\r\n")
-    method, path, _ = lines[0].split(" ", 2)
+    first = True
+    try:
+        while True:
+            try:
+                req = await _read_http_request(reader, writer, None if first else HTTP_KEEPALIVE_S)
+            except (HttpError, ValueError, UnicodeDecodeError, asyncio.IncompleteReadError,
+                    asyncio.LimitOverrunError) as e:
+                status = e.status if isinstance(e, HttpError) else "400 Bad Request"
+                await _write_response(writer, None, HttpResponse(
+                    status=status, body=json.dumps({"error": str(e) or "bad request"})), False)
+                break
+            if req is None:
+                break
+            first = False
+            keep_alive = req.keep_alive
+            t0 = time.monotonic()
+            resp = await _route_http(req)
+            HTTP_REQUEST_SECONDS.labels(req.method, _http_route_label(req.path),
+                                        resp.status.split(" ", 1)[0]).observe(time.monotonic() - t0)
+            await _write_response(writer, req, resp, keep_alive)
+            if not keep_alive:
+                break
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
 
-    # Extract body
-    body = ""
-    if "\r\n\r\n" in request:
-        body = request.split("\r\n\r\n", 1)[1]
 
+async def _route_http(req: HttpRequest) -> HttpResponse:
+    """Dispatch one parsed request to its route."""
+    method, path, query, headers, body = req.method, req.path, req.query, req.headers, req.body
     global dev_mode
 
     response_body = ""
     status = "200 OK"
     content_type = "application/json"
+    stream = None          # async iterator of body bytes -> chunked response
+    extra_headers = {}
 
     try:
         if method == "POST" and path == "/xbot-start":
@@ -3221,6 +5026,7 @@ async def handle_http(reader, writer):
             response_body = json.dumps({
                 "ok": True,
                 "spawned": spawned if spawned else [],
+                "queued": len(_spawn_queue_obj()),
                 "message": f"Started {len(spawned)} skill(s)" if spawned else "No skills ready (all deps not met or already in progress)",
             })
 
@@ -3245,7 +5051,7 @@ async def handle_http(reader, writer):
             response_body = json.dumps({"ok": True})
 
         elif method == "GET" and path == "/status":
-            response_body = json.dumps({
+            agent_status = {
                 aid: {
                     "skill": a.skill,
                     "target": a.target_name,
@@ -3254,7 +5060,20 @@ async def handle_http(reader, writer):
                     "log_tail": a.log[-10:],
                 }
                 for aid, a in agents.items()
-            })
+            }
+            # Plain /status stays a flat agent_id -> agent map for existing
+            # callers; ?include=queue wraps it with the spawn scheduler state.
+            if query.get("include") == "queue":
+                response_body = json.dumps({"agents": agent_status, "scheduler": scheduler_status()})
+            else:
+                response_body = json.dumps(agent_status)
+
+        elif method == "GET" and path == "/ws-clients":
+            response_body = json.dumps(ws_client_stats())
+
+        elif method == "GET" and path == "/metrics":
+            content_type = "text/plain; version=0.0.4; charset=utf-8"
+            response_body = metrics.render()
 
         elif method == "GET" and path == "/entries":
             response_body = json.dumps(skill_entries)
@@ -3262,20 +5081,20 @@ async def handle_http(reader, writer):
         elif method == "POST" and path == "/entries":
             params = json.loads(body)
             entry = _add_entry(params["name"], params.get("description", ""), params.get("dependencies", []))
-            await broadcast_full_sync()
+            await broadcast_changes()
             response_body = json.dumps(entry)
 
         elif method == "DELETE" and path.startswith("/entries/"):
             name = path.split("/entries/", 1)[1]
             removed = _remove_entry(name)
-            await broadcast_full_sync()
+            await broadcast_changes()
             response_body = json.dumps({"ok": removed})
 
         elif method == "PATCH" and path.startswith("/entries/"):
             name = path.split("/entries/", 1)[1]
             params = json.loads(body)
             entry = _update_entry(name, params)
-            await broadcast_full_sync()
+            await broadcast_changes()
             # If status was set to "done", check for newly unblocked skills
             if params.get("status") == "done":
                 await _auto_spawn_ready_skills()
@@ -3286,29 +5105,58 @@ async def handle_http(reader, writer):
             skill = params["skill"]
             execution_id = params.get("execution_id", "")
             job_agent_server = params.get("agent_server", "")
+            code_hash = params.get("code_sha256", "")   # of the script that ran
+            _recording_cache_obj().note_job(execution_id, params.get("job_id", ""))
+            job_target = _target_name_for_server(job_agent_server)
+            if job_target and isinstance(params.get("job_s"), (int, float)):
+                _target_load_obj().record_job(job_target, params["job_s"])
             loop = asyncio.get_running_loop()
             fut = loop.create_future()
             _submission_evals[skill] = {"future": fut, "execution_id": execution_id}
-            asyncio.create_task(_run_submission_eval(skill, execution_id, job_agent_server=job_agent_server))
+            asyncio.create_task(_run_submission_eval(skill, execution_id, job_agent_server=job_agent_server,
+                                                     code_hash=code_hash))
             response_body = json.dumps({"ok": True, "message": f"Evaluator spawned for {skill}"})
 
         elif method == "GET" and path.startswith("/sessions/"):
-            # Raw JSONL of a graph's persisted session log — used by
-            # sessions.html dashboard page to render full agent history.
+            # JSONL of a graph's persisted session log — used by
+            # sessions.html dashboard page to render agent history.
             # Returns 404 if graph doesn't exist; 200 with empty body if
             # agent_sessions.jsonl doesn't exist yet (graph created but no runs).
-            graph_name = path.split("/sessions/", 1)[1].split("?")[0].strip("/")
-            log_path = WORKSPACE_DIR / "graphs" / graph_name / "agent_sessions.jsonl"
-            if not (WORKSPACE_DIR / "graphs" / graph_name).is_dir():
+            # Query: skill, agent_type, target, since, offset, limit, order
+            # (see _select_sessions); X-Total-Count is the filtered total so
+            # the page can lazily fetch further pages. Streamed chunked,
+            # gzip-encoded when the client accepts it.
+            graph_name = path.split("/sessions/", 1)[1].strip("/")
+            graph_dir = WORKSPACE_DIR / "graphs" / graph_name
+            log_path = graph_dir / "agent_sessions.jsonl"
+            if not graph_name or "/" in graph_name or graph_name.startswith(".") \
+                    or not graph_dir.is_dir():
                 status = "404 Not Found"
                 response_body = json.dumps({"error": f"graph {graph_name!r} not found"})
             else:
-                content_type = "application/x-ndjson; charset=utf-8"
-                response_body = log_path.read_text() if log_path.exists() else ""
+                idx = await _session_index_for(log_path)
+                try:
+                    total, ranges = _select_sessions(idx, query)
+                except ValueError as e:
+                    status = "400 Bad Request"
+                    response_body = json.dumps({"error": str(e)})
+                else:
+                    content_type = "application/x-ndjson; charset=utf-8"
+                    extra_headers["X-Total-Count"] = str(total)
+                    extra_headers["Access-Control-Expose-Headers"] = "X-Total-Count"
+                    stream = _stream_session_records(log_path, ranges)
 
         elif method == "GET" and path.startswith("/eval-result/"):
             skill = path.split("/eval-result/", 1)[1]
             entry = _submission_evals.get(skill)
+            # ?wait=N long-polls: hold the request until the verdict is ready
+            # (or N seconds pass) instead of making the caller re-poll.
+            wait = min(float(query.get("wait", 0) or 0), 60.0)
+            if entry and wait > 0 and not entry["future"].done():
+                try:
+                    await asyncio.wait_for(asyncio.shield(entry["future"]), wait)
+                except Exception:
+                    pass  # timed out (-> pending) or failed (reported below)
             if not entry:
                 response_body = json.dumps({"status": "not_found"})
             elif not entry["future"].done():
@@ -3328,23 +5176,16 @@ async def handle_http(reader, writer):
             status = "404 Not Found"
             response_body = json.dumps({"error": "not found"})
 
+    except ValueError as e:
+        # Malformed JSON bodies and rejected graph edits (dependency cycles)
+        status = "400 Bad Request"
+        response_body = json.dumps({"error": str(e)})
     except Exception as e:
         status = "500 Internal Server Error"
         response_body = json.dumps({"error": str(e)})
 
-    # Use UTF-8 byte length (not char length) so multi-byte content
-    # (e.g. Chinese text in session logs) doesn't get truncated.
-    body_bytes = response_body.encode("utf-8")
-    http_response = (
-        f"HTTP/1.1 {status}\r\n"
-        f"Content-Type: {content_type}\r\n"
-        f"Access-Control-Allow-Origin: *\r\n"
-        f"Content-Length: {len(body_bytes)}\r\n"
-        f"\r\n"
-    ).encode("utf-8") + body_bytes
-    writer.write(http_response)
-    await writer.drain()
-    writer.close()
+    return HttpResponse(status=status, body=response_body, content_type=content_type,
+                        headers=extra_headers, stream=stream)
 
 
 # ---------------------------------------------------------------------------
@@ -3353,6 +5194,7 @@ async def handle_http(reader, writer):
 
 async def main():
     _load_entries()
+    _start_graph_persister()
     print(f"[ORCH] Claude Agent Orchestrator")
     print(f"[ORCH] SDK mode: {HAS_SDK}")
     print(f"[ORCH] Harness backend: {HARNESS}" + (
@@ -3376,12 +5218,14 @@ async def main():
 
     # Start HTTP API server
     http_server = await asyncio.start_server(handle_http, "0.0.0.0", WS_PORT + 1)
+    _start_lag_monitor()
+    _eval_pool_obj().start()  # warm evaluator sessions before the first eval
 
     # Persist any in-flight agent logs when the process is asked to stop,
     # so sessions.html still shows their work.
     import signal as _signal
 
-    def _shutdown():
+    async def _shutdown():
         # Snapshot current agents (kill_agent mutates the dict)
         for state in list(agents.values()):
             try:
@@ -3396,6 +5240,12 @@ async def main():
                     _update_entry(state.skill, {"session_id": ""})
                 except Exception:
                     pass
+        # Write-behind persistence: make sure the last debounce window
+        # (including the session_id clears above) reaches disk.
+        try:
+            await _stop_graph_persister()
+        except Exception as e:
+            print(f"[ORCH] shutdown graph flush failed: {e}")
 
     main_task = asyncio.current_task()
     loop = asyncio.get_running_loop()
@@ -3409,7 +5259,9 @@ async def main():
         await asyncio.Future()  # run forever
     except asyncio.CancelledError:
         print("[ORCH] shutdown signal received — persisting agent logs")
-        _shutdown()
+        await _shutdown()
+        await _eval_pool_obj().close()
+        await _http_client().close()
         # Let asyncio tear down cleanly (no re-raise; Future never resolves anyway)
 
 
@@ -3447,13 +5299,25 @@ if _main_mod is not None and _self_mod is not None and _self_mod is not _main_mo
         "graph_meta",            # graph.json top-level metadata
         "agents",                # live AgentState by id
         "ws_clients",            # connected dashboard websockets
+        "ws_outboxes",           # per-client send queues + writer tasks
         "_submission_evals",     # /job-done future store
         "_eval_skill_locks",     # per-skill asyncio.Lock — CRITICAL (mutex)
         "_last_feedback",        # last evaluator feedback per skill
         "_skills_in_test_loop",  # set of skills inside _root_skill_test_loop
         "_eval_attempt_count",   # retry counter per skill
         "_spawn_lock",           # global spawn mutex
+        "_spawn_queue",          # spawns waiting for a concurrency slot
+        "_target_load",          # per-target latency EWMAs for placement
         "_session_log_cache",    # cached agent_sessions.jsonl reads
+        "_session_index",        # byte-offset index over agent_sessions.jsonl
+        "_session_indexes",      # same, for other graphs served by /sessions/
+        "_skill_registry",       # name / dependency / dependents indexes
+        "_graph_persist",        # graph.json write-behind state
+        "_delta_state",          # last-broadcast view + seq for entry/agent patches
+        "_http",                 # shared keep-alive HTTP client
+        "_eval_pool",            # warm evaluator workers + bounded job queue
+        "_recording_cache",      # downloaded recordings: LRU index + in-flight fetches
+        "_eval_results",         # verdicts by execution / code hash + in-flight evals
     ):
         _main_val = getattr(_main_mod, _shared_name, None)
         if _main_val is not None and _main_val is not globals().get(_shared_name):
@@ -320,7 +320,7 @@ async def _tail_session_jsonl(state, agent_id: str, session_file: Path,
     """
     from agent_orchestrator import (
         ws_broadcast_agent_msg, ws_broadcast_status,
-        _update_entry, broadcast_full_sync,
+        _update_entry, broadcast_changes,
     )
 
     # Session id IS the filename (without .jsonl). OpenClaw's JSONL records
@@ -330,7 +330,7 @@ async def _tail_session_jsonl(state, agent_id: str, session_file: Path,
         try:
             state.session_id = session_file.stem
             _update_entry(state.skill, {"session_id": state.session_id})
-            await broadcast_full_sync()
+            await broadcast_changes()
         except Exception:
             pass
 
@@ -632,7 +632,82 @@ async def _kill_agent_openclaw(state):
 # Evaluator path — same idea as _run_agent_openclaw but a one-shot, returns
 # collected assistant text + cost. The orchestrator's run_evaluator() wraps
 # this and parses EVAL_RESULT JSON out of the returned text.
+#
+# The eval pool runs several evaluations at once, and `--local` puts every
+# run of one agent into the same session key. So each concurrent eval takes
+# its own slot: slot 0 is the base evaluator agent, slot n a derived
+# `<base>-w<n>` agent. The session dir being tailed then only ever holds
+# this run's transcript, and an early stop can't act on another skill's
+# EVAL_RESULT. A slot stays taken until its subprocess has exited.
 # ---------------------------------------------------------------------------
+_eval_slots_busy: set[int] = set()
+
+
+def _acquire_eval_slot() -> int:
+    slot = 0
+    while slot in _eval_slots_busy:
+        slot += 1
+    _eval_slots_busy.add(slot)
+    return slot
+
+
+def _eval_agent_for_slot(base_agent_id: str, slot: int) -> str:
+    return base_agent_id if slot == 0 else f"{base_agent_id}-w{slot}"
+
+def _locate_eval_session(sdir: Path, before_snapshot: set, existing_sizes: dict,
+                         sess_id: str = "") -> tuple[Optional[Path], int]:
+    """(session jsonl written by this eval run, offset its new content starts at)."""
+    if sess_id:
+        candidate = sdir / f"{sess_id}.jsonl"
+        if candidate.exists():
+            # If pre-existing (continuation), skip the prefix
+            return candidate, existing_sizes.get(candidate, 0) if candidate in before_snapshot else 0
+    if sdir.exists():
+        new_files = set(sdir.glob("*.jsonl")) - before_snapshot
+        if new_files:
+            return next(iter(new_files)), 0
+        # fall back to file with biggest growth
+        for p, old_sz in existing_sizes.items():
+            if p.exists() and p.stat().st_size > old_sz:
+                return p, old_sz
+    return None, 0
+
+
+def _assistant_texts(raw: bytes) -> list[str]:
+    """Assistant text blocks in one session JSONL line."""
+    try:
+        rec = json.loads(raw.decode("utf-8", errors="replace"))
+    except Exception:
+        return []
+    # OpenClaw shape: {"type":"message","message":{"role":..,
+    # "content":[{"type":"text","text":...}, {"type":"toolCall",...}]}}
+    # The dev tail uses the same access pattern (_tail_session_jsonl).
+    if rec.get("type") != "message":
+        return []
+    msg = rec.get("message", {}) or {}
+    if msg.get("role") != "assistant":
+        return []
+    texts = []
+    for blk in msg.get("content", []) or []:
+        if not isinstance(blk, dict) or blk.get("type") != "text":
+            continue
+        t = (blk.get("text") or "").strip()
+        if t:
+            texts.append(t)
+    return texts
+
+
+async def _stop_eval_proc(proc) -> None:
+    if proc.returncode is None:
+        try: proc.send_signal(signal.SIGINT)
+        except Exception: pass
+        try: await asyncio.wait_for(proc.wait(), timeout=3)
+        except Exception: pass
+        try:
+            if proc.returncode is None: proc.kill()
+        except Exception: pass
+
+
 async def _run_eval_openclaw(
     skill: str,
     system_prompt: str,
@@ -642,17 +717,59 @@ async def _run_eval_openclaw(
 ) -> dict:
     """One-shot evaluator via openclaw subprocess.
 
+    The session JSONL is tailed while the subprocess runs and each assistant
+    text block is passed to ``on_text``. If ``on_text`` returns True (the
+    verdict is complete) the result is returned right away with
+    ``early=True`` and the subprocess is stopped in the background — cost
+    is unknown in that case since the final stderr envelope never arrives.
+    Concurrent calls run on separate evaluator agents (see eval slots above),
+    so each tails only its own session file.
+
     Returns:
       {"ok": bool, "text": str, "session_id": str, "cost_usd": float,
-       "num_turns": int, "error": str (only if ok=False)}
+       "num_turns": int, "early": bool (only if stopped early),
+       "error": str (only if ok=False)}
     """
+    base_agent_id = AGENT_TYPE_MAP.get("evaluator")
+    if not base_agent_id:
+        return {"ok": False, "text": "", "error": "no evaluator agent mapped"}
+    if not _agent_exists(base_agent_id):
+        return {"ok": False, "text": "", "error": f"agent {base_agent_id!r} not configured in OpenClaw"}
+
     from agent_orchestrator import WORKSPACE_DIR
 
-    agent_id = AGENT_TYPE_MAP.get("evaluator")
-    if not agent_id:
-        return {"ok": False, "text": "", "error": "no evaluator agent mapped"}
-    if not _agent_exists(agent_id):
-        return {"ok": False, "text": "", "error": f"agent {agent_id!r} not configured in OpenClaw"}
+    slot = _acquire_eval_slot()
+    run: dict = {}
+    try:
+        agent_id = _eval_agent_for_slot(base_agent_id, slot)
+        if agent_id != base_agent_id:
+            await asyncio.to_thread(_ensure_agent_exists, agent_id, base_agent_id,
+                                    str(WORKSPACE_DIR))
+        return await _run_eval_agent(skill, agent_id, system_prompt, user_prompt,
+                                     on_text, timeout_s, run)
+    finally:
+        proc = run.get("proc")
+        if proc is not None and proc.returncode is None:
+            # Stopped early (or cancelled): free the slot once it has exited.
+            asyncio.ensure_future(_stop_eval_then_release(proc, slot))
+        else:
+            _eval_slots_busy.discard(slot)
+
+
+async def _stop_eval_then_release(proc, slot: int) -> None:
+    try:
+        await _stop_eval_proc(proc)
+        await asyncio.wait_for(proc.wait(), timeout=5)
+    except Exception:
+        pass
+    finally:
+        _eval_slots_busy.discard(slot)
+
+
+async def _run_eval_agent(skill: str, agent_id: str, system_prompt: str, user_prompt: str,
+                          on_text, timeout_s: int, run: dict) -> dict:
+    """Body of _run_eval_openclaw on one evaluator agent; sets run["proc"]."""
+    from agent_orchestrator import WORKSPACE_DIR
 
     # OpenClaw doesn't have a flag for system-prompt override on per-call basis;
     # prepend system context to the message.
@@ -677,22 +794,57 @@ async def _run_eval_openclaw(
         stderr=asyncio.subprocess.PIPE,
         cwd=str(WORKSPACE_DIR),
     )
+    run["proc"] = proc
 
-    try:
-        stdout_bytes, stderr_bytes = await asyncio.wait_for(
-            proc.communicate(), timeout=timeout_s
-        )
-    except asyncio.TimeoutError:
-        if proc.returncode is None:
-            try: proc.send_signal(signal.SIGINT)
-            except Exception: pass
-            try: await asyncio.wait_for(proc.wait(), timeout=3)
-            except Exception: pass
-            try:
-                if proc.returncode is None: proc.kill()
-            except Exception: pass
-        return {"ok": False, "text": "", "error": f"openclaw eval timed out after {timeout_s}s"}
-
+    text_parts: list[str] = []
+    tail = {"file": None, "pos": 0, "partial": b""}
+
+    async def _pump() -> bool:
+        """Read new complete lines from the session file; True = verdict seen."""
+        if tail["file"] is None:
+            tail["file"], tail["pos"] = _locate_eval_session(sdir, before_snapshot, existing_sizes)
+            if tail["file"] is None:
+                return False
+        try:
+            with open(tail["file"], "rb") as f:
+                f.seek(tail["pos"])
+                chunk = f.read()
+        except Exception as e:
+            print(f"[OC eval] {skill}: failed to read session file {tail['file']}: {e}")
+            return False
+        tail["pos"] += len(chunk)
+        *lines, tail["partial"] = (tail["partial"] + chunk).split(b"\n")
+        for raw in lines:
+            for t in _assistant_texts(raw):
+                text_parts.append(t)
+                if on_text:
+                    try:
+                        if await on_text(t):
+                            return True
+                    except Exception:
+                        pass
+        return False
+
+    comm = asyncio.ensure_future(proc.communicate())
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout_s
+    while not comm.done():
+        await asyncio.wait({comm}, timeout=0.5)
+        if await _pump():
+            # _run_eval_openclaw stops the subprocess in the background
+            return {
+                "ok": True,
+                "text": "\n".join(text_parts),
+                "session_id": tail["file"].stem,
+                "cost_usd": 0.0,
+                "num_turns": len(text_parts),
+                "early": True,
+            }
+        if not comm.done() and loop.time() > deadline:
+            await _stop_eval_proc(proc)
+            return {"ok": False, "text": "", "error": f"openclaw eval timed out after {timeout_s}s"}
+
+    stdout_bytes, stderr_bytes = comm.result()
     stderr_raw = stderr_bytes.decode(errors="replace")
     envelope = _parse_final_envelope(stderr_raw)
     if not envelope:
@@ -710,60 +862,17 @@ async def _run_eval_openclaw(
     model = agent_meta.get("model") or ""
     cost = _estimate_cost(provider, model, usage)
 
-    # Locate the session jsonl that grew during this run
-    target_file = None
-    target_start = 0
-    if sess_id:
-        candidate = sdir / f"{sess_id}.jsonl"
-        if candidate.exists():
-            target_file = candidate
-            # If pre-existing (continuation), skip the prefix
-            if candidate in before_snapshot:
-                target_start = existing_sizes.get(candidate, 0)
-    if target_file is None and sdir.exists():
-        new_files = set(sdir.glob("*.jsonl")) - before_snapshot
-        if new_files:
-            target_file = next(iter(new_files))
-        else:
-            # fall back to file with biggest growth
-            for p, old_sz in existing_sizes.items():
-                if p.exists() and p.stat().st_size > old_sz:
-                    target_file = p
-                    target_start = old_sz
-                    break
-
-    text_parts: list[str] = []
-    if target_file is not None:
-        try:
-            with open(target_file, "rb") as f:
-                f.seek(target_start)
-                for raw in f:
-                    try:
-                        rec = json.loads(raw.decode("utf-8", errors="replace"))
-                    except Exception:
-                        continue
-                    # OpenClaw shape: {"type":"message","message":{"role":..,
-                    # "content":[{"type":"text","text":...}, {"type":"toolCall",...}]}}
-                    # The dev tail uses the same access pattern (~L342-363).
-                    if rec.get("type") != "message":
-                        continue
-                    msg = rec.get("message", {}) or {}
-                    if msg.get("role") != "assistant":
-                        continue
-                    for blk in msg.get("content", []) or []:
-                        if not isinstance(blk, dict):
-                            continue
-                        if blk.get("type") != "text":
-                            continue
-                        t = (blk.get("text") or "").strip()
-                        if not t:
-                            continue
-                        text_parts.append(t)
-                        if on_text:
-                            try: await on_text(t)
-                            except Exception: pass
-        except Exception as e:
-            print(f"[OC eval] {skill}: failed to read session file {target_file}: {e}")
+    # The envelope names the session; if the tail guessed another file (or
+    # none), start over on the right one.
+    target_file, target_start = _locate_eval_session(sdir, before_snapshot, existing_sizes, sess_id)
+    if target_file is not None and target_file != tail["file"]:
+        text_parts.clear()
+        tail.update(file=target_file, pos=target_start, partial=b"")
+    if tail["file"] is not None:
+        await _pump()
+        if tail["partial"].strip():
+            tail["partial"] += b"\n"
+            await _pump()
 
     full_text = "\n".join(text_parts)
 
@@ -0,0 +1,353 @@
+"""Asyncio HTTP/1.1 client with per-origin keep-alive connection pools.
+
+The orchestrator talks to a handful of fixed origins (each target's
+agent_server and sim_api) many times per skill — submits, job polls,
+recording metadata, frame downloads. Calling blocking urllib from a
+coroutine freezes the event loop for the whole request, so every call
+goes through this client instead:
+
+    client = AsyncHttpClient()
+    job = await client.get_json(f"{server}/code/jobs/{job_id}", timeout=5)
+    resp = await client.post_json(f"{server}/code/submit", {"code": code})
+    await client.close()
+
+Per origin (scheme://host:port) it keeps up to ``max_per_origin`` open
+connections, reusing idle ones (HTTP/1.1 keep-alive) so back-to-back polls
+don't pay connection setup. Failed attempts are retried with exponential
+backoff + jitter: connection errors, timeouts and 502/503/504 for
+idempotent requests; for POST only when a reused keep-alive connection
+turned out to be stale before any response byte arrived (the request never
+reached the server).
+
+Stdlib only — no aiohttp/httpx dependency.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import json as _json
+import random
+import ssl
+import time
+import urllib.parse
+from collections import deque
+
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "PUT", "DELETE", "OPTIONS"})
+RETRY_STATUSES = frozenset({502, 503, 504})
+
+
+class HttpStatusError(Exception):
+    """Non-2xx response from raise_for_status()."""
+
+    def __init__(self, response: "Response"):
+        super().__init__(f"HTTP {response.status} from {response.url}")
+        self.response = response
+        self.status = response.status
+
+
+class Response:
+    def __init__(self, url: str, status: int, reason: str, headers: dict, body: bytes):
+        self.url = url
+        self.status = status
+        self.reason = reason
+        self.headers = headers   # lower-cased names
+        self.body = body
+
+    @property
+    def ok(self) -> bool:
+        return 200 <= self.status < 300
+
+    def text(self) -> str:
+        return self.body.decode("utf-8", errors="replace")
+
+    def json(self):
+        return _json.loads(self.body)
+
+    def raise_for_status(self) -> "Response":
+        if not self.ok:
+            raise HttpStatusError(self)
+        return self
+
+
+class _StaleConnection(Exception):
+    """A pooled connection was closed by the peer before it answered."""
+
+
+class _Conn:
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+        self.reused = False
+        self.idle_since = time.monotonic()
+
+    def close(self):
+        try:
+            self.writer.close()
+        except Exception:
+            pass
+
+
+class _Origin:
+    """Idle connections + concurrency limit for one scheme://host:port."""
+
+    def __init__(self, max_conns: int):
+        self.idle: deque[_Conn] = deque()
+        self.slots = asyncio.Semaphore(max_conns)
+        self.opened = 0  # connections ever opened (for stats/tests)
+
+
+class AsyncHttpClient:
+    """Shared HTTP client. Safe to use from many coroutines at once."""
+
+    def __init__(self, max_per_origin: int = 8, timeout: float = 10.0, retries: int = 2,
+                 backoff: float = 0.25, max_backoff: float = 4.0, idle_timeout: float = 30.0):
+        self.max_per_origin = max_per_origin
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.idle_timeout = idle_timeout
+        self._origins: dict[tuple[str, str, int], _Origin] = {}
+
+    # -- public API --------------------------------------------------------
+
+    async def request(self, method: str, url: str, *, body: bytes | str | None = None,
+                      json=None, headers: dict | None = None, timeout: float | None = None,
+                      retries: int | None = None, idempotent: bool | None = None) -> Response:
+        """Send one request and return the full response (any status).
+
+        ``timeout`` bounds each attempt (connect + send + full response).
+        ``idempotent`` overrides the method-based retry policy, e.g. for a
+        POST /reset that is safe to repeat.
+        """
+        method = method.upper()
+        if urllib.parse.urlsplit(url).scheme not in ("http", "https"):
+            raise ValueError(f"unsupported URL scheme: {url}")
+        hdrs = {k.lower(): str(v) for k, v in (headers or {}).items()}
+        if json is not None:
+            body = _json.dumps(json)
+            hdrs.setdefault("content-type", "application/json")
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        timeout = self.timeout if timeout is None else timeout
+        retries = self.retries if retries is None else retries
+        if idempotent is None:
+            idempotent = method in IDEMPOTENT_METHODS
+
+        attempt = 0
+        while True:
+            try:
+                resp = await asyncio.wait_for(
+                    self._attempt(method, url, body, hdrs), timeout)
+                if resp.status in RETRY_STATUSES and idempotent and attempt < retries:
+                    raise ConnectionError(f"HTTP {resp.status}")
+                return resp
+            except _StaleConnection:
+                # Nothing reached the server — always safe to resend, and
+                # doesn't count against the retry budget.
+                continue
+            except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError):
+                if not idempotent or attempt >= retries:
+                    raise
+            delay = min(self.max_backoff, self.backoff * (2 ** attempt))
+            attempt += 1
+            await asyncio.sleep(delay * random.uniform(0.5, 1.0))
+
+    async def get(self, url: str, **kw) -> Response:
+        return await self.request("GET", url, **kw)
+
+    async def post(self, url: str, **kw) -> Response:
+        return await self.request("POST", url, **kw)
+
+    async def get_json(self, url: str, **kw):
+        """GET and decode JSON; raises HttpStatusError on non-2xx."""
+        return (await self.get(url, **kw)).raise_for_status().json()
+
+    async def post_json(self, url: str, payload, **kw):
+        """POST a JSON body and decode the JSON reply; raises on non-2xx."""
+        return (await self.post(url, json=payload, **kw)).raise_for_status().json()
+
+    async def close(self):
+        for origin in self._origins.values():
+            while origin.idle:
+                origin.idle.popleft().close()
+        self._origins.clear()
+
+    def stats(self) -> dict[str, dict]:
+        """Per-origin pool counters."""
+        return {
+            f"{scheme}://{host}:{port}": {"idle": len(o.idle), "opened": o.opened}
+            for (scheme, host, port), o in self._origins.items()
+        }
+
+    # -- internals ---------------------------------------------------------
+
+    def _origin(self, key: tuple[str, str, int]) -> _Origin:
+        origin = self._origins.get(key)
+        if origin is None:
+            origin = self._origins[key] = _Origin(self.max_per_origin)
+        return origin
+
+    async def _checkout(self, key: tuple[str, str, int], origin: _Origin) -> _Conn:
+        now = time.monotonic()
+        while origin.idle:
+            conn = origin.idle.pop()  # most recently used first
+            if now - conn.idle_since < self.idle_timeout and not conn.reader.at_eof():
+                conn.reused = True
+                return conn
+            conn.close()
+        scheme, host, port = key
+        ctx = ssl.create_default_context() if scheme == "https" else None
+        reader, writer = await asyncio.open_connection(host, port, ssl=ctx)
+        origin.opened += 1
+        return _Conn(reader, writer)
+
+    async def _attempt(self, method: str, url: str, body: bytes | None, hdrs: dict) -> Response:
+        parts = urllib.parse.urlsplit(url)
+        scheme = parts.scheme
+        host = parts.hostname or "localhost"
+        port = parts.port or (443 if scheme == "https" else 80)
+        key = (scheme, host, port)
+        target = parts.path or "/"
+        if parts.query:
+            target += "?" + parts.query
+
+        origin = self._origin(key)
+        async with origin.slots:
+            conn = await self._checkout(key, origin)
+            keep = False
+            try:
+                host_hdr = host if parts.port is None else f"{host}:{port}"
+                lines = [f"{method} {target} HTTP/1.1", f"Host: {host_hdr}",
+                         "Connection: keep-alive", "Accept-Encoding: identity"]
+                merged = dict(hdrs)
+                if body is not None or method in ("POST", "PUT", "PATCH"):
+                    merged["content-length"] = str(len(body or b""))
+                lines += [f"{k}: {v}" for k, v in merged.items()]
+                conn.writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + (body or b""))
+                await conn.writer.drain()
+                try:
+                    status_line = await conn.reader.readuntil(b"\r\n")
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    if conn.reused:
+                        raise _StaleConnection()
+                    raise
+                resp, keep = await self._read_response(url, method, status_line, conn.reader)
+                return resp
+            finally:
+                if keep:
+                    conn.idle_since = time.monotonic()
+                    origin.idle.append(conn)
+                else:
+                    conn.close()
+
+    @staticmethod
+    async def _read_head(status_line: bytes, reader: asyncio.StreamReader):
+        version, _, rest = status_line.decode("latin-1").strip().partition(" ")
+        code, _, reason = rest.partition(" ")
+        head = await reader.readuntil(b"\r\n\r\n")
+        headers: dict[str, str] = {}
+        for line in head.decode("latin-1").split("\r\n"):
+            if ":" in line:
+                k, _, v = line.partition(":")
+                headers[k.strip().lower()] = v.strip()
+        return version, int(code), reason, headers
+
+    @staticmethod
+    async def _iter_body(headers: dict, reader: asyncio.StreamReader):
+        """Yield body pieces as they arrive (chunked, Content-Length or until close)."""
+        if "chunked" in headers.get("transfer-encoding", "").lower():
+            while True:
+                size = int((await reader.readuntil(b"\r\n")).split(b";")[0].strip() or b"0", 16)
+                if size == 0:
+                    while (await reader.readuntil(b"\r\n")) != b"\r\n":
+                        pass
+                    return
+                yield await reader.readexactly(size)
+                await reader.readexactly(2)
+        elif "content-length" in headers:
+            remaining = int(headers["content-length"])
+            while remaining > 0:
+                piece = await reader.read(min(remaining, 65536))
+                if not piece:
+                    raise asyncio.IncompleteReadError(b"", remaining)
+                remaining -= len(piece)
+                yield piece
+        else:
+            while True:
+                piece = await reader.read(65536)
+                if not piece:
+                    return
+                yield piece
+
+    async def _read_response(self, url: str, method: str, status_line: bytes,
+                             reader: asyncio.StreamReader) -> tuple[Response, bool]:
+        version, status, reason, headers = await self._read_head(status_line, reader)
+        keep = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+        if method == "HEAD" or status in (204, 304) or 100 <= status < 200:
+            body = b""
+        else:
+            if "chunked" not in headers.get("transfer-encoding", "").lower() \
+                    and "content-length" not in headers:
+                keep = False  # delimited by close
+            body = b"".join([piece async for piece in self._iter_body(headers, reader)])
+        return Response(url, status, reason, headers, body), keep
+
+    @contextlib.asynccontextmanager
+    async def stream(self, method: str, url: str, *, headers: dict | None = None,
+                     connect_timeout: float | None = None):
+        """Open a long-lived response (e.g. server-sent events).
+
+        Yields a StreamResponse whose body is consumed incrementally via
+        ``lines()``. Uses a dedicated connection outside the pool, so a
+        stream held open for minutes doesn't occupy a pooled slot; the
+        connection is closed on exit. No retries — callers fall back.
+        """
+        parts = urllib.parse.urlsplit(url)
+        if parts.scheme not in ("http", "https"):
+            raise ValueError(f"unsupported URL scheme: {url}")
+        host = parts.hostname or "localhost"
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+        target = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        ctx = ssl.create_default_context() if parts.scheme == "https" else None
+        timeout = self.timeout if connect_timeout is None else connect_timeout
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(host, port, ssl=ctx), timeout)
+        try:
+            host_hdr = host if parts.port is None else f"{host}:{port}"
+            lines = [f"{method.upper()} {target} HTTP/1.1", f"Host: {host_hdr}",
+                     "Accept-Encoding: identity"]
+            lines += [f"{k}: {v}" for k, v in (headers or {}).items()]
+            writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+            await writer.drain()
+            status_line = await asyncio.wait_for(reader.readuntil(b"\r\n"), timeout)
+            _version, status, reason, hdrs = await self._read_head(status_line, reader)
+            yield StreamResponse(url, status, reason, hdrs, self._iter_body(hdrs, reader))
+        finally:
+            writer.close()
+
+
+class StreamResponse:
+    """Response whose body is read incrementally (see AsyncHttpClient.stream)."""
+
+    def __init__(self, url: str, status: int, reason: str, headers: dict, body_iter):
+        self.url = url
+        self.status = status
+        self.reason = reason
+        self.headers = headers
+        self._body = body_iter
+
+    async def lines(self):
+        """Yield decoded lines (without line terminators) as they arrive."""
+        buf = b""
+        async for piece in self._body:
+            buf += piece
+            while True:
+                nl = buf.find(b"\n")
+                if nl < 0:
+                    break
+                line, buf = buf[:nl], buf[nl + 1:]
+                yield line.rstrip(b"\r").decode("utf-8", errors="replace")
+        if buf:
+            yield buf.rstrip(b"\r").decode("utf-8", errors="replace")
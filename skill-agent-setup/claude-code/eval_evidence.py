@@ -0,0 +1,465 @@
+"""Deterministic evidence extraction from execution recordings.
+
+The evaluator prompt asks the agent to find the key moments of a run in
+``state_log.jsonl`` (gripper open/close, base stop, grasp height, final
+state) and only then look at the frames around them. This module does that
+analysis up front, on the recording timeline, so only those frames are
+downloaded:
+
+    frames = select_key_frames(rec_data)      # RecordingCache frame_selector
+    moments = find_key_moments(rec_data["timeline"])
+
+The timeline analysis is vectorized with numpy. numpy is optional: without
+it select_key_frames() falls back to uniform sampling.
+
+State samples are flattened (``{"gripper": {"position": 3}}`` ->
+``gripper.position``) and signals are found by key name, so both nested
+and flat state layouts work:
+
+    gripper width    *gripper*position* / *gripper*width*
+    object detected  *object_detected
+    base pose        *base_pose  ([x, y, theta])
+    EE height        *ee_pose    (4x4 column-major -> [14]) or [x, y, z, ...]
+
+build_digest() / format_digest() summarize a downloaded recording for the
+evaluator's task message: stdout markers and errors, gripper timeline,
+base displacement, phase durations between key moments, and the frames on
+disk tagged with the moments they show.
+
+pre_evaluate() fails runs that are decisively broken — an uncaught
+traceback, FAILURE / AssertionError on stdout, a non-zero exit code, an
+empty recording — with the quoted evidence, so they skip the LLM
+evaluator. Anything else returns None and goes to the LLM.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from pathlib import Path
+
+import metrics
+from recording_cache import MAX_FRAMES, sample_frames
+
+try:
+    import numpy as np
+except ImportError:  # uniform frame sampling only
+    np = None
+
+EVENT_WINDOW = 2            # timeline samples before/after an event whose frames are kept
+BASE_MOVING_SPEED = 0.02    # m/s — slower than this counts as stopped
+MAX_EE_MINIMA = 3
+
+# Frame budget goes to events in this order.
+EVENT_PRIORITY = (
+    "final", "start", "gripper_close", "gripper_open", "object_detected", "object_lost",
+    "ee_min", "base_stop", "base_start",
+)
+
+
+def _flatten(d: dict, prefix: str = "") -> dict:
+    out = {}
+    for k, v in d.items():
+        key = f"{prefix}{k}"
+        if isinstance(v, dict):
+            out.update(_flatten(v, key + "."))
+        else:
+            out[key] = v
+    return out
+
+
+def _frame_number(name) -> int | None:
+    if isinstance(name, bool):
+        return None
+    if isinstance(name, (int, float)):
+        return int(name)
+    m = re.search(r"\d+", str(name))
+    return int(m.group()) if m else None
+
+
+def _find_key(keys, match) -> str | None:
+    return next((k for k in sorted(keys) if match(k.lower())), None)
+
+
+def _scalar(states: list[dict], key: str):
+    vals = []
+    for s in states:
+        v = s.get(key)
+        vals.append(float(v) if isinstance(v, (int, float)) else np.nan)
+    return np.array(vals, dtype=float)
+
+
+def _component(states: list[dict], key: str, pick):
+    """Column from a list-valued signal; ``pick(len)`` -> index or None."""
+    vals = []
+    for s in states:
+        v = s.get(key)
+        i = pick(len(v)) if isinstance(v, (list, tuple)) else None
+        vals.append(float(v[i]) if i is not None and isinstance(v[i], (int, float)) else np.nan)
+    return np.array(vals, dtype=float)
+
+
+def _flips(values, valid):
+    """Indices where a boolean series changes, and the value it changes to."""
+    idx = np.flatnonzero(valid)
+    if idx.size < 2:
+        return []
+    v = values[idx]
+    changed = np.flatnonzero(v[1:] != v[:-1]) + 1
+    return [(int(idx[c]), bool(v[c])) for c in changed]
+
+
+def find_key_moments(timeline: list[dict]) -> list[dict]:
+    """Key moments of a recording timeline: [{"kind", "index", "t", "frame"}].
+
+    Empty when numpy is unavailable or the timeline is empty.
+    """
+    if np is None or not timeline:
+        return []
+    states = [_flatten(e.get("state") or {}) for e in timeline]
+    n = len(states)
+    t = np.array([float(e.get("timestamp") or 0.0) for e in timeline])
+    keys = set().union(*states)
+    events: list[tuple[int, str]] = [(0, "start"), (n - 1, "final")]
+
+    grip_key = _find_key(keys, lambda k: "gripper" in k and ("position" in k or "width" in k))
+    if grip_key:
+        g = _scalar(states, grip_key)
+        valid = ~np.isnan(g)
+        if valid.sum() >= 2 and np.ptp(g[valid]) > 1e-6:
+            lo, hi = g[valid].min(), g[valid].max()
+            closed = g < (lo + hi) / 2
+            events += [(i, "gripper_close" if c else "gripper_open") for i, c in _flips(closed, valid)]
+
+    obj_key = _find_key(keys, lambda k: k.endswith("object_detected"))
+    if obj_key:
+        o = _scalar(states, obj_key)
+        events += [(i, "object_detected" if d else "object_lost")
+                   for i, d in _flips(o > 0.5, ~np.isnan(o))]
+
+    base_key = _find_key(keys, lambda k: k.endswith("base_pose"))
+    if base_key and n >= 2:
+        x = _component(states, base_key, lambda m: 0 if m >= 2 else None)
+        y = _component(states, base_key, lambda m: 1 if m >= 2 else None)
+        dt = np.maximum(np.diff(t), 1e-6)
+        speed = np.hypot(np.diff(x), np.diff(y)) / dt
+        valid = ~np.isnan(speed)
+        moving = speed > BASE_MOVING_SPEED
+        # speed[i] covers samples i -> i+1, so a flip at i starts at sample i
+        events += [(i, "base_start" if m else "base_stop") for i, m in _flips(moving, valid)]
+
+    ee_key = _find_key(keys, lambda k: k.endswith("ee_pose") or k.endswith("ee_pos"))
+    if ee_key and n >= 3:
+        z = _component(states, ee_key, lambda m: 14 if m == 16 else (2 if m >= 3 else None))
+        valid = ~np.isnan(z)
+        if valid.sum() >= 3 and np.ptp(z[valid]) > 1e-3:
+            idx = np.flatnonzero(valid)
+            zv = z[idx]
+            interior = np.flatnonzero((zv[1:-1] <= zv[:-2]) & (zv[1:-1] < zv[2:])) + 1
+            low = interior[zv[interior] <= zv.min() + 0.25 * np.ptp(zv)]
+            deepest = low[np.argsort(zv[low], kind="stable")][:MAX_EE_MINIMA]
+            events += [(int(idx[i]), "ee_min") for i in deepest]
+
+    moments = []
+    seen = set()
+    for i, kind in sorted(events, key=lambda e: (EVENT_PRIORITY.index(e[1]), e[0])):
+        if (i, kind) in seen:
+            continue
+        seen.add((i, kind))
+        moments.append({"kind": kind, "index": i, "t": float(t[i]),
+                        "frame": timeline[i].get("frame")})
+    return moments
+
+
+def select_key_frames(rec_data: dict, limit: int = MAX_FRAMES) -> list[str]:
+    """Frames (all cameras) around the recording's key moments, at most ``limit``.
+
+    Falls back to uniform sampling when numpy is missing or the timeline
+    yields nothing usable.
+    """
+    frames = rec_data.get("frames", [])
+    timeline = rec_data.get("timeline", [])
+    moments = find_key_moments(timeline)
+    by_number: dict[int, list[str]] = {}
+    for name in frames:
+        num = _frame_number(name)
+        if num is not None:
+            by_number.setdefault(num, []).append(name)
+    if not moments or not by_number:
+        return sample_frames(rec_data, limit)
+
+    numbers = np.array(sorted(by_number))
+    n = len(timeline)
+
+    def _nearest(j: int) -> int:
+        f = _frame_number(timeline[j].get("frame"))
+        if f is None:  # no frame reference: place by position in the timeline
+            f = round(numbers[0] + (numbers[-1] - numbers[0]) * j / max(1, n - 1))
+        return int(numbers[np.abs(numbers - f).argmin()])
+
+    chosen: list[str] = []
+    taken: set[int] = set()
+    # Event frames first (in priority order), then their neighbours.
+    for offsets in ((0,), tuple(o for d in range(1, EVENT_WINDOW + 1) for o in (-d, d))):
+        for m in moments:
+            for off in offsets:
+                num = _nearest(min(n - 1, max(0, m["index"] + off)))
+                if num in taken:
+                    continue
+                names = by_number[num]
+                if len(chosen) + len(names) > limit:
+                    continue
+                taken.add(num)
+                chosen.extend(names)
+    order = {name: i for i, name in enumerate(frames)}
+    return sorted(chosen, key=order.__getitem__)
+
+
+# ---------------------------------------------------------------------------
+# Evidence digest (injected into the evaluator's task message)
+# ---------------------------------------------------------------------------
+
+MARKER_RE = re.compile(r"\b[A-Z][A-Z0-9]*(?:_[A-Z0-9]+)*_(?:OK|FAIL|FAILED|DONE)\b"
+                       r"|\b(?:SUCCESS|FAILURE|FAILED|FAIL)\b")
+ERROR_RE = re.compile(r"Traceback \(most recent call last\)|\b\w+(?:Error|Exception)\b"
+                      r"|task check failed|success=False")
+MAX_MARKERS = 40
+MAX_ERRORS = 15
+MAX_GRIPPER_POINTS = 20
+LINE_CHARS = 200
+
+
+def _read_text(path) -> str:
+    try:
+        return path.read_text(errors="replace")
+    except OSError:
+        return ""
+
+
+def load_recording(exec_dir) -> dict:
+    """metadata / stdout / stderr / timeline / frames of a local recording dir.
+
+    stdout and stderr come from stdout.log / stderr.log, or from
+    metadata.json for recordings fetched by recording_cache.
+    """
+    exec_dir = Path(exec_dir)
+    try:
+        metadata = json.loads((exec_dir / "metadata.json").read_text())
+    except (OSError, ValueError):
+        metadata = {}
+    timeline = []
+    for line in _read_text(exec_dir / "state_log.jsonl").splitlines():
+        try:
+            row = json.loads(line)
+        except ValueError:
+            continue
+        ts, frame = row.pop("timestamp", None), row.pop("frame", None)
+        timeline.append({"timestamp": ts, "frame": frame, "state": row})
+    return {
+        "metadata": metadata,
+        "stdout": _read_text(exec_dir / "stdout.log") or metadata.get("stdout") or "",
+        "stderr": _read_text(exec_dir / "stderr.log") or metadata.get("stderr") or "",
+        "timeline": timeline,
+        "frames": sorted(p.name for p in exec_dir.glob("*.jpg")),
+    }
+
+
+def _keep_ends(items: list, limit: int) -> list:
+    """First quarter and last three quarters of ``items`` when over ``limit``."""
+    if len(items) <= limit:
+        return items
+    head = limit // 4
+    return items[:head] + items[len(items) - (limit - head):]
+
+
+def _signal(timeline: list[dict], match, pick=None) -> list[tuple[float, float]]:
+    states = [_flatten(e.get("state") or {}) for e in timeline]
+    key = _find_key(set().union(*states), match) if states else None
+    if key is None:
+        return []
+    out = []
+    for e, s in zip(timeline, states):
+        v = s.get(key)
+        if pick is not None and isinstance(v, (list, tuple)):
+            i = pick(len(v))
+            v = v[i] if i is not None else None
+        if isinstance(v, (int, float)) and not isinstance(v, bool):
+            out.append((float(e.get("timestamp") or 0.0), float(v)))
+    return out
+
+
+def build_digest(exec_dir) -> dict:
+    """Compact, deterministic summary of a recording for the evaluator."""
+    rec = load_recording(exec_dir)
+    timeline = rec["timeline"]
+
+    markers = [{"line": i + 1, "text": line.strip()[:LINE_CHARS]}
+               for i, line in enumerate(rec["stdout"].splitlines()) if MARKER_RE.search(line)]
+    errors = [{"stream": stream, "line": i + 1, "text": line.strip()[:LINE_CHARS]}
+              for stream in ("stdout", "stderr")
+              for i, line in enumerate(rec[stream].splitlines()) if ERROR_RE.search(line)]
+    exception = ""
+    if "Traceback (most recent call last)" in rec["stderr"]:
+        tail = rec["stderr"].rsplit("Traceback (most recent call last)", 1)[1]
+        exception = next((ln.strip() for ln in reversed(tail.splitlines()) if ln.strip()), "")
+
+    # Gripper: change points (> 5% of the observed range)
+    gripper = []
+    g = _signal(timeline, lambda k: "gripper" in k and ("position" in k or "width" in k))
+    if g:
+        span = (max(v for _, v in g) - min(v for _, v in g)) or 1.0
+        for t, v in g:
+            if not gripper or abs(v - gripper[-1][1]) > 0.05 * span:
+                gripper.append((t, v))
+        if gripper[-1] != g[-1]:
+            gripper.append(g[-1])
+        gripper = _keep_ends(gripper, MAX_GRIPPER_POINTS)
+
+    base = {}
+    xs = _signal(timeline, lambda k: k.endswith("base_pose"), lambda m: 0 if m >= 2 else None)
+    ys = _signal(timeline, lambda k: k.endswith("base_pose"), lambda m: 1 if m >= 2 else None)
+    if len(xs) >= 2 and len(xs) == len(ys):
+        pts = [(x, y) for (_, x), (_, y) in zip(xs, ys)]
+        path = sum(((b[0] - a[0]) ** 2 + (b[1] - a[1]) ** 2) ** 0.5 for a, b in zip(pts, pts[1:]))
+        net = ((pts[-1][0] - pts[0][0]) ** 2 + (pts[-1][1] - pts[0][1]) ** 2) ** 0.5
+        base = {"path_m": round(path, 3), "net_m": round(net, 3),
+                "final_xy": [round(pts[-1][0], 3), round(pts[-1][1], 3)]}
+
+    moments = find_key_moments(timeline)
+    phases = []
+    ordered = sorted(moments, key=lambda m: (m["t"], m["index"]))
+    for a, b in zip(ordered, ordered[1:]):
+        if b["t"] > a["t"]:
+            phases.append({"from": a["kind"], "to": b["kind"], "seconds": round(b["t"] - a["t"], 2)})
+
+    at_frame: dict[int, list[str]] = {}
+    for m in moments:
+        num = _frame_number(m.get("frame"))
+        if num is not None:
+            at_frame.setdefault(num, []).append(m["kind"])
+    frames = [{"name": f, "moments": sorted(set(at_frame.get(_frame_number(f), [])))}
+              for f in rec["frames"]]
+
+    meta = rec["metadata"]
+    return {
+        "execution_id": meta.get("execution_id", ""),
+        "duration_s": meta.get("duration"),
+        "exit_code": meta.get("exit_code"),
+        "stdout_lines": len(rec["stdout"].splitlines()),
+        "markers": _keep_ends(markers, MAX_MARKERS),
+        "errors": _keep_ends(errors, MAX_ERRORS),
+        "exception": exception,
+        "gripper": [[round(t, 2), round(v, 2)] for t, v in gripper],
+        "base": base,
+        "phases": phases,
+        "frames": frames,
+        "state_samples": len(timeline),
+    }
+
+
+def format_digest(d: dict) -> str:
+    """The digest as the plain-text block appended to the evaluator task."""
+    lines = [f"execution: {d['execution_id']}  duration: {d['duration_s']}s  "
+             f"exit_code: {d['exit_code'] if d['exit_code'] is not None else 'unknown'}  "
+             f"stdout lines: {d['stdout_lines']}  state samples: {d['state_samples']}"]
+    lines.append("stdout markers:" if d["markers"] else "stdout markers: (none)")
+    lines += [f"  L{m['line']}: {m['text']}" for m in d["markers"]]
+    lines.append("errors:" if d["errors"] else "errors: (none)")
+    lines += [f"  {e['stream']} L{e['line']}: {e['text']}" for e in d["errors"]]
+    if d["exception"]:
+        lines.append(f"final exception: {d['exception']}")
+    if d["gripper"]:
+        lines.append("gripper (t s -> value): " + ", ".join(f"{t}->{v:g}" for t, v in d["gripper"]))
+    if d["base"]:
+        b = d["base"]
+        lines.append(f"base: path {b['path_m']} m, net displacement {b['net_m']} m, final xy {b['final_xy']}")
+    if d["phases"]:
+        lines.append("phases: " + "; ".join(f"{p['from']} -> {p['to']} {p['seconds']}s" for p in d["phases"]))
+    tagged = [f"{f['name']} ({', '.join(f['moments'])})" if f["moments"] else f["name"] for f in d["frames"]]
+    lines.append(f"frames on disk ({len(tagged)}): " + (", ".join(tagged) if tagged else "(none)"))
+    return "\n".join(lines)
+
+
+# ---------------------------------------------------------------------------
+# Rule-based pre-evaluation (runs that need no LLM to judge)
+# ---------------------------------------------------------------------------
+
+FAILURE_LINE_RE = re.compile(r"\bFAILURE\b|\bAssertionError\b|task check failed")
+UNCAUGHT_RE = re.compile(r"^[A-Za-z_][\w.]*(?:Error|Exception|Interrupt|Exit)\b")
+MAX_QUOTE_LINES = 8
+
+PRE_EVAL_OUTCOMES = metrics.counter(
+    "orch_eval_pre_eval_total",
+    "Rule-based pre-evaluator outcomes: the rule that failed the run, or escalated", ["rule"])
+
+
+def _rule_traceback(rec: dict):
+    # Only an uncaught exception — stderr ends in the exception line. A
+    # logged-and-recovered traceback is left to the LLM.
+    stderr = rec["stderr"]
+    if "Traceback (most recent call last)" not in stderr:
+        return None
+    lines = [ln for ln in stderr.splitlines() if ln.strip()]
+    if not lines or not UNCAUGHT_RE.match(lines[-1]):
+        return None
+    tb = stderr.rsplit("Traceback (most recent call last)", 1)[1].strip("\n:").splitlines()
+    quote = ["Traceback (most recent call last):"] + _keep_ends(tb, MAX_QUOTE_LINES - 1)
+    return (f"The script crashed with an uncaught exception: {lines[-1].strip()[:LINE_CHARS]}",
+            ["stderr:\n" + "\n".join(ln[:LINE_CHARS] for ln in quote)])
+
+
+def _rule_failure_line(rec: dict):
+    hits = [f"stdout L{i + 1}: {line.strip()[:LINE_CHARS]}"
+            for i, line in enumerate(rec["stdout"].splitlines()) if FAILURE_LINE_RE.search(line)]
+    if not hits:
+        return None
+    return "The script reported a failure on stdout.", _keep_ends(hits, MAX_QUOTE_LINES)
+
+
+def _rule_exit_code(rec: dict):
+    code = rec["metadata"].get("exit_code")
+    if code is None or isinstance(code, bool) or code == 0:
+        return None
+    last = [ln.strip()[:LINE_CHARS] for ln in rec["stdout"].splitlines() if ln.strip()][-3:]
+    evidence = [f"exit_code: {code}"] + [f"stdout (last lines): {ln}" for ln in last]
+    return f"The script exited with code {code}.", evidence
+
+
+def _rule_empty_recording(rec: dict):
+    if rec["stdout"].strip() or rec["stderr"].strip() or rec["timeline"] or rec["frames"]:
+        return None
+    return ("The recording is empty: no stdout, no stderr, no robot state and no camera frames.",
+            ["stdout.log / stderr.log / state_log.jsonl / frames: (empty)"])
+
+
+# Checked in order; the first match decides.
+PRE_EVAL_RULES = (
+    ("traceback", _rule_traceback),
+    ("failure_line", _rule_failure_line),
+    ("exit_code", _rule_exit_code),
+    ("empty_recording", _rule_empty_recording),
+)
+
+
+def pre_evaluate(exec_dir) -> dict | None:
+    """FAIL verdict for a run that is decisively broken, else None (escalate).
+
+    Returns {"passed": False, "rule": str, "evidence": [str], "feedback": str};
+    the feedback uses the evaluator's output sections so the dev agent reads
+    it the same way.
+    """
+    rec = load_recording(exec_dir)
+    for rule, check in PRE_EVAL_RULES:
+        hit = check(rec)
+        if hit is None:
+            continue
+        PRE_EVAL_OUTCOMES.labels(rule).inc()
+        summary, evidence = hit
+        quoted = "\n".join(f"    {ln}" for e in evidence for ln in e.splitlines())
+        feedback = (f"### What happened\n{summary}\n\n{quoted}\n\n"
+                    f"### Result\nFAILED — decided by the pre-evaluator rule `{rule}` from the "
+                    f"logs above; the recording was not reviewed further.\n\n"
+                    f"### Issues\n- {summary.rstrip('.')}. Fix this first, then resubmit.")
+        return {"passed": False, "rule": rule, "evidence": evidence, "feedback": feedback}
+    PRE_EVAL_OUTCOMES.labels("escalated").inc()
+    return None
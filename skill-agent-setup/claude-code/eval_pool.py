@@ -0,0 +1,287 @@
+"""Warm evaluator worker pool.
+
+Every evaluation used to start a brand-new ClaudeSDKClient (or openclaw
+subprocess): CLI process spawn, session setup and tool bootstrap on the
+critical path of every eval, and unbounded concurrency when many skills
+finish at once. The pool keeps ``size`` workers, each holding a session
+that was started BEFORE the job arrived, and feeds them from a bounded
+queue:
+
+    pool = EvalWorkerPool(session_factory, size=2, queue_max=16)
+    result = await pool.submit(EvalJob(skill, system_prompt, prompt, on_text, timeout=900))
+
+A session is whatever ``session_factory()`` returns:
+
+    async warm()        start the backend (connect, spawn, ...) — may raise
+    async run(job)      run one evaluation -> {"ok": bool, "error": str, ...}
+                        should stop as soon as ``await job.on_text(t)``
+                        returns True (verdict complete) and set "early"
+    async close()
+    reusable: bool      False = one conversation per session; the worker
+                        closes it after each job and warms a replacement
+                        while idle, so the next job still finds it warm
+
+Per-skill ordering is the caller's job (agent_orchestrator's _eval_lock);
+the pool only bounds cross-skill concurrency to ``size``. Failed sessions
+are discarded; a job that finds no warm session starts one cold.
+
+A pre-started session can die while it sits idle (CLI exit, dropped
+connection) and nothing notices until a job hits it. So a warm session
+that fails before streaming any text gets the job retried once on a fresh
+session, and a session idle for longer than ``idle_ttl`` seconds is
+closed and replaced before a job can land on it. A warm-up that takes
+longer than ``warm_timeout`` seconds (a hung connect) counts as failed,
+so one stuck backend can't hold a worker forever.
+
+The job's future resolves before the worker closes a finished session, so
+an early-stopped eval does not wait for the backend to shut down.
+
+Metrics (metrics.py): queue wait, run time by warm/cold, early stops,
+session restarts (retry / idle_ttl / warm_timeout), and busy/idle/queued
+worker gauges.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Optional
+
+import metrics
+
+EVAL_QUEUE_WAIT_SECONDS = metrics.histogram(
+    "orch_eval_queue_wait_seconds", "Time an evaluation waited for a free worker")
+EVAL_RUN_SECONDS = metrics.histogram(
+    "orch_eval_worker_run_seconds", "Evaluation run time inside a worker", ["session"])
+EVAL_EARLY_STOPS = metrics.counter(
+    "orch_eval_early_stops_total", "Evaluations stopped as soon as EVAL_RESULT was emitted")
+EVAL_SESSION_RESTARTS = metrics.counter(
+    "orch_eval_session_restarts_total",
+    "Evaluator sessions replaced: failed warm session retried, idle past the TTL, "
+    "or warm-up timed out", ["reason"])
+EVAL_POOL_WORKERS = metrics.gauge(
+    "orch_eval_pool", "Evaluator pool workers and queued jobs", ["state"])
+
+
+@dataclass
+class EvalJob:
+    skill: str
+    system_prompt: str
+    prompt: str
+    on_text: Optional[Callable[[str], Awaitable[Optional[bool]]]] = None
+    timeout: float = 900.0
+    enqueued_at: float = 0.0
+    future: Optional[asyncio.Future] = field(default=None, repr=False)
+
+
+class EvalWorkerPool:
+    def __init__(self, session_factory: Callable[[], object], size: int = 2,
+                 queue_max: int = 16, idle_ttl: float = 600.0, warm_timeout: float = 60.0):
+        self.session_factory = session_factory
+        self.size = max(1, size)
+        self.queue_max = queue_max
+        self.idle_ttl = idle_ttl          # <= 0: keep idle sessions forever
+        self.warm_timeout = warm_timeout  # <= 0: wait for warm() indefinitely
+        self.queue: asyncio.Queue | None = None
+        self.workers: list[asyncio.Task] = []
+        self.busy = 0
+        self.completed = 0
+        self._ready: set[int] = set()   # workers holding an idle warm session
+
+    @property
+    def started(self) -> bool:
+        return bool(self.workers)
+
+    def start(self) -> None:
+        """Create the queue and workers (each warms a session right away)."""
+        if self.started:
+            return
+        self.queue = asyncio.Queue(maxsize=self.queue_max)
+        loop = asyncio.get_running_loop()
+        self.workers = [loop.create_task(self._worker(i)) for i in range(self.size)]
+
+    async def submit(self, job: EvalJob) -> dict:
+        """Queue ``job`` (waits while the queue is full) and return its result."""
+        self.start()
+        job.future = asyncio.get_running_loop().create_future()
+        job.enqueued_at = time.monotonic()
+        await self.queue.put(job)
+        return await job.future
+
+    async def _new_session(self):
+        session = self.session_factory()
+        try:
+            if self.warm_timeout > 0:
+                await self._warm_within(session, self.warm_timeout)
+            else:
+                await session.warm()
+        except asyncio.TimeoutError:
+            print(f"[EVAL-POOL] session warm-up timed out after {self.warm_timeout:g}s")
+            EVAL_SESSION_RESTARTS.labels("warm_timeout").inc()
+            await self._close(session)
+            return None
+        except Exception as e:
+            print(f"[EVAL-POOL] session warm-up failed: {e}")
+            await self._close(session)
+            return None
+        return session
+
+    @staticmethod
+    async def _warm_within(session, timeout: float) -> None:
+        """``session.warm()``, raising TimeoutError after ``timeout`` seconds.
+
+        asyncio.wait rather than wait_for: on 3.10/3.11 wait_for drops a
+        cancel that lands as warm() finishes, and pool.close() would hang.
+        """
+        task = asyncio.ensure_future(session.warm())
+        try:
+            done, _ = await asyncio.wait({task}, timeout=timeout)
+        except asyncio.CancelledError:
+            task.cancel()
+            raise
+        if not done:
+            task.cancel()
+            try:
+                await task
+            except (asyncio.CancelledError, Exception):
+                pass
+            raise asyncio.TimeoutError
+        task.result()
+
+    @staticmethod
+    async def _close(session) -> None:
+        if session is None:
+            return
+        try:
+            await session.close()
+        except Exception as e:
+            print(f"[EVAL-POOL] session close failed: {e}")
+
+    @property
+    def warm(self) -> int:
+        return len(self._ready)
+
+    async def _next_job(self, idle_since: float | None) -> Optional[EvalJob]:
+        """Next queued job, or None once a session idle since ``idle_since`` hits the TTL."""
+        if idle_since is None or self.idle_ttl <= 0:
+            return await self.queue.get()
+        remaining = idle_since + self.idle_ttl - time.monotonic()
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout=max(remaining, 0))
+        except asyncio.TimeoutError:
+            return None
+
+    @staticmethod
+    async def _run(session, job: EvalJob, timeout: float) -> tuple[dict, bool, bool]:
+        """Run ``job`` -> (result, session still healthy, any text streamed)."""
+        spoke = False
+        on_text = job.on_text
+        if on_text is not None:
+            async def tracked(text):
+                nonlocal spoke
+                spoke = True
+                return await on_text(text)
+            job.on_text = tracked
+        try:
+            if session is None:
+                return {"ok": False, "error": "evaluator session failed to start"}, False, spoke
+            return await asyncio.wait_for(session.run(job), timeout=timeout), True, spoke
+        except asyncio.TimeoutError:
+            return ({"ok": False, "timeout": True,
+                     "error": f"evaluator timed out after {job.timeout:g}s"}, False, spoke)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            return {"ok": False, "error": f"{type(e).__name__}: {e}"}, False, spoke
+        finally:
+            job.on_text = on_text
+
+    async def _worker(self, idx: int) -> None:
+        session = await self._new_session()
+        idle_since = time.monotonic()
+        try:
+            while True:
+                if session is not None:
+                    self._ready.add(idx)
+                job = await self._next_job(idle_since if session is not None else None)
+                self._ready.discard(idx)
+                if job is None:
+                    EVAL_SESSION_RESTARTS.labels("idle_ttl").inc()
+                    await self._close(session)
+                    session = await self._new_session()
+                    idle_since = time.monotonic()
+                    continue
+                EVAL_QUEUE_WAIT_SECONDS.observe(time.monotonic() - job.enqueued_at)
+                self.busy += 1
+                kind = "warm"
+                if session is None:
+                    kind = "cold"
+                    session = await self._new_session()
+                t0 = time.monotonic()
+                try:
+                    result, healthy, spoke = await self._run(session, job, job.timeout)
+                    if (not healthy and kind == "warm" and not spoke
+                            and not result.get("timeout")):
+                        # Nothing reached the caller yet, so a fresh session can
+                        # take the job over; only once, and within its deadline.
+                        print(f"[EVAL-POOL] {job.skill}: warm session failed "
+                              f"({result.get('error')}); retrying on a fresh session")
+                        EVAL_SESSION_RESTARTS.labels("retry").inc()
+                        await self._close(session)
+                        kind = "cold"
+                        session = await self._new_session()
+                        remaining = max(job.timeout - (time.monotonic() - t0), 1.0)
+                        result, healthy, _ = await self._run(session, job, remaining)
+                except asyncio.CancelledError:
+                    if not job.future.done():
+                        job.future.cancel()
+                    raise
+                finally:
+                    EVAL_RUN_SECONDS.labels(kind).observe(time.monotonic() - t0)
+                    self.busy -= 1
+                    self.completed += 1
+                if result.get("early"):
+                    EVAL_EARLY_STOPS.inc()
+                if not job.future.done():
+                    job.future.set_result(result)
+
+                if not healthy or not getattr(session, "reusable", False):
+                    await self._close(session)
+                    session = await self._new_session()
+                idle_since = time.monotonic()
+        finally:
+            self._ready.discard(idx)
+            await self._close(session)
+
+    def stats(self) -> dict:
+        return {
+            "size": self.size,
+            "busy": self.busy,
+            "warm": self.warm,
+            "queued": self.queue.qsize() if self.queue else 0,
+            "queue_max": self.queue_max,
+            "completed": self.completed,
+        }
+
+    def export_metrics(self) -> None:
+        s = self.stats()
+        EVAL_POOL_WORKERS.labels("busy").set(s["busy"])
+        EVAL_POOL_WORKERS.labels("idle").set(len(self.workers) - s["busy"])
+        EVAL_POOL_WORKERS.labels("warm").set(s["warm"])
+        EVAL_POOL_WORKERS.labels("queued").set(s["queued"])
+
+    async def close(self) -> None:
+        for t in self.workers:
+            t.cancel()
+        for t in self.workers:
+            try:
+                await t
+            except (asyncio.CancelledError, Exception):
+                pass
+        self.workers = []
+        if self.queue is not None:
+            while not self.queue.empty():
+                job = self.queue.get_nowait()
+                if job.future and not job.future.done():
+                    job.future.set_result({"ok": False, "error": "evaluator pool shut down"})
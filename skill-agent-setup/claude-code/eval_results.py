@@ -0,0 +1,244 @@
+"""Evaluator verdict store — one LLM evaluation per piece of evidence.
+
+Path A (_handle_agent_done) and Path B (/job-done) can both evaluate the same
+execution, and a re-spawned dev that resubmits byte-identical code triggers
+another evaluation of the same thing. Verdicts are stored under two keys:
+
+    execution             (execution_id, skill, description): this recording,
+                          judged for this skill against this description
+    code key              sha256 over the skill, its description and the
+                          hash of the script that was submitted (Path B
+                          only — Path A doesn't know what code produced the
+                          recording it picked)
+
+A request that matches either key returns the stored verdict; concurrent
+requests for the same key await a single in-flight evaluation:
+
+    store = EvalResultStore(GRAPH_DIR / "eval_results.jsonl")
+    result = await store.run_once(execution_id, code_key(skill, code_hash, desc),
+                                  skill, lambda: evaluate(...), description=desc)
+
+Only verdicts the evaluator actually produced (``result["parsed"]``) are
+stored — timeouts, crashes and unparseable output are retried next time.
+The file is append-only JSONL next to agent_sessions.jsonl; the last line
+for a key wins.
+
+EnvelopeParser watches the evaluator's streamed text and returns the
+verdict as soon as a complete ``EVAL_RESULT: {...}`` object has been
+emitted, so the caller can stop the evaluator instead of waiting for its
+trailing turns.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import datetime
+import hashlib
+import json
+import re
+from pathlib import Path
+from typing import Awaitable, Callable
+
+import metrics
+
+MAX_STORED_TEXT = 8000
+
+EVAL_RESULT_LOOKUPS = metrics.counter(
+    "orch_eval_result_lookups_total", "Evaluator verdict store lookups", ["result"])
+
+
+_ENVELOPE_RE = re.compile(r"EVAL_RESULT\s*:\s*")
+
+
+def _balanced_object(text: str, pos: int) -> str | None:
+    """The ``{...}`` starting at ``text[pos]`` (after whitespace or a
+    ```json fence), or None if there is none or it isn't closed yet."""
+    while pos < len(text) and text[pos] in " \t\r\n`":
+        pos += 1
+        if text[pos - 1] == "`" and text.startswith("json", pos):
+            pos += 4
+    if pos >= len(text) or text[pos] != "{":
+        return None
+    depth = 0
+    in_str = None
+    escaped = False
+    for i in range(pos, len(text)):
+        c = text[i]
+        if in_str:
+            if escaped:
+                escaped = False
+            elif c == "\\":
+                escaped = True
+            elif c == in_str:
+                in_str = None
+        elif c in "\"'":
+            in_str = c
+        elif c == "{":
+            depth += 1
+        elif c == "}":
+            depth -= 1
+            if depth == 0:
+                return text[pos:i + 1]
+    return None
+
+
+def _load_envelope(raw: str) -> dict | None:
+    candidates = [raw, raw.replace("'", '"')]
+    if raw.startswith("{{") and raw.endswith("}}"):  # the prompt's own example is brace-doubled
+        candidates.append(raw[1:-1])
+    for cand in candidates:
+        try:
+            obj = json.loads(cand, strict=False)  # allow raw newlines in feedback
+        except ValueError:
+            continue
+        if isinstance(obj, dict) and "passed" in obj:
+            return obj
+    return None
+
+
+def find_envelope(text: str) -> dict | None:
+    """First complete, parseable EVAL_RESULT object in ``text``."""
+    for m in _ENVELOPE_RE.finditer(text):
+        raw = _balanced_object(text, m.end())
+        if raw is not None:
+            obj = _load_envelope(raw)
+            if obj is not None:
+                return obj
+    return None
+
+
+class EnvelopeParser:
+    """Incremental EVAL_RESULT detection over streamed text blocks."""
+
+    def __init__(self):
+        self.text = ""
+        self.result: dict | None = None
+        self._scan_from = 0
+
+    def feed(self, block: str) -> dict | None:
+        if self.result is None:
+            self.text += block + "\n"
+            # Scan the new block, plus the last earlier marker whose object
+            # may have been closed by it.
+            start = self.text.rfind("EVAL_RESULT", 0, self._scan_from)
+            if start < 0:
+                start = self._scan_from
+            self.result = find_envelope(self.text[start:])
+            self._scan_from = len(self.text)
+        return self.result
+
+
+def code_key(skill: str, code_hash: str, description: str = "") -> str:
+    """Key for ``skill`` judged against ``description`` on the submitted code.
+
+    ``code_hash`` is the sha256 of the exact script that was submitted
+    (submit_and_wait sends it with /job-done), not of the skill's files at
+    eval time — those may have changed since, or never produced this run.
+    """
+    h = hashlib.sha256()
+    for part in (skill, description, code_hash):
+        h.update(part.encode() + b"\0")
+    return h.hexdigest()
+
+
+class EvalResultStore:
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.by_execution: dict[tuple[str, str, str], dict] = {}   # (execution_id, skill, description)
+        self.by_code: dict[str, dict] = {}
+        self._inflight: dict[tuple, asyncio.Task] = {}
+        self._loaded = False
+
+    def _load(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        try:
+            lines = self.path.read_text().splitlines()
+        except OSError:
+            return
+        for line in lines:
+            try:
+                self._index(json.loads(line))
+            except (ValueError, AttributeError):
+                continue
+
+    def _index(self, rec: dict) -> None:
+        if rec.get("execution_id"):
+            key = (rec["execution_id"], rec.get("skill", ""), rec.get("description", ""))
+            self.by_execution[key] = rec
+        if rec.get("code_key"):
+            self.by_code[rec["code_key"]] = rec
+
+    def lookup(self, execution_id: str, code: str, skill: str,
+               description: str = "") -> tuple[dict | None, str]:
+        """(stored record, "execution" | "code") or (None, "")."""
+        self._load()
+        key = (execution_id, skill, description)
+        if execution_id and key in self.by_execution:
+            return self.by_execution[key], "execution"
+        if code and code in self.by_code:
+            return self.by_code[code], "code"
+        return None, ""
+
+    def record(self, execution_id: str, code: str, skill: str, result: dict,
+               description: str = "") -> None:
+        self._load()
+        rec = {
+            "execution_id": execution_id,
+            "code_key": code,
+            "skill": skill,
+            "description": description,
+            "passed": bool(result.get("passed")),
+            "feedback": result.get("feedback", ""),
+            "full_text": (result.get("full_text") or "")[-MAX_STORED_TEXT:],
+            "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        }
+        self._index(rec)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "a") as f:
+            f.write(json.dumps(rec) + "\n")
+
+    async def run_once(self, execution_id: str, code: str, skill: str,
+                       evaluate: Callable[[], Awaitable[dict]], description: str = "") -> dict:
+        """Stored verdict for this evidence, else run ``evaluate()`` once.
+
+        ``code`` may be "" (no code key known): then only the execution key
+        is read and written.
+        """
+        rec, hit = self.lookup(execution_id, code, skill, description)
+        if rec is not None:
+            EVAL_RESULT_LOOKUPS.labels(hit).inc()
+            return {"passed": rec["passed"], "feedback": rec["feedback"],
+                    "full_text": rec.get("full_text") or rec["feedback"],
+                    "cached": hit, "cached_from": rec.get("execution_id", "")}
+
+        keys = []
+        if execution_id:
+            keys.append(("execution", (execution_id, skill, description)))
+        if code:
+            keys.append(("code", code))
+        task = next((self._inflight[k] for k in keys if k in self._inflight), None)
+        if task is not None:
+            EVAL_RESULT_LOOKUPS.labels("inflight").inc()
+            return dict(await asyncio.shield(task))
+
+        EVAL_RESULT_LOOKUPS.labels("miss").inc()
+
+        async def _run() -> dict:
+            result = await evaluate()
+            if result.get("parsed"):
+                self.record(execution_id, code, skill, result, description)
+            return result
+
+        task = asyncio.get_running_loop().create_task(_run())
+        for k in keys:
+            self._inflight[k] = task
+
+        def _done(_t):
+            for k in keys:
+                if self._inflight.get(k) is task:
+                    del self._inflight[k]
+
+        task.add_done_callback(_done)
+        return dict(await asyncio.shield(task))
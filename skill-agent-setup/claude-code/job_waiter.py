@@ -0,0 +1,271 @@
+"""Wait for an agent-server job to finish — push first, adaptive polling second.
+
+Everything that submits code to the agent server (orchestrator multi-target
+tests, submit_and_wait.py, generated run_trials.py, eval e2e runner) used to
+sleep 2 s between GET /code/jobs/{id} calls. That adds up to 2 s of latency
+per trial and a steady stream of requests per target. This module waits
+for completion in the cheapest way the server supports:
+
+  1. Server-sent events: GET /code/jobs/{id}/events (text/event-stream).
+     Each ``data:`` line is the job JSON; we return on a terminal status.
+     A server that answers anything but an event stream is remembered per
+     origin and not asked again.
+  2. Long-poll: GET /code/jobs/{id}?wait=N. A server that supports it holds
+     the request until the job changes or N seconds pass; one that doesn't
+     ignores the parameter and answers immediately, which —
+  3. — degrades to adaptive polling: 0.2 s, growing ×1.5 up to 2 s, reset
+     whenever the job's status changes (queued -> running).
+
+Sync (stdlib http.client, one keep-alive connection per wait) and async
+(async_http.AsyncHttpClient) front-ends share the same policy:
+
+    job = wait_for_job("http://localhost:8080", job_id, timeout=300)
+    job = await wait_for_job_async(http, server, job_id, timeout=300)
+
+On timeout both return {"status": "timeout", "job_id": ..., "error": ...}.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import http.client
+import json
+import socket
+import time
+import urllib.parse
+
+TERMINAL_STATUSES = frozenset({"completed", "failed", "timed_out", "cancelled", "error"})
+
+POLL_MIN_S = 0.2
+POLL_MAX_S = 2.0
+POLL_GROWTH = 1.5
+LONG_POLL_S = 20.0      # ?wait= sent with each poll
+SSE_IDLE_S = 30.0       # give up on a silent event stream after this long
+
+# Origins whose agent server has no event stream — skip straight to polling.
+_no_event_stream: set[str] = set()
+
+
+def is_terminal(job: dict) -> bool:
+    return job.get("status") in TERMINAL_STATUSES
+
+
+def _origin(base: str) -> str:
+    u = urllib.parse.urlsplit(base)
+    return f"{u.scheme}://{u.netloc}"
+
+
+def _timeout_result(job_id: str, timeout: float) -> dict:
+    return {"status": "timeout", "job_id": job_id, "error": f"Timed out after {timeout}s"}
+
+
+class AdaptiveInterval:
+    """Poll delay that starts short and backs off while nothing changes."""
+
+    def __init__(self, start: float = POLL_MIN_S, limit: float = POLL_MAX_S,
+                 growth: float = POLL_GROWTH):
+        self.start = start
+        self.limit = limit
+        self.growth = growth
+        self.current = start
+
+    def next(self) -> float:
+        delay = self.current
+        self.current = min(self.limit, self.current * self.growth)
+        return delay
+
+    def reset(self):
+        self.current = self.start
+
+
+class _SseParser:
+    """Accumulates text/event-stream lines; returns the JSON payload per event."""
+
+    def __init__(self):
+        self.data: list[str] = []
+
+    def feed(self, line: str):
+        if line == "":
+            if not self.data:
+                return None
+            raw, self.data = "\n".join(self.data), []
+            try:
+                return json.loads(raw)
+            except json.JSONDecodeError:
+                return None
+        if line.startswith(":"):
+            return None  # comment / keep-alive
+        field, _, value = line.partition(":")
+        if field == "data":
+            self.data.append(value[1:] if value.startswith(" ") else value)
+        return None
+
+
+# ---------------------------------------------------------------------------
+# Sync
+# ---------------------------------------------------------------------------
+
+def _connect(base: str, timeout: float) -> tuple[http.client.HTTPConnection, str]:
+    u = urllib.parse.urlsplit(base)
+    cls = http.client.HTTPSConnection if u.scheme == "https" else http.client.HTTPConnection
+    return cls(u.hostname, u.port, timeout=timeout), u.path.rstrip("/")
+
+
+def _get_json(conn: http.client.HTTPConnection, path: str) -> dict:
+    conn.request("GET", path)
+    resp = conn.getresponse()
+    body = resp.read()
+    if resp.status != 200:
+        raise OSError(f"HTTP {resp.status} for {path}")
+    return json.loads(body)
+
+
+def _wait_events(base: str, job_id: str, deadline: float) -> dict | None:
+    """Follow the job's event stream. None = unsupported/ended -> poll instead."""
+    origin = _origin(base)
+    if origin in _no_event_stream:
+        return None
+    conn, prefix = _connect(base, timeout=min(10.0, max(0.1, deadline - time.monotonic())))
+    try:
+        conn.request("GET", f"{prefix}/code/jobs/{job_id}/events",
+                     headers={"Accept": "text/event-stream"})
+        sock = conn.sock  # http.client drops conn.sock for Connection: close replies
+        resp = conn.getresponse()
+        if resp.status != 200 or "text/event-stream" not in resp.getheader("Content-Type", ""):
+            resp.read()
+            _no_event_stream.add(origin)
+            return None
+        parser = _SseParser()
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return _timeout_result(job_id, 0)
+            sock.settimeout(min(SSE_IDLE_S, remaining))
+            raw = resp.readline()
+            if not raw:
+                return None  # stream closed before completion
+            job = parser.feed(raw.decode("utf-8", errors="replace").rstrip("\r\n"))
+            if job is not None and is_terminal(job):
+                if "result" not in job:
+                    # Event carried status only — fetch the full job record
+                    # (the stream's connection is still busy).
+                    fetch, _ = _connect(base, timeout=10.0)
+                    try:
+                        job = _get_json(fetch, f"{prefix}/code/jobs/{job_id}")
+                    finally:
+                        fetch.close()
+                return job
+    except (OSError, socket.timeout, http.client.HTTPException, ValueError):
+        return None
+    finally:
+        conn.close()
+
+
+def wait_for_job(base: str, job_id: str, timeout: float = 300.0, *,
+                 use_events: bool = True, long_poll: float = LONG_POLL_S) -> dict:
+    """Block until the job reaches a terminal status (or ``timeout``)."""
+    deadline = time.monotonic() + timeout
+    if use_events:
+        job = _wait_events(base, job_id, deadline)
+        if job is not None:
+            if job.get("status") == "timeout":
+                return _timeout_result(job_id, timeout)
+            return job
+
+    interval = AdaptiveInterval()
+    last_status = None
+    conn, prefix = None, ""
+    try:
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return _timeout_result(job_id, timeout)
+            wait = min(long_poll, remaining)
+            if conn is None:
+                conn, prefix = _connect(base, timeout=wait + 10)
+            t0 = time.monotonic()
+            try:
+                job = _get_json(conn, f"{prefix}/code/jobs/{job_id}?wait={wait:g}")
+            except (OSError, http.client.HTTPException, ValueError):
+                conn.close()
+                conn = None
+                time.sleep(min(interval.next(), max(0.0, deadline - time.monotonic())))
+                continue
+            if is_terminal(job):
+                return job
+            if job.get("status") != last_status:
+                last_status = job.get("status")
+                interval.reset()
+            if time.monotonic() - t0 < min(1.0, wait / 2):
+                # Answered immediately — no long-poll support; back off.
+                time.sleep(min(interval.next(), max(0.0, deadline - time.monotonic())))
+    finally:
+        if conn is not None:
+            conn.close()
+
+
+# ---------------------------------------------------------------------------
+# Async
+# ---------------------------------------------------------------------------
+
+async def _wait_events_async(http, base: str, job_id: str, deadline: float) -> dict | None:
+    origin = _origin(base)
+    if origin in _no_event_stream:
+        return None
+    url = f"{base.rstrip('/')}/code/jobs/{job_id}/events"
+    try:
+        async with http.stream("GET", url, headers={"Accept": "text/event-stream"}) as resp:
+            if resp.status != 200 or "text/event-stream" not in resp.headers.get("content-type", ""):
+                _no_event_stream.add(origin)
+                return None
+            parser = _SseParser()
+            lines = resp.lines().__aiter__()
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return _timeout_result(job_id, 0)
+                try:
+                    line = await asyncio.wait_for(lines.__anext__(), min(SSE_IDLE_S, remaining))
+                except StopAsyncIteration:
+                    return None
+                job = parser.feed(line)
+                if job is not None and is_terminal(job):
+                    if "result" not in job:
+                        job = await http.get_json(f"{base.rstrip('/')}/code/jobs/{job_id}")
+                    return job
+    except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError):
+        return None
+
+
+async def wait_for_job_async(http, base: str, job_id: str, timeout: float = 300.0, *,
+                             use_events: bool = True, long_poll: float = LONG_POLL_S) -> dict:
+    """Async twin of wait_for_job() on an async_http.AsyncHttpClient."""
+    deadline = time.monotonic() + timeout
+    if use_events:
+        job = await _wait_events_async(http, base, job_id, deadline)
+        if job is not None:
+            if job.get("status") == "timeout":
+                return _timeout_result(job_id, timeout)
+            return job
+
+    interval = AdaptiveInterval()
+    last_status = None
+    url = f"{base.rstrip('/')}/code/jobs/{job_id}"
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return _timeout_result(job_id, timeout)
+        wait = min(long_poll, remaining)
+        t0 = time.monotonic()
+        try:
+            job = await http.get_json(f"{url}?wait={wait:g}", timeout=wait + 10, retries=0)
+        except Exception:
+            await asyncio.sleep(min(interval.next(), max(0.0, deadline - time.monotonic())))
+            continue
+        if is_terminal(job):
+            return job
+        if job.get("status") != last_status:
+            last_status = job.get("status")
+            interval.reset()
+        if time.monotonic() - t0 < min(1.0, wait / 2):
+            await asyncio.sleep(min(interval.next(), max(0.0, deadline - time.monotonic())))
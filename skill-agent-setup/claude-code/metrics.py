@@ -0,0 +1,243 @@
+"""Minimal Prometheus-style metrics (counters, gauges, histograms).
+
+Stdlib only. Metrics live in a module-level registry keyed by name and
+render in the Prometheus text exposition format (version 0.0.4):
+
+    SPAWNS = counter("orch_agent_spawns_total", "Agents spawned", ["agent_type"])
+    SPAWNS.labels(agent_type="dev").inc()
+
+    with EVAL_SECONDS.time():
+        ...
+
+    text = render()   # body of GET /metrics
+
+counter()/gauge()/histogram() return the already-registered metric when
+the name exists, so the openclaw shim's second copy of agent_orchestrator
+(imported as a module next to __main__) shares the same metric objects.
+Everything runs on the event loop thread; no locking.
+"""
+
+from __future__ import annotations
+
+import math
+import time
+from contextlib import contextmanager
+
+# Latency buckets (seconds): sub-ms event-loop work up to multi-minute evals.
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+                   30.0, 60.0, 300.0, 900.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+_registry: dict[str, "_Metric"] = {}
+_collectors: list = []   # callables run before render() (refresh scrape-time gauges)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _fmt_labels(names: tuple, values: tuple, extra: tuple = ()) -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)] + list(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _fmt_value(v: float) -> str:
+    if v == math.inf:
+        return "+Inf"
+    if float(v).is_integer():
+        return str(int(v))
+    return repr(float(v))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames=(), register: bool = True):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._children: dict[tuple, object] = {}
+        if register:
+            if name in _registry:
+                raise ValueError(f"metric {name} already registered")
+            _registry[name] = self
+
+    def labels(self, *values, **kv):
+        if kv:
+            values = tuple(kv[n] for n in self.labelnames)
+        key = tuple(str(v) for v in values)
+        if len(key) != len(self.labelnames):
+            raise ValueError(f"{self.name}: expected labels {self.labelnames}, got {key}")
+        child = self._children.get(key)
+        if child is None:
+            child = self._children[key] = self._new_child()
+        return child
+
+    def _default(self):
+        return self.labels()
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for key, child in sorted(self._children.items()):
+            lines.extend(self._render_child(key, child))
+        return lines
+
+
+class _Value:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0):
+        self.value += amount
+
+    def dec(self, amount: float = 1.0):
+        self.value -= amount
+
+    def set(self, value: float):
+        self.value = value
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self):
+        return _Value()
+
+    def inc(self, amount: float = 1.0):
+        self._default().inc(amount)
+
+    def _render_child(self, key, child):
+        return [f"{self.name}{_fmt_labels(self.labelnames, key)} {_fmt_value(child.value)}"]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float):
+        self._default().set(value)
+
+    def clear(self):
+        """Drop all label sets (for gauges rebuilt at scrape time)."""
+        self._children.clear()
+
+
+class _HistogramChild:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.sum += value
+        self.count += 1
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+
+    @contextmanager
+    def time(self):
+        t0 = time.monotonic()
+        try:
+            yield
+        finally:
+            self.observe(time.monotonic() - t0)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames=(), buckets=DEFAULT_BUCKETS,
+                 register: bool = True):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, help, labelnames, register)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float):
+        self._default().observe(value)
+
+    def time(self):
+        return self._default().time()
+
+    def _render_child(self, key, child):
+        lines = []
+        cumulative = 0
+        for bound, n in zip(self.buckets, child.counts):
+            cumulative += n
+            le = f'le="{_fmt_value(bound)}"'
+            lines.append(f"{self.name}_bucket{_fmt_labels(self.labelnames, key, (le,))} {cumulative}")
+        inf = 'le="+Inf"'
+        lines.append(f"{self.name}_bucket{_fmt_labels(self.labelnames, key, (inf,))} {child.count}")
+        lines.append(f"{self.name}_sum{_fmt_labels(self.labelnames, key)} {_fmt_value(child.sum)}")
+        lines.append(f"{self.name}_count{_fmt_labels(self.labelnames, key)} {child.count}")
+        return lines
+
+
+def _get_or_create(cls, name: str, help: str, labelnames=(), **kw):
+    metric = _registry.get(name)
+    if metric is None:
+        return cls(name, help, labelnames, **kw)
+    if type(metric) is not cls or metric.labelnames != tuple(labelnames):
+        raise ValueError(f"metric {name} already registered with a different type or labels")
+    return metric
+
+
+def counter(name: str, help: str, labelnames=()) -> Counter:
+    return _get_or_create(Counter, name, help, labelnames)
+
+
+def gauge(name: str, help: str, labelnames=()) -> Gauge:
+    return _get_or_create(Gauge, name, help, labelnames)
+
+
+def histogram(name: str, help: str, labelnames=(), buckets=DEFAULT_BUCKETS) -> Histogram:
+    return _get_or_create(Histogram, name, help, labelnames, buckets=buckets)
+
+
+def register_collector(fn) -> None:
+    """Run ``fn()`` before every render() — for gauges derived from live state."""
+    if fn not in _collectors:
+        _collectors.append(fn)
+
+
+def render() -> str:
+    """All registered metrics in Prometheus text format."""
+    for fn in list(_collectors):
+        try:
+            fn()
+        except Exception as e:  # a broken collector must not break /metrics
+            print(f"[METRICS] collector {getattr(fn, '__name__', fn)} failed: {e}")
+    lines: list[str] = []
+    for metric in list(_registry.values()):
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# ---------------------------------------------------------------------------
+# Event-loop lag watchdog
+# ---------------------------------------------------------------------------
+
+async def watch_event_loop_lag(lag_hist: Histogram, lag_gauge: Gauge, interval: float = 0.5,
+                               warn_after: float = 1.0) -> None:
+    """Sleep ``interval`` in a loop and record how late each wakeup was.
+
+    Lag is the time the loop spent running other callbacks past the
+    scheduled wakeup — i.e. how long something blocked the loop. Runs
+    until cancelled.
+    """
+    import asyncio
+    while True:
+        t0 = time.monotonic()
+        await asyncio.sleep(interval)
+        lag = max(0.0, time.monotonic() - t0 - interval)
+        lag_hist.observe(lag)
+        lag_gauge.set(lag)
+        if lag >= warn_after:
+            print(f"[METRICS] event loop blocked for {lag:.2f}s")
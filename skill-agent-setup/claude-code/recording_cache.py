@@ -0,0 +1,374 @@
+"""Local cache of agent-server execution recordings for the evaluator.
+
+The evaluator reads a recording as a plain directory:
+
+    <exec_root>/<execution_id>/metadata.json      (stdout/stderr/exit_code from the job)
+                              /state_log.jsonl    (recording timeline)
+                              /<camera>_<n>.jpg   (sampled frames)
+
+This module builds those directories from the agent server and keeps them
+bounded:
+
+  * Frames are stored once under ``<store_root>/blobs/`` keyed by SHA-256
+    and hard-linked (copied where links aren't possible) into each
+    execution directory — a static scene recorded by several trials costs
+    the disk one frame, not one per trial.
+  * ``<store_root>/index.json`` records, per cached execution, which blobs
+    it references, its size and when it was last used. When the total
+    exceeds the byte budget the least recently used executions are removed
+    (and blobs nobody references any more). Executions used within
+    ``protect_s`` — an evaluator may still be reading them — are skipped,
+    so the budget is soft under heavy use.
+  * The job's stdout/stderr/exit code come from
+    ``GET /code/jobs/{job_id}``; the job id is taken from the recording,
+    or from note_job() (the /job-done webhook). Only when neither is
+    known does it fall back to scanning ``/code/jobs``.
+  * Concurrent fetches of one execution (Path A and Path B evaluating the
+    same run) share a single download.
+  * Frames already in the index aren't downloaded again when the directory
+    is rebuilt.
+  * Hashing, file writes and eviction's deletes run in worker threads, and
+    the byte total is kept up to date per entry instead of rescanned, so a
+    large cache doesn't stall the event loop.
+
+Directories the cache didn't create (local recordings) are served as-is
+and never evicted.
+
+    cache = RecordingCache(exec_root, store_root, budget_bytes, http_client)
+    path = await cache.fetch(agent_server, execution_id, label=skill)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Optional
+
+import metrics
+
+MAX_FRAMES = 30
+DOWNLOAD_CONCURRENCY = 5
+MAX_NOTED_JOBS = 1024   # /job-done ids whose recording was never fetched
+
+CACHE_LOOKUPS = metrics.counter(
+    "orch_recording_cache_lookups_total", "Recording cache lookups", ["result"])
+CACHE_BYTES = metrics.gauge("orch_recording_cache_bytes", "Bytes held by the recording cache")
+CACHE_EVICTIONS = metrics.counter(
+    "orch_recording_cache_evictions_total", "Executions evicted from the recording cache")
+FRAME_DEDUP = metrics.counter(
+    "orch_recording_frames_deduplicated_total", "Downloaded frames already present as a blob")
+
+
+def sample_frames(rec_data: dict, limit: int = MAX_FRAMES) -> list[str]:
+    """Evenly spaced frames from the recording (at most ``limit``)."""
+    frames = rec_data.get("frames", [])
+    if len(frames) <= limit:
+        return list(frames)
+    step = len(frames) / limit
+    return [frames[int(i * step)] for i in range(limit)]
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    # Unique per thread: two downloads may store the same blob at once.
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+class RecordingCache:
+    def __init__(self, exec_root: Path, store_root: Path, budget_bytes: int,
+                 http_client: Callable[[], object],
+                 frame_selector: Callable[[dict], list[str]] = sample_frames,
+                 protect_s: float = 1800.0):
+        self.exec_root = Path(exec_root)
+        self.store_root = Path(store_root)
+        self.blob_dir = self.store_root / "blobs"
+        self.index_path = self.store_root / "index.json"
+        self.budget_bytes = budget_bytes
+        self.http_client = http_client
+        self.frame_selector = frame_selector
+        self.protect_s = protect_s
+        self._inflight: dict[str, asyncio.Task] = {}
+        self._job_ids: dict[str, str] = {}   # execution_id -> job_id, until fetched
+        # Running totals, kept in step with self.entries by _set/_drop_entry.
+        self._entry_bytes = 0                 # sum of entries' own "bytes"
+        self._blob_bytes = 0                  # size of every referenced blob, once
+        self._refs: dict[str, int] = {}       # blob digest -> referencing entries
+        self._blob_size: dict[str, int] = {}
+        self._orphans: set[str] = set()       # unreferenced blobs not yet deleted
+        self.entries: dict[str, dict] = {}
+        for eid, e in self._load_index().items():
+            self._set_entry(eid, e)
+
+    # -- index ---------------------------------------------------------------
+
+    def _load_index(self) -> dict[str, dict]:
+        # Entries whose directory was removed behind our back are kept: their
+        # blobs still count against the budget and are reused on re-fetch.
+        try:
+            return json.loads(self.index_path.read_text()).get("entries", {})
+        except (OSError, ValueError):
+            return {}
+
+    def _write_index(self, data: bytes) -> None:
+        self.store_root.mkdir(parents=True, exist_ok=True)
+        _write_atomic(self.index_path, data)
+
+    def _blob_path(self, digest: str) -> Path:
+        return self.blob_dir / digest[:2] / f"{digest}.jpg"
+
+    def _set_entry(self, execution_id: str, entry: dict) -> None:
+        self._drop_entry(execution_id)
+        self.entries[execution_id] = entry
+        self._entry_bytes += entry.get("bytes", 0)
+        for digest, size in entry.get("blob_bytes", {}).items():
+            n = self._refs.get(digest, 0)
+            self._refs[digest] = n + 1
+            if n == 0:
+                self._blob_size[digest] = size
+                self._blob_bytes += size
+                self._orphans.discard(digest)
+
+    def _drop_entry(self, execution_id: str) -> None:
+        """Forget ``execution_id``; blobs nobody else references become orphans."""
+        entry = self.entries.pop(execution_id, None)
+        if entry is None:
+            return
+        self._entry_bytes -= entry.get("bytes", 0)
+        for digest in entry.get("blob_bytes", {}):
+            n = self._refs.get(digest, 0) - 1
+            if n > 0:
+                self._refs[digest] = n
+                continue
+            self._refs.pop(digest, None)
+            self._blob_bytes -= self._blob_size.pop(digest, 0)
+            self._orphans.add(digest)
+
+    def total_bytes(self) -> int:
+        return self._entry_bytes + self._blob_bytes
+
+    def stats(self) -> dict:
+        return {
+            "executions": len(self.entries),
+            "blobs": len(self._refs),
+            "bytes": self.total_bytes(),
+            "budget_bytes": self.budget_bytes,
+            "inflight": len(self._inflight),
+        }
+
+    # -- public API ----------------------------------------------------------
+
+    def note_job(self, execution_id: str, job_id: str) -> None:
+        """Remember which job produced ``execution_id`` (from /job-done)."""
+        if execution_id and job_id:
+            self._job_ids[execution_id] = job_id
+            if len(self._job_ids) > MAX_NOTED_JOBS:
+                del self._job_ids[next(iter(self._job_ids))]   # oldest first
+
+    def touch(self, execution_id: str) -> None:
+        e = self.entries.get(execution_id)
+        if e is not None:
+            e["last_used"] = time.time()
+
+    async def fetch(self, server: str, execution_id: str, label: str = "") -> Optional[Path]:
+        """Local directory for ``execution_id``, downloading it if needed."""
+        exec_dir = self.exec_root / execution_id
+        if (exec_dir / "metadata.json").exists():
+            CACHE_LOOKUPS.labels("hit").inc()
+            self.touch(execution_id)
+            return exec_dir
+        task = self._inflight.get(execution_id)
+        if task is None:
+            CACHE_LOOKUPS.labels("miss").inc()
+            task = asyncio.get_running_loop().create_task(
+                self._download(server, execution_id, label or execution_id))
+            self._inflight[execution_id] = task
+            task.add_done_callback(lambda _t: self._inflight.pop(execution_id, None))
+        else:
+            CACHE_LOOKUPS.labels("shared").inc()
+        # shield: one waiter giving up must not cancel the others' download
+        return await asyncio.shield(task)
+
+    # -- download ------------------------------------------------------------
+
+    async def _job_output(self, server: str, execution_id: str, rec_data: dict,
+                          label: str) -> tuple[str, str, Optional[int]]:
+        """(stdout, stderr, exit_code) of the job that produced the recording."""
+        http = self.http_client()
+        job_id = self._job_ids.pop(execution_id, None)
+        job_id = rec_data.get("job_id") or job_id
+        try:
+            if job_id:
+                job = await http.get_json(f"{server}/code/jobs/{job_id}", timeout=10)
+            else:
+                jobs_data = await http.get_json(f"{server}/code/jobs", timeout=10)
+                job_list = jobs_data.get("jobs", jobs_data) if isinstance(jobs_data, dict) else jobs_data
+                job = next((j for j in job_list if j.get("execution_id") == execution_id), {})
+        except Exception as e:
+            print(f"[EVAL] {label}: could not fetch job stdout for {execution_id}: {e}")
+            return "", "", None
+        result = job.get("result", {})
+        if not isinstance(result, dict):
+            return "", "", None
+        return result.get("stdout", ""), result.get("stderr", ""), result.get("exit_code")
+
+    async def _download(self, server: str, execution_id: str, label: str) -> Optional[Path]:
+        http = self.http_client()
+        exec_dir = self.exec_root / execution_id
+        print(f"[EVAL] {label}: fetching recording {execution_id} from {server}")
+        try:
+            rec_data = await http.get_json(f"{server}/code/recordings/{execution_id}", timeout=15)
+        except Exception as e:
+            print(f"[EVAL] {label}: failed to fetch recording {execution_id}: {e}")
+            return None
+
+        await asyncio.to_thread(exec_dir.mkdir, parents=True, exist_ok=True)
+        stdout, stderr, exit_code = await self._job_output(server, execution_id, rec_data, label)
+
+        # state_log.jsonl from the timeline
+        timeline = rec_data.get("timeline", [])
+        small_bytes = 0
+        if timeline:
+            lines = []
+            for entry in timeline:
+                state = entry.get("state")
+                if state:
+                    lines.append(json.dumps({
+                        "timestamp": entry.get("timestamp"),
+                        "frame": entry.get("frame"),
+                        **state,
+                    }) + "\n")
+            data = "".join(lines).encode()
+            await asyncio.to_thread((exec_dir / "state_log.jsonl").write_bytes, data)
+            small_bytes += len(data)
+
+        # Frames: reuse what an earlier (evicted-dir or partial) fetch
+        # already stored, download the rest concurrently.
+        known = self.entries.get(execution_id, {}).get("frames", {})
+        frames: dict[str, str] = {}
+        blob_bytes: dict[str, int] = {}
+        copied_bytes = 0
+        sem = asyncio.Semaphore(DOWNLOAD_CONCURRENCY)
+
+        async def _get_frame(fname: str):
+            nonlocal copied_bytes
+            digest = known.get(fname)
+            body = None
+            if digest is None or not await asyncio.to_thread(self._blob_path(digest).exists):
+                url = f"{server}/code/recordings/{execution_id}/frames/{fname}"
+                try:
+                    async with sem:
+                        body = (await http.get(url, timeout=10)).raise_for_status().body
+                except Exception:
+                    return  # non-fatal, evaluator can work with fewer frames
+            try:
+                digest, size, copied, existed = await asyncio.to_thread(
+                    self._store_frame, exec_dir / fname, body, digest)
+            except OSError as e:
+                print(f"[EVAL] {label}: could not store frame {fname}: {e}")
+                return
+            if existed:
+                FRAME_DEDUP.inc()
+            copied_bytes += copied
+            frames[fname] = digest
+            blob_bytes[digest] = size
+
+        await asyncio.gather(*[_get_frame(f) for f in self.frame_selector(rec_data)])
+
+        # metadata.json last: its presence marks the directory complete.
+        metadata = {
+            "execution_id": execution_id,
+            "started_at": rec_data.get("started_at"),
+            "stopped_at": rec_data.get("stopped_at"),
+            "duration": rec_data.get("duration"),
+            "cameras": rec_data.get("cameras", []),
+            "frame_count": rec_data.get("frame_count", 0),
+            "stdout": stdout,
+            "stderr": stderr,
+            "exit_code": exit_code,
+        }
+        data = json.dumps(metadata, indent=2).encode()
+        await asyncio.to_thread(_write_atomic, exec_dir / "metadata.json", data)
+        small_bytes += len(data)
+
+        self._set_entry(execution_id, {
+            "frames": frames,
+            "blob_bytes": blob_bytes,
+            "bytes": small_bytes + copied_bytes,
+            "last_used": time.time(),
+        })
+        await self.evict(keep=execution_id)
+        index = json.dumps({"entries": self.entries}).encode()
+        await asyncio.to_thread(self._write_index, index)
+        print(f"[EVAL] {label}: cached recording {execution_id} "
+              f"({len(frames)} frames, {len(timeline)} state samples)")
+        return exec_dir
+
+    def _store_frame(self, dest: Path, body: Optional[bytes],
+                     digest: Optional[str]) -> tuple[str, int, int, bool]:
+        """Store ``body`` as a blob (or reuse blob ``digest``) and link it to ``dest``.
+
+        Runs in a worker thread. Returns (digest, blob size, bytes copied
+        because a hard link wasn't possible, blob already existed).
+        """
+        existed = False
+        if body is not None:
+            digest = hashlib.sha256(body).hexdigest()
+            blob = self._blob_path(digest)
+            existed = blob.exists()
+            if not existed:
+                blob.parent.mkdir(parents=True, exist_ok=True)
+                _write_atomic(blob, body)
+        blob = self._blob_path(digest)
+        copied = 0
+        if not dest.exists():
+            try:
+                os.link(blob, dest)
+            except FileExistsError:
+                pass
+            except OSError:
+                shutil.copyfile(blob, dest)
+                copied = blob.stat().st_size
+        return digest, blob.stat().st_size, copied, existed
+
+    # -- eviction ------------------------------------------------------------
+
+    async def evict(self, keep: str = "") -> list[str]:
+        """Drop least recently used executions until under the byte budget."""
+        evicted: list[str] = []
+        now = time.time()
+        candidates = sorted(
+            (e["last_used"], eid) for eid, e in self.entries.items()
+            if eid != keep and eid not in self._inflight
+            and now - e["last_used"] >= self.protect_s
+        )
+        for _, eid in candidates:
+            if self.total_bytes() <= self.budget_bytes:
+                break
+            self._drop_entry(eid)
+            evicted.append(eid)
+            CACHE_EVICTIONS.inc()
+        # Another download may be about to link one of these blobs; leave
+        # them for a later pass until this is the only fetch running.
+        orphans: list[Path] = []
+        if len(self._inflight) <= (1 if keep in self._inflight else 0):
+            orphans = [self._blob_path(d) for d in self._orphans]
+            self._orphans.clear()
+        dirs = [self.exec_root / eid for eid in evicted]
+        if dirs or orphans:
+            await asyncio.to_thread(self._delete, dirs, orphans)
+        CACHE_BYTES.set(self.total_bytes())
+        return evicted
+
+    @staticmethod
+    def _delete(dirs: list[Path], blobs: list[Path]) -> None:
+        for d in dirs:
+            shutil.rmtree(d, ignore_errors=True)
+        for blob in blobs:
+            blob.unlink(missing_ok=True)
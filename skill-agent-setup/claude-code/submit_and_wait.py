@@ -4,13 +4,15 @@
 Usage:
     python submit_and_wait.py <code_file> [--holder dev:<skill>] [--timeout SECS] [--no-reset] [--no-eval]
 
-Submits the code via POST /code/submit, polls until done.
+Submits the code via POST /code/submit and waits until done (job event
+stream if the agent server has one, else long-poll / adaptive polling).
 If an orchestrator is running (port 8766), triggers an evaluator agent that reviews
 camera recordings and robot behavior, then returns {passed, feedback, exit_code}.
 Otherwise falls back to raw {stdout, stderr, exit_code}.
 """
 
 import argparse
+import hashlib
 import json
 import sys
 import time
@@ -18,9 +20,11 @@ import urllib.request
 import urllib.error
 
 import os
+
+from job_waiter import AdaptiveInterval, wait_for_job
 AGENT_SERVER = os.getenv("AGENT_SERVER", "http://localhost:8080")
 ORCHESTRATOR = os.getenv("ORCHESTRATOR", "http://localhost:8766")
-POLL_INTERVAL = 2.0
+EVAL_LONG_POLL = 30    # seconds the orchestrator may hold /eval-result
 DEFAULT_TIMEOUT = 300  # 5 minutes
 EVAL_TIMEOUT = 600     # 10 minutes for evaluator
 
@@ -42,27 +46,26 @@ def submit(code: str, holder: str, reset_env: bool) -> str:
 
 
 def poll(job_id: str, timeout: float) -> dict:
-    """Poll until job completes or timeout."""
-    url = f"{AGENT_SERVER}/code/jobs/{job_id}"
-    start = time.time()
-    while True:
-        elapsed = time.time() - start
-        if elapsed > timeout:
-            return {"status": "timeout", "error": f"Timed out after {timeout}s"}
-        try:
-            job = json.loads(urllib.request.urlopen(url).read())
-        except urllib.error.URLError as e:
-            print(f"Agent server unreachable: {e}", file=sys.stderr)
-            time.sleep(POLL_INTERVAL)
-            continue
-        if job.get("status") in ("completed", "failed"):
-            return job
-        time.sleep(POLL_INTERVAL)
-
-
-def notify_job_done(skill: str, execution_id: str) -> bool:
-    """Notify orchestrator that a job finished, triggering evaluator. Returns True if accepted."""
-    data = json.dumps({"skill": skill, "execution_id": execution_id, "agent_server": AGENT_SERVER}).encode()
+    """Wait until job completes or timeout."""
+    return wait_for_job(AGENT_SERVER, job_id, timeout=timeout)
+
+
+def notify_job_done(skill: str, execution_id: str, job_s: float | None = None,
+                    job_id: str = "", code: str = "") -> bool:
+    """Notify orchestrator that a job finished, triggering evaluator. Returns True if accepted.
+
+    ``job_s`` (submit -> done wall time) feeds the orchestrator's per-target
+    load estimate used for least-loaded placement.
+    """
+    payload = {"skill": skill, "execution_id": execution_id, "agent_server": AGENT_SERVER}
+    if job_id:
+        payload["job_id"] = job_id  # lets the orchestrator fetch this job's output directly
+    if code:
+        # identical resubmissions reuse the stored verdict
+        payload["code_sha256"] = hashlib.sha256(code.encode()).hexdigest()
+    if job_s is not None:
+        payload["job_s"] = round(job_s, 3)
+    data = json.dumps(payload).encode()
     req = urllib.request.Request(
         f"{ORCHESTRATOR}/job-done",
         data=data,
@@ -76,19 +79,27 @@ def notify_job_done(skill: str, execution_id: str) -> bool:
 
 
 def poll_eval_result(skill: str, timeout: float) -> dict | None:
-    """Poll orchestrator for evaluator result. Returns None if unavailable."""
-    url = f"{ORCHESTRATOR}/eval-result/{skill}"
+    """Wait for the evaluator result. Returns None if unavailable.
+
+    The orchestrator holds each request for up to ?wait= seconds, so this
+    normally returns as soon as the verdict is in; older orchestrators answer
+    immediately and the adaptive interval keeps re-polling cheap.
+    """
+    url = f"{ORCHESTRATOR}/eval-result/{skill}?wait={EVAL_LONG_POLL}"
+    interval = AdaptiveInterval()
     start = time.time()
     while time.time() - start < timeout:
+        t0 = time.time()
         try:
-            resp = json.loads(urllib.request.urlopen(url).read())
+            resp = json.loads(urllib.request.urlopen(url, timeout=EVAL_LONG_POLL + 30).read())
             if resp.get("status") == "complete":
                 return resp
             if resp.get("status") == "not_found":
                 return None
         except urllib.error.URLError:
             return None
-        time.sleep(POLL_INTERVAL)
+        if time.time() - t0 < 1.0:
+            time.sleep(interval.next())
     return {"passed": True, "feedback": "Evaluator timed out."}
 
 
@@ -108,9 +119,11 @@ def main():
         AGENT_SERVER = args.agent_server
 
     code = open(args.code_file).read()
+    t0 = time.time()
     job_id = submit(code, args.holder, reset_env=not args.no_reset)
 
     job = poll(job_id, args.timeout)
+    job_s = time.time() - t0
 
     result = job.get("result", {})
     execution_id = job.get("execution_id", "")
@@ -149,7 +162,7 @@ def main():
         print(json.dumps({"error": "No skill name — use --holder dev:<skill_name>"}), file=sys.stderr)
         sys.exit(1)
 
-    if not notify_job_done(skill, execution_id):
+    if not notify_job_done(skill, execution_id, job_s, job_id, code):
         # Orchestrator not running — fall back to raw output
         output = {
             "job_id": job_id,
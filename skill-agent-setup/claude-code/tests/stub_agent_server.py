@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""Stub agent server for exercising job submission/wait paths without a robot.
+
+Implements just enough of the agent server + sim API:
+
+    POST /code/submit               -> {"job_id"}; job completes after --job-duration
+    GET  /code/jobs/{id}[?wait=N]   -> job dict; with --long-poll, holds the
+                                       request until the job changes or N s pass
+    GET  /code/jobs/{id}/events     -> text/event-stream of job updates (--events)
+    GET  /code/jobs                 -> {"jobs": [...]}
+    GET  /code/recordings/{id}[/frames/{name}]
+                                    -> recordings registered with add_recording()
+    POST /reset, GET /task/success  -> sim stubs
+
+Used by tests/test_job_waiter.py; can also be run by hand:
+
+    python tests/stub_agent_server.py --port 8080 --events --job-duration 3
+"""
+
+import argparse
+import json
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+
+class StubAgentServer:
+    def __init__(self, port: int = 0, events: bool = False, long_poll: bool = False,
+                 job_duration: float = 0.5):
+        self.events = events
+        self.long_poll = long_poll
+        self.job_duration = job_duration
+        self.jobs: dict[str, dict] = {}
+        self.cond = threading.Condition()
+        self.requests: dict[str, int] = {}   # "submit" / "poll" / "events" / "frame" ... -> count
+        self.recordings: dict[str, dict] = {}  # execution_id -> {"meta", "frames"}
+        self.frame_delay = 0.0
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", port), self._handler_class())
+        self.httpd.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.httpd.server_address[1]}"
+
+    def start(self) -> "StubAgentServer":
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def _count(self, kind: str):
+        with self.cond:
+            self.requests[kind] = self.requests.get(kind, 0) + 1
+
+    def submit(self, code: str) -> str:
+        job_id = uuid.uuid4().hex[:12]
+        with self.cond:
+            self.jobs[job_id] = {"job_id": job_id, "status": "running", "version": 0}
+        threading.Timer(self.job_duration, self._finish, args=(job_id,)).start()
+        return job_id
+
+    def add_recording(self, execution_id: str, frames: dict[str, bytes],
+                      timeline: list | None = None, job_id: str = "") -> None:
+        """Serve a recording; ``job_id`` also creates a completed job for it."""
+        meta = {"execution_id": execution_id, "frames": list(frames),
+                "frame_count": len(frames), "cameras": ["base"], "duration": 1.0,
+                "timeline": timeline or []}
+        if job_id:
+            meta["job_id"] = job_id
+            with self.cond:
+                self.jobs[job_id] = {
+                    "job_id": job_id, "status": "completed", "version": 1,
+                    "execution_id": execution_id,
+                    "result": {"exit_code": 0, "stdout": f"{execution_id} out\n", "stderr": ""},
+                }
+        self.recordings[execution_id] = {"meta": meta, "frames": dict(frames)}
+
+    def _finish(self, job_id: str):
+        with self.cond:
+            job = self.jobs[job_id]
+            job.update({
+                "status": "completed",
+                "execution_id": f"exec-{job_id}",
+                "completed_at": time.time(),
+                "result": {"exit_code": 0, "stdout": "done\n", "stderr": ""},
+            })
+            job["version"] += 1
+            self.cond.notify_all()
+
+    def _handler_class(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive
+
+            def log_message(self, *args):
+                pass
+
+            def _json(self, obj, status=200):
+                body = json.dumps(obj).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                body = json.loads(self.rfile.read(length) or b"{}")
+                path = urlsplit(self.path).path
+                if path == "/code/submit":
+                    stub._count("submit")
+                    self._json({"job_id": stub.submit(body.get("code", ""))})
+                elif path == "/reset":
+                    self._json({"ok": True})
+                else:
+                    self._json({"error": "not found"}, 404)
+
+            def do_GET(self):
+                parts = urlsplit(self.path)
+                path = parts.path
+                if path == "/task/success":
+                    self._json({"success": True})
+                    return
+                if path.startswith("/code/recordings/"):
+                    self._recording(path[len("/code/recordings/"):])
+                    return
+                if path == "/code/jobs":
+                    stub._count("jobs_list")
+                    with stub.cond:
+                        self._json({"jobs": [dict(j) for j in stub.jobs.values()]})
+                    return
+                if not path.startswith("/code/jobs/"):
+                    self._json({"error": "not found"}, 404)
+                    return
+                rest = path[len("/code/jobs/"):]
+                if rest.endswith("/events"):
+                    self._events(rest[:-len("/events")])
+                    return
+                stub._count("poll")
+                wait = float(parse_qs(parts.query).get("wait", ["0"])[0])
+                with stub.cond:
+                    job = stub.jobs.get(rest)
+                    if job is None:
+                        self._json({"error": "unknown job"}, 404)
+                        return
+                    if stub.long_poll and wait > 0:
+                        version = job["version"]
+                        stub.cond.wait_for(lambda: job["version"] != version, timeout=wait)
+                    snapshot = dict(job)
+                self._json(snapshot)
+
+            def _recording(self, rest: str):
+                execution_id, _, fname = rest.partition("/frames/")
+                rec = stub.recordings.get(execution_id)
+                if rec is None or (fname and fname not in rec["frames"]):
+                    self._json({"error": "not found"}, 404)
+                    return
+                if not fname:
+                    stub._count("recording")
+                    self._json(rec["meta"])
+                    return
+                stub._count("frame")
+                time.sleep(stub.frame_delay)
+                body = rec["frames"][fname]
+                self.send_response(200)
+                self.send_header("Content-Type", "image/jpeg")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _events(self, job_id: str):
+                if not stub.events:
+                    self._json({"error": "not found"}, 404)
+                    return
+                stub._count("events")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Cache-Control", "no-cache")
+                self.send_header("Connection", "close")
+                self.end_headers()
+                version = -1
+                while True:
+                    with stub.cond:
+                        job = stub.jobs.get(job_id)
+                        if job is None:
+                            return
+                        stub.cond.wait_for(lambda: job["version"] != version, timeout=5)
+                        version = job["version"]
+                        snapshot = dict(job)
+                    try:
+                        self.wfile.write(f"data: {json.dumps(snapshot)}\n\n".encode())
+                        self.wfile.flush()
+                    except OSError:
+                        return
+                    if snapshot["status"] in ("completed", "failed"):
+                        self.close_connection = True
+                        return
+
+        return Handler
+
+
+def main():
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument("--port", type=int, default=8080)
+    p.add_argument("--events", action="store_true", help="Serve /code/jobs/{id}/events")
+    p.add_argument("--long-poll", action="store_true", help="Honor ?wait= on job polls")
+    p.add_argument("--job-duration", type=float, default=3.0)
+    args = p.parse_args()
+    stub = StubAgentServer(args.port, events=args.events, long_poll=args.long_poll,
+                           job_duration=args.job_duration)
+    print(f"stub agent server on {stub.url} (events={args.events}, long_poll={args.long_poll})")
+    try:
+        stub.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""Test the async HTTP client: keep-alive pooling, framing, retries, timeouts.
+
+Runs a throwaway asyncio HTTP server on localhost — no agent server needed.
+
+Usage:
+    cd ~/tidybot_uni/marketing/Tidybot-Universe/skill-agent-setup/claude-code
+    python tests/test_async_http.py
+"""
+
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from async_http import AsyncHttpClient, HttpStatusError  # noqa: E402
+
+passed = 0
+failed = 0
+
+
+def check(name, condition):
+    global passed, failed
+    if condition:
+        print(f"  PASS: {name}")
+        passed += 1
+    else:
+        print(f"  FAIL: {name}")
+        failed += 1
+
+
+# ---------------------------------------------------------------------------
+# Stub server
+# ---------------------------------------------------------------------------
+
+class StubServer:
+    """Minimal keep-alive HTTP server with scripted routes."""
+
+    def __init__(self):
+        self.connections = 0
+        self.hits: dict[str, int] = {}
+        self.fail_first: dict[str, int] = {}   # path -> number of 503s to return
+        self.server = None
+        self.port = 0
+
+    async def start(self):
+        self.server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self
+
+    @property
+    def base(self):
+        return f"http://127.0.0.1:{self.port}"
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def _handle(self, reader, writer):
+        self.connections += 1
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except asyncio.IncompleteReadError:
+                    break
+                lines = head.decode().split("\r\n")
+                method, path, _ = lines[0].split(" ", 2)
+                headers = {k.lower(): v.strip() for k, _, v in
+                           (l.partition(":") for l in lines[1:] if l)}
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+                self.hits[path] = self.hits.get(path, 0) + 1
+
+                if self.fail_first.get(path, 0) > 0:
+                    self.fail_first[path] -= 1
+                    writer.write(b"HTTP/1.1 503 Unavailable\r\nContent-Length: 0\r\n\r\n")
+                elif path == "/echo":
+                    out = json.dumps({"method": method, "body": body.decode()}).encode()
+                    writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: %d\r\n\r\n" % len(out) + out)
+                elif path == "/chunked":
+                    writer.write(b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\n"
+                                 b"5\r\nhello\r\n6\r\n world\r\n0\r\n\r\n")
+                elif path == "/slow":
+                    await asyncio.sleep(1.0)
+                    writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: 0\r\n\r\n")
+                elif path == "/close":
+                    writer.write(b"HTTP/1.1 200 OK\r\nConnection: close\r\nContent-Length: 2\r\n\r\nok")
+                    await writer.drain()
+                    break
+                else:
+                    writer.write(b"HTTP/1.1 404 Not Found\r\nContent-Length: 0\r\n\r\n")
+                await writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            pass  # client went away / server shutting down
+        finally:
+            writer.close()
+
+
+# ---------------------------------------------------------------------------
+# Tests
+# ---------------------------------------------------------------------------
+
+async def test_keepalive_reuse(srv, client):
+    """Sequential requests to one origin share a single connection."""
+    before = srv.connections
+    for i in range(5):
+        r = await client.post_json(f"{srv.base}/echo", {"i": i})
+    check("json round trip", json.loads(r["body"]) == {"i": 4})
+    check("one connection for 5 requests", srv.connections - before == 1)
+
+
+async def test_concurrent_bounded(srv, client):
+    """Concurrent requests open at most max_per_origin connections."""
+    before = srv.connections
+    await asyncio.gather(*[client.get(f"{srv.base}/echo") for _ in range(20)])
+    check("connections bounded by pool size", srv.connections - before <= client.max_per_origin)
+
+
+async def test_chunked_response(srv, client):
+    r = await client.get(f"{srv.base}/chunked")
+    check("chunked body decoded", r.text() == "hello world")
+
+
+async def test_retry_on_503(srv, client):
+    """Idempotent GETs retry 503s with backoff; POSTs don't."""
+    srv.fail_first["/echo"] = 2
+    r = await client.get(f"{srv.base}/echo")
+    check("GET succeeds after two 503s", r.status == 200)
+
+    srv.fail_first["/echo"] = 1
+    r = await client.post(f"{srv.base}/echo", json={})
+    check("POST returns the 503 without retrying", r.status == 503)
+    srv.fail_first.pop("/echo", None)
+
+    try:
+        await client.get_json(f"{srv.base}/missing")
+        check("404 raises HttpStatusError", False)
+    except HttpStatusError as e:
+        check("404 raises HttpStatusError", e.status == 404)
+
+
+async def test_timeout(srv, client):
+    t0 = time.monotonic()
+    try:
+        await client.get(f"{srv.base}/slow", timeout=0.1, retries=0)
+        check("slow request times out", False)
+    except asyncio.TimeoutError:
+        check("slow request times out", time.monotonic() - t0 < 0.5)
+
+
+async def test_server_closed_connection(srv, client):
+    """A connection the server closed is not reused; next request reconnects."""
+    r = await client.get(f"{srv.base}/close")
+    check("close-delimited response read", r.text() == "ok")
+    r = await client.post(f"{srv.base}/echo", json={"after": True})
+    check("next request succeeds on a fresh connection", r.status == 200)
+
+
+async def test_connection_refused(srv, client):
+    """Unreachable origin raises after retries instead of hanging."""
+    fast = AsyncHttpClient(retries=1, backoff=0.01)
+    try:
+        await fast.get("http://127.0.0.1:1/x", timeout=1)
+        check("connection refused raises", False)
+    except OSError:
+        check("connection refused raises", True)
+    finally:
+        await fast.close()
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+
+async def run_all():
+    srv = await StubServer().start()
+    client = AsyncHttpClient(max_per_origin=4, backoff=0.01)
+    tests = [
+        ("Keep-alive reuse", test_keepalive_reuse),
+        ("Concurrent requests bounded per origin", test_concurrent_bounded),
+        ("Chunked response", test_chunked_response),
+        ("Retry policy", test_retry_on_503),
+        ("Per-attempt timeout", test_timeout),
+        ("Server-closed connection", test_server_closed_connection),
+        ("Connection refused", test_connection_refused),
+    ]
+    print("=" * 60)
+    print("Async HTTP Client Tests")
+    print("=" * 60)
+    try:
+        for name, fn in tests:
+            print(f"\n{name}:")
+            try:
+                await fn(srv, client)
+            except Exception as e:
+                print(f"  ERROR: {e}")
+                import traceback
+                traceback.print_exc()
+                global failed
+                failed += 1
+    finally:
+        await client.close()
+        await asyncio.sleep(0.05)  # let server handlers see EOF before shutdown
+        await srv.stop()
+
+
+def main():
+    asyncio.run(run_all())
+    print(f"\n{'=' * 60}")
+    print(f"Results: {passed} passed, {failed} failed")
+    print("=" * 60)
+    sys.exit(0 if failed == 0 else 1)
+
+
+if __name__ == "__main__":
+    main()
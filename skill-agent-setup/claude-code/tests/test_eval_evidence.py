@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""Test key-moment detection, frame selection and the evidence digest
+(eval_evidence.py).
+
+The timeline analysis needs numpy; without it only the uniform-sampling
+fallback and the numpy-free parts of the digest are checked.
+
+Usage:
+    cd ~/tidybot_uni/marketing/Tidybot-Universe/skill-agent-setup/claude-code
+    python tests/test_eval_evidence.py
+"""
+
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import eval_evidence  # noqa: E402
+from recording_cache import sample_frames  # noqa: E402
+
+passed = 0
+failed = 0
+
+
+def check(name, condition):
+    global passed, failed
+    if condition:
+        print(f"  PASS: {name}")
+        passed += 1
+    else:
+        print(f"  FAIL: {name}")
+        failed += 1
+
+
+def pick_and_place_recording(samples: int = 100) -> dict:
+    """10 Hz state, 5 Hz frames from two cameras.
+
+    Base drives for 1 s and stops (i=10), EE descends to its lowest point
+    at i=40, gripper closes at i=45, object detected from i=46, EE lifts.
+    """
+    timeline = []
+    for i in range(samples):
+        x = 0.05 * min(i, 10)
+        z = 0.6 - 0.01 * min(i, 40) + (0.01 * (i - 40) if i > 40 else 0)
+        ee = [0.0] * 16
+        ee[14] = z
+        timeline.append({
+            "timestamp": i / 10,
+            "frame": i // 2,
+            "state": {
+                "base": {"base_pose": [x, 0.0, 0.0]},
+                "arm": {"ee_pose": ee},
+                "gripper": {"position": 20 if i >= 45 else 250, "object_detected": i >= 46},
+            },
+        })
+    frames = [f"{f:04d}_{cam}_camera.jpg" for f in range(samples // 2) for cam in ("base", "wrist")]
+    return {"timeline": timeline, "frames": frames}
+
+
+# ---------------------------------------------------------------------------
+# Tests
+# ---------------------------------------------------------------------------
+
+def test_fallback_without_moments():
+    rec = {"frames": [f"{i:04d}_base_camera.jpg" for i in range(100)], "timeline": []}
+    check("empty timeline -> uniform sampling", eval_evidence.select_key_frames(rec) == sample_frames(rec))
+    check("frame numbers parsed", eval_evidence._frame_number("0042_wrist_camera.jpg") == 42)
+    check("nested state flattened",
+          eval_evidence._flatten({"gripper": {"position": 3}, "t": 1}) == {"gripper.position": 3, "t": 1})
+
+
+def test_key_moments():
+    if eval_evidence.np is None:
+        print("  SKIP: numpy not installed")
+        return
+    moments = eval_evidence.find_key_moments(pick_and_place_recording()["timeline"])
+    at = {(m["kind"], m["index"]) for m in moments}
+    check("start and final", ("start", 0) in at and ("final", 99) in at)
+    check("gripper close", ("gripper_close", 45) in at)
+    check("object detected flip", ("object_detected", 46) in at)
+    check("base stop", ("base_stop", 10) in at)
+    check("EE height minimum", ("ee_min", 40) in at)
+    check("no spurious gripper open", not any(k == "gripper_open" for k, _ in at))
+    check("final first in priority", moments[0]["kind"] == "final")
+
+
+def test_key_frame_selection():
+    if eval_evidence.np is None:
+        print("  SKIP: numpy not installed")
+        return
+    rec = pick_and_place_recording()
+    chosen = eval_evidence.select_key_frames(rec)
+    check("fewer frames than the uniform 30", 0 < len(chosen) < 30)
+    check("both cameras per moment", "0022_base_camera.jpg" in chosen and "0022_wrist_camera.jpg" in chosen)
+    check("final frame kept", "0049_base_camera.jpg" in chosen)
+    check("frames around the grasp", "0023_base_camera.jpg" in chosen and "0021_base_camera.jpg" in chosen)
+    check("recording order preserved", chosen == [f for f in rec["frames"] if f in chosen])
+    small = eval_evidence.select_key_frames(rec, limit=4)
+    check("limit respected, priority events first",
+          small == ["0000_base_camera.jpg", "0000_wrist_camera.jpg",
+                    "0049_base_camera.jpg", "0049_wrist_camera.jpg"])
+
+
+def write_recording(d: Path, rec: dict, stdout: str, stderr: str = "") -> None:
+    (d / "metadata.json").write_text(json.dumps({"execution_id": "e1", "duration": 9.9,
+                                                 "stdout": stdout, "stderr": stderr}))
+    with open(d / "state_log.jsonl", "w") as f:
+        for e in rec["timeline"]:
+            f.write(json.dumps({"timestamp": e["timestamp"], "frame": e["frame"], **e["state"]}) + "\n")
+    for name in ("0000_base_camera.jpg", "0022_base_camera.jpg", "0049_base_camera.jpg"):
+        (d / name).write_bytes(b"jpg")
+
+
+def test_digest():
+    stdout = "init\nDETECT_OK yogurt\nAPPROACH_OK 0.12\nmoving...\nFAILURE: task check failed\n"
+    stderr = "Traceback (most recent call last):\n  File \"main.py\", line 3\nValueError: bad grasp\n"
+    with tempfile.TemporaryDirectory() as tmp:
+        d = Path(tmp)
+        write_recording(d, pick_and_place_recording(), stdout, stderr)
+        (d / "stdout.log").write_text(stdout)
+        digest = eval_evidence.build_digest(d)
+        text = eval_evidence.format_digest(digest)
+    check("markers in order", [m["text"] for m in digest["markers"]] ==
+          ["DETECT_OK yogurt", "APPROACH_OK 0.12", "FAILURE: task check failed"])
+    check("errors from both streams", {e["stream"] for e in digest["errors"]} == {"stdout", "stderr"})
+    check("final exception", digest["exception"] == "ValueError: bad grasp")
+    check("gripper change points", digest["gripper"] == [[0.0, 250.0], [4.5, 20.0], [9.9, 20.0]])
+    check("base displacement", digest["base"]["net_m"] == 0.5 and digest["base"]["path_m"] == 0.5)
+    check("frames listed", [f["name"] for f in digest["frames"]] ==
+          ["0000_base_camera.jpg", "0022_base_camera.jpg", "0049_base_camera.jpg"])
+    check("text block mentions markers and exception",
+          "L2: DETECT_OK yogurt" in text and "final exception: ValueError: bad grasp" in text)
+    if eval_evidence.np is not None:
+        check("phases between moments", digest["phases"][0] == {"from": "start", "to": "base_stop", "seconds": 1.0})
+        check("frames tagged with moments", digest["frames"][1]["moments"] == ["gripper_close"])
+
+
+def test_digest_stdout_from_metadata():
+    with tempfile.TemporaryDirectory() as tmp:
+        d = Path(tmp)
+        write_recording(d, {"timeline": []}, "GRASP_OK\n")
+        digest = eval_evidence.build_digest(d)
+    check("stdout falls back to metadata.json", [m["text"] for m in digest["markers"]] == ["GRASP_OK"])
+    check("no signals -> empty sections", digest["gripper"] == [] and digest["base"] == {})
+
+
+def pre_evaluate_with(stdout="", stderr="", exit_code=None, rec=None):
+    with tempfile.TemporaryDirectory() as tmp:
+        d = Path(tmp)
+        write_recording(d, rec if rec is not None else pick_and_place_recording(), stdout, stderr)
+        meta = json.loads((d / "metadata.json").read_text())
+        meta["exit_code"] = exit_code
+        (d / "metadata.json").write_text(json.dumps(meta))
+        if rec is not None and not rec["timeline"]:
+            for p in d.glob("*.jpg"):
+                p.unlink()
+        return eval_evidence.pre_evaluate(d)
+
+
+def test_pre_evaluate_rules():
+    crash = "Traceback (most recent call last):\n  File \"main.py\", line 3\nValueError: bad grasp\n"
+    v = pre_evaluate_with("DETECT_OK\n", crash, exit_code=1)
+    check("uncaught traceback fails the run", v is not None and v["rule"] == "traceback" and not v["passed"])
+    check("exception quoted", "ValueError: bad grasp" in v["feedback"] and "### Result" in v["feedback"])
+
+    recovered = crash + "retrying grasp\n"
+    check("recovered traceback escalates", pre_evaluate_with("GRASP_OK\n", recovered, exit_code=0) is None)
+
+    v = pre_evaluate_with("DETECT_OK\nFAILURE: task check failed\n", exit_code=0)
+    check("FAILURE on stdout", v["rule"] == "failure_line"
+          and v["evidence"] == ["stdout L2: FAILURE: task check failed"])
+    v = pre_evaluate_with("DETECT_OK\n", exit_code=2)
+    check("non-zero exit code", v["rule"] == "exit_code" and v["evidence"][0] == "exit_code: 2")
+    v = pre_evaluate_with(rec={"timeline": []})
+    check("empty recording", v["rule"] == "empty_recording")
+
+    before = eval_evidence.PRE_EVAL_OUTCOMES.labels("escalated").value
+    check("clean run escalates to the LLM", pre_evaluate_with("DETECT_OK\nGRASP_OK\n", exit_code=0) is None)
+    check("escalations counted", eval_evidence.PRE_EVAL_OUTCOMES.labels("escalated").value == before + 1)
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+
+def main():
+    global failed
+    tests = [
+        ("Fallback and helpers", test_fallback_without_moments),
+        ("Key moments", test_key_moments),
+        ("Key frame selection", test_key_frame_selection),
+        ("Evidence digest", test_digest),
+        ("Digest from fetched recording", test_digest_stdout_from_metadata),
+        ("Pre-evaluator rules", test_pre_evaluate_rules),
+    ]
+    print("=" * 60)
+    print("Eval Evidence Tests")
+    print("=" * 60)
+    for name, fn in tests:
+        print(f"\n{name}:")
+        try:
+            fn()
+        except Exception as e:
+            print(f"  ERROR: {e}")
+            import traceback
+            traceback.print_exc()
+            failed += 1
+    print(f"\n{'=' * 60}")
+    print(f"Results: {passed} passed, {failed} failed")
+    print("=" * 60)
+    sys.exit(0 if failed == 0 else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+"""Test the warm evaluator worker pool (eval_pool.py) with fake sessions.
+
+Usage:
+    cd ~/tidybot_uni/marketing/Tidybot-Universe/skill-agent-setup/claude-code
+    python tests/test_eval_pool.py
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import eval_pool  # noqa: E402
+from eval_pool import EvalJob, EvalWorkerPool  # noqa: E402
+
+passed = 0
+failed = 0
+
+
+def check(name, condition):
+    global passed, failed
+    if condition:
+        print(f"  PASS: {name}")
+        passed += 1
+    else:
+        print(f"  FAIL: {name}")
+        failed += 1
+
+
+class FakeSession:
+    """Records warm-ups; run() sleeps ``run_s`` and echoes the job's skill."""
+
+    reusable = True
+    run_s = 0.2
+    warm_s = 0.0
+    fail_warm = 0       # number of warm() calls (across all sessions) that raise
+    warms = 0
+    closes = 0
+    running = 0
+    max_running = 0
+
+    async def warm(self):
+        cls = type(self)
+        cls.warms += 1
+        if cls.fail_warm > 0:
+            cls.fail_warm -= 1
+            raise RuntimeError("cli died")
+        await asyncio.sleep(cls.warm_s)
+
+    async def run(self, job):
+        cls = type(self)
+        cls.running += 1
+        cls.max_running = max(cls.max_running, cls.running)
+        try:
+            await asyncio.sleep(cls.run_s)
+        finally:
+            cls.running -= 1
+        if job.on_text:
+            await job.on_text(f"checked {job.skill}")
+        return {"ok": True, "skill": job.skill}
+
+    async def close(self):
+        type(self).closes += 1
+
+
+def fake_session_class(**attrs):
+    return type("Fake", (FakeSession,), dict(attrs))
+
+
+# ---------------------------------------------------------------------------
+# Tests
+# ---------------------------------------------------------------------------
+
+def test_warm_before_first_job():
+    """Workers warm their sessions at start(); the first job doesn't pay for it."""
+    Fake = fake_session_class(warm_s=0.3, run_s=0.05)
+
+    async def run():
+        pool = EvalWorkerPool(Fake, size=2)
+        pool.start()
+        await asyncio.sleep(0.4)
+        check("both workers warm", pool.stats()["warm"] == 2)
+        t0 = time.monotonic()
+        res = await pool.submit(EvalJob("a", "sys", "go"))
+        elapsed = time.monotonic() - t0
+        await pool.close()
+        return res, elapsed
+
+    res, elapsed = asyncio.run(run())
+    check("result returned", res == {"ok": True, "skill": "a"})
+    check("no warm-up on the critical path", elapsed < 0.25)
+
+
+def test_cross_skill_concurrency_bounded():
+    Fake = fake_session_class(run_s=0.2)
+
+    async def run():
+        pool = EvalWorkerPool(Fake, size=2)
+        t0 = time.monotonic()
+        results = await asyncio.gather(*[pool.submit(EvalJob(f"s{i}", "", "")) for i in range(4)])
+        elapsed = time.monotonic() - t0
+        stats = pool.stats()
+        await pool.close()
+        return results, elapsed, stats
+
+    results, elapsed, stats = asyncio.run(run())
+    check("all jobs answered in order", [r["skill"] for r in results] == ["s0", "s1", "s2", "s3"])
+    check("never more than size running", Fake.max_running == 2)
+    check("two batches, not four", 0.35 < elapsed < 0.7)
+    check("completed count", stats["completed"] == 4)
+
+
+def test_bounded_queue():
+    Fake = fake_session_class(run_s=0.3)
+
+    async def run():
+        pool = EvalWorkerPool(Fake, size=1, queue_max=1)
+        tasks = [asyncio.ensure_future(pool.submit(EvalJob(f"s{i}", "", ""))) for i in range(3)]
+        await asyncio.sleep(0.1)
+        queued = pool.stats()["queued"]
+        await asyncio.gather(*tasks)
+        await pool.close()
+        return queued
+
+    check("queue never exceeds queue_max", asyncio.run(run()) == 1)
+
+
+def test_single_use_sessions_replaced():
+    Fake = fake_session_class(reusable=False, run_s=0.01)
+
+    async def run():
+        pool = EvalWorkerPool(Fake, size=1)
+        for i in range(3):
+            await pool.submit(EvalJob(f"s{i}", "", ""))
+        await asyncio.sleep(0.05)
+        warm = pool.stats()["warm"]
+        await pool.close()
+        return warm
+
+    warm = asyncio.run(run())
+    check("fresh session per job, plus one waiting", Fake.warms == 4)
+    check("used sessions closed", Fake.closes == 4)
+    check("replacement is warm again", warm == 1)
+
+
+def test_timeout_and_failed_warm():
+    Slow = fake_session_class(run_s=5)
+
+    async def run_timeout():
+        pool = EvalWorkerPool(Slow, size=1)
+        res = await pool.submit(EvalJob("slow", "", "", timeout=0.1))
+        await pool.close()
+        return res
+
+    res = asyncio.run(run_timeout())
+    check("timeout flagged", res.get("ok") is False and res.get("timeout") is True)
+
+    Flaky = fake_session_class(fail_warm=1, run_s=0.01)
+
+    async def run_flaky():
+        pool = EvalWorkerPool(Flaky, size=1)
+        res = await pool.submit(EvalJob("a", "", ""))
+        await pool.close()
+        return res
+
+    res = asyncio.run(run_flaky())
+    check("failed warm-up falls back to a cold start", res.get("ok") is True)
+    check("cold run recorded", eval_pool.EVAL_RUN_SECONDS.labels("cold").count >= 1)
+
+
+class StreamingSession(FakeSession):
+    """Streams a verdict then a long trailing turn; slow to shut down."""
+
+    reusable = False
+
+    async def run(self, job):
+        for block in ('EVAL_RESULT: {"passed": true, "feedback": "ok"}', "trailing summary"):
+            if await job.on_text(block):
+                return {"ok": True, "early": True}
+            await asyncio.sleep(5)
+        return {"ok": True}
+
+    async def close(self):
+        await asyncio.sleep(0.5)
+        type(self).closes += 1
+
+
+def test_early_stop():
+    StreamingSession.closes = 0
+
+    async def run():
+        pool = EvalWorkerPool(StreamingSession, size=1)
+        seen = []
+
+        async def on_text(t):
+            seen.append(t)
+            return t.startswith("EVAL_RESULT")
+
+        t0 = time.monotonic()
+        res = await pool.submit(EvalJob("a", "", "", on_text, timeout=10))
+        elapsed = time.monotonic() - t0
+        await pool.close()
+        return res, elapsed, seen
+
+    before = eval_pool.EVAL_EARLY_STOPS.labels().value
+    res, elapsed, seen = asyncio.run(run())
+    check("resolved at the verdict", res.get("early") is True and seen == [seen[0]])
+    check("did not wait for trailing turns or session close", elapsed < 0.4)
+    check("early stop counted", eval_pool.EVAL_EARLY_STOPS.labels().value == before + 1)
+    check("session still closed", StreamingSession.closes >= 1)
+
+
+class StaleSession(FakeSession):
+    """The first ``stale`` sessions died while idle: run() raises before any text."""
+
+    stale = 0
+    fail_after_text = False
+
+    async def warm(self):
+        cls = type(self)
+        cls.warms += 1
+        self.dead = cls.stale > 0
+        cls.stale -= 1
+
+    async def run(self, job):
+        if self.dead:
+            if type(self).fail_after_text and job.on_text:
+                await job.on_text("partial")
+            raise ConnectionError("connection lost")
+        return await FakeSession.run(self, job)
+
+
+def test_stale_warm_session_retried():
+    Stale = type("Stale", (StaleSession,), {"stale": 1, "warms": 0, "closes": 0})
+
+    async def run(cls):
+        pool = EvalWorkerPool(cls, size=1)
+        seen = []
+
+        async def on_text(t):
+            seen.append(t)
+
+        res = await pool.submit(EvalJob("a", "", "", on_text))
+        await pool.close()
+        return res, seen
+
+    before = eval_pool.EVAL_SESSION_RESTARTS.labels("retry").value
+    res, seen = asyncio.run(run(Stale))
+    check("job retried on a fresh session", res == {"ok": True, "skill": "a"} and seen == ["checked a"])
+    check("retry counted", eval_pool.EVAL_SESSION_RESTARTS.labels("retry").value == before + 1)
+
+    Partial = type("Partial", (StaleSession,), {"stale": 1, "fail_after_text": True,
+                                                "warms": 0, "closes": 0})
+    res, seen = asyncio.run(run(Partial))
+    check("no retry once text was streamed", res.get("ok") is False and seen == ["partial"])
+
+
+def test_idle_session_recycled():
+    Fake = fake_session_class(run_s=0.01)
+
+    async def run():
+        pool = EvalWorkerPool(Fake, size=1, idle_ttl=0.1)
+        pool.start()
+        await asyncio.sleep(0.35)
+        warm = pool.stats()["warm"]
+        res = await pool.submit(EvalJob("a", "", ""))
+        await pool.close()
+        return warm, res
+
+    before = eval_pool.EVAL_SESSION_RESTARTS.labels("idle_ttl").value
+    warm, res = asyncio.run(run())
+    check("idle session replaced after the TTL", Fake.warms >= 3 and Fake.closes >= 2)
+    check("replacement stays warm", warm == 1 and res.get("ok") is True)
+    check("idle recycle counted", eval_pool.EVAL_SESSION_RESTARTS.labels("idle_ttl").value >= before + 2)
+
+
+def test_hung_warm_up_times_out():
+    """A warm() that never returns is abandoned; the worker stays usable."""
+    Fake = fake_session_class(run_s=0.01)
+
+    class Hung(Fake):
+        hangs = 1
+
+        async def warm(self):
+            cls = type(self)
+            if cls.hangs > 0:
+                cls.hangs -= 1
+                await asyncio.Event().wait()   # connect() that never completes
+            await super().warm()
+
+    async def run():
+        pool = EvalWorkerPool(Hung, size=1, warm_timeout=0.1)
+        res = await asyncio.wait_for(pool.submit(EvalJob("a", "", "")), timeout=2)
+        await pool.close()
+        return res
+
+    before = eval_pool.EVAL_SESSION_RESTARTS.labels("warm_timeout").value
+    res = asyncio.run(run())
+    check("job served after a hung warm-up", res == {"ok": True, "skill": "a"})
+    check("hung session closed", Hung.closes >= 1)
+    check("warm-up timeout counted",
+          eval_pool.EVAL_SESSION_RESTARTS.labels("warm_timeout").value == before + 1)
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+
+def main():
+    global failed
+    tests = [
+        ("Warm before first job", test_warm_before_first_job),
+        ("Cross-skill concurrency", test_cross_skill_concurrency_bounded),
+        ("Bounded queue", test_bounded_queue),
+        ("Single-use sessions", test_single_use_sessions_replaced),
+        ("Timeout and failed warm-up", test_timeout_and_failed_warm),
+        ("Early stop at EVAL_RESULT", test_early_stop),
+        ("Stale warm session retried", test_stale_warm_session_retried),
+        ("Idle sessions recycled", test_idle_session_recycled),
+        ("Hung warm-up times out", test_hung_warm_up_times_out),
+    ]
+    print("=" * 60)
+    print("Eval Pool Tests")
+    print("=" * 60)
+    for name, fn in tests:
+        print(f"\n{name}:")
+        try:
+            fn()
+        except Exception as e:
+            print(f"  ERROR: {e}")
+            import traceback
+            traceback.print_exc()
+            failed += 1
+    print(f"\n{'=' * 60}")
+    print(f"Results: {passed} passed, {failed} failed")
+    print("=" * 60)
+    sys.exit(0 if failed == 0 else 1)
+
+
+if __name__ == "__main__":
+    main()
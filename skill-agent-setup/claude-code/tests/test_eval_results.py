@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""Test the evaluator verdict store (eval_results.py).
+
+Usage:
+    cd ~/tidybot_uni/marketing/Tidybot-Universe/skill-agent-setup/claude-code
+    python tests/test_eval_results.py
+"""
+
+import asyncio
+import hashlib
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from eval_results import EnvelopeParser, EvalResultStore, code_key, find_envelope  # noqa: E402
+
+passed = 0
+failed = 0
+
+
+def check(name, condition):
+    global passed, failed
+    if condition:
+        print(f"  PASS: {name}")
+        passed += 1
+    else:
+        print(f"  FAIL: {name}")
+        failed += 1
+
+
+class Evaluator:
+    """Counts calls; returns a parsed verdict after ``delay`` seconds."""
+
+    def __init__(self, delay=0.05, parsed=True):
+        self.calls = 0
+        self.delay = delay
+        self.parsed = parsed
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return {"passed": False, "feedback": f"run {self.calls}", "full_text": "EVAL_RESULT: ...",
+                "parsed": self.parsed}
+
+
+# ---------------------------------------------------------------------------
+# Tests
+# ---------------------------------------------------------------------------
+
+def test_code_key():
+    bundle = hashlib.sha256(b"print('g')").hexdigest()
+    k1 = code_key("grasp", bundle, "pick it up")
+    check("stable", k1 == code_key("grasp", bundle, "pick it up"))
+    check("description is part of the key", k1 != code_key("grasp", bundle, "other task"))
+    check("skill is part of the key", k1 != code_key("detect", bundle, "pick it up"))
+    other = hashlib.sha256(b"print('g2')").hexdigest()
+    check("submitted code is part of the key", k1 != code_key("grasp", other, "pick it up"))
+
+
+def test_execution_and_code_hits():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "eval_results.jsonl"
+        ev = Evaluator()
+
+        async def run():
+            store = EvalResultStore(path)
+            first = await store.run_once("e1", "c1", "grasp", ev)
+            same_exec = await store.run_once("e1", "c2", "grasp", ev)
+            same_code = await store.run_once("e2", "c1", "grasp", ev)
+            fresh = await store.run_once("e3", "c3", "grasp", ev)
+            return first, same_exec, same_code, fresh
+
+        first, same_exec, same_code, fresh = asyncio.run(run())
+        check("first request evaluates", first["feedback"] == "run 1" and "cached" not in first)
+        check("same execution reuses verdict", same_exec["cached"] == "execution"
+              and same_exec["feedback"] == "run 1")
+        check("same code reuses verdict", same_code["cached"] == "code" and same_code["cached_from"] == "e1")
+        check("new evidence evaluates", fresh["feedback"] == "run 2" and ev.calls == 2)
+
+        reopened = EvalResultStore(path)
+        rec, hit = reopened.lookup("e3", "", "grasp")
+        check("persisted across restarts", hit == "execution" and rec["feedback"] == "run 2")
+
+
+def test_execution_key_is_per_skill():
+    with tempfile.TemporaryDirectory() as tmp:
+        ev = Evaluator()
+
+        async def run():
+            store = EvalResultStore(Path(tmp) / "eval_results.jsonl")
+            a = await store.run_once("exec-1", "codeA", "skill-a", ev, description="A")
+            b = await store.run_once("exec-1", "codeB", "skill-b", ev, description="B")
+            a2 = await store.run_once("exec-1", "", "skill-a", ev, description="A, reworded")
+            again = await store.run_once("exec-1", "", "skill-b", ev, description="B")
+            return a, b, a2, again
+
+        a, b, a2, again = asyncio.run(run())
+        check("other skill's verdict on the same execution not reused",
+              "cached" not in b and b["feedback"] == "run 2")
+        check("changed description re-evaluates", "cached" not in a2 and ev.calls == 3)
+        check("same skill and description still reused",
+              again["cached"] == "execution" and again["feedback"] == "run 2")
+
+
+def test_no_code_key_without_one():
+    with tempfile.TemporaryDirectory() as tmp:
+        ev = Evaluator()
+
+        async def run():
+            store = EvalResultStore(Path(tmp) / "eval_results.jsonl")
+            await store.run_once("e1", "", "grasp", ev)
+            return store, await store.run_once("e2", "", "grasp", ev)
+
+        store, second = asyncio.run(run())
+        check("empty code key never matches", "cached" not in second and ev.calls == 2)
+        check("nothing stored under an empty code key", store.by_code == {})
+
+
+def test_concurrent_requests_share_one_eval():
+    with tempfile.TemporaryDirectory() as tmp:
+        ev = Evaluator(delay=0.2)
+
+        async def run():
+            store = EvalResultStore(Path(tmp) / "eval_results.jsonl")
+            return await asyncio.gather(
+                store.run_once("e1", "c1", "grasp", ev),
+                store.run_once("e1", "c1", "grasp", ev),
+                store.run_once("e9", "c1", "grasp", ev),
+            )
+
+        results = asyncio.run(run())
+        check("one evaluation", ev.calls == 1)
+        check("all callers get it", all(r["feedback"] == "run 1" for r in results))
+
+
+def test_unparsed_not_stored():
+    with tempfile.TemporaryDirectory() as tmp:
+        ev = Evaluator(parsed=False)
+
+        async def run():
+            store = EvalResultStore(Path(tmp) / "eval_results.jsonl")
+            await store.run_once("e1", "c1", "grasp", ev)
+            await store.run_once("e1", "c1", "grasp", ev)
+
+        asyncio.run(run())
+        check("timeouts / unparseable output are retried", ev.calls == 2)
+
+
+def test_envelope_parser_streaming():
+    p = EnvelopeParser()
+    check("no verdict in prose", p.feed("The gripper closed at t=4.5s.") is None)
+    check("incomplete object waits", p.feed('EVAL_RESULT: {"passed": false, "feedback": "a } b') is None)
+    res = p.feed('still dropped"}')
+    check("object split across blocks", res == {"passed": False, "feedback": "a } b\nstill dropped"})
+    check("later blocks ignored", p.feed('EVAL_RESULT: {"passed": true}') == res)
+
+
+def test_find_envelope_variants():
+    check("code fence", find_envelope('EVAL_RESULT:\n```json\n{"passed": true, "feedback": "x"}\n```')
+          == {"passed": True, "feedback": "x"})
+    check("single quotes", find_envelope("EVAL_RESULT: {'passed': true, 'feedback': 'x'}")
+          == {"passed": True, "feedback": "x"})
+    check("doubled braces from the prompt example",
+          find_envelope('EVAL_RESULT: {{"passed": false, "feedback": "y"}}') == {"passed": False, "feedback": "y"})
+    check("placeholder skipped for the real verdict",
+          find_envelope('format: EVAL_RESULT: {...}\nEVAL_RESULT: {"passed": true}') == {"passed": True})
+    check("no passed key is not a verdict", find_envelope('EVAL_RESULT: {"feedback": "x"}') is None)
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+
+def main():
+    global failed
+    tests = [
+        ("Code key", test_code_key),
+        ("Execution and code hits", test_execution_and_code_hits),
+        ("Execution key is per skill", test_execution_key_is_per_skill),
+        ("No code key without one", test_no_code_key_without_one),
+        ("Concurrent requests", test_concurrent_requests_share_one_eval),
+        ("Unparsed results not stored", test_unparsed_not_stored),
+        ("Streaming envelope parser", test_envelope_parser_streaming),
+        ("Envelope variants", test_find_envelope_variants),
+    ]
+    print("=" * 60)
+    print("Eval Result Store Tests")
+    print("=" * 60)
+    for name, fn in tests:
+        print(f"\n{name}:")
+        try:
+            fn()
+        except Exception as e:
+            print(f"  ERROR: {e}")
+            import traceback
+            traceback.print_exc()
+            failed += 1
+    print(f"\n{'=' * 60}")
+    print(f"Results: {passed} passed, {failed} failed")
+    print("=" * 60)
+    sys.exit(0 if failed == 0 else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""Test job completion waiting: event stream, long-poll and adaptive polling.
+
+Runs against tests/stub_agent_server.py — no robot or sim needed.
+
+Usage:
+    cd ~/tidybot_uni/marketing/Tidybot-Universe/skill-agent-setup/claude-code
+    python tests/test_job_waiter.py
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+import job_waiter  # noqa: E402
+from async_http import AsyncHttpClient  # noqa: E402
+from stub_agent_server import StubAgentServer  # noqa: E402
+
+passed = 0
+failed = 0
+
+JOB_S = 0.6
+
+
+def check(name, condition):
+    global passed, failed
+    if condition:
+        print(f"  PASS: {name}")
+        passed += 1
+    else:
+        print(f"  FAIL: {name}")
+        failed += 1
+
+
+def timed_wait(stub, **kw):
+    job_id = stub.submit("print('hi')")
+    t0 = time.monotonic()
+    job = job_waiter.wait_for_job(stub.url, job_id, **kw)
+    return job, time.monotonic() - t0
+
+
+# ---------------------------------------------------------------------------
+# Tests
+# ---------------------------------------------------------------------------
+
+def test_event_stream():
+    """Completion is pushed over SSE; no polling at all."""
+    stub = StubAgentServer(events=True, job_duration=JOB_S).start()
+    try:
+        job, elapsed = timed_wait(stub, timeout=10)
+        check("job completed", job.get("status") == "completed")
+        check("result included", job.get("result", {}).get("stdout") == "done\n")
+        check("latency close to job duration", elapsed < JOB_S + 0.3)
+        check("no polls issued", stub.requests.get("poll", 0) == 0)
+    finally:
+        stub.stop()
+
+
+def test_long_poll():
+    """Without SSE, a long-polling server is asked about once per change."""
+    stub = StubAgentServer(long_poll=True, job_duration=JOB_S).start()
+    try:
+        job, elapsed = timed_wait(stub, timeout=10)
+        check("job completed", job.get("status") == "completed")
+        check("latency close to job duration", elapsed < JOB_S + 0.3)
+        check("at most two polls", stub.requests.get("poll", 0) <= 2)
+        check("SSE-less origin remembered", job_waiter._origin(stub.url) in job_waiter._no_event_stream)
+        job, _ = timed_wait(stub, timeout=10)
+        check("second wait skips event probe", stub.requests.get("events", 0) == 0)
+    finally:
+        stub.stop()
+
+
+def test_adaptive_polling():
+    """A plain polling server still gets sub-2s latency with few requests."""
+    stub = StubAgentServer(job_duration=JOB_S).start()
+    try:
+        job, elapsed = timed_wait(stub, timeout=10)
+        check("job completed", job.get("status") == "completed")
+        check("latency well under old 2s poll", elapsed < JOB_S + 0.6)
+        check("poll count bounded", stub.requests.get("poll", 0) <= 8)
+    finally:
+        stub.stop()
+
+
+def test_timeout():
+    stub = StubAgentServer(job_duration=5).start()
+    try:
+        job, elapsed = timed_wait(stub, timeout=0.5)
+        check("timeout status", job.get("status") == "timeout")
+        check("returns at the deadline", elapsed < 1.5)
+    finally:
+        stub.stop()
+
+
+def test_async_variants():
+    async def run():
+        http = AsyncHttpClient()
+        results = {}
+        for name, kw in (("events", {"events": True}), ("long_poll", {"long_poll": True}),
+                         ("polling", {})):
+            stub = StubAgentServer(job_duration=JOB_S, **kw).start()
+            try:
+                job_id = stub.submit("x")
+                t0 = time.monotonic()
+                job = await job_waiter.wait_for_job_async(http, stub.url, job_id, timeout=10)
+                results[name] = (job.get("status"), time.monotonic() - t0, dict(stub.requests))
+            finally:
+                stub.stop()
+        await http.close()
+        return results
+
+    results = asyncio.run(run())
+    for name, (status, elapsed, reqs) in results.items():
+        check(f"async {name}: completed", status == "completed")
+        check(f"async {name}: latency", elapsed < JOB_S + 0.6)
+    check("async events: no polls", results["events"][2].get("poll", 0) == 0)
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+
+def main():
+    global failed
+    tests = [
+        ("Event stream push", test_event_stream),
+        ("Long-poll fallback", test_long_poll),
+        ("Adaptive polling fallback", test_adaptive_polling),
+        ("Timeout", test_timeout),
+        ("Async waiter", test_async_variants),
+    ]
+    print("=" * 60)
+    print("Job Waiter Tests")
+    print("=" * 60)
+    for name, fn in tests:
+        print(f"\n{name}:")
+        try:
+            fn()
+        except Exception as e:
+            print(f"  ERROR: {e}")
+            import traceback
+            traceback.print_exc()
+            failed += 1
+    print(f"\n{'=' * 60}")
+    print(f"Results: {passed} passed, {failed} failed")
+    print("=" * 60)
+    sys.exit(0 if failed == 0 else 1)
+
+
+if __name__ == "__main__":
+    main()
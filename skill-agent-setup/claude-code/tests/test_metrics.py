@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""Test the Prometheus text rendering in metrics.py.
+
+Usage:
+    cd ~/tidybot_uni/marketing/Tidybot-Universe/skill-agent-setup/claude-code
+    python tests/test_metrics.py
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import metrics  # noqa: E402
+
+passed = 0
+failed = 0
+
+
+def check(name, condition):
+    global passed, failed
+    if condition:
+        print(f"  PASS: {name}")
+        passed += 1
+    else:
+        print(f"  FAIL: {name}")
+        failed += 1
+
+
+# ---------------------------------------------------------------------------
+# Tests
+# ---------------------------------------------------------------------------
+
+def test_counter_and_gauge():
+    c = metrics.counter("t_requests_total", "Requests", ["code"])
+    c.labels("200").inc()
+    c.labels(code="200").inc(2)
+    c.labels("500").inc()
+    g = metrics.gauge("t_temperature", "Temp")
+    g.set(1.5)
+    text = metrics.render()
+    check("counter HELP/TYPE", "# HELP t_requests_total Requests\n# TYPE t_requests_total counter" in text)
+    check("positional and keyword labels share a series", 't_requests_total{code="200"} 3' in text)
+    check("second label set", 't_requests_total{code="500"} 1' in text)
+    check("unlabelled gauge", "t_temperature 1.5" in text)
+
+
+def test_histogram_buckets_cumulative():
+    h = metrics.histogram("t_latency_seconds", "Latency", buckets=(0.1, 1.0))
+    for v in (0.05, 0.5, 0.5, 5.0):
+        h.observe(v)
+    text = metrics.render()
+    check("le=0.1 bucket", 't_latency_seconds_bucket{le="0.1"} 1' in text)
+    check("le=1 bucket is cumulative", 't_latency_seconds_bucket{le="1"} 3' in text)
+    check("+Inf bucket is the count", 't_latency_seconds_bucket{le="+Inf"} 4' in text)
+    check("sum", "t_latency_seconds_sum 6.05" in text)
+    check("count", "t_latency_seconds_count 4" in text)
+
+
+def test_registry_and_escaping():
+    a = metrics.counter("t_shared_total", "Shared", ["x"])
+    check("get-or-create returns the same object", metrics.counter("t_shared_total", "Shared", ["x"]) is a)
+    try:
+        metrics.gauge("t_shared_total", "Shared", ["x"])
+        check("type mismatch rejected", False)
+    except ValueError:
+        check("type mismatch rejected", True)
+    a.labels('a"b\\c').inc()
+    check("label values escaped", 't_shared_total{x="a\\"b\\\\c"} 1' in metrics.render())
+
+
+def test_collectors():
+    g = metrics.gauge("t_live", "Live")
+    calls = []
+
+    def collect():
+        calls.append(1)
+        g.set(len(calls))
+
+    def broken():
+        raise RuntimeError("boom")
+
+    metrics.register_collector(collect)
+    metrics.register_collector(collect)
+    metrics.register_collector(broken)
+    text = metrics.render()
+    check("collector runs once per render", calls == [1])
+    check("collector output rendered", "t_live 1" in text)
+    check("broken collector doesn't break render", "t_requests_total" in text)
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+
+def main():
+    global failed
+    tests = [
+        ("Counter and gauge", test_counter_and_gauge),
+        ("Histogram buckets", test_histogram_buckets_cumulative),
+        ("Registry and escaping", test_registry_and_escaping),
+        ("Scrape-time collectors", test_collectors),
+    ]
+    print("=" * 60)
+    print("Metrics Tests")
+    print("=" * 60)
+    for name, fn in tests:
+        print(f"\n{name}:")
+        try:
+            fn()
+        except Exception as e:
+            print(f"  ERROR: {e}")
+            import traceback
+            traceback.print_exc()
+            failed += 1
+    print(f"\n{'=' * 60}")
+    print(f"Results: {passed} passed, {failed} failed")
+    print("=" * 60)
+    sys.exit(0 if failed == 0 else 1)
+
+
+if __name__ == "__main__":
+    main()
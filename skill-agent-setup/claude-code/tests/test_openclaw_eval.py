@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""Test concurrent openclaw evaluations against a fake ``openclaw`` CLI.
+
+Two evals running at once must each read their own session transcript:
+an early stop on one skill's EVAL_RESULT can't come from the other run.
+
+Usage:
+    cd ~/tidybot_uni/marketing/Tidybot-Universe/skill-agent-setup/claude-code
+    python tests/test_openclaw_eval.py
+"""
+
+import asyncio
+import os
+import stat
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+passed = 0
+failed = 0
+
+# `openclaw agents list|add` and `openclaw agent --local --agent <id> -m <prompt>`.
+# An eval run writes a new session file for its agent, streams the verdict
+# for the skill named in the prompt, then idles so only an early stop ends it.
+FAKE_CLI = r'''#!/usr/bin/env python3
+import json, os, sys, time, uuid
+from pathlib import Path
+home = Path(os.environ["OPENCLAW_HOME"])
+args = sys.argv[1:]
+if args[:2] == ["agents", "list"]:
+    print(json.dumps([{"id": p.name} for p in (home / "agents").iterdir()]))
+    sys.exit(0)
+if args[:2] == ["agents", "add"]:
+    (home / "agents" / args[2] / "agent").mkdir(parents=True, exist_ok=True)
+    sys.exit(0)
+agent = args[args.index("--agent") + 1]
+prompt = args[args.index("-m") + 1]
+skill = prompt.split("SKILL=")[1].split()[0]
+sdir = home / "agents" / agent / "sessions"
+sdir.mkdir(parents=True, exist_ok=True)
+delay = 0.2 if skill == "fast" else 1.2
+with open(sdir / f"{uuid.uuid4()}.jsonl", "a") as f:
+    time.sleep(delay)
+    msg = {"type": "message", "message": {"role": "assistant", "content": [
+        {"type": "text", "text": f'EVAL_RESULT: {{"skill": "{skill}"}}'}]}}
+    f.write(json.dumps(msg) + "\n")
+    f.flush()
+    time.sleep(30)
+'''
+
+
+def check(name, condition):
+    global passed, failed
+    if condition:
+        print(f"  PASS: {name}")
+        passed += 1
+    else:
+        print(f"  FAIL: {name}")
+        failed += 1
+
+
+def test_concurrent_evals_tail_their_own_session(oc):
+    async def one(skill):
+        seen = []
+
+        async def on_text(t):
+            seen.append(t)
+            return t.startswith("EVAL_RESULT")
+
+        res = await oc._run_eval_openclaw(skill, "sys", f"SKILL={skill} judge it",
+                                          on_text=on_text, timeout_s=20)
+        busy[skill] = set(oc._eval_slots_busy)
+        return res, seen
+
+    busy = {}
+
+    async def run():
+        results = await asyncio.gather(one("slow"), one("fast"))
+        for _ in range(50):
+            if not oc._eval_slots_busy:
+                break
+            await asyncio.sleep(0.1)
+        return results, set(oc._eval_slots_busy)
+
+    (slow, fast), busy_later = asyncio.run(run())
+    check("fast eval stopped on its own verdict",
+          fast[0].get("early") is True and fast[1] == ['EVAL_RESULT: {"skill": "fast"}'])
+    check("slow eval not stopped by the other skill's verdict",
+          slow[0].get("early") is True and slow[1] == ['EVAL_RESULT: {"skill": "slow"}'])
+    check("second concurrent eval ran on a derived agent",
+          (oc.OPENCLAW_HOME / "agents" / "tidybot-evaluator-w1" / "sessions").is_dir())
+    check("early-stopped eval keeps its slot until the subprocess exits", busy["fast"] == {0, 1})
+    check("slots released afterwards", busy_later == set())
+
+
+def main():
+    global failed
+    tmp = tempfile.TemporaryDirectory()
+    root = Path(tmp.name)
+    bin_dir = root / "bin"
+    bin_dir.mkdir()
+    cli = bin_dir / "openclaw"
+    cli.write_text(FAKE_CLI.replace("#!/usr/bin/env python3", f"#!{sys.executable}", 1))
+    cli.chmod(cli.stat().st_mode | stat.S_IEXEC)
+    home = root / "openclaw"
+    (home / "agents" / "tidybot-evaluator" / "agent").mkdir(parents=True)
+    os.environ["OPENCLAW_HOME"] = str(home)
+    os.environ["PATH"] = f"{bin_dir}{os.pathsep}{os.environ['PATH']}"
+
+    # The backend only needs WORKSPACE_DIR (the subprocess cwd) from the orchestrator.
+    import types
+    orch_stub = types.ModuleType("agent_orchestrator")
+    orch_stub.WORKSPACE_DIR = root
+    sys.modules["agent_orchestrator"] = orch_stub
+
+    import agent_orchestrator_openclaw as oc
+
+    tests = [
+        ("Concurrent evals tail their own session", test_concurrent_evals_tail_their_own_session),
+    ]
+    print("=" * 60)
+    print("OpenClaw Eval Tests")
+    print("=" * 60)
+    for name, fn in tests:
+        print(f"\n{name}:")
+        try:
+            fn(oc)
+        except Exception as e:
+            print(f"  ERROR: {e}")
+            import traceback
+            traceback.print_exc()
+            failed += 1
+    tmp.cleanup()
+    print(f"\n{'=' * 60}")
+    print(f"Results: {passed} passed, {failed} failed")
+    print("=" * 60)
+    sys.exit(0 if failed == 0 else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -733,6 +733,852 @@ async def test_graph_meta_load(orch):
         os.unlink(graph_file.name)
 
 
+async def test_registry_indexes_follow_mutations(orch):
+    """Registry name/dependency/dependents indexes track add, update, remove."""
+    orch.skill_entries = [
+        make_entry("grasp"),
+        make_entry("navigate"),
+        make_entry("task", deps=["grasp", "navigate"]),
+    ]
+    reg = orch._registry()
+    check("lookup by name", reg.get("grasp") is orch.skill_entries[0])
+    check("dependents of grasp", reg.dependents.get("grasp") == {"task"})
+
+    orch._add_entry("place", "Place object", ["grasp"])
+    check("added skill indexed", orch._find_entry("place") is not None)
+    check("new dependent recorded", reg.dependents.get("grasp") == {"task", "place"})
+
+    orch._update_entry("task", {"dependencies": ["navigate"]})
+    check("dependents follow dependency update", reg.dependents.get("grasp") == {"place"})
+
+    orch._remove_entry("place")
+    check("removed skill dropped", orch._find_entry("place") is None)
+    check("dependents of removed skill cleaned up", "grasp" not in reg.dependents)
+    check("remove of unknown skill returns False", orch._remove_entry("nope") is False)
+
+
+async def test_registry_rebinds_on_list_swap(orch):
+    """Rebinding skill_entries to a new list is picked up on the next lookup."""
+    orch.skill_entries = [make_entry("a")]
+    check("a found", orch._find_entry("a") is not None)
+    orch.skill_entries = [make_entry("b", deps=["c"]), make_entry("c")]
+    orch.graph_meta = {"task_env": "RoboCasa-Test-v0"}
+    check("a gone after swap", orch._find_entry("a") is None)
+    check("b is root after swap", orch._is_task_root("b"))
+    check("c not root after swap", not orch._is_task_root("c"))
+
+
+async def test_registry_readiness_counters(orch):
+    """Unmet-dependency counters follow status changes via reverse edges."""
+    orch.skill_entries = [
+        make_entry("grasp"),
+        make_entry("navigate"),
+        make_entry("task", deps=["grasp", "navigate"]),
+        make_entry("extra", deps=["missing"]),
+    ]
+    reg = orch._registry()
+    check("leaves ready", reg.ready_names() == ["grasp", "navigate"])
+    check("task waits on two deps", reg.unmet["task"] == 2)
+    check("missing dep counts as unmet", reg.unmet["extra"] == 1)
+
+    orch._update_entry("grasp", {"status": "done"})
+    check("done dep decrements dependent", reg.unmet["task"] == 1)
+    check("done skill leaves ready set", "grasp" not in reg.ready)
+    orch._update_entry("navigate", {"status": "done"})
+    check("task ready once all deps done", reg.ready_names() == ["task"])
+    orch._update_entry("task", {"status": "writing"})
+    check("in-progress skill not ready", "task" not in reg.ready)
+
+    orch._update_entry("navigate", {"status": "review"})
+    check("un-done dep blocks again", reg.unmet["task"] == 1)
+    orch._add_entry("missing")
+    orch._update_entry("missing", {"status": "done"})
+    check("re-added dependency unblocks", reg.unmet["extra"] == 0 and "extra" in reg.ready)
+    orch._remove_entry("missing")
+    check("removed done dependency blocks again", reg.unmet["extra"] == 1)
+
+    fresh = orch.SkillRegistry()
+    fresh.rebuild(orch.skill_entries)
+    check("incremental counters match a rebuild",
+          fresh.unmet == reg.unmet and fresh.ready == reg.ready)
+
+
+async def test_dependency_cycles_rejected(orch):
+    """Cycles are refused at add/update time and flagged at load instead of deadlocking."""
+    orch.skill_entries = [make_entry("a", deps=["b"]), make_entry("b", deps=["c"])]
+    try:
+        orch._add_entry("c", "", ["a"])
+        check("add closing a cycle raises", False)
+    except ValueError as e:
+        check("add closing a cycle raises", "a -> b -> c -> a" in str(e))
+    check("rejected entry not added", orch._find_entry("c") is None)
+
+    orch._add_entry("c")
+    try:
+        orch._update_entry("c", {"dependencies": ["a"]})
+        check("update closing a cycle raises", False)
+    except ValueError:
+        check("update closing a cycle raises", orch._find_entry("c")["dependencies"] == [])
+    check("self-dependency is a cycle", orch._registry().cycle_with("c", ["c"]) == ["c", "c"])
+    check("acyclic graph passes", orch.find_dependency_cycle({"x": ["y"], "y": []}) is None)
+
+    patch = json.dumps({"dependencies": ["a"]})
+    status, _, body = await http_request(
+        orch, f"PATCH /entries/c HTTP/1.1\r\nContent-Length: {len(patch)}\r\n\r\n{patch}")
+    check("cyclic PATCH -> 400", "400" in status and "cycle" in json.loads(body)["error"])
+
+    from pathlib import Path
+    graph_file = Path(make_graph([make_entry("p", deps=["q"]), make_entry("q", deps=["p"])]))
+    old_repos = orch.LOCAL_REPOS
+    orch.LOCAL_REPOS = graph_file
+    try:
+        orch._load_entries()
+        check("cyclic graph.json still loads", orch._find_entry("p") is not None)
+        check("skills on the cycle are marked",
+              all("p -> q -> p" in (orch._find_entry(n).get("agent_status_text") or "")
+                  for n in ("p", "q")))
+    finally:
+        orch.LOCAL_REPOS = old_repos
+        os.unlink(graph_file)
+
+
+async def test_graph_write_behind(orch):
+    """Burst updates coalesce into one atomic graph.json write."""
+    from pathlib import Path
+    graph_file = Path(make_graph([]))
+    old_repos = orch.LOCAL_REPOS
+    old_debounce = orch.GRAPH_FLUSH_DEBOUNCE_S
+    orch.LOCAL_REPOS = graph_file
+    orch.GRAPH_FLUSH_DEBOUNCE_S = 0.05
+    orch.skill_entries = [make_entry("grasp")]
+    try:
+        orch._start_graph_persister()
+        writes_before = orch._graph_persist.writes
+        for i in range(10):
+            orch._update_entry("grasp", {"total_trials": i})
+        check("no write during debounce window", json.loads(graph_file.read_text()) == [])
+        await asyncio.sleep(0.2)
+        on_disk = json.loads(graph_file.read_text())
+        check("burst flushed once", orch._graph_persist.writes == writes_before + 1)
+        check("latest value persisted", on_disk[0]["total_trials"] == 9)
+
+        orch._update_entry("grasp", {"status": "review"})
+        await orch._stop_graph_persister()
+        check("shutdown flush writes pending changes",
+              json.loads(graph_file.read_text())[0]["status"] == "review")
+        leftovers = [p for p in graph_file.parent.glob(f".{graph_file.name}.*.tmp")]
+        check("no temp files left behind", leftovers == [])
+
+        # A write already in a worker thread at shutdown must not land
+        # after the final flush.
+        real_write = orch._atomic_write_text
+
+        def slow_write(path, text):
+            time.sleep(0.3)
+            real_write(path, text)
+
+        orch._atomic_write_text = slow_write
+        try:
+            orch._start_graph_persister()
+            orch._update_entry("grasp", {"status": "testing"})
+            await asyncio.sleep(0.15)          # flush loop is now inside slow_write
+            orch._update_entry("grasp", {"status": "done"})
+            await orch._stop_graph_persister()
+            time.sleep(0.4)
+        finally:
+            orch._atomic_write_text = real_write
+        check("in-flight write can't overwrite the final flush",
+              json.loads(graph_file.read_text())[0]["status"] == "done")
+    finally:
+        await orch._stop_graph_persister()
+        orch.LOCAL_REPOS = old_repos
+        orch.GRAPH_FLUSH_DEBOUNCE_S = old_debounce
+        os.unlink(graph_file)
+
+
+async def test_delta_broadcasts(orch):
+    """Changes broadcast as seq-numbered field patches, not full syncs."""
+    orch.skill_entries = [make_entry("grasp"), make_entry("place", deps=["grasp"])]
+    await orch.broadcast_changes()  # baseline
+    base_seq = orch._delta_state.seq
+    check("full_sync carries current seq", orch.build_full_sync()["seq"] == base_seq)
+
+    orch.ws_broadcast.reset_mock()
+    await orch.broadcast_changes()
+    check("no changes -> nothing sent", orch.ws_broadcast.call_count == 0)
+
+    orch._update_entry("grasp", {"status": "writing"})
+    await orch.broadcast_changes()
+    msgs = [c.args[0] for c in orch.ws_broadcast.call_args_list]
+    patches = [m for m in msgs if m["type"] == "entry_patch"]
+    check("one entry_patch for the updated skill",
+          len(patches) == 1 and patches[0]["name"] == "grasp")
+    check("patch carries only changed fields",
+          set(patches[0]["fields"]) == {"status", "updated_at"})
+    check("no full_sync sent", not any(m["type"] == "full_sync" for m in msgs))
+    check("seq increments by one per message",
+          [m["seq"] for m in msgs] == list(range(base_seq + 1, base_seq + 1 + len(msgs))))
+
+    orch.ws_broadcast.reset_mock()
+    orch.agents["a1"] = orch.AgentState(agent_id="a1", skill="place", status="running")
+    await orch.broadcast_changes()
+    msgs = [c.args[0] for c in orch.ws_broadcast.call_args_list]
+    check("agent_patch for new agent",
+          any(m["type"] == "agent_patch" and m["agent_id"] == "a1" for m in msgs))
+    check("entry_patch for skill with new agent",
+          any(m["type"] == "entry_patch" and m["name"] == "place"
+              and m["fields"].get("agent_id") == "a1" for m in msgs))
+
+    orch.ws_broadcast.reset_mock()
+    orch.agents.pop("a1")
+    orch._remove_entry("grasp")
+    await orch.broadcast_changes()
+    msgs = [c.args[0] for c in orch.ws_broadcast.call_args_list]
+    check("agent removal patch", any(m["type"] == "agent_patch" and m.get("removed") for m in msgs))
+    check("entry removal patch",
+          any(m["type"] == "entry_patch" and m["name"] == "grasp" and m.get("removed") for m in msgs))
+    check("overlay cleared once agent is gone",
+          any(m["type"] == "entry_patch" and m["name"] == "place"
+              and "target_agents" in m["fields"] for m in msgs))
+
+    orch.ws_broadcast.reset_mock()
+    orch.agents["a2"] = orch.AgentState(agent_id="a2", skill="place", status="running")
+    orch.agents["a2"].session_id = "sess-a2"
+    orch.agents["a2"].log.append("hello")
+    await orch.broadcast_changes()
+    msgs = [c.args[0] for c in orch.ws_broadcast.call_args_list]
+    live = [m["fields"]["live_sessions"] for m in msgs
+            if m["type"] == "sync_patch" and "live_sessions" in m["fields"]]
+    check("sync_patch carries live_sessions for a new session",
+          len(live) == 1 and live[0][0]["session_id"] == "sess-a2"
+          and live[0][0]["log"] == ["hello"] and "timestamp" in live[0][0])
+
+    orch.ws_broadcast.reset_mock()
+    await orch.broadcast_changes()
+    check("unchanged live sessions not re-sent", orch.ws_broadcast.call_count == 0)
+
+    orch.agents["a2"].log.append("more")
+    await orch.broadcast_changes()
+    msgs = [c.args[0] for c in orch.ws_broadcast.call_args_list]
+    check("log growth re-sends live_sessions",
+          any(m["type"] == "sync_patch"
+              and m["fields"].get("live_sessions", [{}])[0].get("log") == ["hello", "more"]
+              for m in msgs))
+    orch.agents.pop("a2")
+
+
+class FakeWebSocket:
+    """Websocket stand-in whose send() can be stalled."""
+
+    def __init__(self, stalled=False):
+        self.sent = []
+        self.stalled = stalled
+        self.closed = False
+        self.remote_address = ("127.0.0.1", 5000 + id(self) % 1000)
+
+    async def send(self, data):
+        while self.stalled:
+            await asyncio.sleep(0.01)
+        self.sent.append(json.loads(data))
+
+    async def close(self):
+        self.closed = True
+
+
+class ScriptedWebSocket(FakeWebSocket):
+    """FakeWebSocket that also delivers ``incoming`` messages to the handler."""
+
+    def __init__(self, incoming):
+        super().__init__()
+        self.incoming = incoming
+
+    async def __aiter__(self):
+        for raw in self.incoming:
+            await asyncio.sleep(0.01)
+            yield raw
+        await asyncio.sleep(0.05)  # let the outbox drain before disconnecting
+
+
+async def test_ws_rejected_entry_edits(orch):
+    """A cyclic add/update over the websocket is answered, not fatal."""
+    orch.skill_entries = [make_entry("a", deps=["b"]), make_entry("b")]
+    ws = ScriptedWebSocket([
+        json.dumps({"type": "update_entry", "name": "b", "updates": {"dependencies": ["a"]}}),
+        json.dumps({"type": "add_entry", "name": "c", "dependencies": ["c"]}),
+        json.dumps({"type": "add_entry", "name": "d", "dependencies": ["a"]}),
+    ])
+    await orch.ws_handler(ws)
+    errors = [m["error"] for m in ws.sent if m["type"] == "error"]
+    check("cyclic update_entry answered with an error", any("b" in e and "cycle" in e for e in errors))
+    check("cyclic add_entry answered with an error", any("c -> c" in e for e in errors))
+    check("handler keeps serving after a rejected edit", orch._find_entry("d") is not None)
+    check("rejected edits not applied",
+          orch._find_entry("b")["dependencies"] == [] and orch._find_entry("c") is None)
+
+
+async def test_ws_per_client_queues(orch):
+    """A stalled client backs up only its own queue; fan-out never blocks."""
+    old_max, old_drops = orch.WS_QUEUE_MAX, orch.WS_MAX_DROPS
+    orch.WS_QUEUE_MAX, orch.WS_MAX_DROPS = 5, 20
+    fast, slow = FakeWebSocket(), FakeWebSocket(stalled=True)
+    orch.ws_clients.update({fast, slow})
+    try:
+        t0 = time.monotonic()
+        orch._ws_fanout(json.dumps({"type": "tick", "i": 0}))
+        check("fan-out returns without waiting on sockets", time.monotonic() - t0 < 0.1)
+        for i in range(1, 10):
+            await asyncio.sleep(0.001)  # let writers drain between producers
+            orch._ws_fanout(json.dumps({"type": "tick", "i": i}))
+        await asyncio.sleep(0.05)
+        check("fast client got every message", [m["i"] for m in fast.sent] == list(range(10)))
+
+        stats = {s["peer"]: s for s in orch.ws_client_stats()}
+        slow_stats = stats[orch._ws_peer(slow)]
+        check("slow client queue bounded", slow_stats["queue_depth"] <= orch.WS_QUEUE_MAX)
+        check("slow client drops counted", slow_stats["dropped"] >= 4)
+        check("fast client has no drops", stats[orch._ws_peer(fast)]["dropped"] == 0)
+
+        for i in range(30):
+            await asyncio.sleep(0.001)
+            orch._ws_fanout(json.dumps({"type": "tick", "i": 10 + i}))
+        await asyncio.sleep(0.05)
+        check("persistently slow client disconnected", slow not in orch.ws_clients)
+        check("fast client still connected", fast in orch.ws_clients)
+        check("fast client kept receiving", fast.sent[-1]["i"] == 39)
+    finally:
+        for ws in (fast, slow):
+            box = orch.ws_outboxes.get(ws)
+            if box:
+                box.close()
+        orch.ws_clients.difference_update({fast, slow})
+        orch.WS_QUEUE_MAX, orch.WS_MAX_DROPS = old_max, old_drops
+
+
+async def test_session_log_index(orch):
+    """agent_sessions.jsonl is indexed incrementally and survives restarts."""
+    from pathlib import Path
+    tmp = Path(tempfile.mkdtemp())
+    log = tmp / "agent_sessions.jsonl"
+    old_log = orch.SESSION_LOG
+    orch.SESSION_LOG = log
+
+    def append(skill, agent_type="dev", target=None, text="hi", partial=False):
+        rec = {"session_id": f"s-{skill}", "skill": skill, "agent_type": agent_type,
+               "log": [text], "timestamp": "2026-01-01T00:00:00Z"}
+        if target:
+            rec["target"] = target
+        with open(log, "a") as f:
+            f.write(json.dumps(rec) + ("" if partial else "\n"))
+
+    try:
+        append("grasp", target="sim")
+        append("grasp", agent_type="evaluator")
+        append("place", target="real", text="first")
+        orch._invalidate_session_log_cache()
+        check("dev counts per target",
+              orch._session_counts() == (2, {"sim": 1, "real": 1}))
+
+        idx = orch._session_log_index()
+        offset = idx.offset
+        append("place", target="real", text="second")
+        append("place", text="torn", partial=True)
+        check("only appended bytes parsed", idx.refresh() == 1 and idx.offset > offset)
+        orch._invalidate_session_log_cache()
+        check("last session per skill",
+              orch._load_session_logs()["place"][0]["text"] == "second")
+        check("partial trailing line not indexed", len(idx.records) == 4)
+        with open(log, "a") as f:
+            f.write("\n")
+        check("completed line picked up", idx.refresh() == 1)
+
+        fresh = orch.SessionLogIndex().bind(log)
+        check("restart resumes from sidecar",
+              fresh.offset == idx.offset and fresh.refresh() == 0)
+        check("sidecar counts match", fresh.dev_counts() == idx.dev_counts())
+
+        before = idx.sidecar.read_text()
+        append("grasp", target="sim", text="again")
+        idx.refresh()
+        after = idx.sidecar.read_text()
+        new_line = json.loads(after[len(before):])
+        check("sidecar appended, not rewritten",
+              after.startswith(before) and len(new_line["records"]) == 1)
+        with open(idx.sidecar, "a") as f:
+            f.write('{"from": 12')        # torn append
+        torn = orch.SessionLogIndex().bind(log)
+        check("torn sidecar line ignored", torn.offset == idx.offset and torn.records == idx.records)
+
+        log.write_text("")
+        append("navigate")
+        check("rewritten log reindexed", fresh.refresh() == 1 and len(fresh.records) == 1)
+        check("sidecar restarted after rotation",
+              len(fresh.sidecar.read_text().splitlines()) == 1
+              and orch.SessionLogIndex().bind(log).records == fresh.records)
+    finally:
+        orch.SESSION_LOG = old_log
+        orch._invalidate_session_log_cache()
+        import shutil
+        shutil.rmtree(tmp)
+
+
+class FakeWriter:
+    """Collects everything handle_http writes."""
+
+    def __init__(self):
+        self.written = []
+
+    def write(self, data):
+        self.written.append(data)
+
+    async def drain(self):
+        pass
+
+    def close(self):
+        pass
+
+    def get_extra_info(self, name, default=None):
+        return default
+
+
+async def http_request(orch, raw):
+    """Feed one raw request to handle_http; return (status line, headers, body bytes)."""
+    reader = asyncio.StreamReader()
+    reader.feed_data(raw.encode())
+    reader.feed_eof()
+    writer = FakeWriter()
+    await orch.handle_http(reader, writer)
+    data = b"".join(writer.written)
+    head, _, body = data.partition(b"\r\n\r\n")
+    lines = head.decode().split("\r\n")
+    headers = {k.lower(): v.strip() for k, _, v in (l.partition(":") for l in lines[1:])}
+    if headers.get("transfer-encoding") == "chunked":
+        out = b""
+        while True:
+            size_line, _, body = body.partition(b"\r\n")
+            size = int(size_line, 16)
+            if size == 0:
+                break
+            out += body[:size]
+            body = body[size + 2:]
+        body = out
+    return lines[0], headers, body
+
+
+async def test_eval_verdict_reuse_keys(orch):
+    """Stored verdicts are reused only for the same skill, and code keys only on Path B."""
+    import shutil
+    from pathlib import Path
+    from eval_results import EvalResultStore
+    root = Path(tempfile.mkdtemp())
+    (root / "logs" / "code_executions" / "exec-1").mkdir(parents=True)
+    orch.skill_entries = [make_entry("skill-a"), make_entry("skill-b")]
+    calls = []
+
+    async def fake_eval(skill, latest, desc):
+        calls.append((skill, latest.name))
+        return {"passed": skill == "skill-a", "feedback": f"judged {skill}",
+                "full_text": "", "parsed": True}
+
+    saved = (orch.PROJECT_DIR, orch._eval_results, orch._evaluate_recording,
+             orch.pre_evaluate, orch._update_trial_images)
+    orch.PROJECT_DIR = root
+    orch._eval_results = EvalResultStore(root / "eval_results.jsonl")
+    orch._evaluate_recording = fake_eval
+    orch.pre_evaluate = lambda d: None
+
+    async def no_images(*a, **k):
+        pass
+
+    orch._update_trial_images = no_images
+    try:
+        a = await orch.run_evaluator("skill-a")   # Path A: newest recording
+        b = await orch.run_evaluator("skill-b", execution_id="exec-1", code_hash="h1")
+        check("other skill's verdict on the same execution not reused",
+              b["feedback"] == "judged skill-b" and len(calls) == 2)
+        check("Path A stores no code key",
+              [r["skill"] for r in orch._eval_results.by_code.values()] == ["skill-b"])
+        (root / "logs" / "code_executions" / "exec-2").mkdir()
+        b2 = await orch.run_evaluator("skill-b", execution_id="exec-2", code_hash="h1")
+        check("identical submitted code reused on Path B",
+              b2.get("cached") == "code" and b2["cached_from"] == "exec-1" and len(calls) == 2)
+        a2 = await orch.run_evaluator("skill-a", execution_id="exec-2", code_hash="h1")
+        check("code key not shared across skills", "cached" not in a2 and len(calls) == 3)
+        check("first verdict was skill-a's own", a["passed"] is True)
+    finally:
+        (orch.PROJECT_DIR, orch._eval_results, orch._evaluate_recording,
+         orch.pre_evaluate, orch._update_trial_images) = saved
+        shutil.rmtree(root)
+
+
+async def test_sessions_endpoint_paging(orch):
+    """/sessions/<graph> filters, pages and gzips from the offset index."""
+    import gzip
+    import shutil
+    from pathlib import Path
+    ws = Path(tempfile.mkdtemp())
+    graph_dir = ws / "graphs" / "g1"
+    graph_dir.mkdir(parents=True)
+    recs = [
+        {"skill": "grasp", "agent_type": "dev", "target": "sim", "log": ["a"],
+         "timestamp": "2026-01-01T00:00:00+00:00"},
+        {"skill": "grasp", "agent_type": "evaluator", "log": ["b"],
+         "timestamp": "2026-01-02T00:00:00+00:00"},
+        {"skill": "place", "agent_type": "dev", "log": ["c"],
+         "timestamp": "2026-01-03T00:00:00+00:00"},
+    ]
+    (graph_dir / "agent_sessions.jsonl").write_text("".join(json.dumps(r) + "\n" for r in recs))
+    old_ws = orch.WORKSPACE_DIR
+    orch.WORKSPACE_DIR = ws
+
+    def rows(body):
+        return [json.loads(l) for l in body.decode().splitlines() if l.strip()]
+
+    import threading
+    refresh_threads = []
+    real_refresh = orch.SessionLogIndex.refresh
+
+    def spy_refresh(self):
+        refresh_threads.append(threading.current_thread())
+        return real_refresh(self)
+
+    orch.SessionLogIndex.refresh = spy_refresh
+    try:
+        status, headers, body = await http_request(orch, "GET /sessions/g1 HTTP/1.1\r\n\r\n")
+        check("unfiltered returns every record", status.endswith("200 OK") and rows(body) == recs)
+        check("other graph's index refreshed off the event loop",
+              refresh_threads and threading.main_thread() not in refresh_threads)
+        orch.SessionLogIndex.refresh = real_refresh
+        check("total count header", headers.get("x-total-count") == "3")
+
+        _, headers, body = await http_request(
+            orch, "GET /sessions/g1?skill=grasp&limit=1&offset=1 HTTP/1.1\r\n\r\n")
+        check("skill filter + paging", rows(body) == [recs[1]] and headers["x-total-count"] == "2")
+
+        _, _, body = await http_request(
+            orch, "GET /sessions/g1?agent_type=dev&since=2026-01-02T00:00:00Z HTTP/1.1\r\n\r\n")
+        check("agent_type + since filter", rows(body) == [recs[2]])
+
+        _, _, body = await http_request(
+            orch, "GET /sessions/g1?order=desc&limit=1 HTTP/1.1\r\n\r\n")
+        check("newest first", rows(body) == [recs[2]])
+
+        _, headers, body = await http_request(
+            orch, "GET /sessions/g1 HTTP/1.1\r\nAccept-Encoding: gzip, deflate\r\n\r\n")
+        check("gzip content-encoding", headers.get("content-encoding") == "gzip"
+              and rows(gzip.decompress(body)) == recs)
+
+        status, _, _ = await http_request(orch, "GET /sessions/g1?limit=x HTTP/1.1\r\n\r\n")
+        check("bad params -> 400", "400" in status)
+        status, _, _ = await http_request(orch, "GET /sessions/nope HTTP/1.1\r\n\r\n")
+        check("unknown graph -> 404", "404" in status)
+    finally:
+        orch.SessionLogIndex.refresh = real_refresh
+        orch.WORKSPACE_DIR = old_ws
+        shutil.rmtree(ws)
+
+
+async def test_http_keepalive_and_large_bodies(orch):
+    """Bodies past 8 KB arrive whole; one connection serves several requests."""
+    from pathlib import Path
+    graph_file = Path(make_graph([]))
+    old_repos = orch.LOCAL_REPOS
+    orch.LOCAL_REPOS = graph_file
+    orch.skill_entries = []
+    server = await asyncio.start_server(orch.handle_http, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+
+    async def read_response():
+        head = await reader.readuntil(b"\r\n\r\n")
+        lines = head.decode().split("\r\n")
+        hdrs = {k.lower(): v.strip() for k, _, v in (l.partition(":") for l in lines[1:] if l)}
+        body = await reader.readexactly(int(hdrs["content-length"]))
+        return lines[0], hdrs, body
+
+    try:
+        desc = "x" * 20000
+        payload = json.dumps({"name": "big", "description": desc}).encode()
+        writer.write(b"POST /entries HTTP/1.1\r\nHost: t\r\n"
+                     b"Content-Length: " + str(len(payload)).encode() + b"\r\n\r\n")
+        writer.write(payload[:5000])
+        await writer.drain()
+        await asyncio.sleep(0.01)
+        writer.write(payload[5000:])
+        await writer.drain()
+        status, hdrs, body = await read_response()
+        check("large body accepted", "200" in status and json.loads(body)["name"] == "big")
+        check("connection kept alive", hdrs.get("connection") == "keep-alive")
+        check("full description stored", len(orch._find_entry("big")["description"]) == 20000)
+
+        writer.write(b"GET /entries HTTP/1.1\r\nHost: t\r\nConnection: close\r\n\r\n")
+        await writer.drain()
+        status, hdrs, body = await read_response()
+        check("second request on same connection", "200" in status
+              and json.loads(body)[0]["name"] == "big")
+        check("server closes after Connection: close", await reader.read() == b"")
+    finally:
+        writer.close()
+        server.close()
+        await server.wait_closed()
+        orch.LOCAL_REPOS = old_repos
+        os.unlink(graph_file)
+
+
+async def test_metrics_endpoint(orch):
+    """GET /metrics exposes handler latency, live agents, eval-lock waits, loop lag."""
+    import metrics
+    state = orch.AgentState(agent_id="agent-metrics", skill="m", status="running")
+    state.target_name = "sim-a"
+    orch.agents[state.agent_id] = state
+    try:
+        await http_request(orch, "GET /status HTTP/1.1\r\n\r\n")
+        lock_waits = orch.EVAL_LOCK_WAIT_SECONDS.labels().count
+        async with orch._eval_lock("m"):
+            pass
+
+        lag = metrics.histogram("test_loop_lag_seconds", "test")
+        last = metrics.gauge("test_loop_lag_last_seconds", "test")
+        task = asyncio.ensure_future(metrics.watch_event_loop_lag(lag, last, interval=0.01))
+        await asyncio.sleep(0.02)
+        time.sleep(0.15)  # block the loop
+        await asyncio.sleep(0.03)
+        task.cancel()
+
+        status, headers, body = await http_request(orch, "GET /metrics HTTP/1.1\r\n\r\n")
+        text = body.decode()
+        check("metrics served as Prometheus text", status.endswith("200 OK")
+              and headers.get("content-type", "").startswith("text/plain; version=0.0.4"))
+        check("HTTP latency labelled by route",
+              'orch_http_request_seconds_count{method="GET",route="/status",status="200"} 1' in text)
+        check("live agents by status and target",
+              'orch_agents{status="running",target="sim-a"} 1' in text)
+        check("eval lock wait recorded without a skill label",
+              orch.EVAL_LOCK_WAIT_SECONDS.labels().count == lock_waits + 1
+              and "orch_eval_lock_wait_seconds_count{" not in text)
+        check("unknown routes collapse to other",
+              orch._http_route_label("/grasp-ball") == "other"
+              and orch._http_route_label("/entries/grasp") == "/entries/*"
+              and orch._http_route_label("/job-done") == "/job-done")
+        check("blocked loop shows up as lag", lag.labels().sum >= 0.1)
+        check("same metric object on re-registration",
+              metrics.counter("orch_evals_total", "x", ["result"]) is orch.EVALS)
+    finally:
+        orch.agents.pop(state.agent_id, None)
+
+
+async def test_spawn_scheduler_slots_and_priority(orch):
+    """Spawns beyond the slot limits queue; critical path first; slots refill."""
+    orch.skill_entries = [
+        make_entry("leaf-x"),
+        make_entry("root-a"),
+        make_entry("mid-b", deps=["root-a"]),
+        make_entry("top-c", deps=["mid-b"]),
+    ]
+    orch.agents.clear()
+    orch._spawn_queue.items.clear()
+    old_targets = list(orch.targets)
+    orch.targets[:] = [{"name": "t1", "agent_server": "http://t1"},
+                       {"name": "t2", "agent_server": "http://t2"}]
+    old_limits = orch.MAX_CONCURRENT_AGENTS, orch.MAX_AGENTS_PER_TARGET
+    orch.MAX_CONCURRENT_AGENTS, orch.MAX_AGENTS_PER_TARGET = 2, 1
+    original_spawn = orch.spawn_agent
+    started = []
+
+    async def fake_spawn(skill, prompt, agent_type="dev", target=None):
+        aid = f"agent-{skill}-{target['name']}"
+        state = orch.AgentState(agent_id=aid, skill=skill, status="running")
+        state.target_name = target["name"]
+        orch.agents[aid] = state
+        started.append((skill, target["name"]))
+        return aid
+
+    orch.spawn_agent = fake_spawn
+    try:
+        spawned = await orch._auto_spawn_ready_skills()
+        check("critical-path skill starts first", spawned == ["root-a"])
+        check("one agent per target", sorted(started) == [("root-a", "t1"), ("root-a", "t2")])
+        queue = orch.scheduler_status()["queue"]
+        check("leaf waits in the queue on both targets",
+              sorted((q["skill"], q["target"]) for q in queue) == [("leaf-x", "t1"), ("leaf-x", "t2")])
+        check("critical path length as priority", orch._critical_path_lengths(orch._registry())["root-a"] == 2)
+        reg = orch._registry()
+        first = orch._critical_path_lengths(reg)
+        orch.scheduler_status()
+        check("critical paths cached between broadcasts", orch._critical_path_lengths(reg) is first)
+        reg.status_changed("leaf-x")
+        check("status change keeps the cache", orch._critical_path_lengths(reg) is first)
+        reg.by_name["leaf-x"]["dependencies"] = ["top-c"]
+        reg.dependencies_changed("leaf-x")
+        check("new edge recomputes critical paths", orch._critical_path_lengths(reg)["root-a"] == 3)
+        reg.by_name["leaf-x"]["dependencies"] = []
+        reg.dependencies_changed("leaf-x")
+
+        await orch._auto_spawn_ready_skills()
+        check("re-scan doesn't duplicate queued work", len(orch._spawn_queue) == 2)
+
+        status, _, body = await http_request(orch, "GET /status?include=queue HTTP/1.1\r\n\r\n")
+        payload = json.loads(body)
+        check("/status?include=queue shows the queue", len(payload["scheduler"]["queue"]) == 2
+              and "agent-root-a-t1" in payload["agents"])
+        _, _, body = await http_request(orch, "GET /status HTTP/1.1\r\n\r\n")
+        check("plain /status keeps agent map shape", set(json.loads(body)) == {"agent-root-a-t1", "agent-root-a-t2"})
+        check("full_sync carries scheduler state", len(orch.build_full_sync()["scheduler"]["queue"]) == 2)
+
+        orch.agents["agent-root-a-t2"].status = "done"
+        spawned = await orch._pump_spawn_queue()
+        check("freed slot starts queued work", spawned == ["leaf-x"] and started[-1] == ("leaf-x", "t2"))
+        check("other target still full", [(q["skill"], q["target"]) for q in orch.scheduler_status()["queue"]]
+              == [("leaf-x", "t1")])
+
+        orch._update_entry("leaf-x", {"status": "review"})
+        orch.agents["agent-root-a-t1"].status = "done"
+        await orch._pump_spawn_queue()
+        check("stale queued work dropped", len(orch._spawn_queue) == 0 and len(started) == 3)
+    finally:
+        orch.spawn_agent = original_spawn
+        orch.MAX_CONCURRENT_AGENTS, orch.MAX_AGENTS_PER_TARGET = old_limits
+        orch.targets[:] = old_targets
+        orch._spawn_queue.items.clear()
+        orch.agents.clear()
+
+
+async def test_least_loaded_placement(orch):
+    """least-loaded placement puts each skill on one target, by load score."""
+    orch.skill_entries = [make_entry("a"), make_entry("b"), make_entry("c")]
+    orch.agents.clear()
+    orch._spawn_queue.items.clear()
+    busy = orch.AgentState(agent_id="agent-busy", skill="other", status="running")
+    busy.target_name = "t1"
+    orch.agents[busy.agent_id] = busy
+    old_targets = list(orch.targets)
+    orch.targets[:] = [{"name": "t1", "agent_server": "http://t1"},
+                       {"name": "t2", "agent_server": "http://t2/"}]
+    old = orch.PLACEMENT, orch.MAX_CONCURRENT_AGENTS, orch.MAX_AGENTS_PER_TARGET
+    orch.PLACEMENT, orch.MAX_CONCURRENT_AGENTS, orch.MAX_AGENTS_PER_TARGET = "least-loaded", 0, 0
+    orch._target_load.job_s.clear()
+    orch._target_load.reset_s.clear()
+    original_spawn = orch.spawn_agent
+    started = []
+
+    async def fake_spawn(skill, prompt, agent_type="dev", target=None):
+        aid = f"agent-{skill}-{target['name']}"
+        state = orch.AgentState(agent_id=aid, skill=skill, status="running")
+        state.target_name = target["name"]
+        orch.agents[aid] = state
+        started.append((skill, target["name"]))
+        return aid
+
+    orch.spawn_agent = fake_spawn
+    try:
+        await orch._auto_spawn_ready_skills()
+        check("one target per skill", sorted(started) == [("a", "t2"), ("b", "t1"), ("c", "t2")])
+        check("placement remembered on the entry", orch._find_entry("a")["placement"] == "t2")
+
+        fetched = []
+
+        async def fake_fetch(server, execution_id, label=""):
+            fetched.append(server)
+            return None
+
+        cache = orch._recording_cache
+        original_fetch = cache.fetch
+        cache.fetch = fake_fetch
+        try:
+            await orch._fetch_remote_recording("exec-1", "a")
+            await orch._fetch_remote_recording("exec-2", "a", "http://t1")
+        finally:
+            cache.fetch = original_fetch
+        check("recordings fetched from the placed target, unless told otherwise",
+              fetched == ["http://t2/", "http://t1"])
+
+        await orch._auto_spawn_ready_skills()
+        check("running skills aren't placed again", len(started) == 3)
+
+        check("agent_server maps back to its target", orch._target_name_for_server("http://t2") == "t2")
+        orch._target_load.record_job("t2", 600)
+        orch._target_load.record_reset("t2", 30)
+        scores = orch._target_scores()
+        check("observed latency raises the score", scores["t2"] > scores["t1"] + 10)
+
+        orch.agents.pop("agent-a-t2")
+        orch._update_entry("a", {"status": "failed"})
+        await orch._auto_spawn_ready_skills()
+        check("respawn sticks to the skill's target", started[-1] == ("a", "t2"))
+        check("scheduler status reports placement + load",
+              orch.scheduler_status()["placement"] == "least-loaded"
+              and orch.scheduler_status()["target_load"]["t2"]["job_s"] == 600)
+    finally:
+        orch.spawn_agent = original_spawn
+        orch.PLACEMENT, orch.MAX_CONCURRENT_AGENTS, orch.MAX_AGENTS_PER_TARGET = old
+        orch.targets[:] = old_targets
+        orch._spawn_queue.items.clear()
+        orch._target_load.job_s.clear()
+        orch._target_load.reset_s.clear()
+        orch.agents.clear()
+
+
+async def test_mechanical_test_streaming(orch):
+    """Test output is line-buffered and capped; a decided test is stopped."""
+    skill = "chatty-root"
+    tests_dir = orch.SKILLS_DIR / skill / "tests"
+    tests_dir.mkdir(parents=True, exist_ok=True)
+    (tests_dir / "run_trials.py").write_text(
+        "import json, os, sys, time\n"
+        "for i in range(20000):\n"
+        "    print('noise', i, 'x' * 200)\n"
+        "print('Trial 1: FAIL - arm error')\n"
+        "print('Trial 2 [t2]: FAIL (sim _check_success=False)')\n"
+        "print('x' * 100000, file=sys.stderr)\n"
+        "os.makedirs('tests/results', exist_ok=True)\n"
+        "json.dump({'decision': 'fail', 'success_rate': 0, 'total_trials': 2,\n"
+        "           'passed': 0, 'failed': 2}, open('tests/results/summary.json', 'w'))\n"
+        "sys.stdout.flush()\n"
+        "time.sleep(60)\n"
+    )
+    orch.skill_entries = [make_entry(skill, status="testing")]
+    old = orch.TEST_POLL_S, orch.TEST_DECIDED_GRACE_S
+    orch.TEST_POLL_S, orch.TEST_DECIDED_GRACE_S = 0.2, 0.2
+    try:
+        t0 = time.monotonic()
+        result = await orch.run_mechanical_test(skill)
+        elapsed = time.monotonic() - t0
+    finally:
+        orch.TEST_POLL_S, orch.TEST_DECIDED_GRACE_S = old
+    msgs = [c.args[1] for c in orch.ws_broadcast_agent_msg.call_args_list]
+    check("decided test killed early", elapsed < 20 and not result["passed"])
+    check("verdict taken from summary.json", result["total_trials"] == 2
+          and orch._find_entry(skill)["status"] == "failed")
+    check("trial lines forwarded as they appear",
+          "Trial 1: FAIL - arm error" in msgs and "Trial 2 [t2]: FAIL (sim _check_success=False)" in msgs)
+    check("noise not forwarded", not any(m.startswith("noise") for m in msgs))
+    check("stdout capped to the ring buffer",
+          len(result["stdout"].splitlines()) <= orch.TEST_OUTPUT_MAX_LINES
+          and "Trial 2 [t2]" in result["stdout"])
+    check("long lines truncated", len(result["stderr"]) <= orch.TEST_LINE_MAX_CHARS + 2)
+
+    # Decided, but a trial is still on the robot: not killed until it drains.
+    (tests_dir / "run_trials.py").write_text(
+        "import json, os, sys, time\n"
+        "os.makedirs('tests/results', exist_ok=True)\n"
+        "def summary(inflight):\n"
+        "    json.dump({'decision': 'pass', 'success_rate': 100, 'total_trials': 3, 'passed': 3,\n"
+        "               'failed': 0, 'inflight': inflight}, open('tests/results/summary.json', 'w'))\n"
+        "summary([{'trial': 4, 'target': 't1'}])\n"
+        "time.sleep(1.5)\n"
+        "summary([])\n"
+        "time.sleep(60)\n"
+    )
+    orch._update_entry(skill, {"status": "testing"})
+    orch.TEST_POLL_S, orch.TEST_DECIDED_GRACE_S = 0.2, 0.2
+    try:
+        t0 = time.monotonic()
+        result = await orch.run_mechanical_test(skill)
+        elapsed = time.monotonic() - t0
+    finally:
+        orch.TEST_POLL_S, orch.TEST_DECIDED_GRACE_S = old
+    check("in-flight trials drained before the kill", 1.5 <= elapsed < 20 and result["passed"])
+
+
 # ---------------------------------------------------------------------------
 # Main
 # ---------------------------------------------------------------------------
@@ -777,6 +1623,22 @@ def main():
             ("Dev → plan → dev status transitions", test_dev_to_plan_back_to_dev_status_transitions),
             ("Concurrent plan and dev branches", test_concurrent_plan_and_dev_branches),
             ("Graph metadata loading", test_graph_meta_load),
+            ("Registry indexes follow mutations", test_registry_indexes_follow_mutations),
+            ("Registry rebinds on list swap", test_registry_rebinds_on_list_swap),
+            ("Registry readiness counters", test_registry_readiness_counters),
+            ("Dependency cycles rejected", test_dependency_cycles_rejected),
+            ("WS rejected entry edits", test_ws_rejected_entry_edits),
+            ("graph.json write-behind", test_graph_write_behind),
+            ("Delta broadcasts", test_delta_broadcasts),
+            ("WS per-client send queues", test_ws_per_client_queues),
+            ("Session log offset index", test_session_log_index),
+            ("Eval verdict reuse keys", test_eval_verdict_reuse_keys),
+            ("/sessions paging, filters, gzip", test_sessions_endpoint_paging),
+            ("HTTP keep-alive + large bodies", test_http_keepalive_and_large_bodies),
+            ("/metrics exposition", test_metrics_endpoint),
+            ("Spawn scheduler slots + priority", test_spawn_scheduler_slots_and_priority),
+            ("Least-loaded target placement", test_least_loaded_placement),
+            ("Mechanical test output streaming", test_mechanical_test_streaming),
         ]
 
         print("=" * 60)
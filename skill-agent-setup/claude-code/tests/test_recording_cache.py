@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""Test the evaluator's recording cache (recording_cache.py).
+
+Runs against tests/stub_agent_server.py — no robot or sim needed.
+
+Usage:
+    cd ~/tidybot_uni/marketing/Tidybot-Universe/skill-agent-setup/claude-code
+    python tests/test_recording_cache.py
+"""
+
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+from async_http import AsyncHttpClient  # noqa: E402
+import recording_cache  # noqa: E402
+from recording_cache import RecordingCache  # noqa: E402
+from stub_agent_server import StubAgentServer  # noqa: E402
+
+passed = 0
+failed = 0
+
+FRAME = b"\xff\xd8" + b"x" * 1000   # identical "static scene" frame
+
+
+def check(name, condition):
+    global passed, failed
+    if condition:
+        print(f"  PASS: {name}")
+        passed += 1
+    else:
+        print(f"  FAIL: {name}")
+        failed += 1
+
+
+def frames(tag: str, n: int = 3) -> dict:
+    return {f"base_{i:03d}.jpg": FRAME if i == 0 else f"{tag}-{i}".encode() * 100 for i in range(n)}
+
+
+def rescanned_bytes(cache) -> int:
+    """Byte total recomputed from scratch, to check the running one."""
+    blobs = {}
+    for e in cache.entries.values():
+        blobs.update(e["blob_bytes"])
+    return sum(e["bytes"] for e in cache.entries.values()) + sum(blobs.values())
+
+
+def run_with_cache(fn, budget=10 ** 9, protect_s=0.0, **stub_kw):
+    """Run ``await fn(cache, stub)`` against a fresh stub + temp cache dir."""
+    stub = StubAgentServer(**stub_kw).start()
+    tmp = tempfile.TemporaryDirectory()
+
+    async def run():
+        http = AsyncHttpClient()
+        cache = RecordingCache(Path(tmp.name) / "exec", Path(tmp.name) / "store", budget,
+                               lambda: http, protect_s=protect_s)
+        try:
+            return await fn(cache, stub)
+        finally:
+            await http.close()
+
+    try:
+        return asyncio.run(run()), Path(tmp.name)
+    finally:
+        stub.stop()
+        tmp.cleanup()
+
+
+# ---------------------------------------------------------------------------
+# Tests
+# ---------------------------------------------------------------------------
+
+def test_fetch_layout_and_job_by_id():
+    async def fn(cache, stub):
+        stub.add_recording("e1", frames("a"), timeline=[{"timestamp": 0, "frame": 0,
+                                                         "state": {"gripper": 1}}], job_id="j1")
+        d = await cache.fetch(stub.url, "e1")
+        meta = json.loads((d / "metadata.json").read_text())
+        state = (d / "state_log.jsonl").read_text().splitlines()
+        return d, meta, state, sorted(p.name for p in d.glob("*.jpg")), dict(stub.requests)
+
+    (d, meta, state, jpgs, reqs), _ = run_with_cache(fn)
+    check("directory named after execution", d.name == "e1")
+    check("stdout and exit code from the job", meta["stdout"] == "e1 out\n" and meta["exit_code"] == 0)
+    check("job fetched by id, not by listing", reqs.get("poll") == 1 and "jobs_list" not in reqs)
+    check("state log written", json.loads(state[0]) == {"timestamp": 0, "frame": 0, "gripper": 1})
+    check("frames materialized", jpgs == ["base_000.jpg", "base_001.jpg", "base_002.jpg"])
+
+
+def test_note_job_and_list_fallback():
+    async def fn(cache, stub):
+        stub.add_recording("e1", frames("a"))
+        stub.add_recording("e2", frames("b"))
+        stub.jobs["j2"] = {"job_id": "j2", "status": "completed", "version": 1,
+                           "execution_id": "e2", "result": {"stdout": "from j2\n"}}
+        cache.note_job("e2", "j2")
+        await cache.fetch(stub.url, "e2")
+        after_noted = dict(stub.requests)
+        await cache.fetch(stub.url, "e1")
+        used = dict(cache._job_ids)
+        for i in range(recording_cache.MAX_NOTED_JOBS + 5):
+            cache.note_job(f"x{i}", f"j{i}")
+        return after_noted, dict(stub.requests), used, dict(cache._job_ids)
+
+    (noted, after, used, flood), _ = run_with_cache(fn)
+    check("noted job id fetched directly", noted.get("poll") == 1 and "jobs_list" not in noted)
+    check("unknown job falls back to the job list", after.get("jobs_list") == 1)
+    check("job id forgotten once used", used == {})
+    check("unfetched job ids bounded",
+          len(flood) == recording_cache.MAX_NOTED_JOBS and "x0" not in flood)
+
+
+def test_dedup_and_hit():
+    async def fn(cache, stub):
+        stub.add_recording("e1", frames("a"), job_id="j1")
+        stub.add_recording("e2", frames("b"), job_id="j2")
+        d1 = await cache.fetch(stub.url, "e1")
+        d2 = await cache.fetch(stub.url, "e2")
+        n = stub.requests["frame"]
+        await cache.fetch(stub.url, "e1")
+        same_inode = (d1 / "base_000.jpg").stat().st_ino == (d2 / "base_000.jpg").stat().st_ino
+        return cache.stats(), n, stub.requests["frame"], same_inode
+
+    (stats, n, n_after, same_inode), _ = run_with_cache(fn)
+    check("identical frame stored once", stats["blobs"] == 5)
+    check("shared frame is one file", same_inode)
+    check("cached execution not downloaded again", n == n_after == 6)
+
+
+def test_concurrent_fetch_shares_download():
+    async def fn(cache, stub):
+        stub.add_recording("e1", frames("a"), job_id="j1")
+        stub.frame_delay = 0.1
+        a, b = await asyncio.gather(cache.fetch(stub.url, "e1"), cache.fetch(stub.url, "e1"))
+        return a == b, dict(stub.requests)
+
+    (same, reqs), _ = run_with_cache(fn)
+    check("both readers get the directory", same)
+    check("one recording download", reqs.get("recording") == 1 and reqs.get("frame") == 3)
+
+
+def test_lru_eviction():
+    async def fn(cache, stub):
+        for i in range(3):
+            stub.add_recording(f"e{i}", frames(f"r{i}"), job_id=f"j{i}")
+        await cache.fetch(stub.url, "e0")
+        await cache.fetch(stub.url, "e1")
+        cache.entries["e0"]["last_used"] = time.time() - 10
+        cache.entries["e1"]["last_used"] = time.time() - 5
+        cache.budget_bytes = cache.total_bytes()          # room for two executions
+        await cache.fetch(stub.url, "e2")
+        running = cache.total_bytes() == rescanned_bytes(cache)
+        blobs_on_disk = len(list((cache.blob_dir).glob("*/*.jpg")))
+        return (sorted(cache.entries), cache.total_bytes() <= cache.budget_bytes, cache.stats(),
+                running, blobs_on_disk)
+
+    (left, under, stats, running, blobs_on_disk), root = run_with_cache(fn)
+    check("least recently used evicted", left == ["e1", "e2"])
+    check("back under budget", under)
+    check("running byte total matches a rescan", running)
+    check("orphaned blobs deleted from disk", blobs_on_disk == stats["blobs"])
+    check("shared blob kept, e0's own blobs removed", stats["blobs"] == 5)
+
+
+def test_index_survives_restart():
+    tmp = tempfile.TemporaryDirectory()
+    stub = StubAgentServer().start()
+    stub.add_recording("e1", frames("a"), job_id="j1")
+
+    async def run():
+        http = AsyncHttpClient()
+        root = Path(tmp.name)
+        c1 = RecordingCache(root / "exec", root / "store", 10 ** 9, lambda: http)
+        await c1.fetch(stub.url, "e1")
+        (root / "exec" / "e1" / "metadata.json").unlink()   # partial directory
+        c2 = RecordingCache(root / "exec", root / "store", 10 ** 9, lambda: http)
+        n = stub.requests["frame"]
+        loaded = c2.total_bytes() == c1.total_bytes()
+        await c2.fetch(stub.url, "e1")
+        await http.close()
+        return (n, stub.requests["frame"], (root / "exec" / "e1" / "metadata.json").exists(),
+                loaded and c2.total_bytes() == rescanned_bytes(c2))
+
+    try:
+        n, n_after, rebuilt, totals = asyncio.run(run())
+    finally:
+        stub.stop()
+        tmp.cleanup()
+    check("directory rebuilt", rebuilt)
+    check("byte total restored from the index and kept on re-fetch", totals)
+    check("indexed frames not downloaded again", n == n_after == 3)
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+
+def main():
+    global failed
+    tests = [
+        ("Fetch layout, job by id", test_fetch_layout_and_job_by_id),
+        ("note_job and list fallback", test_note_job_and_list_fallback),
+        ("Content-addressed dedup", test_dedup_and_hit),
+        ("Concurrent readers", test_concurrent_fetch_shares_download),
+        ("LRU eviction", test_lru_eviction),
+        ("Index reuse after restart", test_index_survives_restart),
+    ]
+    print("=" * 60)
+    print("Recording Cache Tests")
+    print("=" * 60)
+    for name, fn in tests:
+        print(f"\n{name}:")
+        try:
+            fn()
+        except Exception as e:
+            print(f"  ERROR: {e}")
+            import traceback
+            traceback.print_exc()
+            failed += 1
+    print(f"\n{'=' * 60}")
+    print(f"Results: {passed} passed, {failed} failed")
+    print("=" * 60)
+    sys.exit(0 if failed == 0 else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,458 @@
+#!/usr/bin/env python3
+"""Test the in-process bundler API and its bundle cache (tidybot_bundle.py).
+
+Usage:
+    cd ~/tidybot_uni/marketing/Tidybot-Universe/skill-agent-setup/claude-code
+    python tests/test_tidybot_bundle.py
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+SCRIPTS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "tidybot-bundle", "scripts"))
+sys.path.insert(0, SCRIPTS_DIR)
+
+import tidybot_bundle  # noqa: E402
+
+passed = 0
+failed = 0
+
+
+def check(name, condition):
+    global passed, failed
+    if condition:
+        print(f"  PASS: {name}")
+        passed += 1
+    else:
+        print(f"  FAIL: {name}")
+        failed += 1
+
+
+def make_skill(root: Path, name: str, code: str, deps=()):
+    d = root / name / "scripts"
+    d.mkdir(parents=True, exist_ok=True)
+    main = d / "main.py"
+    # Bump mtime so back-to-back rewrites are seen even on coarse clocks.
+    old = main.stat().st_mtime_ns if main.exists() else 0
+    main.write_text(code)
+    st = main.stat()
+    if st.st_mtime_ns <= old:
+        os.utime(main, ns=(st.st_atime_ns, old + 1_000_000))
+    if deps:
+        (d / "deps.txt").write_text("\n".join(deps) + "\n")
+
+
+def make_tree(root: Path):
+    make_skill(root, "detect", "import time\n\ndef detect():\n    return 'cup'\n")
+    make_skill(root, "grasp", "import time\n\ndef grasp():\n    return detect()\n\n"
+               "if __name__ == '__main__':\n    print(grasp())\n", deps=["detect"])
+
+
+def reset():
+    tidybot_bundle._memory_cache.clear()
+    for k in tidybot_bundle.cache_stats:
+        tidybot_bundle.cache_stats[k] = 0
+
+
+# ---------------------------------------------------------------------------
+# Tests
+# ---------------------------------------------------------------------------
+
+def test_memory_cache():
+    reset()
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        make_tree(root)
+        first = tidybot_bundle.bundle("grasp", root)
+        second = tidybot_bundle.bundle("grasp", str(root))
+        check("same output as an uncached build", first == tidybot_bundle.build_bundle("grasp", root))
+        check("second call served from memory", second == first and tidybot_bundle.cache_stats["memory"] == 1
+              and tidybot_bundle.cache_stats["miss"] == 1)
+        called = tidybot_bundle.bundle("grasp", root, call="grasp()")
+        check("--call is part of the key", called != first and called.rstrip().endswith("grasp()"))
+
+
+def test_invalidation():
+    reset()
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        make_tree(root)
+        k1 = tidybot_bundle.bundle_key("grasp", root)
+        tidybot_bundle.bundle("grasp", root)
+        make_skill(root, "detect", "def detect():\n    return 'bowl'\n")
+        check("dependency edit changes the key", tidybot_bundle.bundle_key("grasp", root) != k1)
+        check("dependency edit rebuilds", "'bowl'" in tidybot_bundle.bundle("grasp", root)
+              and tidybot_bundle.cache_stats["miss"] == 2)
+        make_skill(root, "place", "def place():\n    pass\n")
+        k2 = tidybot_bundle.bundle_key("grasp", root)
+        (root / "grasp" / "scripts" / "deps.txt").write_text("detect\nplace\n")
+        check("deps.txt edit changes the key", tidybot_bundle.bundle_key("grasp", root) != k2)
+
+
+def test_disk_cache():
+    reset()
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp) / "skills"
+        cache = Path(tmp) / "cache"
+        make_tree(root)
+        code = tidybot_bundle.bundle("grasp", root, cache_dir=cache)
+        files = list(cache.glob("*.py"))
+        check("bundle written to the cache dir", len(files) == 1 and files[0].read_text() == code)
+
+        tidybot_bundle._memory_cache.clear()
+        check("fresh memory reads the disk cache", tidybot_bundle.bundle("grasp", root, cache_dir=cache) == code
+              and tidybot_bundle.cache_stats["disk"] == 1)
+
+        files[0].write_text("# served from cache\n")
+        out = subprocess.run(
+            [sys.executable, os.path.join(SCRIPTS_DIR, "tidybot-bundle.py"), "grasp",
+             "--skills-dir", str(root), "--cache-dir", str(cache)],
+            capture_output=True, text=True,
+        )
+        check("CLI shares the cache dir", out.returncode == 0 and out.stdout.strip() == "# served from cache")
+
+
+def test_errors_not_cached():
+    reset()
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp) / "skills"
+        cache = Path(tmp) / "cache"
+        make_skill(root, "grasp", "def grasp():\n    pass\n", deps=["missing"])
+        check("missing dependency has no key", tidybot_bundle.bundle_key("grasp", root) is None)
+        out = tidybot_bundle.bundle("grasp", root, cache_dir=cache)
+        check("missing dependency is an error", out == f"# ERROR: Skill 'missing' not found "
+              f"(required by 'grasp') in {root.resolve()}\n")
+        check("nothing cached", not list(cache.glob("*.py")) and not tidybot_bundle._memory_cache)
+        check("unknown skill", "# ERROR" in tidybot_bundle.bundle("nope", root) and not tidybot_bundle._memory_cache)
+
+
+def test_prune():
+    reset()
+    saved = tidybot_bundle.CACHE_MAX_ENTRIES
+    tidybot_bundle.CACHE_MAX_ENTRIES = 2
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp) / "skills"
+            cache = Path(tmp) / "cache"
+            make_tree(root)
+            for call in ("grasp()", "detect()", "grasp(1)"):
+                tidybot_bundle.bundle("grasp", root, call=call, cache_dir=cache)
+                time.sleep(0.02)
+            check("disk cache bounded", len(list(cache.glob("*.py"))) == 2)
+            check("memory cache bounded", len(tidybot_bundle._memory_cache) == 2)
+    finally:
+        tidybot_bundle.CACHE_MAX_ENTRIES = saved
+
+
+UTIL = """\
+\"\"\"Shared helpers.\"\"\"
+from __future__ import annotations
+import functools
+import json
+from math import (
+    floor,
+    sqrt as root,
+)
+
+REGISTRY = []
+SCALE = 2
+UNUSED_LIMIT = 99
+
+
+def logged(fn):
+    @functools.wraps(fn)
+    def wrapper(*a):
+        return fn(*a)
+    return wrapper
+
+
+@logged
+def scaled(x):
+    return floor(root(x)) * SCALE
+
+
+class Unused:
+    pass
+
+
+async def unused_async():
+    return json.dumps({})
+
+
+REGISTRY.append("util")
+
+if __name__ == "__main__":
+    print("util main")
+"""
+
+MEASURE = """\
+import functools
+from math import floor, sqrt as root
+SCALE = 2
+
+
+def scaled(x):
+    return -1
+
+
+class Reading:
+    def __init__(self, v):
+        self.v = scaled(v)
+
+
+def unused_measure():
+    return floor(1.5)
+"""
+
+REPORT = """\
+import json
+
+def report(n):
+    return json.dumps({"v": Reading(n).v, "reg": REGISTRY})
+
+if __name__ == "__main__":
+    print(report(16))
+"""
+
+
+def make_pipeline(root: Path):
+    make_skill(root, "util", UTIL)
+    make_skill(root, "measure", MEASURE, deps=["util"])
+    make_skill(root, "report", REPORT, deps=["measure"])
+
+
+def run_code(code: str) -> str:
+    return subprocess.run([sys.executable, "-c", code], capture_output=True, text=True).stdout.strip()
+
+
+def test_concurrent_bundles():
+    reset()
+    saved = tidybot_bundle.CACHE_MAX_ENTRIES
+    tidybot_bundle.CACHE_MAX_ENTRIES = 3
+    errors, wrong = [], []
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp) / "skills"
+            cache = Path(tmp) / "cache"
+            make_tree(root)
+            calls = [f"grasp({i})" for i in range(6)]
+            expected = {c: tidybot_bundle.build_bundle("grasp", root, call=c) for c in calls}
+
+            def worker(offset):
+                try:
+                    for i in range(40):
+                        call = calls[(offset + i) % len(calls)]
+                        if tidybot_bundle.bundle("grasp", root, call=call, cache_dir=cache) != expected[call]:
+                            wrong.append(call)
+                except Exception as e:
+                    errors.append(repr(e))
+
+            threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+            switch = sys.getswitchinterval()
+            sys.setswitchinterval(1e-6)     # interleave the threads as much as possible
+            try:
+                for t in threads:
+                    t.start()
+                for t in threads:
+                    t.join()
+            finally:
+                sys.setswitchinterval(switch)
+            on_disk = len(list(cache.glob("*.py")))
+    finally:
+        tidybot_bundle.CACHE_MAX_ENTRIES = saved
+    check("no errors from concurrent callers", errors == [])
+    check("every caller got its own bundle", wrong == [])
+    check("memory cache still bounded", len(tidybot_bundle._memory_cache) <= 3)
+    check("hits and misses all counted", sum(tidybot_bundle.cache_stats.values()) == 8 * 40)
+    check("disk cache still bounded", on_disk <= 3 + 8)
+
+
+def test_ast_merge():
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        make_pipeline(root)
+        code = tidybot_bundle.build_bundle("report", root)
+    check("bundle runs", run_code(code) == '{"v": 8, "reg": ["util"]}')
+    check("__future__ import hoisted once", code.count("from __future__") == 1
+          and code.index("from __future__") < code.index("# DEPENDENCY: util"))
+    check("multi-line and aliased imports merged",
+          code.count("from math import") == 1 and code.count("import functools") == 1)
+    check("first definition wins", code.count("def scaled(") == 1 and "return -1" not in code)
+    check("identical constant dropped", code.count("SCALE = 2") == 1)
+    check("dependency __main__ blocks removed", "util main" not in code)
+
+
+def test_tree_shaking():
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        make_pipeline(root)
+        code = tidybot_bundle.build_bundle("report", root)
+        full = tidybot_bundle.build_bundle("report", root, shake=False)
+        called = tidybot_bundle.build_bundle("report", root, call="print(scaled(9))")
+        make_skill(root, "report", REPORT.replace("Reading(n).v", "globals()['Reading'](n).v"))
+        dynamic = tidybot_bundle.build_bundle("report", root)
+    check("unused class, async def, function and constant dropped",
+          not any(n in code for n in ("class Unused", "unused_async", "unused_measure", "UNUSED_LIMIT")))
+    check("decorator and its imports kept", "def logged(" in code and "import functools" in code)
+    check("import-time side effects kept", 'REGISTRY.append("util")' in code)
+    check("smaller than without shaking", len(code) < len(full) and "class Unused" in full)
+    check("same result as without shaking", run_code(code) == run_code(full))
+    check("--call is an entry point", run_code(called) == "6" and "def report(" in called)
+    check("dynamic lookups disable shaking", "class Unused" in dynamic)
+
+
+HOOKS = """\
+import atexit
+
+_HANDLERS = {}
+
+
+def register(fn):
+    _HANDLERS[fn.__name__] = fn
+    return fn
+
+
+@register
+def on_grasp():
+    return "grasped"
+
+
+@atexit.register
+def cleanup():
+    print("bye")
+
+
+def dispatch(name):
+    return _HANDLERS[name]()
+
+
+def unused_hook():
+    pass
+"""
+
+
+def test_registering_decorators_kept():
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        make_skill(root, "hooks", HOOKS)
+        make_skill(root, "gripper", "def main():\n    print(dispatch('on_grasp'))\n\n"
+                   "if __name__ == '__main__':\n    main()\n", deps=["hooks"])
+        code = tidybot_bundle.build_bundle("gripper", root)
+    check("registered handlers survive shaking", "def on_grasp(" in code and "def cleanup(" in code)
+    check("registration still works", run_code(code) == "grasped\nbye")
+    check("undecorated unused code still dropped", "unused_hook" not in code)
+
+
+def test_unparseable_falls_back():
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        make_pipeline(root)
+        make_skill(root, "measure", MEASURE + "\ndef broken(:\n")
+        code = tidybot_bundle.build_bundle("report", root)
+    check("line-based merge used", "class Unused" in code and "def broken(:" in code)
+
+
+def test_dependency_graph():
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp) / "skills"
+        cache = Path(tmp) / "cache"
+        make_pipeline(root)
+        graph = tidybot_bundle.DependencyGraph(root, cache / "graph.json")
+        check("topological order", graph.resolve("report") == ["util", "measure", "report"])
+
+        reads = []
+        real_read_deps = tidybot_bundle.read_deps
+        tidybot_bundle.read_deps = lambda d: reads.append(d.name) or real_read_deps(d)
+        try:
+            reloaded = tidybot_bundle.DependencyGraph(root, cache / "graph.json")
+            order = reloaded.resolve("report")
+            check("persisted graph reused without reading deps.txt", order[-1] == "report" and reads == [])
+            make_skill(root, "util", UTIL, deps=["report"])
+            try:
+                reloaded.resolve("report")
+                cycle = ""
+            except tidybot_bundle.DependencyCycleError as e:
+                cycle = str(e)
+            check("changed deps.txt re-read", reads == ["util"])
+            check("cycle reported", cycle == "Dependency cycle: report -> measure -> util -> report")
+        finally:
+            tidybot_bundle.read_deps = real_read_deps
+        check("cycle is a bundle error", tidybot_bundle.bundle("report", root)
+              .startswith("# ERROR: Dependency cycle"))
+
+
+def test_bundle_all():
+    reset()
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp) / "skills"
+        make_pipeline(root)
+        make_tree(root)
+        make_skill(root, "orphan", "def orphan():\n    pass\n", deps=["gone"])
+        parses = []
+        real_split = tidybot_bundle.split_section
+        tidybot_bundle.split_section = lambda code: parses.append(1) or real_split(code)
+        try:
+            results = tidybot_bundle.bundle_all(root)
+        finally:
+            tidybot_bundle.split_section = real_split
+        check("every skill bundled", sorted(results) == ["detect", "grasp", "measure", "orphan", "report", "util"])
+        check("each main.py parsed once", len(parses) == 5)
+        check("failures reported per skill", results["orphan"].startswith("# ERROR: Skill 'gone' not found")
+              and run_code(results["report"]) == '{"v": 8, "reg": ["util"]}')
+
+        out_dir = Path(tmp) / "bundles"
+        out = subprocess.run(
+            [sys.executable, os.path.join(SCRIPTS_DIR, "tidybot-bundle.py"), "--all",
+             "--skills-dir", str(root), "-o", str(out_dir)],
+            capture_output=True, text=True,
+        )
+        check("CLI --all writes bundles and fails on errors", out.returncode == 1
+              and (out_dir / "report.py").exists() and not (out_dir / "orphan.py").exists()
+              and "5/6 skills bundled" in out.stderr)
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+
+def main():
+    global failed
+    tests = [
+        ("Memory cache", test_memory_cache),
+        ("Invalidation", test_invalidation),
+        ("Disk cache", test_disk_cache),
+        ("Errors not cached", test_errors_not_cached),
+        ("Pruning", test_prune),
+        ("Concurrent callers", test_concurrent_bundles),
+        ("AST merge", test_ast_merge),
+        ("Tree-shaking", test_tree_shaking),
+        ("Registering decorators", test_registering_decorators_kept),
+        ("Unparseable section", test_unparseable_falls_back),
+        ("Dependency graph", test_dependency_graph),
+        ("Bundle all skills", test_bundle_all),
+    ]
+    print("=" * 60)
+    print("Bundler Tests")
+    print("=" * 60)
+    for name, fn in tests:
+        print(f"\n{name}:")
+        try:
+            fn()
+        except Exception as e:
+            print(f"  ERROR: {e}")
+            import traceback
+            traceback.print_exc()
+            failed += 1
+    print(f"\n{'=' * 60}")
+    print(f"Results: {passed} passed, {failed} failed")
+    print("=" * 60)
+    sys.exit(0 if failed == 0 else 1)
+
+
+if __name__ == "__main__":
+    main()
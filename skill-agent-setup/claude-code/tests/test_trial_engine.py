@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""Test parallel trials with SPRT early stopping (trial_engine.py).
+
+Usage:
+    cd ~/tidybot_uni/marketing/Tidybot-Universe/skill-agent-setup/claude-code
+    python tests/test_trial_engine.py
+"""
+
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from trial_engine import SPRT, TrialEngine  # noqa: E402
+
+passed = 0
+failed = 0
+
+TARGETS = [{"name": "t1"}, {"name": "t2"}, {"name": "t3"}]
+
+
+def check(name, condition):
+    global passed, failed
+    if condition:
+        print(f"  PASS: {name}")
+        passed += 1
+    else:
+        print(f"  FAIL: {name}")
+        failed += 1
+
+
+class FakeTrials:
+    """run_trial stand-in: ``outcome(n)`` decides, ``duration(n)`` sleeps."""
+
+    def __init__(self, outcome, duration=lambda n: 0.05):
+        self.outcome = outcome
+        self.duration = duration
+        self.started: list[tuple[str, int]] = []
+        self.running = 0
+        self.max_running = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, target, n):
+        with self.lock:
+            self.started.append((target["name"], n))
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        try:
+            time.sleep(self.duration(n))
+            return {"passed": self.outcome(n), "execution_id": f"exec-{n}"}
+        finally:
+            with self.lock:
+                self.running -= 1
+
+
+# ---------------------------------------------------------------------------
+# Tests
+# ---------------------------------------------------------------------------
+
+def test_sprt_decisions():
+    s = SPRT()
+    for _ in range(2):
+        s.update(True)
+    check("two passes undecided", s.decision() == (None, ""))
+    s.update(True)
+    check("three passes decide pass", s.decision() == ("pass", "sprt"))
+
+    s = SPRT()
+    for _ in range(3):
+        s.update(False)
+    check("three failures decide fail", s.decision() == ("fail", "sprt"))
+
+    s = SPRT(max_trials=4)
+    for ok in (True, False, True, False):
+        s.update(ok)
+    check("max trials falls back to the observed rate", s.decision() == ("pass", "max_trials"))
+
+    strict = SPRT(threshold=0.9)
+    for _ in range(3):
+        strict.update(True)
+    check("higher threshold needs more evidence", strict.decision() == (None, ""))
+
+
+def test_parallel_early_pass():
+    trials = FakeTrials(lambda n: True, duration=lambda n: 0.2)
+    with tempfile.TemporaryDirectory() as tmp:
+        summary_path = Path(tmp) / "results" / "summary.json"
+        t0 = time.monotonic()
+        summary = TrialEngine(TARGETS, trials, SPRT(max_trials=10), summary_path,
+                              meta={"skill": "grasp"}).run()
+        elapsed = time.monotonic() - t0
+        on_disk = json.loads(summary_path.read_text())
+    check("decided pass by SPRT", summary["decision"] == "pass" and summary["reason"] == "sprt")
+    check("trials spread over all targets", trials.max_running == 3
+          and {t for t, _ in trials.started} == {"t1", "t2", "t3"})
+    check("stopped after one parallel round", len(trials.started) == 3 and elapsed < 0.35)
+    check("summary streamed to disk", on_disk["decision"] == "pass" and on_disk["skill"] == "grasp"
+          and len(on_disk["trials"]) == 3 and on_disk["success_rate"] == 100)
+
+
+def test_in_order_counting():
+    # Odd trials fail fast, even trials pass slowly: counting in completion
+    # order would see three quick failures first.
+    trials = FakeTrials(lambda n: n % 2 == 0, duration=lambda n: 0.02 if n % 2 else 0.15)
+    summary = TrialEngine(TARGETS[:2], trials, SPRT(max_trials=6)).run()
+    counted = [t["trial"] for t in summary["trials"] if t["counted"]]
+    check("counted in trial order", counted == list(range(1, len(counted) + 1)))
+    check("balanced results reach max trials", summary["total_trials"] == 6
+          and summary["reason"] == "max_trials" and summary["decision"] == "pass")
+
+
+def test_drains_inflight_trials():
+    # Trial 3 decides the test while trials 4 and 5 are still on the robot.
+    trials = FakeTrials(lambda n: True, duration=lambda n: {1: 0.05, 2: 0.05, 3: 0.3}.get(n, 0.4))
+    seen_during_drain = {}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        summary_path = Path(tmp) / "summary.json"
+
+        def run_trial(target, n):
+            result = trials(target, n)
+            if n == 4:
+                seen_during_drain.update(json.loads(summary_path.read_text()))
+            return result
+
+        t0 = time.monotonic()
+        summary = TrialEngine(TARGETS, run_trial, SPRT(max_trials=10), summary_path).run()
+        elapsed = time.monotonic() - t0
+    check("verdict written before the drain", seen_during_drain.get("decision") == "pass"
+          and seen_during_drain.get("status") == "draining"
+          and [t["trial"] for t in seen_during_drain.get("inflight", [])] == [4, 5])
+    check("waited for submitted trials", elapsed >= 0.4 and trials.running == 0)
+    check("late trials recorded, not counted", summary["status"] == "decided" and summary["inflight"] == []
+          and len(summary["trials"]) == 5 and summary["total_trials"] == 3)
+
+    slow = FakeTrials(lambda n: True, duration=lambda n: 5 if n == 4 else 0.02)
+    t0 = time.monotonic()
+    summary = TrialEngine(TARGETS[:2], slow, SPRT(max_trials=10), drain_timeout=0.1).run()
+    check("drain bounded by drain_timeout", time.monotonic() - t0 < 1.0)
+    check("unfinished trial left in the summary", summary["status"] == "draining"
+          and [t["trial"] for t in summary["inflight"]] == [4])
+
+
+def test_errors_count_as_failures():
+    def boom(target, n):
+        raise ConnectionError("agent server down")
+
+    summary = TrialEngine(TARGETS[:1], boom, SPRT()).run()
+    check("errors fail the skill", summary["decision"] == "fail" and summary["total_trials"] == 3)
+    check("error kept in failure modes", "agent server down" in summary["failure_modes"][0])
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+
+def main():
+    global failed
+    tests = [
+        ("SPRT decisions", test_sprt_decisions),
+        ("Parallel early pass", test_parallel_early_pass),
+        ("In-order counting", test_in_order_counting),
+        ("Drain in-flight trials", test_drains_inflight_trials),
+        ("Errors", test_errors_count_as_failures),
+    ]
+    print("=" * 60)
+    print("Trial Engine Tests")
+    print("=" * 60)
+    for name, fn in tests:
+        print(f"\n{name}:")
+        try:
+            fn()
+        except Exception as e:
+            print(f"  ERROR: {e}")
+            import traceback
+            traceback.print_exc()
+            failed += 1
+    print(f"\n{'=' * 60}")
+    print(f"Results: {passed} passed, {failed} failed")
+    print("=" * 60)
+    sys.exit(0 if failed == 0 else 1)
+
+
+if __name__ == "__main__":
+    main()
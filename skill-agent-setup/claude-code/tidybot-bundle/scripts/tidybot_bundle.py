@@ -0,0 +1,955 @@
+#!/usr/bin/env python3
+"""
+tidybot-bundle: Bundle a skill and its dependencies into a single executable script.
+
+Usage:
+    tidybot-bundle <skill-name> [--skills-dir DIR] [--output FILE] [--cache-dir DIR] [--keep-unused]
+    tidybot-bundle --all [--skills-dir DIR] [--output DIR] [--cache-dir DIR]
+
+Resolves dependencies from deps.txt, topologically sorts them,
+and inlines all code into one self-contained Python script.
+
+Sections are merged on the AST: imports are deduplicated per bound
+name, repeated functions, classes and constants are dropped (first
+definition wins), and dependency code the skill never reaches from its
+own code, its __main__ block or --call is left out (--keep-unused
+disables that). Sections that don't parse fall back to the line-based
+merge in deduplicate_bundle().
+
+Also importable (this is what tidybot-bundle.py runs):
+
+    sys.path.insert(0, ".../tidybot-bundle/scripts")
+    from tidybot_bundle import bundle
+    code = bundle("pick-up-object", skills_dir, cache_dir=cache_dir)
+
+Bundles are cached by a hash of every main.py and deps.txt in the
+resolved dependency closure (plus --call and this file), in memory and,
+with a cache dir, on disk as <hash>.py. Point the orchestrator, test
+runners and skill scripts at the same --cache-dir (or set
+TIDYBOT_BUNDLE_CACHE_DIR) to share it. The deps.txt graph of each skills
+directory is kept there too (depgraph-<hash>.json) and re-read only for
+skills whose files changed. A missing dependency or a dependency cycle
+is an error, not a partial bundle. --all bundles every skill in one
+process, parsing each main.py once.
+"""
+
+import argparse
+import ast
+import copy
+import hashlib
+import json
+import os
+import sys
+import threading
+from pathlib import Path
+from collections import OrderedDict
+
+
+DEFAULT_SKILLS_DIR = Path.home() / ".openclaw/workspace/skills"
+CACHE_DIR_ENV = "TIDYBOT_BUNDLE_CACHE_DIR"
+CACHE_MAX_ENTRIES = 256     # per cache dir, and in memory
+
+# Guards the module-level caches below (_graphs, _sections, _file_hashes,
+# _memory_cache, cache_stats): bundle() may be called from several threads
+# (e.g. the orchestrator's worker threads). Only lookups and stores hold
+# it; reading, hashing, parsing and building happen outside.
+_cache_lock = threading.Lock()
+
+
+def find_skill_dir(skill_name: str, skills_dir: Path) -> Path | None:
+    """Find a skill directory by name. Supports both old (main.py at root) and new (scripts/main.py) layouts."""
+    candidates = [
+        skills_dir / skill_name,
+        skills_dir / f"{skill_name}-repo",
+    ]
+    for candidate in candidates:
+        if candidate.is_dir():
+            if (candidate / "scripts" / "main.py").exists():
+                return candidate
+            if (candidate / "main.py").exists():
+                return candidate
+    return None
+
+
+def _get_main_py(skill_dir: Path) -> Path:
+    """Return path to main.py, preferring scripts/ subfolder."""
+    scripts_main = skill_dir / "scripts" / "main.py"
+    if scripts_main.exists():
+        return scripts_main
+    return skill_dir / "main.py"
+
+
+def _get_deps_txt(skill_dir: Path) -> Path:
+    """Return path to deps.txt, preferring scripts/ subfolder."""
+    deps_file = skill_dir / "scripts" / "deps.txt"
+    if not deps_file.exists():
+        deps_file = skill_dir / "deps.txt"
+    return deps_file
+
+
+def read_deps(skill_dir: Path) -> list[str]:
+    """Read dependencies from deps.txt (checks scripts/ first, then root)."""
+    deps_file = _get_deps_txt(skill_dir)
+    if not deps_file.exists():
+        return []
+    
+    deps = []
+    for line in deps_file.read_text().strip().split("\n"):
+        line = line.strip()
+        if line and not line.startswith("#"):
+            deps.append(line)
+    return deps
+
+
+class BundleError(Exception):
+    """A skill's dependencies can't be resolved."""
+
+
+class MissingSkillError(BundleError):
+    pass
+
+
+class DependencyCycleError(BundleError):
+    pass
+
+
+class DependencyGraph:
+    """deps.txt graph of one skills directory.
+
+    Each skill's deps are re-read only when the mtime of its main.py or
+    deps.txt changed (or its directory moved); with a cache path the graph
+    survives between processes as JSON.
+    """
+
+    VERSION = 1
+
+    def __init__(self, skills_dir: Path, cache_path: Path | None = None):
+        self.skills_dir = Path(skills_dir)
+        self.cache_path = Path(cache_path) if cache_path else None
+        self.nodes: dict[str, dict] = {}    # name -> {"dir", "sig", "deps"}
+        self.dir_mtime = 0
+        self._dirty = False
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self) -> None:
+        if self.cache_path is None:
+            return
+        try:
+            data = json.loads(self.cache_path.read_text())
+        except (OSError, ValueError):
+            return
+        if data.get("version") == self.VERSION and data.get("skills_dir") == str(self.skills_dir):
+            self.nodes = data.get("nodes", {})
+            self.dir_mtime = data.get("dir_mtime", 0)
+
+    def save(self) -> None:
+        if self.cache_path is None or not self._dirty:
+            return
+        data = {"version": self.VERSION, "skills_dir": str(self.skills_dir),
+                "dir_mtime": self.dir_mtime, "nodes": self.nodes}
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.cache_path.with_name(f".{self.cache_path.name}.{os.getpid()}.tmp")
+            tmp.write_text(json.dumps(data))
+            os.replace(tmp, self.cache_path)
+            self._dirty = False
+        except OSError as e:
+            print(f"WARNING: could not write dependency graph {self.cache_path}: {e}", file=sys.stderr)
+
+    @staticmethod
+    def _signature(skill_dir: Path) -> list[int]:
+        sig = []
+        for p in (skill_dir / "scripts" / "main.py", skill_dir / "main.py",
+                  skill_dir / "scripts" / "deps.txt", skill_dir / "deps.txt"):
+            try:
+                sig.append(p.stat().st_mtime_ns)
+            except OSError:
+                sig.append(0)
+        return sig
+
+    def _check_dir(self) -> None:
+        # A new or removed directory can change which of <name> and
+        # <name>-repo a skill resolves to.
+        try:
+            mtime = self.skills_dir.stat().st_mtime_ns
+        except OSError:
+            mtime = 0
+        if mtime != self.dir_mtime:
+            self.dir_mtime = mtime
+            self.nodes = {n: rec for n, rec in self.nodes.items() if rec["dir"] == n}
+            self._dirty = True
+
+    def node(self, name: str) -> dict | None:
+        """{"dir", "sig", "deps"} for a skill, or None if it doesn't exist."""
+        rec = self.nodes.get(name)
+        if rec is not None and self._signature(self.skills_dir / rec["dir"]) == rec["sig"]:
+            return rec
+        skill_dir = find_skill_dir(name, self.skills_dir)
+        if skill_dir is None:
+            if self.nodes.pop(name, None) is not None:
+                self._dirty = True
+            return None
+        rec = {"dir": skill_dir.name, "sig": self._signature(skill_dir), "deps": read_deps(skill_dir)}
+        self.nodes[name] = rec
+        self._dirty = True
+        return rec
+
+    def resolve(self, skill_name: str) -> list[str]:
+        """Dependencies first, ``skill_name`` last.
+
+        Raises MissingSkillError or DependencyCycleError.
+        """
+        with self._lock:
+            self._check_dir()
+            order: list[str] = []
+            done: set[str] = set()
+            path: list[str] = []
+
+            def visit(name: str) -> None:
+                if name in done:
+                    return
+                if name in path:
+                    cycle = path[path.index(name):] + [name]
+                    raise DependencyCycleError(f"Dependency cycle: {' -> '.join(cycle)}")
+                rec = self.node(name)
+                if rec is None:
+                    where = f" (required by '{path[-1]}')" if path else ""
+                    raise MissingSkillError(f"Skill '{name}' not found{where} in {self.skills_dir}")
+                path.append(name)
+                for dep in rec["deps"]:
+                    visit(dep)
+                path.pop()
+                done.add(name)
+                order.append(name)
+
+            try:
+                visit(skill_name)
+            finally:
+                self.save()
+            return order
+
+    def skills(self) -> list[str]:
+        """Every skill directory (one with a main.py), sorted."""
+        if not self.skills_dir.is_dir():
+            return []
+        return sorted(d.name for d in self.skills_dir.iterdir()
+                      if not d.name.startswith(".") and find_skill_dir(d.name, self.skills_dir) == d)
+
+
+_graphs: dict[tuple[Path, Path | None], DependencyGraph] = {}
+
+
+def dependency_graph(skills_dir: Path, cache_dir: Path | str | None = None) -> DependencyGraph:
+    """The shared graph for ``skills_dir``, persisted under ``cache_dir`` if given."""
+    skills_dir = Path(skills_dir).resolve()
+    cache_dir = Path(cache_dir) if cache_dir is not None else None
+    with _cache_lock:
+        graph = _graphs.get((skills_dir, cache_dir))
+        if graph is None:
+            cache_path = None
+            if cache_dir is not None:
+                tag = hashlib.sha256(str(skills_dir).encode()).hexdigest()[:16]
+                cache_path = cache_dir / f"depgraph-{tag}.json"
+            graph = _graphs[(skills_dir, cache_dir)] = DependencyGraph(skills_dir, cache_path)
+    return graph
+
+
+def resolve_dependencies(skill_name: str, skills_dir: Path,
+                         cache_dir: Path | str | None = None) -> list[str]:
+    """
+    Resolve all dependencies in topological order (dependencies first).
+    Raises MissingSkillError or DependencyCycleError.
+    """
+    return dependency_graph(skills_dir, cache_dir).resolve(skill_name)
+
+
+def extract_code(skill_dir: Path, skill_name: str, is_dependency: bool) -> str:
+    """
+    Extract code from a skill's main.py.
+    For dependencies, skip if __name__ == "__main__" blocks.
+    """
+    main_py = _get_main_py(skill_dir)
+    if not main_py.exists():
+        return f"# ERROR: {skill_name}/main.py not found\n"
+    
+    code = main_py.read_text()
+    
+    if is_dependency:
+        # Remove if __name__ == "__main__" block from dependencies
+        lines = code.split("\n")
+        filtered = []
+        skip_main = False
+        main_indent = 0
+        
+        for line in lines:
+            # Detect start of main block
+            stripped = line.strip()
+            if stripped.startswith("if __name__") and "__main__" in stripped:
+                skip_main = True
+                main_indent = len(line) - len(line.lstrip())
+                continue
+            
+            # If we're skipping, check if we've dedented past the main block
+            if skip_main:
+                if line.strip() == "":
+                    continue  # Skip blank lines in main block
+                current_indent = len(line) - len(line.lstrip())
+                if current_indent <= main_indent and line.strip():
+                    skip_main = False  # Dedented, stop skipping
+                else:
+                    continue  # Still in main block, skip
+            
+            filtered.append(line)
+        
+        code = "\n".join(filtered)
+    
+    return code
+
+
+def deduplicate_bundle(code_sections: list[tuple[str, str, str]]) -> list[tuple[str, str, str]]:
+    """
+    Deduplicate imports and function definitions across bundled sections.
+    
+    Each section is (label, name, code). Returns sections with duplicates removed
+    (first occurrence wins). Line-based; only used when a section doesn't
+    parse (see merge_sections for the AST merge).
+    """
+    import re
+    
+    seen_imports = set()      # "import x" or "from x import y" lines
+    seen_functions = set()    # function names
+    
+    result = []
+    for label, name, code in code_sections:
+        lines = code.split("\n")
+        filtered = []
+        skip_func = False
+        func_indent = 0
+        
+        i = 0
+        while i < len(lines):
+            line = lines[i]
+            stripped = line.strip()
+            
+            # Handle imports
+            if stripped.startswith(("import ", "from ")) and not stripped.startswith("from ."):
+                if stripped in seen_imports:
+                    i += 1
+                    continue
+                seen_imports.add(stripped)
+                filtered.append(line)
+                i += 1
+                continue
+            
+            # Handle function definitions
+            func_match = re.match(r'^(def \w+)\(', stripped)
+            if func_match:
+                func_sig = func_match.group(1)
+                if func_sig in seen_functions:
+                    # Skip entire function body
+                    base_indent = len(line) - len(line.lstrip())
+                    i += 1
+                    while i < len(lines):
+                        next_line = lines[i]
+                        if next_line.strip() == "":
+                            i += 1
+                            continue
+                        next_indent = len(next_line) - len(next_line.lstrip())
+                        if next_indent <= base_indent:
+                            break
+                        i += 1
+                    continue
+                seen_functions.add(func_sig)
+            
+            filtered.append(line)
+            i += 1
+        
+        result.append((label, name, "\n".join(filtered)))
+    
+    return result
+
+
+# ---------------------------------------------------------------------------
+# AST merge and tree-shaking
+# ---------------------------------------------------------------------------
+
+# Code that looks names up by string defeats name-based reachability.
+DYNAMIC_LOOKUPS = {"globals", "locals", "vars", "eval", "exec"}
+
+
+class _Unit:
+    """One top-level statement of a section, with the comments above it."""
+
+    def __init__(self, node: ast.stmt, lead: str, body: str):
+        self.node = node
+        self.lead = lead
+        self.body = body
+        self.kind = "effect"    # future | import | def | assign | main | effect
+        self.defines: set[str] = set()
+        self.uses: set[str] = set()
+        self.aliases: list[tuple[str, tuple, ast.alias]] = []   # imports: (bound name, spec, alias)
+        self.keep = True
+        self.reached = False
+
+    def text(self) -> str:
+        node = self.node
+        if self.kind == "import" and len(self.aliases) < len(node.names):
+            cls = type(node)
+            new = cls(names=[a for _, _, a in self.aliases],
+                      **({"module": node.module, "level": node.level} if cls is ast.ImportFrom else {}))
+            return self.lead + ast.unparse(new) + "\n"
+        return self.lead + self.body
+
+
+def _is_main_guard(node: ast.stmt) -> bool:
+    if not isinstance(node, ast.If) or not isinstance(node.test, ast.Compare):
+        return False
+    t = node.test
+    if len(t.ops) != 1 or not isinstance(t.ops[0], ast.Eq):
+        return False
+    sides = [t.left, t.comparators[0]]
+    return (any(isinstance(x, ast.Name) and x.id == "__name__" for x in sides)
+            and any(isinstance(x, ast.Constant) and x.value == "__main__" for x in sides))
+
+
+def _names(node: ast.AST, stored: bool = False) -> set[str]:
+    """Every name the node reads (or, with stored=True, binds) anywhere inside it."""
+    out = set()
+    for n in ast.walk(node):
+        if isinstance(n, ast.Name) and isinstance(n.ctx, ast.Store) == stored:
+            out.add(n.id)
+        elif isinstance(n, ast.Global) and not stored:
+            out.update(n.names)
+    return out
+
+
+def _classify(u: _Unit) -> None:
+    node = u.node
+    if isinstance(node, ast.Import):
+        u.kind = "import"
+        u.aliases = [(a.asname or a.name.split(".")[0], ("import", a.name, a.asname), a)
+                     for a in node.names]
+        u.uses = {al[0] for al in u.aliases}   # keeps the skill's own imports reachable
+    elif isinstance(node, ast.ImportFrom):
+        if node.module == "__future__":
+            u.kind = "future"
+        elif node.level == 0 and all(a.name != "*" for a in node.names):
+            u.kind = "import"
+            u.aliases = [(a.asname or a.name, ("from", node.module, a.name, a.asname), a)
+                         for a in node.names]
+            u.uses = {al[0] for al in u.aliases}
+    elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+        u.kind = "def"
+        u.defines = {node.name}
+        u.uses = _names(node)
+    elif _is_main_guard(node):
+        u.kind = "main"
+        u.uses = _names(node)
+    else:
+        u.defines = _names(node, stored=True)
+        u.uses = _names(node)
+        targets = (node.targets if isinstance(node, ast.Assign)
+                   else [node.target] if isinstance(node, ast.AnnAssign) else None)
+        value = getattr(node, "value", None)
+        # Plain name bindings without calls can be dropped when unused;
+        # anything that may do work at import time is kept.
+        if (targets is not None
+                and all(isinstance(t, ast.Name) or (isinstance(t, ast.Tuple)
+                        and all(isinstance(e, ast.Name) for e in t.elts)) for t in targets)
+                and not (value is not None and any(isinstance(n, (ast.Call, ast.Await, ast.Yield,
+                                                                  ast.YieldFrom, ast.NamedExpr))
+                                                   for n in ast.walk(value)))):
+            u.kind = "assign"
+
+
+def _decorated(u: _Unit) -> bool:
+    """A decorated def/class: the decorator runs at import time and may
+    register it (@register, @atexit.register), so it is a root like an effect."""
+    return u.kind == "def" and bool(u.node.decorator_list)
+
+
+def split_section(code: str) -> tuple[list[_Unit], str]:
+    """Split a section into top-level units plus trailing text (comments).
+
+    Raises SyntaxError if the code doesn't parse.
+    """
+    tree = ast.parse(code)
+    lines = code.splitlines(keepends=True)
+    units: list[_Unit] = []
+    prev_end = 0
+    for node in tree.body:
+        start = min([node.lineno] + [d.lineno for d in getattr(node, "decorator_list", [])])
+        if units and start <= prev_end:
+            # Statements sharing a line (a; b) stay together and are kept as-is.
+            u = units[-1]
+            u.body += "".join(lines[prev_end:node.end_lineno])
+            u.kind, u.aliases = "effect", []
+            u.defines |= _names(node, stored=True)
+            u.uses |= _names(node)
+        else:
+            u = _Unit(node, "".join(lines[prev_end:start - 1]), "".join(lines[start - 1:node.end_lineno]))
+            if u.body and not u.body.endswith("\n"):
+                u.body += "\n"
+            _classify(u)
+            units.append(u)
+        prev_end = max(prev_end, node.end_lineno)
+    return units, "".join(lines[prev_end:])
+
+
+def merge_sections(sections: list[tuple[str, str, list[_Unit]]], call: str | None = None,
+                   shake: bool = True) -> dict:
+    """Deduplicate and tree-shake parsed sections in place (sets ``_Unit.keep``).
+
+    ``sections`` are (label, name, units) in bundle order, the MAIN one
+    last. Returns {"future": [...], "duplicate": n, "unused": n}.
+    """
+    stats = {"future": [], "duplicate": 0, "unused": 0}
+    bindings: dict[str, tuple | None] = {}   # name -> what it is currently bound to
+
+    for label, _, units in sections:
+        for u in units:
+            if u.kind == "future":
+                stats["future"].extend(a.name for a in u.node.names if a.name not in stats["future"])
+                u.keep = False
+            elif u.kind == "main" and (label != "MAIN" or call is not None):
+                u.keep = False
+            elif u.kind == "import":
+                fresh = [al for al in u.aliases if bindings.get(al[0]) != ("import", al[1])]
+                for bound, spec, _ in fresh:
+                    bindings[bound] = ("import", spec)
+                u.aliases = fresh
+                u.keep = bool(fresh)
+            elif u.kind == "def":
+                if (bindings.get(u.node.name) or ("",))[0] == "def":
+                    u.keep = False      # first definition wins
+                    stats["duplicate"] += 1
+                else:
+                    bindings[u.node.name] = ("def",)
+            elif u.kind == "assign":
+                sig = ("assign", ast.dump(u.node))
+                if all(bindings.get(n) == sig for n in u.defines):
+                    u.keep = False
+                    stats["duplicate"] += 1
+                else:
+                    bindings.update(dict.fromkeys(u.defines, sig))
+            else:
+                bindings.update(dict.fromkeys(u.defines))
+
+    every = [(label, u) for label, _, units in sections for u in units]
+    kept = [(label, u) for label, u in every if u.keep]
+    if not shake or any(u.uses & DYNAMIC_LOOKUPS for _, u in kept):
+        return stats
+    try:
+        entry = _names(ast.parse(call)) if call else set()
+    except SyntaxError:
+        return stats
+
+    # Roots: the skill's own code, and anything that runs at import time.
+    definers: dict[str, list[_Unit]] = {}
+    todo = []
+    for label, u in every:
+        if label == "MAIN" and u.kind == "import" and not u.keep:
+            todo.append(u)      # deduplicated against a dependency's import
+        elif not u.keep:
+            continue
+        elif label == "MAIN" or u.kind in ("effect", "main") or _decorated(u):
+            u.reached = True
+            todo.append(u)
+        elif u.kind in ("def", "assign"):
+            for n in u.defines:
+                definers.setdefault(n, []).append(u)
+    needed: set[str] = set()
+    names = list(entry)
+    while names or todo:
+        if todo:
+            names.extend(todo.pop().uses)
+            continue
+        n = names.pop()
+        if n in needed:
+            continue
+        needed.add(n)
+        for d in definers.get(n, ()):
+            if not d.reached:
+                d.reached = True
+                todo.append(d)
+
+    for label, u in kept:
+        if label == "MAIN" or u.reached:
+            continue
+        if u.kind == "import":
+            u.aliases = [al for al in u.aliases if al[0] in needed]
+            u.keep = bool(u.aliases)
+        else:
+            u.keep = False
+            stats["unused"] += 1
+    return stats
+
+
+_sections: dict[Path, tuple[int, int, list[_Unit], str]] = {}   # main.py -> (mtime_ns, size, units, trailing)
+
+
+def parsed_section(main_py: Path) -> tuple[list[_Unit], str]:
+    """split_section() of a main.py, parsed once per (mtime, size).
+
+    Returns copies of the units, so bundles built from the same parse
+    (e.g. every skill depending on one base skill) don't interfere.
+    """
+    st = main_py.stat()
+    with _cache_lock:
+        hit = _sections.get(main_py)
+    if hit is None or hit[:2] != (st.st_mtime_ns, st.st_size):
+        units, trailing = split_section(main_py.read_text())
+        hit = (st.st_mtime_ns, st.st_size, units, trailing)
+        with _cache_lock:
+            _sections[main_py] = hit
+    return [copy.copy(u) for u in hit[2]], hit[3]
+
+
+def _ast_sections(order: list[str], skills_dir: Path, call: str | None,
+                  shake: bool) -> tuple[list[tuple[str, str, str]], dict] | None:
+    """Sections merged on the AST, or None if any main.py doesn't parse."""
+    parsed = []
+    for i, name in enumerate(order):
+        label = "DEPENDENCY" if (i < len(order) - 1) else "MAIN"
+        skill_dir = find_skill_dir(name, skills_dir)
+        if skill_dir is None:
+            parsed.append(("ERROR", name, None, f"# ERROR: Skill '{name}' not found"))
+            continue
+        main_py = _get_main_py(skill_dir)
+        if not main_py.exists():
+            parsed.append(("ERROR", name, None, f"# ERROR: {name}/main.py not found\n"))
+            continue
+        try:
+            units, trailing = parsed_section(main_py)
+        except SyntaxError as e:
+            print(f"WARNING: {name}/main.py does not parse ({e.msg}, line {e.lineno}); "
+                  f"using line-based merge", file=sys.stderr)
+            return None
+        parsed.append((label, name, units, trailing))
+
+    stats = merge_sections([(label, name, units) for label, name, units, _ in parsed if units is not None],
+                           call=call, shake=shake)
+    sections = []
+    for label, name, units, trailing in parsed:
+        if units is None:
+            sections.append((label, name, trailing))
+            continue
+        kept = [u.text() for u in units if u.keep]
+        code = ("".join(kept) + trailing).strip("\n") if kept else "# (nothing used by the entry point)"
+        sections.append((label, name, code + "\n"))
+    return sections, stats
+
+
+def build_bundle(skill_name: str, skills_dir: Path, call: str | None = None,
+                 shake: bool = True, cache_dir: Path | str | None = None) -> str:
+    """Bundle a skill and all dependencies into one script (uncached).
+    
+    Args:
+        skill_name: Name of the skill to bundle
+        skills_dir: Path to skills directory
+        call: Optional function call to append (replaces __main__ block).
+              e.g. 'pick_and_place(pick_target="ball", place_target="trash can")'
+        shake: Drop dependency code the skill never reaches
+        cache_dir: Where the dependency graph is persisted (optional)
+    """
+    try:
+        order = resolve_dependencies(skill_name, skills_dir, cache_dir)
+    except BundleError as e:
+        return f"# ERROR: {e}\n"
+    
+    merged = _ast_sections(order, skills_dir, call, shake)
+    if merged is not None:
+        sections, stats = merged
+    else:
+        # Collect all code sections
+        sections = []
+        for i, name in enumerate(order):
+            skill_dir = find_skill_dir(name, skills_dir)
+            if skill_dir is None:
+                sections.append(("ERROR", name, f"# ERROR: Skill '{name}' not found"))
+                continue
+            
+            # When --call is used, treat the main skill like a dependency too
+            # (strip its __main__ block since we'll append our own call)
+            is_dep = (i < len(order) - 1) or (call is not None)
+            label = "DEPENDENCY" if (i < len(order) - 1) else "MAIN"
+            code = extract_code(skill_dir, name, is_dependency=is_dep)
+            sections.append((label, name, code))
+        
+        # Deduplicate imports and functions
+        sections = deduplicate_bundle(sections)
+        stats = {"future": [], "duplicate": 0, "unused": 0}
+    
+    parts = [
+        '"""',
+        f"Bundled skill: {skill_name}",
+        f"Dependencies: {', '.join(order[:-1]) if len(order) > 1 else 'none'}",
+        f"Generated by tidybot-bundle",
+    ]
+    if stats["duplicate"] or stats["unused"]:
+        parts.append(f"Dropped: {stats['duplicate']} duplicate, {stats['unused']} unused top-level definitions")
+    parts += ['"""', ""]
+    if stats["future"]:
+        parts.append(f"from __future__ import {', '.join(stats['future'])}")
+    
+    for label, name, code in sections:
+        parts.append("")
+        parts.append("# " + "=" * 76)
+        parts.append(f"# {label}: {name}")
+        parts.append("# " + "=" * 76)
+        parts.append("")
+        parts.append(code)
+    
+    # Append custom call if provided
+    if call:
+        parts.append("")
+        parts.append("# " + "=" * 76)
+        parts.append("# Entry point (via --call)")
+        parts.append("# " + "=" * 76)
+        parts.append("")
+        parts.append(call)
+    
+    return "\n".join(parts)
+
+
+# ---------------------------------------------------------------------------
+# Bundle cache
+# ---------------------------------------------------------------------------
+
+_file_hashes: dict[Path, tuple[int, int, str]] = {}   # path -> (mtime_ns, size, sha256)
+_memory_cache: "OrderedDict[str, str]" = OrderedDict()
+cache_stats = {"memory": 0, "disk": 0, "miss": 0}
+
+
+def _file_hash(path: Path) -> str:
+    """sha256 of a file, memoized on (mtime, size); "-" if it doesn't exist."""
+    try:
+        st = path.stat()
+    except OSError:
+        return "-"
+    with _cache_lock:
+        memo = _file_hashes.get(path)
+    if memo is not None and memo[:2] == (st.st_mtime_ns, st.st_size):
+        return memo[2]
+    digest = hashlib.sha256(path.read_bytes()).hexdigest()
+    with _cache_lock:
+        _file_hashes[path] = (st.st_mtime_ns, st.st_size, digest)
+    return digest
+
+
+def bundle_key(skill_name: str, skills_dir: Path, call: str | None = None,
+               shake: bool = True, cache_dir: Path | str | None = None) -> str | None:
+    """Content hash of everything build_bundle() reads for this skill.
+
+    None if the dependencies don't resolve (error bundles aren't cached).
+    """
+    skills_dir = Path(skills_dir)
+    h = hashlib.sha256(_file_hash(Path(__file__).resolve()).encode())
+    h.update(f"\0{skill_name}\0{call or ''}\0{int(shake)}".encode())
+    try:
+        order = resolve_dependencies(skill_name, skills_dir, cache_dir)
+    except BundleError:
+        return None
+    for name in order:
+        skill_dir = find_skill_dir(name, skills_dir)
+        if skill_dir is None:
+            return None
+        main_py = _get_main_py(skill_dir)
+        deps_txt = _get_deps_txt(skill_dir)
+        h.update(f"\0{name}\0{main_py.relative_to(skill_dir)}\0{_file_hash(main_py)}"
+                 f"\0{_file_hash(deps_txt)}".encode())
+    return h.hexdigest()
+
+
+def _remember(key: str, code: str) -> None:
+    with _cache_lock:
+        _memory_cache[key] = code
+        _memory_cache.move_to_end(key)
+        while len(_memory_cache) > CACHE_MAX_ENTRIES:
+            _memory_cache.popitem(last=False)
+
+
+def _recall(key: str) -> str | None:
+    """The in-memory bundle for ``key`` (counted as a memory hit), else None."""
+    with _cache_lock:
+        code = _memory_cache.get(key)
+        if code is not None:
+            cache_stats["memory"] += 1
+            _memory_cache.move_to_end(key)
+        return code
+
+
+def _count(kind: str) -> None:
+    with _cache_lock:
+        cache_stats[kind] += 1
+
+
+def _disk_get(cache_dir: Path, key: str) -> str | None:
+    path = cache_dir / f"{key}.py"
+    try:
+        code = path.read_text()
+        os.utime(path)  # LRU order for pruning
+    except OSError:
+        return None
+    return code
+
+
+def _mtime(path: Path) -> float:
+    try:
+        return path.stat().st_mtime
+    except OSError:
+        return 0.0   # pruned by another thread or process meanwhile
+
+
+def _disk_put(cache_dir: Path, key: str, code: str) -> None:
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp = cache_dir / f".{key}.{os.getpid()}.{threading.get_ident()}.tmp"
+        tmp.write_text(code)
+        os.replace(tmp, cache_dir / f"{key}.py")
+        entries = sorted(cache_dir.glob("*.py"), key=_mtime)
+        for old in entries[:max(0, len(entries) - CACHE_MAX_ENTRIES)]:
+            old.unlink(missing_ok=True)
+    except OSError as e:
+        print(f"WARNING: could not write bundle cache {cache_dir}: {e}", file=sys.stderr)
+
+
+def bundle(skill_name: str, skills_dir: Path, call: str | None = None,
+           cache_dir: Path | str | None = None, shake: bool = True) -> str:
+    """Bundle a skill and all dependencies into one script, reusing a cached
+    bundle when none of the files it is built from changed.
+
+    Args:
+        skill_name: Name of the skill to bundle
+        skills_dir: Path to skills directory
+        call: Optional function call to append (see build_bundle)
+        cache_dir: Optional on-disk cache shared between processes
+        shake: Drop dependency code the skill never reaches
+    """
+    skills_dir = Path(skills_dir)
+    key = bundle_key(skill_name, skills_dir, call, shake, cache_dir)
+    if key is None:
+        _count("miss")
+        return build_bundle(skill_name, skills_dir, call=call, shake=shake, cache_dir=cache_dir)
+    code = _recall(key)
+    if code is not None:
+        return code
+    if cache_dir is not None:
+        code = _disk_get(Path(cache_dir), key)
+        if code is not None:
+            _count("disk")
+            _remember(key, code)
+            return code
+    _count("miss")
+    code = build_bundle(skill_name, skills_dir, call=call, shake=shake, cache_dir=cache_dir)
+    _remember(key, code)
+    if cache_dir is not None:
+        _disk_put(Path(cache_dir), key, code)
+    return code
+
+
+def bundle_all(skills_dir: Path, cache_dir: Path | str | None = None,
+               shake: bool = True) -> dict[str, str]:
+    """Bundle every skill in ``skills_dir`` in this process.
+
+    The dependency graph and parsed main.py sections are shared, so each
+    file is read and parsed once however many skills depend on it.
+    Returns {skill: bundle}; failures are "# ERROR: ..." strings.
+    """
+    return {name: bundle(name, skills_dir, cache_dir=cache_dir, shake=shake)
+            for name in dependency_graph(skills_dir, cache_dir).skills()}
+
+
+def _main_all(args) -> None:
+    if args.call:
+        sys.exit("ERROR: --call can't be combined with --all")
+    if args.output:
+        args.output.mkdir(parents=True, exist_ok=True)
+    results = bundle_all(args.skills_dir, cache_dir=args.cache_dir, shake=not args.keep_unused)
+    errors = 0
+    for name, code in results.items():
+        if code.startswith("# ERROR"):
+            status = code.strip()[2:]
+        else:
+            try:
+                compile(code, f"<{name} bundle>", "exec")
+                status = f"ok ({code.count(chr(10)) + 1} lines)"
+            except SyntaxError as e:
+                status = f"ERROR: bundle does not compile: {e.msg} (line {e.lineno})"
+            if args.output:
+                (args.output / f"{name}.py").write_text(code)
+        errors += status.startswith("ERROR")
+        print(f"{name}: {status}", file=sys.stderr)
+    print(f"{len(results) - errors}/{len(results)} skills bundled", file=sys.stderr)
+    sys.exit(1 if errors else 0)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Bundle a TidyBot skill and its dependencies"
+    )
+    parser.add_argument("skill", nargs="?", help="Skill name to bundle")
+    parser.add_argument(
+        "--all",
+        action="store_true",
+        help="Bundle every skill in the skills directory and report failures; "
+             "--output is then a directory for <skill>.py files"
+    )
+    parser.add_argument(
+        "--skills-dir", "-d",
+        type=Path,
+        default=DEFAULT_SKILLS_DIR,
+        help=f"Skills directory (default: {DEFAULT_SKILLS_DIR})"
+    )
+    parser.add_argument(
+        "--output", "-o",
+        type=Path,
+        help="Output file (default: stdout)"
+    )
+    parser.add_argument(
+        "--call", "-c",
+        type=str,
+        help="Function call to append as entry point (replaces __main__ block). "
+             'e.g. \'pick_and_place(pick_target="ball", place_target="trash")\''
+    )
+    parser.add_argument(
+        "--keep-unused",
+        action="store_true",
+        help="Keep dependency code the skill never reaches (no tree-shaking)"
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        default=os.environ.get(CACHE_DIR_ENV) or None,
+        help=f"Reuse bundles and the dependency graph cached here when no source file changed "
+             f"(default: ${CACHE_DIR_ENV}, else no disk cache)"
+    )
+    
+    args = parser.parse_args()
+    
+    if not args.skills_dir.is_dir():
+        print(f"ERROR: Skills directory not found: {args.skills_dir}", file=sys.stderr)
+        sys.exit(1)
+    
+    if args.all:
+        _main_all(args)
+    if not args.skill:
+        parser.error("a skill name (or --all) is required")
+    
+    result = bundle(args.skill, args.skills_dir, call=args.call, cache_dir=args.cache_dir,
+                    shake=not args.keep_unused)
+    
+    if result.startswith("# ERROR"):
+        print(result.strip()[2:], file=sys.stderr)
+        sys.exit(1)
+    
+    if args.output:
+        args.output.write_text(result)
+        print(f"Bundled to {args.output}", file=sys.stderr)
+    else:
+        print(result)
+
+
+if __name__ == "__main__":
+    main()
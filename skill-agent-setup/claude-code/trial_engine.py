@@ -0,0 +1,235 @@
+"""Parallel ground-truth trials with sequential early stopping.
+
+The generated run_trials.py used to run NUM_TRIALS = 1 serially and
+run_mechanical_test passed any skill with a success rate above zero — one
+lucky or unlucky trial decided the verdict, and more trials meant a
+proportionally slower test. This engine runs trials on every configured
+target at once (one worker per target; each trial resets that target's
+sim) and stops as soon as a sequential probability ratio test decides:
+
+    H1  success probability >= threshold + delta   -> "pass"
+    H0  success probability <= threshold - delta   -> "fail"
+
+with error rates ``alpha`` (false pass) and ``beta`` (false fail). If
+``max_trials`` is reached first, the observed rate against ``threshold``
+decides. With the defaults (threshold 0.5, delta 0.2, alpha = beta = 0.1)
+three straight passes or three straight failures decide.
+
+Trials finish out of order across targets, and failures are usually
+faster than successes. Results are therefore fed to the test in trial
+order, so stopping early does not favour quick crashes. Trials still
+running when the test decides are not counted, but their robot jobs are
+already submitted: run() writes the verdict right away (status
+"draining", with the trials listed under "inflight") and then waits up to
+``drain_timeout`` seconds for them, so the next test on that target
+doesn't overlap a leftover job.
+
+Stdlib only — it is imported by generated tests the same way job_waiter is:
+
+    engine = TrialEngine(targets, run_trial, SPRT(threshold=0.5),
+                         summary_path="tests/results/summary.json",
+                         meta={"skill": "pick-up-yogurt"})
+    summary = engine.run()      # summary["decision"] in ("pass", "fail")
+
+``run_trial(target, trial_num)`` returns {"passed": bool, ...}; extra keys
+(execution_id, error) are kept in the summary. summary.json is rewritten
+atomically after every finished trial.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Optional
+
+DEFAULT_THRESHOLD = 0.5
+DEFAULT_DELTA = 0.2
+DEFAULT_ALPHA = 0.1
+DEFAULT_BETA = 0.1
+DEFAULT_MAX_TRIALS = 10
+DEFAULT_DRAIN_TIMEOUT = 600.0
+
+
+class SPRT:
+    """Wald's sequential probability ratio test for a Bernoulli success rate."""
+
+    def __init__(self, threshold: float = DEFAULT_THRESHOLD, delta: float = DEFAULT_DELTA,
+                 alpha: float = DEFAULT_ALPHA, beta: float = DEFAULT_BETA,
+                 max_trials: int = DEFAULT_MAX_TRIALS):
+        self.threshold = threshold
+        self.p0 = min(max(threshold - delta, 0.01), 0.98)
+        self.p1 = min(max(threshold + delta, self.p0 + 0.01), 0.99)
+        self.alpha = alpha
+        self.beta = beta
+        self.max_trials = max(1, max_trials)
+        self.upper = math.log((1 - beta) / alpha)
+        self.lower = math.log(beta / (1 - alpha))
+        self.passed = 0
+        self.failed = 0
+        self.llr = 0.0
+
+    @property
+    def trials(self) -> int:
+        return self.passed + self.failed
+
+    def update(self, passed: bool) -> None:
+        if passed:
+            self.passed += 1
+            self.llr += math.log(self.p1 / self.p0)
+        else:
+            self.failed += 1
+            self.llr += math.log((1 - self.p1) / (1 - self.p0))
+
+    def decision(self) -> tuple[Optional[str], str]:
+        """("pass" | "fail" | None, reason)."""
+        if self.llr >= self.upper:
+            return "pass", "sprt"
+        if self.llr <= self.lower:
+            return "fail", "sprt"
+        if self.trials >= self.max_trials:
+            rate = self.passed / self.trials
+            return ("pass" if rate >= self.threshold else "fail"), "max_trials"
+        return None, ""
+
+    def snapshot(self) -> dict:
+        return {
+            "p0": round(self.p0, 4), "p1": round(self.p1, 4),
+            "alpha": self.alpha, "beta": self.beta, "max_trials": self.max_trials,
+            "llr": round(self.llr, 4), "lower": round(self.lower, 4), "upper": round(self.upper, 4),
+        }
+
+
+class TrialEngine:
+    def __init__(self, targets: list[dict], run_trial: Callable[[dict, int], dict],
+                 sprt: SPRT, summary_path=None, meta: Optional[dict] = None,
+                 drain_timeout: float = DEFAULT_DRAIN_TIMEOUT):
+        self.targets = targets or [{"name": "default"}]
+        self.run_trial = run_trial
+        self.sprt = sprt
+        self.summary_path = Path(summary_path) if summary_path else None
+        self.meta = meta or {}
+        self.drain_timeout = drain_timeout
+        self.trials: list[dict] = []
+        self.decision: Optional[str] = None
+        self.reason = ""
+        self._next_trial = 1        # next trial number to hand out
+        self._next_counted = 1      # next trial number the test consumes
+        self._pending: dict[int, dict] = {}
+        self._inflight: dict[int, str] = {}   # trial number -> target, while running
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        self._running = 0
+        self._started = 0.0
+
+    def _claim(self, target: dict) -> Optional[int]:
+        with self._lock:
+            if self.decision is not None or self._next_trial > self.sprt.max_trials:
+                return None
+            n = self._next_trial
+            self._next_trial += 1
+            self._running += 1
+            self._inflight[n] = target.get("name", "")
+            return n
+
+    def _finish(self, target: dict, n: int, result: dict, seconds: float) -> None:
+        with self._lock:
+            self._running -= 1
+            self._inflight.pop(n, None)
+            rec = {"trial": n, "target": target.get("name", ""), "seconds": round(seconds, 2),
+                   **result, "passed": bool(result.get("passed")), "counted": False}
+            self.trials.append(rec)
+            if self.decision is None:
+                self._pending[n] = rec
+                while self._next_counted in self._pending:
+                    counted = self._pending.pop(self._next_counted)
+                    counted["counted"] = True
+                    self.sprt.update(counted["passed"])
+                    self._next_counted += 1
+                    self.decision, self.reason = self.sprt.decision()
+                    if self.decision is not None:
+                        break
+            print(f"SPRT after trial {n} [{rec['target']}]: {self.sprt.passed}/{self.sprt.trials} "
+                  f"counted passed, llr={self.sprt.llr:.2f}", flush=True)
+            self._write_summary()
+            if self.decision is not None or (self._running == 0 and self._claim_exhausted()):
+                self._done.set()
+
+    def _claim_exhausted(self) -> bool:
+        return self._next_trial > self.sprt.max_trials
+
+    def _worker(self, target: dict) -> None:
+        while True:
+            n = self._claim(target)
+            if n is None:
+                break
+            t0 = time.monotonic()
+            try:
+                result = self.run_trial(target, n)
+            except Exception as e:
+                result = {"passed": False, "error": f"{type(e).__name__}: {e}"[:200]}
+            self._finish(target, n, result, time.monotonic() - t0)
+
+    def summary(self) -> dict:
+        s = self.sprt
+        counted = sorted((t for t in self.trials if t["counted"]), key=lambda t: t["trial"])
+        per_target: dict[str, dict] = {}
+        for t in self.trials:
+            pt = per_target.setdefault(t["target"], {"passed": 0, "failed": 0})
+            pt["passed" if t["passed"] else "failed"] += 1
+        return {
+            **self.meta,
+            "status": ("draining" if self._inflight else "decided") if self.decision else "running",
+            "inflight": [{"trial": n, "target": t} for n, t in sorted(self._inflight.items())],
+            "decision": self.decision,
+            "reason": self.reason,
+            "success_threshold": s.threshold,
+            "success_rate": (s.passed / s.trials * 100) if s.trials else 0,
+            "total_trials": s.trials,
+            "passed": s.passed,
+            "failed": s.failed,
+            "failure_modes": [f"trial_{t['trial']}" + (f": {t['error']}" if t.get("error") else "")
+                              for t in counted if not t["passed"]],
+            "sprt": s.snapshot(),
+            "targets": per_target,
+            "trials": sorted(self.trials, key=lambda t: t["trial"]),
+            "elapsed_s": round(time.monotonic() - self._started, 2),
+        }
+
+    def _write_summary(self) -> None:
+        if self.summary_path is None:
+            return
+        self.summary_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.summary_path.with_suffix(".json.tmp")
+        tmp.write_text(json.dumps(self.summary(), indent=2))
+        os.replace(tmp, self.summary_path)
+
+    def run(self) -> dict:
+        """Run until decided; returns the final summary (also on disk)."""
+        self._started = time.monotonic()
+        with self._lock:
+            self._write_summary()
+        workers = [threading.Thread(target=self._worker, args=(target,), daemon=True,
+                                    name=f"trial-{target.get('name', '')}")
+                   for target in self.targets]
+        for w in workers:
+            w.start()
+        self._done.wait()
+        with self._lock:
+            if self.decision is None:   # workers gone without a decision
+                self.decision, self.reason = self.sprt.decision()
+                if self.decision is None:
+                    self.decision, self.reason = "fail", "no_trials"
+            self._write_summary()
+            draining = len(self._inflight)
+        if draining:
+            print(f"SPRT decided {self.decision}; waiting for {draining} in-flight trial(s)", flush=True)
+        deadline = time.monotonic() + self.drain_timeout
+        for w in workers:
+            w.join(max(0.0, deadline - time.monotonic()))
+        with self._lock:
+            self._write_summary()
+            return self.summary()